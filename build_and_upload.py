@@ -819,10 +819,17 @@ def delete_data_files(port):
         # 삭제할 데이터 파일들
         data_files = [
             "/data/global_data.json",
+            "/data/screen_backup.json",
             "/data/dispense_log.json", 
+            "/data/dispense_log.bin",
             "/data/boot_target.json",
             "/data/disk_states.json",
             "/data/medication.json",
+            "/data/disk_counters.bin",
+            "/data/state.kv",
+            "/data/io_stats.bin",
+            "/data/motion_state.bin",
+            "/data/door_levels.bin",
             "/data/settings.json"
         ]
         
@@ -833,13 +840,17 @@ def delete_data_files(port):
         # 삭제 확인
         print(f"\n⚠️  경고: 모든 데이터 파일이 삭제됩니다!")
         print("이 작업은 다음 데이터를 삭제합니다:")
-        print("  - 전역 데이터 (global_data.json)")
-        print("  - 복용 로그 (dispense_log.json)")
+        print("  - 전역 데이터 (global_data.json, screen_backup.json)")
+        print("  - 복용 로그 (dispense_log.json, dispense_log.bin)")
         print("  - 부팅 타겟 (boot_target.json)")
         print("  - 디스크 상태 (disk_states.json)")
-        print("  - 약물 정보 (medication.json)")
+        print("  - 약물 정보 (medication.json, disk_counters.bin)")
         print("  - 설정 정보 (settings.json)")
         print("  - WiFi 연결 설정 (wifi_config.json)")
+        print("  - 상태 저장소 (state.kv: 부팅 타겟, 디스크 상태, WiFi 설정)")
+        print("  - 플래시 쓰기 통계 (io_stats.bin)")
+        print("  - 모터 위치 상태 (motion_state.bin: 원점/정상 종료 플래그, 삭제 시 다음 부팅에서 원점 보정)")
+        print("  - 도어 레벨 보정 표 (door_levels.bin)")
         
         confirm = input("\n정말로 모든 데이터 파일을 삭제하시겠습니까? (yes 입력): ").strip().lower()
         
@@ -388,8 +388,42 @@ class AlarmSystem:
             # print(f"[ERROR] 알람 종료 실패: {e}")
             return False
     
-    def _handle_dispense_failure(self, dose_index, alarm_info):
-        """복용 실패 처리 - 심볼을 lv.SYMBOL.CLOSE로 변경"""
+    def report_motor_faults(self, dose_index, faults):
+        """배출 중 모터 이상 보고 - 걸림(stall)은 배출 실패로 처리, 미끄러짐(slip)/short는 기록만
+        
+        걸림은 이력/실패 심볼만 남기고 배출 실패 로그(log_dispense)는 배출을 실행한 쪽이 1번 기록
+        
+        Args:
+            dose_index: 배출 중이던 일정 인덱스
+            faults: PillBoxMotorSystem.take_faults() 결과 [(종류, 디스크 번호, 스텝 수)]
+        """
+        try:
+            alarm_info = self.active_alarms.get(dose_index, {})
+            stalled = False
+            for kind, disk_num, steps in faults:
+                # print(f"[WARN] 디스크 {disk_num} 모터 이상: {kind} ({steps}스텝)")
+                self.alarm_history.append({
+                    "timestamp": self._get_current_timestamp(),
+                    "dose_index": dose_index,
+                    "dose_time": alarm_info.get("dose_time", ""),
+                    "meal_name": alarm_info.get("meal_name", f"일정 {dose_index + 1}"),
+                    "action": f"motor_{kind}",
+                    "disk": disk_num,
+                    "steps": steps
+                })
+                if kind == "stall":
+                    stalled = True
+            
+            if stalled:
+                self._handle_dispense_failure(dose_index, alarm_info, log=False)
+            return stalled
+            
+        except Exception as e:
+            # print(f"[ERROR] 모터 이상 보고 실패: {e}")
+            return False
+    
+    def _handle_dispense_failure(self, dose_index, alarm_info, log=True):
+        """복용 실패 처리 - 심볼을 lv.SYMBOL.CLOSE로 변경 (log=False이면 배출 실패 로그는 기록하지 않음)"""
         try:
             meal_name = alarm_info.get("meal_name", f"일정 {dose_index + 1}")
             dose_time = alarm_info.get("dose_time", "")
@@ -397,7 +431,7 @@ class AlarmSystem:
             # print(f"❌ 복용 실패 처리: {meal_name} ({dose_time})")
             
             # 데이터 매니저에 실패 기록 저장 (지연 로딩)
-            if hasattr(self, 'data_manager') and self.data_manager:
+            if log and hasattr(self, 'data_manager') and self.data_manager:
                 try:
                     self.data_manager.log_dispense(dose_index, False)
                 except Exception as e:
@@ -3,29 +3,23 @@
 SW1(Menu), SW2(Select), SW3(Up), SW4(Down) 버튼의 입력을 처리하는 클래스
 """
 
-from machine import Pin
 import time
 
+from shift_bus import get_bus
+
 class ButtonInterface:
     """74HC165 시프트 레지스터 기반 버튼 인터페이스 클래스"""
     
     def __init__(self):
         """버튼 인터페이스 초기화"""
-        # 74HC165 핀 설정 (ESP32-C6 GPIO)
-        self.pload_pin = Pin(15, Pin.OUT)      # PL 핀 (IO15)
-        self.data_pin = Pin(10, Pin.IN)        # Q7 출력 (IO10)
-        self.clock_pin = Pin(3, Pin.OUT)       # CLK 핀 (IO3)
+        # 74HC165 핀(PL=IO15, Q7=IO10, CLK=IO3)은 74HC595D 모터 출력과 공유하므로
+        # 핀을 직접 만들지 않고 공유 버스(shift_bus.get_bus())로 읽음
         
         # 기본 파라미터
         self.NUMBER_OF_SHIFT_CHIPS = 1
         self.DATA_WIDTH = self.NUMBER_OF_SHIFT_CHIPS * 8
-        self.PULSE_WIDTH_USEC = 5
         self.POLL_DELAY_MSEC = 1
         
-        # 초기 상태 설정
-        self.clock_pin.value(0)
-        self.pload_pin.value(1)
-        
         # 버튼 매핑 (74HC165 핀 순서)
         self.button_mapping = {
             0: 'SW1',  # 버튼 A 역할
@@ -55,30 +49,11 @@ class ButtonInterface:
         self.last_press_time = {key: 0 for key in self.callbacks.keys()}
         
         # print("[OK] ButtonInterface (74HC165) 초기화 완료")
-        # print(f"핀 설정: PL={self.pload_pin}, DATA={self.data_pin}, CLK={self.clock_pin}")
+        # print(f"공유 버스: {get_bus().mode}")
     
     def read_shift_regs(self):
-        """SN74HC165에서 직렬 데이터 읽기"""
-        bytes_val = 0
-        
-        # 병렬 입력을 래치
-        self.pload_pin.value(0)  # Load data (Active LOW)
-        time.sleep_us(self.PULSE_WIDTH_USEC)
-        self.pload_pin.value(1)  # Stop loading
-        time.sleep_us(self.PULSE_WIDTH_USEC)
-        
-        # 직렬 데이터 읽기
-        for i in range(self.DATA_WIDTH):
-            bit_val = self.data_pin.value()
-            bytes_val |= (bit_val << ((self.DATA_WIDTH - 1) - i))
-            
-            # CLK 상승엣지
-            self.clock_pin.value(1)
-            time.sleep_us(self.PULSE_WIDTH_USEC)
-            self.clock_pin.value(0)
-            time.sleep_us(self.PULSE_WIDTH_USEC)
-        
-        return bytes_val
+        """SN74HC165에서 직렬 데이터 읽기 (공유 버스에서 새 틱 스캔, 같은 틱의 리미트 스위치 확인은 이 값을 재사용)"""
+        return get_bus().scan()
     
     def update(self):
         """버튼 상태 업데이트 및 변경 감지"""
@@ -0,0 +1,190 @@
+"""
+모터 코일 통전 관리 (모터별 통전 시간/추정 에너지 집계, 유지 시간이 지나면 코일 자동 OFF)
+StepperMotorController.power로 생성되어 프레임 재생 시작(start)과 코일 상태 반영(settle) 때만 호출됨
+(스텝마다 호출하지 않음: 이동 중에는 스텝 방식의 평균 통전 코일 수로 계산)
+자동 OFF는 컨트롤러 release_idle_coils()가 모션 엔진 update, 약 낙하 대기, 메인 화면 update에서 확인
+
+    controller.power.hold_ms = 100           # 이동 후 코일 유지 시간 (None이면 자동 OFF 안 함)
+    controller.power.report()                # 오늘/최근 배출 에너지 등 dict
+    controller.power.dump()                  # 시리얼 출력 (COILPOWER ...)
+
+에너지 = 통전 시간 x 통전 코일 수 x coil_mw (28BYJ-48 5V 코일 약 50옴 → 코일 1개 약 500mW 추정)
+정수 uJ로 누적 (MicroPython float는 단정밀도라 작은 값을 오래 더하면 오차가 큼)
+"""
+
+import time
+
+COIL_MW = 500        # 코일 1개 통전 전력 추정 (mW)
+BATTERY_VOLTS = 3.7  # mAh 환산 기준 전압 (battery_monitor.py의 Li-ion 공칭 전압)
+MAX_DAYS = 7         # 보관할 최근 일별 합계 수
+MAX_DISPENSES = 8    # 보관할 최근 배출 기록 수
+ACCOUNT_US = 60000000  # 상태 변화 없이 켜 둔 코일의 중간 누적 주기 (us)
+
+
+class CoilPower:
+    """모터 1~4 코일 통전 집계와 유지 시간 후 자동 OFF 판단"""
+
+    def __init__(self, hold_ms=100, coil_mw=COIL_MW):
+        """
+        Args:
+            hold_ms: 이동이 끝난 뒤 코일을 켜 두는 시간 (회전자 안정, None이면 자동 OFF 안 함)
+            coil_mw: 코일 1개 통전 전력 (mW)
+        """
+        self.hold_ms = hold_ms
+        self.coil_mw = coil_mw
+        self.coils2 = [0, 0, 0, 0, 0]          # 모터별 통전 코일 수 x2 (하프스텝 이동 평균 1.5개 = 3)
+        self.moving = [False] * 5              # 이동 중 (유지 시간 계산 안 함)
+        self.since = [0, 0, 0, 0, 0]           # 현재 상태 시작 (ticks_us)
+        self.energized_us = [0, 0, 0, 0, 0]    # 누적 통전 시간
+        self.hold_us = [0, 0, 0, 0, 0]         # 그중 멈춘 채 통전한 시간
+        self.energy_uj = [0, 0, 0, 0, 0]       # 누적 추정 에너지
+        self.release_at = [None] * 5           # 자동 OFF 시각 (ticks_ms)
+        self.pending = 0                       # 자동 OFF 대기 중인 모터 수
+        self.releases = 0                      # 자동 OFF 횟수
+        self._day = None
+        self._day_start_uj = 0
+        self.days = []                         # 최근 일별 [(년, 월, 일), mJ]
+        self._dispense_start = None
+        self.dispenses = []                    # 최근 배출 [(복용 인덱스, mJ, 통전 ms)]
+
+    # ----- 상태 변화 -----
+
+    def _account(self, motor_index, now):
+        """현재 상태로 지난 시간 누적"""
+        coils2 = self.coils2[motor_index]
+        if coils2:
+            dt = time.ticks_diff(now, self.since[motor_index])
+            if dt > 0:
+                self.energized_us[motor_index] += dt
+                if not self.moving[motor_index]:
+                    self.hold_us[motor_index] += dt
+                self.energy_uj[motor_index] += dt * coils2 * self.coil_mw // 2000
+        self.since[motor_index] = now
+
+    def start(self, motor_index, coils2):
+        """프레임 재생 시작: 모터가 평균 coils2/2개 코일로 이동 중 (유지 시간 OFF 취소)"""
+        self._account(motor_index, time.ticks_us())
+        self.coils2[motor_index] = coils2
+        self.moving[motor_index] = True
+        if self.release_at[motor_index] is not None:
+            self.release_at[motor_index] = None
+            self.pending -= 1
+
+    def settle(self, states):
+        """코일 상태 반영 (재생 끝/중단, 출력 갱신): 켜진 모터는 hold_ms 뒤 자동 OFF 예약"""
+        now = time.ticks_us()
+        hold_ms = self.hold_ms
+        for m in range(1, 5):
+            nibble = states[m] & 0x0F
+            coils2 = 2 * ((nibble & 1) + (nibble >> 1 & 1) + (nibble >> 2 & 1) + (nibble >> 3 & 1))
+            if coils2 == self.coils2[m] and not self.moving[m]:
+                continue
+            self._account(m, now)
+            self.coils2[m] = coils2
+            self.moving[m] = False
+            if coils2 and hold_ms is not None:
+                if self.release_at[m] is None:
+                    self.pending += 1
+                self.release_at[m] = time.ticks_add(time.ticks_ms(), hold_ms)
+            elif self.release_at[m] is not None:
+                self.release_at[m] = None
+                self.pending -= 1
+
+    def due(self):
+        """유지 시간이 지난 모터 번호 목록 (호출한 쪽이 코일을 끄고 settle로 반영)"""
+        now = time.ticks_us()
+        for m in range(1, 5):
+            # 오래 켜 둔 코일은 ticks_us 랩어라운드(약 9분) 전에 중간 누적
+            if self.coils2[m] and time.ticks_diff(now, self.since[m]) > ACCOUNT_US:
+                self._account(m, now)
+        if not self.pending:
+            return ()
+        now_ms = time.ticks_ms()
+        return [m for m in range(1, 5)
+                if self.release_at[m] is not None and time.ticks_diff(now_ms, self.release_at[m]) >= 0]
+
+    def hold_left_ms(self):
+        """가장 먼저 자동 OFF될 모터까지 남은 ms (예약 없으면 None)"""
+        if not self.pending:
+            return None
+        now_ms = time.ticks_ms()
+        return max(0, min(time.ticks_diff(at, now_ms) for at in self.release_at if at is not None))
+
+    # ----- 집계 -----
+
+    def _roll(self):
+        """전체 누적 uJ (현재 시각까지 반영), 날짜가 바뀌었으면 일별 합계 마감"""
+        now = time.ticks_us()
+        for m in range(1, 5):
+            self._account(m, now)
+        total = sum(self.energy_uj)
+        day = self._today()
+        if day != self._day:
+            if self._day is not None:
+                self.days.append([self._day, (total - self._day_start_uj) // 1000])
+                if len(self.days) > MAX_DAYS:
+                    self.days.pop(0)
+            self._day = day
+            self._day_start_uj = total
+        return total
+
+    def _today(self):
+        t = time.localtime()
+        return (t[0], t[1], t[2])
+
+    def energy_mj(self, motor_index=None):
+        """누적 추정 에너지 (mJ, motor_index가 None이면 전체)"""
+        self._roll()
+        if motor_index is None:
+            return sum(self.energy_uj) // 1000
+        return self.energy_uj[motor_index] // 1000
+
+    def today_mj(self):
+        """오늘 추정 에너지 (mJ)"""
+        return (self._roll() - self._day_start_uj) // 1000
+
+    def begin_dispense(self):
+        """배출 1회 집계 시작"""
+        self._dispense_start = (self._roll(), sum(self.energized_us))
+
+    def end_dispense(self, dose_index):
+        """배출 1회 집계 끝: 최근 배출 기록에 추가하고 mJ 반환 (begin_dispense 없이 호출하면 None)"""
+        if self._dispense_start is None:
+            return None
+        start_uj, start_us = self._dispense_start
+        self._dispense_start = None
+        mj = (self._roll() - start_uj) // 1000
+        self.dispenses.append((dose_index, mj, (sum(self.energized_us) - start_us) // 1000))
+        if len(self.dispenses) > MAX_DISPENSES:
+            self.dispenses.pop(0)
+        return mj
+
+    @staticmethod
+    def mah(mj, volts=BATTERY_VOLTS):
+        """mJ → 배터리 mAh 환산 (변환 손실 제외)"""
+        return mj / volts / 3600
+
+    def report(self):
+        """집계 dict (모터별 통전/유지 ms와 mJ, 오늘 mJ, 최근 일별/배출 기록)"""
+        today = self.today_mj()
+        return {
+            "energized_ms": [us // 1000 for us in self.energized_us[1:]],
+            "hold_ms": [us // 1000 for us in self.hold_us[1:]],
+            "energy_mj": [uj // 1000 for uj in self.energy_uj[1:]],
+            "today_mj": today,
+            "days": [tuple(d) for d in self.days],
+            "dispenses": list(self.dispenses),
+            "releases": self.releases,
+        }
+
+    def dump(self):
+        """집계 출력 (tests/sim_coil_power.py가 읽는 형식)"""
+        r = self.report()
+        for m in range(4):
+            print("COILPOWER motor %d on_ms=%d hold_ms=%d mj=%d" %
+                  (m + 1, r["energized_ms"][m], r["hold_ms"][m], r["energy_mj"][m]))
+        print("COILPOWER today mj=%d mah=%.3f releases=%d" % (r["today_mj"], self.mah(r["today_mj"]), r["releases"]))
+        for day, mj in r["days"]:
+            print("COILPOWER day %04d-%02d-%02d mj=%d" % (day[0], day[1], day[2], mj))
+        for dose_index, mj, on_ms in r["dispenses"]:
+            print("COILPOWER dispense dose=%d mj=%d on_ms=%d" % (dose_index, mj, on_ms))
@@ -44,13 +44,19 @@ date = None
 class DataManager:
     """데이터 영속성 관리 클래스 (global_data 기능 포함)"""
     
-    def __init__(self):
-        """데이터 매니저 초기화"""
-        self.data_dir = "/data"
-        self.settings_file = "/data/settings.json"
+    def __init__(self, data_dir="/data"):
+        """데이터 매니저 초기화
+        
+        Args:
+            data_dir: 데이터 디렉토리 (기본값: /data, 호스트 벤치마크에서는 임시 디렉토리 사용)
+        """
+        self.data_dir = data_dir
+        self.settings_file = f"{data_dir}/settings.json"
         
         # 전역 데이터 저장소 (화면 전환 시에도 유지되는 데이터) - JSON 파일 기반
-        self.global_data_file = "/data/global_data.json"
+        self.global_data_file = f"{data_dir}/global_data.json"
+        # 마법사 화면 백업 (운용 데이터와 분리, 화면 백업/복원 시에만 로드)
+        self.screen_backup_file = f"{data_dir}/screen_backup.json"
         
         # 지연 로딩을 위한 캐시 (global_data.py 기능 통합)
         self._dose_times = None
@@ -59,8 +65,15 @@ class DataManager:
         self._screen_data_backup = None
         self._auto_assigned_disks = None
         self._unused_disks = None
-        self.medication_file = "/data/medication.json"
-        self.dispense_log_file = "/data/dispense_log.json"
+        self._screen_backup_deferred = False  # 쓰기 예산 초과로 미룬 화면 백업 저장
+        self.medication_file = f"{data_dir}/medication.json"
+        self.dispense_log_file = f"{data_dir}/dispense_log.json"  # 기존 JSON 로그 (마이그레이션 원본)
+        self.dispense_ring_file = f"{data_dir}/dispense_log.bin"  # 링버퍼 배출 기록
+        self.journal_file = f"{data_dir}/.journal"  # 원자적 쓰기 커밋 저널
+        self.counters_file = f"{data_dir}/disk_counters.bin"  # 디스크별 수량 카운터
+        self._disk_counters = None
+        self._low_stock_threshold = None
+        self._dispense_ring = None
         
         # 메모리 최적화: 데이터 캐싱 완전 비활성화 (I2S 메모리 절약)
         self._medication_cache = None
@@ -68,6 +81,14 @@ class DataManager:
         self._cache_timeout = 0  # 캐시 비활성화 (메모리 절약)
         self._cache_enabled = False  # 캐시 완전 비활성화
         
+        # 쓰기 지연(write-back) 모드: 약물 문서 1개만 메모리에 유지하고 변경 시 dirty 표시,
+        # flush() 또는 유휴 시간 경과 시 한 번만 저장 (기본 비활성화)
+        self._write_back = False
+        self._medication_dirty = False
+        self._pending_counters = {}  # 저장 대기 중인 카운터 슬롯 {디스크 번호: (수량, 용량, 충전 epoch)}
+        self._last_mutation_ms = 0
+        self.write_back_idle_ms = 5000
+        
         # 지연 로딩을 위한 캐시
         self._wifi_manager = None
         self._settings_cache = None
@@ -77,9 +98,20 @@ class DataManager:
         self._today_date_timestamp = 0
         self._modules_cache = {}  # 모듈 캐시
         
+        # 오늘 배출 인덱스 (중복 배출 확인용, 날짜가 바뀌면 다시 구성)
+        self._today_index_date = None   # 인덱스 기준 날짜 "YYYY-MM-DD"
+        self._today_dose_mask = 0       # 성공 배출된 dose_index 비트마스크
+        self._today_dose_minutes = set()  # dose_index * 1440 + 배출 시각(분)
+        
+        # 충전 기록 압축 대기 여부 (None이면 다음 약물 데이터 로드 시 확인)
+        self._refill_compaction_pending = None
+        
         # 데이터 디렉토리 생성
         self._ensure_data_directory()
         
+        # 중단된 쓰기 복구 (저널 파일 1개만 확인 - O(1))
+        self._recover_journal()
+        
         # print("[OK] DataManager 초기화 완료 (지연 로딩 적용 - 메모리 절약)")
     
     def _get_module(self, module_name):
@@ -113,11 +145,14 @@ class DataManager:
     def clear_cache(self):
         """캐시 정리 (메모리 절약)"""
         try:
-            self._medication_cache = None
+            if not self._medication_dirty:
+                # 미저장 변경이 있으면 쓰기 지연 문서는 유지
+                self._medication_cache = None
             self._cache_timestamp = 0
             self._wifi_manager = None
             self._settings_cache = None
             self._dispense_logs_cache = None
+            self._dispense_ring = None
             self._last_file_check.clear()
             self._today_date_str = None
             self._today_date_timestamp = 0
@@ -231,13 +266,16 @@ class DataManager:
                 
                 return exists
         except AttributeError:
-            # MicroPython에서 ticks_ms가 없는 경우 직접 파일 확인
-            try:
-                with open(file_path, 'r'):
-                    pass
-                return True
-            except OSError:
-                return False
+            # MicroPython에서 ticks_ms가 없는 경우 아래에서 직접 파일 확인
+            pass
+        
+        # ticks_ms가 없는 환경 (호스트 CPython 등): 캐시 없이 직접 파일 확인
+        try:
+            with open(file_path, 'r'):
+                pass
+            return True
+        except OSError:
+            return False
     
     def _ensure_data_directory(self):
         """데이터 디렉토리 존재 확인 및 생성 (지연 로딩)"""
@@ -258,19 +296,93 @@ class DataManager:
         except Exception as e:
             # print(f"[ERROR] 데이터 디렉토리 생성 실패: {e}")
             pass
+    
+    # ===== 원자적 쓰기 (임시 파일 + 저널 + rename) =====
+    
+    def _sync_file(self, f):
+        """파일 버퍼를 저장장치까지 기록"""
+        f.flush()
+        os = self._get_module("os")
+        try:
+            os.fsync(f.fileno())  # CPython
+        except (AttributeError, OSError):
+            try:
+                os.sync()  # MicroPython
+            except (AttributeError, OSError):
+                pass
+    
+    def _atomic_write_json(self, file_path, data):
+        """JSON 원자적 저장: 임시 파일 기록 → 저널 커밋 → rename
+        
+        저널 한 줄(대상 경로 + 개행)이 완전히 기록된 시점이 커밋 지점이며,
+        그 전에 전원이 끊기면 기존 파일이, 그 후에 끊기면 새 파일이 부팅 시 복구됨
+        """
+        json = self._get_module("json")
+        if json is None:
+            raise OSError("json 모듈 로딩 실패")
+        
+        from io_stats import tracked_open
+        tmp_path = file_path + ".tmp"
+        with tracked_open(tmp_path, 'w') as f:
+            json.dump(data, f)
+            self._sync_file(f)
+        
+        # 커밋 지점
+        with tracked_open(self.journal_file, 'w') as f:
+            f.write(file_path + "\n")
+            self._sync_file(f)
+        
+        self._apply_commit(file_path)
+        self._last_file_check.pop(file_path, None)
+    
+    def _apply_commit(self, file_path):
+        """커밋된 임시 파일을 대상 파일로 교체하고 저널 삭제"""
+        os = self._get_module("os")
+        tmp_path = file_path + ".tmp"
+        try:
+            os.rename(tmp_path, file_path)
+        except OSError:
+            # 임시 파일이 없으면 이미 교체 완료된 상태
+            try:
+                os.stat(tmp_path)
+            except OSError:
+                tmp_path = None
+            if tmp_path is not None:
+                # 대상 파일 덮어쓰기를 지원하지 않는 파일시스템 (FAT 등)
+                try:
+                    os.remove(file_path)
+                except OSError:
+                    pass
+                os.rename(tmp_path, file_path)
+        os.remove(self.journal_file)
+    
+    def _recover_journal(self):
+        """부팅 시 중단된 커밋 복구 (저널이 완전하면 재적용, 불완전하면 폐기)"""
+        try:
+            with open(self.journal_file, 'r') as f:
+                entry = f.read()
+        except OSError:
+            return  # 저널 없음 - 정상 종료 상태
+        
+        try:
+            if entry.endswith("\n"):
+                # 커밋 완료 후 교체 전에 중단됨 - 재적용
+                self._apply_commit(entry[:-1])
+                # print(f"[INFO] 중단된 저장 복구: {entry[:-1]}")
+            else:
+                # 커밋 전에 중단됨 - 기존 파일 유지
+                os = self._get_module("os")
+                os.remove(self.journal_file)
+        except Exception as e:
+            # print(f"[WARN] 저널 복구 실패: {e}")
+            pass
+    
     # ===== 설정 관리 =====
     
     def save_settings(self, settings):
         """설정 저장 (캐시 업데이트) - 지연 로딩"""
         try:
-            json = self._get_module("json")
-            if json is None:
-                # print("[ERROR] json 모듈 로딩 실패")
-                return False
-                pass
-            
-            with open(self.settings_file, 'w') as f:
-                json.dump(settings, f)
+            self._atomic_write_json(self.settings_file, settings)
             
             # 캐시 업데이트
             self._settings_cache = settings
@@ -341,24 +453,108 @@ class DataManager:
     
     # ===== 약물 관리 =====
     
+    # ===== 쓰기 지연(write-back) 모드 =====
+    
+    def _ticks_ms(self):
+        """현재 ms 틱 (MicroPython ticks_ms, 없으면 time.time 기반)"""
+        time = self._get_module("time")
+        try:
+            return time.ticks_ms()
+        except AttributeError:
+            return int(time.time() * 1000)
+    
+    def enable_write_back(self, idle_flush_ms=5000):
+        """쓰기 지연 모드 활성화
+        
+        약물 데이터 변경은 메모리의 문서 1개에만 반영되고, flush() 호출 시 또는
+        마지막 변경 후 idle_flush_ms가 지나 poll_flush()가 호출될 때 한 번만 저장됨.
+        디스크 수량(카운터 슬롯)도 디스크별 최신 값만 모아 두었다가 flush() 때 파일 1번 열어 기록
+        메모리 사용량은 약물 문서 1개로 제한됨 (충전 기록은 refill_history 압축으로 크기 유지)
+        """
+        self.write_back_idle_ms = idle_flush_ms
+        self._write_back = True
+    
+    def disable_write_back(self):
+        """쓰기 지연 모드 비활성화 (미저장 변경은 먼저 저장)"""
+        result = self.flush()
+        self._write_back = False
+        self._medication_cache = None
+        return result
+    
+    def get_io_stats(self):
+        """플래시 쓰기 통계 조회 (오늘 파일별 쓰기 횟수/바이트/재작성/블록, 누적값)"""
+        import io_stats
+        return io_stats.get_io_stats()
+    
+    def set_write_budget(self, bytes_per_hour):
+        """시간당 쓰기 예산 설정 (초과 시 화면 백업 저장을 미룸, None이면 해제)"""
+        import io_stats
+        io_stats.get_tracker().set_hourly_budget(bytes_per_hour)
+    
+    def is_dirty(self):
+        """저장되지 않은 약물 데이터/디스크 수량 변경 여부"""
+        return self._medication_dirty or bool(self._pending_counters)
+    
+    def flush(self):
+        """미저장 디스크 수량, 약물 데이터, 미룬 화면 백업, 쓰기 통계를 파일에 저장 (변경 없으면 아무것도 하지 않음)"""
+        import io_stats
+        if self._screen_backup_deferred:
+            self._save_screen_backup()
+        io_stats.get_tracker().maybe_save(0)
+        if self._pending_counters:
+            try:
+                if not self._get_disk_counters().write_many(self._pending_counters):
+                    return False
+                self._pending_counters = {}
+            except Exception as e:
+                # print(f"[ERROR] 디스크 수량 flush 실패: {e}")
+                return False
+        if not self._medication_dirty or self._medication_cache is None:
+            return True
+        try:
+            self._atomic_write_json(self.medication_file, self._medication_cache)
+            self._medication_dirty = False
+            return True
+        except Exception as e:
+            # print(f"[ERROR] 약물 데이터 flush 실패: {e}")
+            return False
+    
+    def poll_flush(self):
+        """유휴 시간이 지난 미저장 변경 저장 (주기적 update 루프에서 호출)"""
+        import io_stats
+        if self._screen_backup_deferred:
+            # 예산이 남았을 때만 미룬 화면 백업 저장
+            self._save_screen_backup(critical=False)
+        io_stats.get_tracker().maybe_save()
+        
+        if (self.is_dirty() and
+                self._ticks_ms() - self._last_mutation_ms >= self.write_back_idle_ms):
+            return self.flush()
+        return True
+    
     def save_medication_data(self, medication_data):
         """약물 데이터 저장 (캐시 업데이트) - 지연 로딩"""
+        self._low_stock_threshold = medication_data.get("low_stock_threshold", 3)
+        
+        # 현재 스키마 버전으로 기록된 파일은 로드 시 구조 검증 생략
+        from data_schema import MEDICATION_SCHEMA_VERSION
+        
+        if self._write_back:
+            # 쓰기 지연 모드: 메모리 문서만 교체하고 dirty 표시
+            medication_data["schema_version"] = MEDICATION_SCHEMA_VERSION
+            self._medication_cache = medication_data
+            self._medication_dirty = True
+            self._last_mutation_ms = self._ticks_ms()
+            return True
+        
         try:
             # print(f"[DEBUG] save_medication_data 시작: {self.medication_file}")
             # print(f"[DEBUG] 저장할 데이터: {medication_data}")
             
-            json = self._get_module("json")
             time = self._get_module("time")
             
-            if json is None:
-                # print("[ERROR] json 모듈 로딩 실패")
-                return False
-                pass
-            
-            # print(f"[DEBUG] JSON 모듈 로드 성공, 파일 쓰기 시작...")
-            
-            with open(self.medication_file, 'w') as f:
-                json.dump(medication_data, f)
+            medication_data["schema_version"] = MEDICATION_SCHEMA_VERSION
+            self._atomic_write_json(self.medication_file, medication_data)
             
             # print(f"[DEBUG] 파일 쓰기 완료, 캐시 업데이트 시작...")
             
@@ -382,6 +578,10 @@ class DataManager:
     
     def load_medication_data(self):
         """약물 데이터 로드 (지연 로딩 및 캐싱 적용)"""
+        # 쓰기 지연 모드에서는 메모리 문서가 최신 상태
+        if self._write_back and self._medication_cache is not None:
+            return self._medication_cache
+        
         try:
             time = self._get_module("time")
             try:
@@ -424,11 +624,20 @@ class DataManager:
             # 디버그: 로드된 데이터 확인
             # print(f"[DEBUG] 로드된 약물 데이터: {medication_data}")
             
-            # 데이터 구조 검증 및 수정
-            medication_data = self._validate_and_fix_medication_data(medication_data)
+            # 이전 버전 문서만 마이그레이션 후 1회 저장 (현재 버전 문서는 검증 생략)
+            from data_schema import migrate_medication
+            if migrate_medication(medication_data):
+                self._atomic_write_json(self.medication_file, medication_data)
+            
+            # 수량은 카운터 파일 값이 기준
+            self._overlay_disk_counters(medication_data)
+            
+            # 오래된 충전 기록이 있으면 유휴 시간 압축 대상으로 표시
+            from refill_history import needs_compaction
+            self._refill_compaction_pending = needs_compaction(medication_data)
             
             # 캐시 업데이트 (캐시가 활성화된 경우에만)
-            if self._cache_enabled:
+            if self._cache_enabled or self._write_back:
                 self._medication_cache = medication_data
                 try:
                     if time and hasattr(time, 'ticks_ms'):
@@ -456,132 +665,87 @@ class DataManager:
                 self._cache_timestamp = 0
             return default_data
     
-    def _validate_and_fix_medication_data(self, medication_data):
-        """약물 데이터 구조 검증 및 수정"""
-        try:
-            # print(f"[DEBUG] 데이터 구조 검증 시작: {medication_data}")
-            
-            # 잘못된 disk_counts 필드가 있으면 제거
-            if "disk_counts" in medication_data:
-                # print(f"[WARN] 잘못된 disk_counts 필드 발견, 제거: {medication_data['disk_counts']}")
-                del medication_data["disk_counts"]
-            
-            # disks 필드가 없으면 기본 데이터로 교체
-            if "disks" not in medication_data:
-                # print("[WARN] disks 필드 없음, 기본 데이터로 교체")
-                default_data = self._get_default_medication_data()
-                medication_data["disks"] = default_data["disks"]
-            
-            # 각 디스크 데이터 검증 및 수정
-            for disk_num in ["1", "2", "3"]:
-                if disk_num not in medication_data["disks"]:
-                    # print(f"[WARN] 디스크 {disk_num} 데이터 없음, 기본 데이터로 교체")
-                    default_data = self._get_default_medication_data()
-                    medication_data["disks"][disk_num] = default_data["disks"][disk_num].copy()
-                else:
-                    disk_data = medication_data["disks"][disk_num]
-                    # 필수 필드 검증
-                    required_fields = ["name", "total_capacity", "current_count", "last_refill", "medication_type"]
-                    for field in required_fields:
-                        if field not in disk_data:
-                            # print(f"[WARN] 디스크 {disk_num} {field} 필드 없음, 기본값 설정")
-                            if field == "name":
-                                disk_data[field] = f"{'아침' if disk_num == '1' else '점심' if disk_num == '2' else '저녁'}약"
-                            elif field == "total_capacity":
-                                disk_data[field] = 15
-                            elif field == "current_count":
-                                disk_data[field] = 0
-                            elif field == "last_refill":
-                                disk_data[field] = None
-                            elif field == "medication_type":
-                                disk_data[field] = "morning" if disk_num == "1" else "lunch" if disk_num == "2" else "dinner"
-            
-            # refill_history 필드 검증
-            if "refill_history" not in medication_data:
-                medication_data["refill_history"] = []
-            
-            # low_stock_threshold 필드 검증
-            if "low_stock_threshold" not in medication_data:
-                medication_data["low_stock_threshold"] = 3
-            
-            # print(f"[DEBUG] 데이터 구조 검증 완료: {medication_data}")
-            return medication_data
-            
-        except Exception as e:
-            # print(f"[ERROR] 데이터 구조 검증 실패: {e}")
-            return self._get_default_medication_data()
-    
     def _get_default_medication_data(self):
         """기본 약물 데이터 반환"""
-        return {
-            "disks": {
-                "1": {
-                    "name": "아침약",
-                    "total_capacity": 15,
-                    "current_count": 0,
-                    "last_refill": None,
-                    "medication_type": "morning"
-                },
-                "2": {
-                    "name": "점심약", 
-                    "total_capacity": 15,
-                    "current_count": 0,
-                    "last_refill": None,
-                    "medication_type": "lunch"
-                },
-                "3": {
-                    "name": "저녁약",
-                    "total_capacity": 15,
-                    "current_count": 0,
-                    "last_refill": None,
-                    "medication_type": "dinner"
-                }
-            },
-            "refill_history": [],
-            "low_stock_threshold": 3
-        }
+        from data_schema import default_medication
+        return default_medication()
     
     # ===== 배출 기록 관리 =====
     
+    def _get_dispense_ring(self):
+        """배출 기록 링버퍼 지연 로딩 (JSON 로그가 남아 있으면 링버퍼가 새 파일이 아니어도 마이그레이션)"""
+        if self._dispense_ring is None:
+            from dispense_log import DispenseLogRing
+            ring = DispenseLogRing(self.dispense_ring_file)
+            ring.open()
+            # 이전 마이그레이션이 중단(전원 차단/예외)되어 JSON 파일이 남아 있으면 다시 이전
+            self._migrate_json_dispense_logs(ring)
+            self._dispense_ring = ring
+        return self._dispense_ring
+    
+    def _migrate_json_dispense_logs(self, ring):
+        """기존 dispense_log.json 내용을 링버퍼로 이전 후 JSON 파일 삭제 (기록 성공 후에만 삭제)
+        
+        링버퍼에 이미 기록이 있으면(중단된 이전 마이그레이션 / 그 뒤 새 배출) 중복을 빼고 시간순으로 합쳐 다시 기록
+        """
+        try:
+            if not self._file_exists(self.dispense_log_file):
+                return
+            
+            # 기록 dict를 하나씩 스트리밍으로 파싱해 작은 레코드 튜플로 변환
+            from dispense_log import log_to_record
+            from json_stream import iter_items
+            records = []
+            for log in iter_items(self.dispense_log_file):
+                try:
+                    records.append(log_to_record(log))
+                except Exception:
+                    # 형식이 깨진 기록은 건너뜀
+                    pass
+                if len(records) > ring.capacity:
+                    records.pop(0)
+            if ring.count:
+                # 드문 복구 경로: 링버퍼 기록과 합쳐 시간순 정렬 (레코드 튜플은 년월일시분초 순서)
+                existing = list(ring.iter_newest())
+                existing.reverse()
+                merged = sorted(set(records) | set(existing))
+                ring.rewrite(merged)
+            else:
+                ring.extend(records)
+            
+            # 이전 완료 후 원본 삭제 (다음 부팅 시 재이전 방지)
+            os = self._get_module("os")
+            if os:
+                os.remove(self.dispense_log_file)
+            self._last_file_check.pop(self.dispense_log_file, None)
+            # print(f"[OK] 배출 기록 마이그레이션 완료: {len(records)}개")
+        except Exception as e:
+            # print(f"[WARN] 배출 기록 마이그레이션 실패: {e}")
+            pass
+    
     def log_dispense(self, dose_index, success, timestamp=None):
-        """배출 기록 저장"""
+        """배출 기록 저장 (링버퍼에 레코드 1개만 기록)"""
         try:
             if timestamp is None:
                 # 지연 로딩된 시간 사용
                 current_time = self._get_current_time()
-                timestamp = f"{current_time[0]:04d}-{current_time[1]:02d}-{current_time[2]:02d}T{current_time[3]:02d}:{current_time[4]:02d}:{current_time[5]:02d}"
-            
-            # 기존 로그 로드
-            logs = self.load_dispense_logs()
-            
-            # 새 로그 추가 (지연 로딩된 시간 사용)
-            current_time = self._get_current_time()
-            new_log = {
-                "timestamp": timestamp,
-                "dose_index": dose_index,
-                "success": success,
-                "date": f"{current_time[0]:04d}-{current_time[1]:02d}-{current_time[2]:02d}",
-                "time": f"{current_time[3]:02d}:{current_time[4]:02d}:{current_time[5]:02d}"
-            }
-            
-            logs.append(new_log)
-            
-            # 최근 100개 로그만 유지
-            if len(logs) > 100:
-                logs = logs[-100:]
-            
-            # 파일에 저장 (MicroPython에서는 encoding 매개변수 지원 안함)
-            json = self._get_module("json")
-            if json is None:
-                # print("[ERROR] json 모듈 로딩 실패")
-                return False
-                pass
+                record = (current_time[0], current_time[1], current_time[2],
+                          current_time[3], current_time[4], current_time[5],
+                          dose_index & 0xFF, 1 if success else 0)
+            else:
+                # "YYYY-MM-DDTHH:MM:SS" 형식의 타임스탬프 사용
+                from dispense_log import log_to_record
+                record = log_to_record({"timestamp": timestamp, "dose_index": dose_index, "success": success})
             
-            with open(self.dispense_log_file, 'w') as f:
-                json.dump(logs, f)
+            self._get_dispense_ring().append(record)
+            self._index_today_record(record)
             
-            # 캐시 업데이트
-            self._dispense_logs_cache = logs
+            # 캐시 업데이트 (캐시가 있을 때만 - 최근 100개 유지)
+            if self._dispense_logs_cache is not None:
+                from dispense_log import record_to_log
+                self._dispense_logs_cache.append(record_to_log(record))
+                if len(self._dispense_logs_cache) > 100:
+                    self._dispense_logs_cache = self._dispense_logs_cache[-100:]
             
             # print(f"[OK] 배출 기록 저장: 일정 {dose_index + 1}, 성공: {success}")
             return True
@@ -591,118 +755,244 @@ class DataManager:
             return False
     
     def load_dispense_logs(self):
-        """배출 기록 로드 (지연 로딩 적용)"""
+        """배출 기록 로드 (최근 100개, 지연 로딩 적용)"""
         # 캐시된 로그가 있으면 캐시 반환
         if self._dispense_logs_cache is not None:
             return self._dispense_logs_cache
         
         try:
-            json = self._get_module("json")
-            if json is None:
-                # print("[ERROR] json 모듈 로딩 실패")
-                self._dispense_logs_cache = []
-                return []
-            
-            if self._file_exists(self.dispense_log_file):
-                with open(self.dispense_log_file, 'r') as f:
-                    logs = json.load(f)
-                self._dispense_logs_cache = logs
-                return logs
-            else:
-                self._dispense_logs_cache = []
-                return []
+            logs = self._get_dispense_ring().read_recent(100)
+            self._dispense_logs_cache = logs
+            return logs
         except Exception as e:
             # print(f"[ERROR] 배출 기록 로드 실패: {e}")
             self._dispense_logs_cache = []
             return []
     
     def get_today_dispense_logs(self):
-        """오늘 배출 기록만 반환 (지연 로딩 적용)"""
+        """오늘 배출 기록만 반환 (최신 레코드부터 오늘 이전 날짜까지만 읽음)"""
         try:
-            logs = self.load_dispense_logs()
             today = self._get_today_date_str()  # 지연 로딩된 날짜 사용
-            today_logs = [log for log in logs if log.get("date") == today]
-            return today_logs
+            year, month, day = [int(v) for v in today.split("-")]
+            return self._get_dispense_ring().read_date(year, month, day)
         except Exception as e:
             # print(f"[ERROR] 오늘 배출 기록 로드 실패: {e}")
             return []
     
+    def _get_today_index(self):
+        """오늘 배출 인덱스 반환 (처음 호출 시 또는 자정이 지나면 오늘 레코드만 읽어 다시 구성)"""
+        today = self._get_today_date_str()
+        if self._today_index_date != today:
+            self._today_index_date = today
+            self._today_dose_mask = 0
+            self._today_dose_minutes = set()
+            try:
+                year, month, day = [int(v) for v in today.split("-")]
+                target = (year, month, day)
+                for record in self._get_dispense_ring().iter_newest():
+                    record_date = (record[0], record[1], record[2])
+                    if record_date == target:
+                        self._add_today_record(record)
+                    elif record_date < target:
+                        break
+            except Exception as e:
+                # print(f"[WARN] 오늘 배출 인덱스 구성 실패: {e}")
+                pass
+        return self._today_dose_mask, self._today_dose_minutes
+    
+    def _add_today_record(self, record):
+        """성공 배출 레코드를 오늘 인덱스에 추가"""
+        if record[7]:
+            dose_index = record[6]
+            self._today_dose_mask |= 1 << dose_index
+            self._today_dose_minutes.add(dose_index * 1440 + record[3] * 60 + record[4])
+    
+    def _index_today_record(self, record):
+        """새로 기록한 레코드가 인덱스 날짜와 같으면 인덱스 갱신 (인덱스가 없으면 다음 조회 때 구성)"""
+        if self._today_index_date is None:
+            return
+        if self._today_index_date == f"{record[0]:04d}-{record[1]:02d}-{record[2]:02d}":
+            self._add_today_record(record)
+    
+    def _time_str_to_minute(self, time_str):
+        """HH:MM 또는 HH:MM:SS 문자열을 하루 중 분으로 변환"""
+        return int(time_str[0:2]) * 60 + int(time_str[3:5])
+    
     def was_dispensed_today(self, dose_index, dose_time=None):
-        """오늘 해당 일정이 배출되었는지 확인 (시간별 중복 체크)"""
+        """오늘 해당 일정이 배출되었는지 확인 (시간별 중복 체크, 인덱스 조회 O(1))
+        
+        dose_time은 분 단위로 비교 ("08:00" 일정은 08:00:00~08:00:59 배출 기록과 일치)
+        """
         try:
-            today_logs = self.get_today_dispense_logs()
+            mask, minutes = self._get_today_index()
             
             # 시간이 지정된 경우: 같은 시간에 배출된 기록이 있는지 확인
             if dose_time:
-                for log in today_logs:
-                    if (log.get("dose_index") == dose_index and 
-                        log.get("success") and 
-                        log.get("time") == dose_time):
-                        return True
-                return False
+                return (dose_index * 1440 + self._time_str_to_minute(dose_time)) in minutes
             
-            # 시간이 지정되지 않은 경우: 해당 일정 인덱스에 대한 모든 배출 기록 확인
-            for log in today_logs:
-                if log.get("dose_index") == dose_index and log.get("success"):
-                    return True
-            return False
+            # 시간이 지정되지 않은 경우: 해당 일정 인덱스에 대한 배출 기록 확인
+            return bool(mask & (1 << dose_index))
             
         except Exception as e:
             # print(f"[ERROR] 오늘 배출 확인 실패: {e}")
             return False
     
+    def was_dispensed_recently(self, dose_index, within_minutes=60):
+        """오늘 해당 일정이 within_minutes분 이내에 배출되었는지 확인 (재부팅 후 중복 배출 확인용)"""
+        try:
+            mask, minutes = self._get_today_index()
+            if not mask & (1 << dose_index):
+                return False
+            current_time = self._get_current_time()
+            now_minute = current_time[3] * 60 + current_time[4]
+            base = dose_index * 1440
+            for key in minutes:
+                if base <= key < base + 1440 and 0 <= now_minute - (key - base) < within_minutes:
+                    return True
+            return False
+        except Exception as e:
+            # print(f"[ERROR] 최근 배출 확인 실패: {e}")
+            return False
+    
     # ===== 약물 수량 관리 =====
     
+    def _get_disk_counters(self):
+        """디스크 수량 카운터 파일 지연 로딩 (최초 생성 시 medication.json 값으로 채움)"""
+        if self._disk_counters is None:
+            from disk_counters import DiskCounterFile
+            counters = DiskCounterFile(self.counters_file)
+            if counters.open():
+                self._migrate_disk_counters(counters)
+            self._disk_counters = counters
+        return self._disk_counters
+    
+    def _read_disk_counter(self, disk_num):
+        """디스크 카운터 값 (저장 대기 중인 값이 있으면 그 값), 슬롯 손상 시 None"""
+        slot = self._pending_counters.get(disk_num)
+        if slot is not None:
+            return slot
+        return self._get_disk_counters().read(disk_num)
+    
+    def _write_disk_counter(self, disk_num, count, capacity, last_refill_epoch):
+        """디스크 카운터 기록 (쓰기 지연 모드에서는 flush()까지 메모리에 모아 둠)"""
+        if self._write_back and 1 <= disk_num <= 3:
+            self._pending_counters[disk_num] = (count, capacity, last_refill_epoch)
+            self._last_mutation_ms = self._ticks_ms()
+            return True
+        return self._get_disk_counters().write(disk_num, count, capacity, last_refill_epoch)
+    
+    def _migrate_disk_counters(self, counters):
+        """medication.json의 디스크 수량을 카운터 파일로 1회 이전"""
+        # 약물 문서 전체가 아니라 disks 객체만 스트리밍으로 파싱
+        from json_stream import load_path
+        disks = load_path(self.medication_file, "disks", None) or {}
+        
+        default_disks = self._get_default_medication_data()["disks"]
+        for disk_key in ("1", "2", "3"):
+            disk_data = disks.get(disk_key) or default_disks[disk_key]
+            counters.write(int(disk_key),
+                           disk_data.get("current_count", 0),
+                           disk_data.get("total_capacity", 15),
+                           self._timestamp_to_epoch(disk_data.get("last_refill")))
+    
+    def _timestamp_to_epoch(self, timestamp):
+        """"YYYY-MM-DDTHH:MM:SS" 문자열을 epoch 초로 변환 (없으면 0)"""
+        if not timestamp:
+            return 0
+        try:
+            t = (int(timestamp[0:4]), int(timestamp[5:7]), int(timestamp[8:10]),
+                 int(timestamp[11:13]), int(timestamp[14:16]), int(timestamp[17:19]))
+            return self._time_tuple_to_epoch(t)
+        except (ValueError, IndexError):
+            return 0
+    
+    def _time_tuple_to_epoch(self, t):
+        """(년, 월, 일, 시, 분, 초, ...) 튜플을 epoch 초로 변환"""
+        time = self._get_module("time")
+        # MicroPython은 8/9개, CPython은 9개 항목 튜플 허용
+        return int(time.mktime((t[0], t[1], t[2], t[3], t[4], t[5], 0, 0, -1)))
+    
+    def _epoch_to_timestamp(self, epoch):
+        """epoch 초를 "YYYY-MM-DDTHH:MM:SS" 문자열로 변환 (0이면 None)"""
+        if not epoch:
+            return None
+        t = self._get_module("time").localtime(epoch)
+        return f"{t[0]:04d}-{t[1]:02d}-{t[2]:02d}T{t[3]:02d}:{t[4]:02d}:{t[5]:02d}"
+    
+    def _overlay_disk_counters(self, medication_data):
+        """카운터 파일의 수량/충전 시각을 약물 문서에 반영 (카운터 파일이 기준값)"""
+        try:
+            for disk_key, disk_data in medication_data.get("disks", {}).items():
+                slot = self._read_disk_counter(int(disk_key))
+                if slot is not None:
+                    disk_data["current_count"] = slot[0]
+                    disk_data["last_refill"] = self._epoch_to_timestamp(slot[2])
+        except Exception as e:
+            # print(f"[WARN] 디스크 카운터 반영 실패: {e}")
+            pass
+        return medication_data
+    
     def update_disk_count(self, disk_num, new_count):
-        """디스크 약물 수량 업데이트"""
+        """디스크 약물 수량 업데이트 (카운터 슬롯 제자리 쓰기)
+        
+        수량 감소(배출)는 카운터 파일 슬롯 14바이트만 기록하고 (쓰기 지연 모드에서는 flush() 때 모아서),
+        수량 증가(충전)일 때만 medication.json의 refill_history에 기록함
+        """
         try:
-            # print(f"[DEBUG] update_disk_count 시작: 디스크 {disk_num}, 수량 {new_count}")
+            slot = self._read_disk_counter(disk_num)
+            if slot is None:
+                # 슬롯 손상 또는 범위 밖 디스크 - JSON 문서 값으로 복구
+                disk_data = self.load_medication_data()["disks"].get(str(disk_num), {})
+                slot = (disk_data.get("current_count", 0),
+                        disk_data.get("total_capacity", 15),
+                        self._timestamp_to_epoch(disk_data.get("last_refill")))
+            old_count, capacity, last_refill_epoch = slot
+            
+            is_refill = new_count > old_count
+            if is_refill:
+                current_time = self._get_current_time()
+                last_refill_epoch = self._time_tuple_to_epoch(current_time)
             
-            # 캐시된 데이터가 있으면 사용, 없으면 로드
-            if self._medication_cache is not None:
-                # print(f"[DEBUG] 캐시된 데이터 사용")
-                medication_data = self._medication_cache.copy()
-            else:
-                # print(f"[DEBUG] 파일에서 데이터 로드")
-                medication_data = self.load_medication_data()
+            if not self._write_disk_counter(disk_num, new_count, capacity, last_refill_epoch):
+                return False
             
-            disk_key = str(disk_num)
+            # 메모리에 있는 약물 문서도 갱신 (쓰기 지연 문서 포함, 저장 불필요)
+            if self._medication_cache is not None:
+                disk_data = self._medication_cache["disks"].get(str(disk_num))
+                if disk_data is not None:
+                    disk_data["current_count"] = new_count
+                    disk_data["last_refill"] = self._epoch_to_timestamp(last_refill_epoch)
             
-            # print(f"[DEBUG] 로드된 medication_data: {medication_data}")
+            if not is_refill:
+                return True
             
-            # 디스크 데이터가 없으면 기본 데이터 생성
+            # 충전 기록 추가 (드물게 발생하는 JSON 문서 변경)
+            medication_data = self.load_medication_data()
+            disk_key = str(disk_num)
             if disk_key not in medication_data["disks"]:
-                # print(f"[INFO] 디스크 {disk_num} 데이터 없음, 기본 데이터 생성")
                 default_data = self._get_default_medication_data()
                 medication_data["disks"][disk_key] = default_data["disks"][disk_key].copy()
             
-            # 현재 시간 가져오기 (지연 로딩)
-            current_time = self._get_current_time()
-            
-            # print(f"[DEBUG] 업데이트 전 디스크 {disk_num} 수량: {medication_data['disks'][disk_key]['current_count']}")
-            
+            timestamp = f"{current_time[0]:04d}-{current_time[1]:02d}-{current_time[2]:02d}T{current_time[3]:02d}:{current_time[4]:02d}:{current_time[5]:02d}"
             medication_data["disks"][disk_key]["current_count"] = new_count
-            medication_data["disks"][disk_key]["last_refill"] = f"{current_time[0]:04d}-{current_time[1]:02d}-{current_time[2]:02d}T{current_time[3]:02d}:{current_time[4]:02d}:{current_time[5]:02d}"
-            
-            # print(f"[DEBUG] 업데이트 후 디스크 {disk_num} 수량: {medication_data['disks'][disk_key]['current_count']}")
+            medication_data["disks"][disk_key]["last_refill"] = timestamp
             
             # 리필 기록 추가
             refill_record = {
                 "disk": disk_num,
-                "timestamp": f"{current_time[0]:04d}-{current_time[1]:02d}-{current_time[2]:02d}T{current_time[3]:02d}:{current_time[4]:02d}:{current_time[5]:02d}",
+                "timestamp": timestamp,
                 "count": new_count
             }
             medication_data["refill_history"].append(refill_record)
             
-            # 최근 50개 리필 기록만 유지
-            if len(medication_data["refill_history"]) > 50:
-                medication_data["refill_history"] = medication_data["refill_history"][-50:]
-            
-            # print(f"[DEBUG] save_medication_data 호출 전: {medication_data}")
-            save_result = self.save_medication_data(medication_data)
-            # print(f"[DEBUG] save_medication_data 결과: {save_result}")
+            # 오래된 기록은 유휴 시간에 요약으로 압축 (밀린 경우에만 즉시 압축)
+            from refill_history import RAW_KEEP, COMPACT_SLACK, compact_step, needs_compaction
+            history_len = len(medication_data["refill_history"])
+            if history_len > RAW_KEEP + COMPACT_SLACK:
+                compact_step(medication_data, max_events=history_len - RAW_KEEP)
+            self._refill_compaction_pending = needs_compaction(medication_data)
             
-            return save_result
+            return self.save_medication_data(medication_data)
                 
         except Exception as e:
             # print(f"[ERROR] 디스크 수량 업데이트 실패: {e}")
@@ -710,43 +1000,77 @@ class DataManager:
             sys.print_exception(e)
             return False
     
-    def get_disk_count(self, disk_num):
-        """디스크 약물 수량 조회 (최적화)"""
+    def compact_refill_history(self, max_events=8):
+        """오래된 충전 기록을 최대 max_events개 요약으로 압축 (유휴 시간 update 루프에서 호출)
+        
+        Returns:
+            int: 압축한 기록 수 (압축할 기록이 없으면 파일 접근 없이 0)
+        """
+        if self._refill_compaction_pending is False:
+            return 0
         try:
-            # print(f"[DEBUG] get_disk_count 시작: 디스크 {disk_num}")
-            
+            from refill_history import compact_step, needs_compaction
             medication_data = self.load_medication_data()
-            disk_key = str(disk_num)
-            
-            # print(f"[DEBUG] 로드된 medication_data: {medication_data}")
-            # print(f"[DEBUG] disk_key: {disk_key}")
-            # print(f"[DEBUG] medication_data['disks']: {medication_data.get('disks', {})}")
+            moved = compact_step(medication_data, max_events=max_events)
+            if moved:
+                self.save_medication_data(medication_data)
+            self._refill_compaction_pending = needs_compaction(medication_data)
+            return moved
+        except Exception as e:
+            # print(f"[WARN] 충전 기록 압축 실패: {e}")
+            self._refill_compaction_pending = False
+            return 0
+    
+    def get_disk_count(self, disk_num):
+        """디스크 약물 수량 조회 (카운터 슬롯 1개만 읽음)"""
+        try:
+            slot = self._read_disk_counter(disk_num)
+            if slot is not None:
+                return slot[0]
             
-            if disk_key in medication_data["disks"]:
-                current_count = medication_data["disks"][disk_key]["current_count"]
-                # print(f"[DEBUG] 디스크 {disk_num} 수량: {current_count}")
-                return current_count
-            else:
-                # print(f"[DEBUG] 디스크 {disk_num} 데이터 없음")
-                return 0
+            # 슬롯 손상 시 JSON 문서에서 해당 값만 조회
+            return self._read_medication_path(f"disks.{disk_num}.current_count", 0)
         except Exception as e:
             # print(f"[ERROR] get_disk_count({disk_num}) 실패: {e}")
             import sys
             sys.print_exception(e)
             return 0
     
+    def _get_low_stock_threshold(self):
+        """부족 임계값 (드물게 변경되므로 한 번만 로드)"""
+        if self._low_stock_threshold is None:
+            self._low_stock_threshold = self._read_medication_path("low_stock_threshold", 3)
+        return self._low_stock_threshold
+    
+    def _read_medication_path(self, key_path, default=None):
+        """약물 데이터의 경로 값 1개 조회 ("disks.2.current_count")
+        
+        메모리에 문서가 있으면 문서에서, 없으면 파일 전체를 로드하지 않고 스트리밍으로 해당 값만 파싱
+        """
+        if self._medication_cache is not None:
+            return self._walk_path(self._medication_cache, key_path, default)
+        
+        if not self._file_exists(self.medication_file):
+            return self._walk_path(self._get_default_medication_data(), key_path, default)
+        
+        from json_stream import load_path
+        return load_path(self.medication_file, key_path, default)
+    
+    def _walk_path(self, data, key_path, default):
+        """메모리 문서에서 점으로 구분한 경로 값 조회"""
+        for part in key_path.split("."):
+            if not isinstance(data, dict) or part not in data:
+                return default
+            data = data[part]
+        return data
+    
     def is_disk_low_stock(self, disk_num):
         """디스크 약물 부족 여부 확인"""
         try:
-            medication_data = self.load_medication_data()
-            disk_key = str(disk_num)
-            threshold = medication_data.get("low_stock_threshold", 3)
-            
-            if disk_key in medication_data["disks"]:
-                current_count = medication_data["disks"][disk_key]["current_count"]
-                return current_count <= threshold
-            else:
+            slot = self._read_disk_counter(disk_num)
+            if slot is None:
                 return True
+            return slot[0] <= self._get_low_stock_threshold()
         except Exception as e:
             # print(f"[ERROR] 디스크 부족 확인 실패: {e}")
             return True
@@ -759,7 +1083,9 @@ class DataManager:
             files_to_clear = [
                 self.settings_file,
                 self.medication_file,
-                self.dispense_log_file
+                self.dispense_log_file,
+                self.dispense_ring_file,
+                self.counters_file
             ]
             
             os = self._get_module("os")
@@ -775,6 +1101,16 @@ class DataManager:
                     # 파일이 없으면 무시
                     pass
             
+            self._dispense_ring = None
+            self._dispense_logs_cache = None
+            self._today_index_date = None
+            self._disk_counters = None
+            self._low_stock_threshold = None
+            self._medication_cache = None
+            self._medication_dirty = False
+            self._pending_counters = {}
+            self._last_file_check.clear()
+            
             # print("[OK] 모든 데이터 삭제 완료")
             return True
         except Exception as e:
@@ -786,12 +1122,12 @@ class DataManager:
         try:
             settings = self.load_settings()
             medication_data = self.load_medication_data()
-            logs = self.load_dispense_logs()
+            dispense_ring = self._get_dispense_ring()
             
             summary = {
                 "settings_loaded": settings is not None,
                 "medication_data_loaded": medication_data is not None,
-                "total_dispense_logs": len(logs),
+                "total_dispense_logs": dispense_ring.count,
                 "today_dispense_logs": len(self.get_today_dispense_logs()),
                 "disk_counts": {
                     "1": self.get_disk_count(1),
@@ -837,12 +1173,9 @@ class DataManager:
             return False
     
     def get_all_disk_counts(self):
-        """모든 디스크의 알약 개수 조회"""
+        """모든 디스크의 알약 개수 조회 ({"1": 수량, "2": 수량, "3": 수량})"""
         try:
-            medication_data = self.load_medication_data()
-            if medication_data and "disk_counts" in medication_data:
-                return medication_data["disk_counts"]
-            return {}
+            return {str(disk_num): self.get_disk_count(disk_num) for disk_num in (1, 2, 3)}
         except Exception as e:
             # print(f"[ERROR] 모든 디스크 알약 개수 조회 실패: {e}")
             return {}
@@ -850,30 +1183,32 @@ class DataManager:
     # 전역 데이터 관리 메서드들 (global_data.py 기능 통합 - JSON 파일 기반)
     
     def _load_global_data_from_file(self):
-        """전역 데이터 JSON 파일에서 로드 (지연 로딩)"""
+        """전역 데이터 JSON 파일에서 로드 (지연 로딩, 화면 백업은 별도 파일이라 디코드하지 않음)"""
         try:
             import gc
             gc.collect()
             
             # json 모듈 지연 로딩
             import json
+            from data_schema import migrate_global
             
             with open(self.global_data_file, 'r') as f:
                 data = json.load(f)
             
+            # 이전 버전 문서만 마이그레이션 후 1회 저장
+            migrated, detached = migrate_global(data)
+            if migrated:
+                if "screen_data_backup" in detached:
+                    # 분리한 화면 백업을 먼저 저장 (중단되면 다음 부팅에 마이그레이션 다시 수행)
+                    self._screen_data_backup = detached["screen_data_backup"]
+                    self._atomic_write_json(self.screen_backup_file, self._screen_data_backup)
+                self._atomic_write_json(self.global_data_file, data)
+            
             self._dose_times = data.get('dose_times', [])
             self._selected_meals = data.get('selected_meals', [])
             self._dose_count = data.get('dose_count', 1)
             self._auto_assigned_disks = data.get('auto_assigned_disks', [])
             self._unused_disks = data.get('unused_disks', [])
-            self._screen_data_backup = data.get('screen_data_backup', {
-                'wifi_scan': {},
-                'meal_time': {},
-                'dose_time': {},
-                'disk_selection': {},
-                'pill_loading': {},
-                'main': {}
-            })
             
             # print("[DEBUG] 전역 데이터 JSON 파일 로드 완료")
             return True
@@ -884,24 +1219,14 @@ class DataManager:
             self._dose_times = []
             self._selected_meals = []
             self._dose_count = 1
-            self._screen_data_backup = {
-                'wifi_scan': {},
-                'meal_time': {},
-                'dose_time': {},
-                'disk_selection': {},
-                'pill_loading': {},
-                'main': {}
-            }
             return False
     
     def _save_global_data_to_file(self):
-        """전역 데이터 JSON 파일에 저장"""
+        """전역 데이터 JSON 파일에 저장 (운용 데이터만, 화면 백업은 _save_screen_backup)"""
         try:
             import gc
             gc.collect()
-            
-            # json 모듈 지연 로딩
-            import json
+            from data_schema import GLOBAL_SCHEMA_VERSION
             
             data = {
                 'dose_times': self._dose_times or [],
@@ -909,11 +1234,10 @@ class DataManager:
                 'dose_count': self._dose_count or 1,
                 'auto_assigned_disks': self._auto_assigned_disks or [],
                 'unused_disks': self._unused_disks or [],
-                'screen_data_backup': self._screen_data_backup or {}
+                'schema_version': GLOBAL_SCHEMA_VERSION
             }
             
-            with open(self.global_data_file, 'w') as f:
-                json.dump(data, f)
+            self._atomic_write_json(self.global_data_file, data)
             
             # print("[DEBUG] 전역 데이터 JSON 파일 저장 완료")
             return True
@@ -922,6 +1246,50 @@ class DataManager:
             # print(f"[ERROR] 전역 데이터 JSON 파일 저장 실패: {e}")
             return False
     
+    def _load_screen_backup(self):
+        """화면 백업 지연 로딩 (화면 백업/복원이 처음 필요할 때만 디코드)"""
+        if self._screen_data_backup is not None:
+            return self._screen_data_backup
+        
+        # 이전 버전 global_data.json이면 로드하면서 화면 백업이 분리됨
+        if self._dose_times is None:
+            self._load_global_data_from_file()
+            if self._screen_data_backup is not None:
+                return self._screen_data_backup
+        
+        from data_schema import fix_screen_backup
+        try:
+            import json
+            with open(self.screen_backup_file, 'r') as f:
+                backup = json.load(f)
+        except (OSError, ValueError):
+            backup = None
+        self._screen_data_backup = fix_screen_backup(backup)
+        return self._screen_data_backup
+    
+    def _save_screen_backup(self, critical=True):
+        """화면 백업 JSON 파일에 저장
+        
+        critical=False(화면 백업)인 저장은 시간당 쓰기 예산을 넘으면 미뤄지고
+        poll_flush()/flush()에서 예산 안에 들어올 때 저장됨
+        """
+        try:
+            from io_stats import allow_write
+            if not allow_write(critical):
+                self._screen_backup_deferred = True
+                return True
+            
+            import gc
+            gc.collect()
+            
+            self._atomic_write_json(self.screen_backup_file, self._load_screen_backup())
+            self._screen_backup_deferred = False
+            return True
+            
+        except Exception as e:
+            # print(f"[ERROR] 화면 백업 JSON 파일 저장 실패: {e}")
+            return False
+    
     
     def add_selected_disks_to_current_data(self, selected_disks):
         """현재 저장된 데이터에 selected_disks 정보 추가 (테스트용)"""
@@ -1083,17 +1451,14 @@ class DataManager:
             self._dose_times = []
             self._selected_meals = []
             self._dose_count = 1
-            self._screen_data_backup = {
-                'wifi_scan': {},
-                'meal_time': {},
-                'dose_time': {},
-                'disk_selection': {},
-                'pill_loading': {},
-                'main': {}
-            }
+            self._auto_assigned_disks = []
+            self._unused_disks = []
+            from data_schema import default_screen_backup
+            self._screen_data_backup = default_screen_backup()
             
             # JSON 파일에 저장
             self._save_global_data_to_file()
+            self._save_screen_backup()
             
             # 참조 정리
             import gc
@@ -1111,15 +1476,14 @@ class DataManager:
         """화면 데이터 백업 (JSON 파일 기반)"""
         try:
             # 지연 로딩으로 데이터 로드
-            if self._screen_data_backup is None:
-                self._load_global_data_from_file()
+            self._load_screen_backup()
             
             if screen_name in self._screen_data_backup:
                 self._screen_data_backup[screen_name] = data.copy() if isinstance(data, dict) else data
                 # print(f"[INFO] {screen_name} 화면 데이터 백업 완료")
                 
                 # JSON 파일에 저장
-                self._save_global_data_to_file()
+                self._save_screen_backup(critical=False)
                 
                 # 참조 정리
                 import gc
@@ -1136,8 +1500,7 @@ class DataManager:
         """화면 데이터 복원 (지연 로딩)"""
         try:
             # 지연 로딩으로 데이터 로드
-            if self._screen_data_backup is None:
-                self._load_global_data_from_file()
+            self._load_screen_backup()
             
             if screen_name in self._screen_data_backup:
                 data = self._screen_data_backup[screen_name]
@@ -1155,15 +1518,14 @@ class DataManager:
         """특정 화면 데이터 삭제 (JSON 파일 기반)"""
         try:
             # 지연 로딩으로 데이터 로드
-            if self._screen_data_backup is None:
-                self._load_global_data_from_file()
+            self._load_screen_backup()
             
             if screen_name in self._screen_data_backup:
                 self._screen_data_backup[screen_name] = {}
                 # print(f"[INFO] {screen_name} 화면 데이터 삭제 완료")
                 
                 # JSON 파일에 저장
-                self._save_global_data_to_file()
+                self._save_screen_backup(critical=False)
                 
                 # 참조 정리
                 import gc
@@ -1180,8 +1542,7 @@ class DataManager:
         """모든 화면 데이터 삭제 (JSON 파일 기반)"""
         try:
             # 지연 로딩으로 데이터 로드
-            if self._screen_data_backup is None:
-                self._load_global_data_from_file()
+            self._load_screen_backup()
             
             for screen_name in self._screen_data_backup:
                 self._screen_data_backup[screen_name] = {}
@@ -1189,7 +1550,7 @@ class DataManager:
             # print("[INFO] 모든 화면 데이터 삭제 완료")
             
             # JSON 파일에 저장
-            self._save_global_data_to_file()
+            self._save_screen_backup(critical=False)
             
             # 참조 정리
             import gc
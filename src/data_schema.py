@@ -0,0 +1,205 @@
+"""
+데이터 스키마 / 버전 관리
+약물 문서(medication.json)와 전역 데이터(global_data.json)의 필드 형식과 기본값을 선언하고,
+저장된 문서의 schema_version이 현재 버전보다 낮을 때만 마이그레이션을 순서대로 적용
+(현재 버전 문서는 로드 시 검증/수정 없이 그대로 사용)
+
+버전 기록:
+    약물 문서
+        0 → 1: 잘못된 disk_counts 필드 제거, 디스크/필수 필드 기본값 채우기
+        1 → 2: 충전 기록 요약 필드(refill_summary, refill_totals) 추가, 전체 필드 형식 검사
+    전역 데이터
+        0 → 1: 운용 필드 형식 검사 및 기본값 채우기
+        1 → 2: 마법사 화면 백업(screen_data_backup)을 별도 파일로 분리
+               (분리된 섹션은 detached로 반환되어 호출자가 저장, 화면 백업이 필요할 때만 디코드)
+"""
+
+MEDICATION_SCHEMA_VERSION = 2
+GLOBAL_SCHEMA_VERSION = 2
+
+_NONE_TYPE = type(None)
+
+# 디스크별 기본값 (이름, 복용 시간 구분)
+_DISK_DEFAULTS = {
+    "1": ("아침약", "morning"),
+    "2": ("점심약", "lunch"),
+    "3": ("저녁약", "dinner"),
+}
+
+# 필드 선언: (이름, 허용 형식, 기본값 - 호출 가능하면 호출 결과 사용)
+DISK_FIELDS = (
+    ("name", str, None),  # 디스크별 기본값
+    ("total_capacity", int, 15),
+    ("current_count", int, 0),
+    ("last_refill", (str, _NONE_TYPE), None),
+    ("medication_type", str, None),  # 디스크별 기본값
+)
+
+MEDICATION_FIELDS = (
+    ("disks", dict, None),  # default_disks()
+    ("refill_history", list, list),
+    ("refill_summary", list, list),
+    ("refill_totals", dict, dict),
+    ("low_stock_threshold", int, 3),
+)
+
+GLOBAL_FIELDS = (
+    ("dose_times", list, list),
+    ("selected_meals", list, list),
+    ("dose_count", int, 1),
+    ("auto_assigned_disks", list, list),
+    ("unused_disks", list, list),
+)
+
+# 화면 백업 섹션 (마법사 화면 상태, 메인 화면 운용에는 사용하지 않음)
+SCREEN_BACKUP_SECTIONS = ("wifi_scan", "meal_time", "dose_time", "disk_selection", "pill_loading", "main")
+
+
+# ----- 기본값 -----
+
+def default_disk(disk_num):
+    """디스크 1개 기본 데이터"""
+    name, medication_type = _DISK_DEFAULTS[disk_num]
+    return {
+        "name": name,
+        "total_capacity": 15,
+        "current_count": 0,
+        "last_refill": None,
+        "medication_type": medication_type,
+    }
+
+
+def default_disks():
+    """디스크 1~3 기본 데이터"""
+    return {disk_num: default_disk(disk_num) for disk_num in ("1", "2", "3")}
+
+
+def default_medication():
+    """기본 약물 문서 (현재 스키마 버전)"""
+    data = {"disks": default_disks()}
+    _fill_fields(data, MEDICATION_FIELDS)
+    data["schema_version"] = MEDICATION_SCHEMA_VERSION
+    return data
+
+
+def default_global():
+    """기본 전역 데이터 문서 (화면 백업 제외, 현재 스키마 버전)"""
+    data = {}
+    _fill_fields(data, GLOBAL_FIELDS)
+    data["schema_version"] = GLOBAL_SCHEMA_VERSION
+    return data
+
+
+def default_screen_backup():
+    """빈 화면 백업"""
+    return {name: {} for name in SCREEN_BACKUP_SECTIONS}
+
+
+def _fill_fields(data, fields):
+    """형식이 맞지 않거나 없는 필드를 기본값으로 채움, 바꾼 필드가 있으면 True"""
+    changed = False
+    for name, types, default in fields:
+        if not isinstance(data.get(name), types):
+            data[name] = default() if callable(default) else default
+            changed = True
+    return changed
+
+
+# ----- 약물 문서 마이그레이션 -----
+
+def _medication_v1(data):
+    """0 → 1: 잘못된 필드 제거, 디스크/필수 필드 기본값 채우기"""
+    data.pop("disk_counts", None)
+    disks = data.get("disks")
+    if not isinstance(disks, dict):
+        disks = data["disks"] = default_disks()
+    for disk_num in ("1", "2", "3"):
+        disk_data = disks.get(disk_num)
+        if not isinstance(disk_data, dict):
+            disks[disk_num] = default_disk(disk_num)
+            continue
+        defaults = default_disk(disk_num)
+        for name, _, _ in DISK_FIELDS:
+            if name not in disk_data:
+                disk_data[name] = defaults[name]
+    data.setdefault("refill_history", [])
+    data.setdefault("low_stock_threshold", 3)
+
+
+def _medication_v2(data):
+    """1 → 2: 충전 기록 요약 필드 추가, 전체 필드 형식 검사"""
+    _fill_fields(data, MEDICATION_FIELDS)
+    for disk_num, disk_data in data["disks"].items():
+        if disk_num not in _DISK_DEFAULTS:
+            continue
+        defaults = default_disk(disk_num)
+        for name, types, _ in DISK_FIELDS:
+            if not isinstance(disk_data.get(name), types):
+                disk_data[name] = defaults[name]
+
+
+# ----- 전역 데이터 마이그레이션 -----
+
+def _global_v1(data):
+    """0 → 1: 운용 필드 형식 검사 및 기본값 채우기"""
+    _fill_fields(data, GLOBAL_FIELDS)
+
+
+def _global_v2(data):
+    """1 → 2: 화면 백업을 문서에서 분리 (detached 섹션으로 반환)"""
+    backup = data.pop("screen_data_backup", None)
+    return {"screen_data_backup": fix_screen_backup(backup)}
+
+
+# 버전 n → n+1 마이그레이션 (인덱스 n)
+MEDICATION_MIGRATIONS = (_medication_v1, _medication_v2)
+GLOBAL_MIGRATIONS = (_global_v1, _global_v2)
+
+
+def _migrate(data, version, migrations):
+    """data의 schema_version부터 version까지 마이그레이션 적용
+
+    Returns:
+        tuple: (마이그레이션 적용 여부, 분리된 섹션 dict)
+    """
+    current = data.get("schema_version", 0)
+    if not isinstance(current, int) or current < 0:
+        current = 0
+    detached = {}
+    if current >= version:
+        return False, detached
+    for migration in migrations[current:version]:
+        sections = migration(data)
+        if sections:
+            detached.update(sections)
+    data["schema_version"] = version
+    return True, detached
+
+
+def migrate_medication(data):
+    """약물 문서를 현재 버전으로 마이그레이션 (제자리 수정, 적용했으면 True)"""
+    if not isinstance(data, dict):
+        raise ValueError("약물 문서 형식 오류")
+    migrated, _ = _migrate(data, MEDICATION_SCHEMA_VERSION, MEDICATION_MIGRATIONS)
+    return migrated
+
+
+def migrate_global(data):
+    """전역 데이터 문서를 현재 버전으로 마이그레이션 (제자리 수정)
+
+    Returns:
+        tuple: (적용 여부, 분리된 섹션 dict - 예: {"screen_data_backup": {...}})
+    """
+    if not isinstance(data, dict):
+        raise ValueError("전역 데이터 형식 오류")
+    return _migrate(data, GLOBAL_SCHEMA_VERSION, GLOBAL_MIGRATIONS)
+
+
+def fix_screen_backup(backup):
+    """화면 백업 섹션 검사 (없는 섹션은 빈 dict로 채움, 화면 백업을 디코드할 때만 호출)"""
+    if not isinstance(backup, dict):
+        return default_screen_backup()
+    for name in SCREEN_BACKUP_SECTIONS:
+        if name not in backup:
+            backup[name] = {}
+    return backup
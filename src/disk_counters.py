@@ -0,0 +1,122 @@
+"""
+디스크 알약 수량 카운터 파일
+디스크별 고정 크기 슬롯(수량, 용량, 마지막 충전 시각, CRC)을 seek로 직접 읽고 쓰는 바이너리 파일
+
+파일 구조:
+    헤더 (4바이트): 매직 "PCNT"
+    디스크별 슬롯 2개 (14바이트 x 2): 수량(2) + 용량(2) + 마지막 충전 epoch(4) + 순번(2) + CRC32(4)
+
+디스크마다 슬롯 두 개를 번갈아 기록하므로 기록 중 전원이 끊겨도
+나머지 슬롯에 직전 값이 남아 있음 (순번이 큰 유효 슬롯이 현재 값)
+"""
+
+import struct
+
+from io_stats import tracked_open
+
+try:
+    from binascii import crc32
+except ImportError:
+    def crc32(data):
+        """binascii.crc32가 없는 펌웨어용 간이 체크섬"""
+        value = 0
+        for b in data:
+            value = ((value << 5) + value + b) & 0xFFFFFFFF
+        return value
+
+COUNTER_MAGIC = b"PCNT"
+HEADER_SIZE = len(COUNTER_MAGIC)
+
+SLOT_DATA_FMT = "<HHIH"
+SLOT_DATA_SIZE = struct.calcsize(SLOT_DATA_FMT)
+SLOT_SIZE = SLOT_DATA_SIZE + 4  # + CRC32
+DISK_SIZE = SLOT_SIZE * 2
+
+
+class DiskCounterFile:
+    """디스크별 수량 카운터 파일 (O(1) 읽기/쓰기)"""
+
+    def __init__(self, file_path, num_disks=3):
+        """카운터 파일 초기화 (파일은 open()에서 열림)"""
+        self.file_path = file_path
+        self.num_disks = num_disks
+        self._buf = bytearray(DISK_SIZE)  # 읽기용 고정 버퍼 (디스크 1개 분량)
+
+    def open(self):
+        """기존 파일 확인, 없거나 손상되었으면 빈 슬롯으로 새로 생성
+
+        Returns:
+            bool: 새 파일을 생성했으면 True (호출자가 초기값을 채워야 함)
+        """
+        try:
+            with open(self.file_path, 'rb') as f:
+                magic = f.read(HEADER_SIZE)
+                f.seek(0, 2)
+                size = f.tell()
+            if magic == COUNTER_MAGIC and size == HEADER_SIZE + DISK_SIZE * self.num_disks:
+                return False
+        except OSError:
+            pass
+
+        with tracked_open(self.file_path, 'wb') as f:
+            f.write(COUNTER_MAGIC)
+            f.write(bytes(DISK_SIZE * self.num_disks))  # CRC 불일치 상태 = 값 없음
+        return True
+
+    def _read_slots(self, f, disk_num):
+        """디스크의 두 슬롯을 읽어 (현재 슬롯 인덱스, 값) 반환, 유효 슬롯이 없으면 (-1, None)"""
+        buf = self._buf
+        f.seek(HEADER_SIZE + (disk_num - 1) * DISK_SIZE)
+        if f.readinto(buf) != DISK_SIZE:
+            return -1, None
+
+        best_index, best = -1, None
+        for index in (0, 1):
+            offset = index * SLOT_SIZE
+            data = bytes(buf[offset:offset + SLOT_DATA_SIZE])
+            if struct.unpack_from("<I", buf, offset + SLOT_DATA_SIZE)[0] != crc32(data):
+                continue
+            value = struct.unpack(SLOT_DATA_FMT, data)
+            # 순번 비교 (16비트 순환 고려)
+            if best is None or ((value[3] - best[3]) & 0xFFFF) < 0x8000:
+                best_index, best = index, value
+        return best_index, best
+
+    def read(self, disk_num):
+        """디스크 현재 값 읽기
+
+        Returns:
+            tuple: (수량, 용량, 마지막 충전 epoch), 두 슬롯 모두 비었거나 손상되었으면 None
+        """
+        if not 1 <= disk_num <= self.num_disks:
+            return None
+        with open(self.file_path, 'rb') as f:
+            _, value = self._read_slots(f, disk_num)
+        return None if value is None else value[:3]
+
+    def _write_slot(self, f, disk_num, count, capacity, last_refill_epoch):
+        """열린 파일에 디스크 값 기록 (현재 슬롯이 아닌 쪽 슬롯 14바이트만 덮어쓰기)"""
+        current_index, current = self._read_slots(f, disk_num)
+        seq = 0 if current is None else (current[3] + 1) & 0xFFFF
+        target_index = 1 - current_index if current_index >= 0 else 0
+
+        data = struct.pack(SLOT_DATA_FMT, max(0, count), capacity, last_refill_epoch, seq)
+        f.seek(HEADER_SIZE + (disk_num - 1) * DISK_SIZE + target_index * SLOT_SIZE)
+        f.write(data + struct.pack("<I", crc32(data)))
+
+    def write(self, disk_num, count, capacity, last_refill_epoch):
+        """디스크 값 기록 (현재 슬롯이 아닌 쪽 슬롯 14바이트만 덮어쓰기)"""
+        if not 1 <= disk_num <= self.num_disks:
+            return False
+        with tracked_open(self.file_path, 'r+b') as f:
+            self._write_slot(f, disk_num, count, capacity, last_refill_epoch)
+        return True
+
+    def write_many(self, values):
+        """여러 디스크 값을 파일 1번 열어 기록 (values: {디스크 번호: (수량, 용량, 마지막 충전 epoch)})"""
+        if not all(1 <= disk_num <= self.num_disks for disk_num in values):
+            return False
+        with tracked_open(self.file_path, 'r+b') as f:
+            for disk_num in sorted(values):
+                self._write_slot(f, disk_num, *values[disk_num])
+        return True
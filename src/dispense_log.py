@@ -0,0 +1,165 @@
+"""
+배출 기록 링버퍼
+고정 크기 레코드를 순환 기록하는 바이너리 로그 파일 (JSON 전체 재작성 대체)
+
+파일 구조:
+    헤더 (12바이트): 매직(4) + 버전(1) + 예약(1) + 용량(2) + head(2) + count(2)
+    레코드 (9바이트 x 용량): 년(2) 월 일 시 분 초 일정인덱스 성공여부
+"""
+
+import struct
+
+from io_stats import tracked_open
+
+LOG_MAGIC = b"PLOG"
+LOG_VERSION = 1
+
+HEADER_FMT = "<4sBBHHH"
+HEADER_SIZE = struct.calcsize(HEADER_FMT)
+HEAD_OFFSET = 8  # head, count 필드 위치 (매직4 + 버전1 + 예약1 + 용량2)
+
+RECORD_FMT = "<HBBBBBBB"
+RECORD_SIZE = struct.calcsize(RECORD_FMT)
+
+DEFAULT_CAPACITY = 1024  # 1024 x 9바이트 = 약 9KB (하루 3회 기준 약 11개월)
+
+
+def record_to_log(record):
+    """레코드 튜플을 기존 JSON 로그 형식의 dict로 변환"""
+    year, month, day, hour, minute, second, dose_index, success = record
+    date_str = f"{year:04d}-{month:02d}-{day:02d}"
+    time_str = f"{hour:02d}:{minute:02d}:{second:02d}"
+    return {
+        "timestamp": f"{date_str}T{time_str}",
+        "dose_index": dose_index,
+        "success": bool(success),
+        "date": date_str,
+        "time": time_str
+    }
+
+
+def log_to_record(log):
+    """기존 JSON 로그 dict를 레코드 튜플로 변환 (마이그레이션용)"""
+    date_str = log.get("date") or log.get("timestamp", "")[:10]
+    time_str = log.get("time") or log.get("timestamp", "")[11:19]
+    year, month, day = [int(v) for v in date_str.split("-")]
+    hour, minute, second = [int(v) for v in time_str.split(":")]
+    return (year, month, day, hour, minute, second,
+            int(log.get("dose_index", 0)) & 0xFF, 1 if log.get("success") else 0)
+
+
+class DispenseLogRing:
+    """고정 레코드 링버퍼 배출 기록 파일"""
+
+    def __init__(self, file_path, capacity=DEFAULT_CAPACITY):
+        """링버퍼 초기화 (파일은 open()에서 열림)"""
+        self.file_path = file_path
+        self.capacity = capacity
+        self.head = 0   # 다음에 기록할 슬롯
+        self.count = 0  # 유효 레코드 수
+        self._buf = bytearray(RECORD_SIZE)  # 읽기용 고정 버퍼 (할당 최소화)
+
+    def open(self):
+        """기존 파일 헤더 로드, 없거나 손상되었으면 새로 생성
+
+        Returns:
+            bool: 새 파일을 생성했으면 True
+        """
+        try:
+            with open(self.file_path, 'rb') as f:
+                header = f.read(HEADER_SIZE)
+            magic, version, _, capacity, head, count = struct.unpack(HEADER_FMT, header)
+            if magic == LOG_MAGIC and version == LOG_VERSION and head < capacity and count <= capacity:
+                self.capacity = capacity
+                self.head = head
+                self.count = count
+                return False
+        except (OSError, ValueError, struct.error):
+            pass
+
+        self._create()
+        return True
+
+    def _create(self):
+        """빈 링버퍼 파일 생성 (헤더 + 0으로 채운 레코드 영역)"""
+        self.head = 0
+        self.count = 0
+        with tracked_open(self.file_path, 'wb') as f:
+            f.write(struct.pack(HEADER_FMT, LOG_MAGIC, LOG_VERSION, 0, self.capacity, 0, 0))
+            zero_block = bytes(RECORD_SIZE * 16)
+            remaining = self.capacity
+            while remaining > 0:
+                n = min(16, remaining)
+                f.write(zero_block[:RECORD_SIZE * n])
+                remaining -= n
+
+    def append(self, record):
+        """레코드 1개 기록 (레코드 슬롯 + head/count 필드만 덮어쓰기)"""
+        with tracked_open(self.file_path, 'r+b') as f:
+            f.seek(HEADER_SIZE + self.head * RECORD_SIZE)
+            f.write(struct.pack(RECORD_FMT, *record))
+
+            # 레코드가 기록된 후에만 head 이동 (중간 정전 시 이전 상태 유지)
+            head = (self.head + 1) % self.capacity
+            count = min(self.count + 1, self.capacity)
+            f.seek(HEAD_OFFSET)
+            f.write(struct.pack("<HH", head, count))
+
+        self.head = head
+        self.count = count
+
+    def extend(self, records):
+        """여러 레코드를 한 번에 기록 (마이그레이션용)"""
+        if not records:
+            return
+        with tracked_open(self.file_path, 'r+b') as f:
+            head = self.head
+            for record in records:
+                f.seek(HEADER_SIZE + head * RECORD_SIZE)
+                f.write(struct.pack(RECORD_FMT, *record))
+                head = (head + 1) % self.capacity
+            count = min(self.count + len(records), self.capacity)
+            f.seek(HEAD_OFFSET)
+            f.write(struct.pack("<HH", head, count))
+
+        self.head = head
+        self.count = count
+
+    def rewrite(self, records):
+        """파일을 새로 만들고 records(오래된 것 먼저)로 채움 (마이그레이션 복구용)"""
+        self._create()
+        self.extend(records[-self.capacity:])
+
+    def iter_newest(self, limit=None):
+        """최신 레코드부터 역순으로 순회 (레코드 1개 크기 버퍼만 사용)"""
+        total = self.count if limit is None else min(limit, self.count)
+        if total <= 0:
+            return
+
+        buf = self._buf
+        with open(self.file_path, 'rb') as f:
+            slot = self.head
+            for _ in range(total):
+                slot = (slot - 1) % self.capacity
+                f.seek(HEADER_SIZE + slot * RECORD_SIZE)
+                f.readinto(buf)
+                yield struct.unpack(RECORD_FMT, buf)
+
+    def read_recent(self, limit):
+        """최근 limit개 레코드를 시간순(오래된 것 먼저) 로그 dict 리스트로 반환"""
+        logs = [record_to_log(record) for record in self.iter_newest(limit)]
+        logs.reverse()
+        return logs
+
+    def read_date(self, year, month, day):
+        """특정 날짜의 레코드를 시간순 로그 dict 리스트로 반환 (이전 날짜 도달 시 중단)"""
+        target = (year, month, day)
+        logs = []
+        for record in self.iter_newest():
+            record_date = (record[0], record[1], record[2])
+            if record_date == target:
+                logs.append(record_to_log(record))
+            elif record_date < target:
+                break
+        logs.reverse()
+        return logs
@@ -0,0 +1,279 @@
+"""
+플래시 쓰기 통계
+데이터 파일 쓰기를 파일별로 집계 (쓰기 횟수, 바이트, 전체 재작성 횟수, 추정 소거 블록 수)하고
+시간당 쓰기 예산을 넘으면 중요하지 않은 쓰기를 미루도록 판단
+
+통계 파일 구조 (/data/io_stats.bin, 고정 크기):
+    헤더: 매직 "PIOS" + 오늘 날짜(년2 월1 일1) + 집계 일수(4) + 누적 쓰기(4) + 누적 바이트(4) + 누적 블록(4)
+    파일별 오늘 통계 (16바이트 x TRACKED_FILES): 쓰기(4) + 바이트(4) + 재작성(4) + 블록(4)
+"""
+
+import struct
+
+STATS_FILE = "/data/io_stats.bin"
+STATS_MAGIC = b"PIOS"
+BLOCK_SIZE = 4096  # LittleFS 블록 크기 (ESP32 플래시 소거 단위)
+SAVE_INTERVAL_S = 3600  # 통계 파일 저장 주기 (통계 저장 자체가 플래시 쓰기이므로 드물게)
+
+# 집계 대상 파일 (임시 파일은 원본 이름으로 집계, 목록에 없으면 other)
+TRACKED_FILES = (
+    "medication.json",
+    "global_data.json",
+    "screen_backup.json",
+    "settings.json",
+    ".journal",
+    "dispense_log.bin",
+    "disk_counters.bin",
+    "state.kv",
+    "motion_state.bin",
+    "other",
+)
+
+HEADER_FMT = "<4sHBBIIII"
+HEADER_SIZE = struct.calcsize(HEADER_FMT)
+ENTRY_FMT = "<IIII"
+ENTRY_SIZE = struct.calcsize(ENTRY_FMT)
+
+
+def _file_slot(path):
+    """경로 → TRACKED_FILES 인덱스"""
+    name = path.rsplit("/", 1)[-1]
+    if name.endswith(".tmp"):
+        name = name[:-4]
+    try:
+        return TRACKED_FILES.index(name)
+    except ValueError:
+        return len(TRACKED_FILES) - 1
+
+
+class TrackedFile:
+    """쓰기 바이트를 세는 파일 래퍼 (닫힐 때 통계에 기록)"""
+
+    def __init__(self, stats, f, slot, rewrite):
+        self._stats = stats
+        self._f = f
+        self._slot = slot
+        self._rewrite = rewrite
+        self._bytes = 0
+
+    def write(self, data):
+        self._bytes += len(data)
+        return self._f.write(data)
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+            self._stats.record(self._slot, self._bytes, self._rewrite)
+
+    def __getattr__(self, name):
+        return getattr(self._f, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class IOStats:
+    """파일별 플래시 쓰기 집계와 시간당 쓰기 예산"""
+
+    def __init__(self, file_path=STATS_FILE):
+        self.file_path = file_path
+        self.hourly_budget_bytes = None  # None이면 예산 제한 없음
+        self._day = None                 # (년, 월, 일)
+        self._days = 1                   # 집계 일수 (일 평균 계산용)
+        self._lifetime = [0, 0, 0]       # 누적 쓰기, 바이트, 블록
+        self._today = [[0, 0, 0, 0] for _ in TRACKED_FILES]
+        self._hour = None
+        self._hour_bytes = 0
+        self._deferred = 0               # 예산 초과로 미룬 쓰기 횟수 (오늘)
+        self._last_save = None
+        self._dirty = False
+        self._loaded = False
+
+    # ----- 시간 -----
+
+    def _now(self):
+        """(epoch 초, (년, 월, 일))"""
+        import time
+        now = time.time()
+        t = time.localtime(int(now))
+        return now, (t[0], t[1], t[2])
+
+    def _roll(self):
+        """날짜/시간이 바뀌었으면 오늘 통계와 시간당 사용량 초기화"""
+        if not self._loaded:
+            self.load()
+        now, day = self._now()
+        hour = int(now // 3600)
+        if hour != self._hour:
+            self._hour = hour
+            self._hour_bytes = 0
+        if day != self._day:
+            if self._day is not None:
+                self._days += 1
+                self._today = [[0, 0, 0, 0] for _ in TRACKED_FILES]
+                self._deferred = 0
+                self._dirty = True
+            self._day = day
+        return now
+
+    # ----- 기록 -----
+
+    def open(self, path, mode):
+        """쓰기용 파일 열기 (쓰기 바이트 집계)
+
+        'w'/'wb' 모드 쓰기는 문서 전체 재작성, 'r+b' 모드는 제자리 부분 쓰기로 집계
+        """
+        return TrackedFile(self, open(path, mode), _file_slot(path), 'w' in mode)
+
+    def record(self, slot, nbytes, rewrite=False):
+        """쓰기 1회 기록 (블록 수는 쓰기 바이트를 덮는 최소 블록 수로 추정)"""
+        self._roll()
+        blocks = (nbytes + BLOCK_SIZE - 1) // BLOCK_SIZE if nbytes else 0
+        entry = self._today[slot]
+        entry[0] += 1
+        entry[1] += nbytes
+        if rewrite:
+            entry[2] += 1
+        entry[3] += blocks
+        self._lifetime[0] += 1
+        self._lifetime[1] += nbytes
+        self._lifetime[2] += blocks
+        self._hour_bytes += nbytes
+        self._dirty = True
+
+    # ----- 예산 -----
+
+    def set_hourly_budget(self, budget_bytes):
+        """시간당 쓰기 예산 설정 (None이면 해제)"""
+        self.hourly_budget_bytes = budget_bytes
+
+    def allow_write(self, critical=True):
+        """쓰기 허용 여부 (중요한 쓰기는 항상 허용, 그 외는 이번 시간 예산 안에서만)"""
+        if critical or self.hourly_budget_bytes is None:
+            return True
+        self._roll()
+        if self._hour_bytes < self.hourly_budget_bytes:
+            return True
+        self._deferred += 1
+        return False
+
+    # ----- 조회 -----
+
+    def get_stats(self):
+        """오늘/누적 쓰기 통계 dict 반환"""
+        self._roll()
+        files = {}
+        total = [0, 0, 0, 0]
+        for name, entry in zip(TRACKED_FILES, self._today):
+            if entry[0]:
+                files[name] = {"writes": entry[0], "bytes": entry[1], "rewrites": entry[2], "blocks": entry[3]}
+            for i in range(4):
+                total[i] += entry[i]
+        return {
+            "date": "%04d-%02d-%02d" % self._day,
+            "today": {"writes": total[0], "bytes": total[1], "rewrites": total[2], "blocks": total[3]},
+            "files": files,
+            "hour_bytes": self._hour_bytes,
+            "hourly_budget_bytes": self.hourly_budget_bytes,
+            "deferred_today": self._deferred,
+            "lifetime": {"writes": self._lifetime[0], "bytes": self._lifetime[1],
+                         "blocks": self._lifetime[2], "days": self._days},
+        }
+
+    # ----- 저장 -----
+
+    def load(self):
+        """통계 파일 로드 (없거나 손상되었으면 0부터 시작)"""
+        self._loaded = True
+        try:
+            with open(self.file_path, 'rb') as f:
+                data = f.read()
+            if len(data) != HEADER_SIZE + ENTRY_SIZE * len(TRACKED_FILES):
+                return False
+            magic, year, month, day, days, writes, nbytes, blocks = struct.unpack_from(HEADER_FMT, data, 0)
+            if magic != STATS_MAGIC:
+                return False
+            self._day = (year, month, day)
+            self._days = max(1, days)
+            self._lifetime = [writes, nbytes, blocks]
+            for i in range(len(TRACKED_FILES)):
+                self._today[i] = list(struct.unpack_from(ENTRY_FMT, data, HEADER_SIZE + i * ENTRY_SIZE))
+            return True
+        except (OSError, ValueError):
+            return False
+
+    def save(self):
+        """통계 파일 저장 (고정 크기 1회 쓰기, 통계 파일 쓰기 자체는 집계하지 않음)"""
+        now = self._roll()
+        year, month, day = self._day
+        data = bytearray(struct.pack(HEADER_FMT, STATS_MAGIC, year, month, day, self._days,
+                                     self._lifetime[0] & 0xFFFFFFFF, self._lifetime[1] & 0xFFFFFFFF,
+                                     self._lifetime[2] & 0xFFFFFFFF))
+        for entry in self._today:
+            data.extend(struct.pack(ENTRY_FMT, *[v & 0xFFFFFFFF for v in entry]))
+        try:
+            with open(self.file_path, 'wb') as f:
+                f.write(data)
+            self._dirty = False
+            self._last_save = now
+            return True
+        except OSError:
+            return False
+
+    def maybe_save(self, interval_s=SAVE_INTERVAL_S):
+        """변경이 있고 마지막 저장 후 interval_s가 지났으면 저장 (유휴 시간 호출용, 0이면 즉시)"""
+        if not self._dirty:
+            return False
+        import time
+        now = time.time()
+        if self._last_save is None:
+            # 부팅 후 첫 호출 시각을 기준으로 주기 계산
+            self._last_save = now
+        if now - self._last_save < interval_s:
+            return False
+        return self.save()
+
+
+def estimate_flash_lifetime_years(blocks_per_day, partition_blocks, erase_cycles=100000):
+    """일 평균 소거 블록 수로 플래시 수명(년) 추정 (LittleFS 마모 평준화로 파티션 전체에 분산된다고 가정)"""
+    if blocks_per_day <= 0:
+        return None
+    return partition_blocks * erase_cycles / blocks_per_day / 365
+
+
+# 전역 통계 인스턴스 (싱글톤)
+_io_stats = None
+
+
+def get_tracker():
+    """전역 통계 인스턴스 반환 (처음 호출 시 생성)"""
+    global _io_stats
+    if _io_stats is None:
+        _io_stats = IOStats()
+    return _io_stats
+
+
+def init_tracker(file_path=STATS_FILE):
+    """다른 통계 파일 경로로 전역 인스턴스 다시 생성 (호스트 시험용)"""
+    global _io_stats
+    _io_stats = IOStats(file_path)
+    return _io_stats
+
+
+def tracked_open(path, mode):
+    """쓰기 바이트를 집계하는 open (데이터 파일 쓰기용)"""
+    return get_tracker().open(path, mode)
+
+
+def get_io_stats():
+    """오늘/누적 쓰기 통계 조회"""
+    return get_tracker().get_stats()
+
+
+def allow_write(critical=True):
+    """시간당 예산 기준 쓰기 허용 여부"""
+    return get_tracker().allow_write(critical)
@@ -0,0 +1,295 @@
+"""
+스트리밍 JSON 읽기
+작은 고정 버퍼로 파일을 조금씩 읽으면서 필요한 부분만 파싱 (MicroPython / CPython 공용)
+
+    load_path("/data/medication.json", "disks.2.current_count")   # 경로 값 1개만 파싱
+    iter_items("/data/dispense_log.json")                          # 리스트 항목을 하나씩 생성
+    load_keys("/data/global_data.json", ("dose_count", "dose_times"))  # 필요한 최상위 키만 파싱
+
+필요 없는 값은 객체를 만들지 않고 건너뛰므로 최대 메모리 사용량은
+파일 전체 크기가 아니라 실제로 꺼낸 값 크기 + 버퍼 크기로 제한됨
+"""
+
+DEFAULT_BUF_SIZE = 64
+
+# 바이트 값 튜플 (MicroPython은 bytes에 대한 int in 연산을 지원하지 않음)
+_WHITESPACE = (0x20, 0x09, 0x0D, 0x0A)
+_VALUE_END = (0x2C, 0x5D, 0x7D) + _WHITESPACE  # , ] } 공백
+_NUMBER_CHARS = tuple(b"0123456789+-.eE")
+_ESCAPES = {
+    ord('"'): b'"', ord('\\'): b'\\', ord('/'): b'/',
+    ord('b'): b'\b', ord('f'): b'\f', ord('n'): b'\n', ord('r'): b'\r', ord('t'): b'\t',
+}
+
+
+class JsonStream:
+    """바이너리 파일 객체 위의 JSON 토크나이저 (버퍼 buf_size 바이트만 사용)"""
+
+    def __init__(self, f, buf_size=DEFAULT_BUF_SIZE):
+        self._f = f
+        self._buf = bytearray(buf_size)
+        self._len = 0
+        self._pos = 0
+
+    # ----- 문자 단위 읽기 -----
+
+    def _peek(self):
+        """다음 바이트 확인 (파일 끝이면 -1)"""
+        if self._pos >= self._len:
+            self._len = self._f.readinto(self._buf) or 0
+            self._pos = 0
+            if self._len == 0:
+                return -1
+        return self._buf[self._pos]
+
+    def _next(self):
+        """다음 바이트 소비"""
+        c = self._peek()
+        if c < 0:
+            raise ValueError("JSON 데이터가 중간에 끝남")
+        self._pos += 1
+        return c
+
+    def _skip_ws(self):
+        """공백을 건너뛰고 다음 바이트 반환"""
+        c = self._peek()
+        while c >= 0 and c in _WHITESPACE:
+            self._pos += 1
+            c = self._peek()
+        return c
+
+    def _expect(self, ch):
+        """공백 다음 바이트가 ch인지 확인 후 소비"""
+        if self._skip_ws() != ord(ch):
+            raise ValueError("JSON 형식 오류: '" + ch + "' 필요")
+        self._pos += 1
+
+    def _end_of_item(self, close):
+        """항목 뒤의 ',' 또는 닫는 괄호 소비, 컨테이너가 끝났으면 True"""
+        c = self._skip_ws()
+        self._pos += 1
+        if c == ord(','):
+            return False
+        if c == ord(close):
+            return True
+        raise ValueError("JSON 형식 오류: ',' 또는 '" + close + "' 필요")
+
+    # ----- 값 읽기 -----
+
+    def read_value(self):
+        """현재 위치의 값 1개를 파싱해 반환"""
+        c = self._skip_ws()
+        if c == ord('{'):
+            result = {}
+            for key in self.iter_keys():
+                result[key] = self.read_value()
+            return result
+        if c == ord('['):
+            return list(self.iter_array())
+        if c == ord('"'):
+            return self._read_string()
+        if c == ord('t'):
+            self._read_literal(b"true")
+            return True
+        if c == ord('f'):
+            self._read_literal(b"false")
+            return False
+        if c == ord('n'):
+            self._read_literal(b"null")
+            return None
+        return self._read_number()
+
+    def skip_value(self):
+        """현재 위치의 값 1개를 객체 생성 없이 건너뜀"""
+        c = self._skip_ws()
+        if c == ord('"'):
+            self._skip_string()
+            return
+        if c != ord('{') and c != ord('['):
+            # 숫자 / true / false / null
+            while c >= 0 and c not in _VALUE_END:
+                self._pos += 1
+                c = self._peek()
+            return
+
+        depth = 0
+        while True:
+            c = self._peek()
+            if c < 0:
+                raise ValueError("JSON 데이터가 중간에 끝남")
+            if c == ord('"'):
+                self._skip_string()
+                continue
+            self._pos += 1
+            if c == ord('{') or c == ord('['):
+                depth += 1
+            elif c == ord('}') or c == ord(']'):
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def _read_literal(self, literal):
+        """true / false / null 확인"""
+        for expected in literal:
+            if self._next() != expected:
+                raise ValueError("JSON 형식 오류: 알 수 없는 값")
+
+    def _read_number(self):
+        """숫자 파싱 (정수 또는 실수)"""
+        chars = bytearray()
+        c = self._peek()
+        while c >= 0 and c in _NUMBER_CHARS:
+            chars.append(c)
+            self._pos += 1
+            c = self._peek()
+        if not chars:
+            raise ValueError("JSON 형식 오류: 값 필요")
+        text = chars.decode()
+        if "." in text or "e" in text or "E" in text:
+            return float(text)
+        return int(text)
+
+    def _read_string(self):
+        """문자열 파싱 (이스케이프 처리, UTF-8 바이트는 그대로 모아 마지막에 디코드)"""
+        self._next()  # 여는 따옴표
+        out = bytearray()
+        while True:
+            c = self._next()
+            if c == ord('"'):
+                return out.decode()
+            if c != ord('\\'):
+                out.append(c)
+                continue
+            c = self._next()
+            if c == ord('u'):
+                code = self._read_hex4()
+                if 0xD800 <= code < 0xDC00:
+                    # 서로게이트 쌍
+                    self._next()
+                    self._next()
+                    code = 0x10000 + ((code - 0xD800) << 10) + (self._read_hex4() - 0xDC00)
+                out.extend(chr(code).encode())
+            else:
+                escaped = _ESCAPES.get(c)
+                if escaped is None:
+                    raise ValueError("JSON 형식 오류: 잘못된 이스케이프")
+                out.extend(escaped)
+
+    def _read_hex4(self):
+        """\\u 뒤의 16진수 4자리"""
+        digits = bytes([self._next(), self._next(), self._next(), self._next()])
+        return int(digits.decode(), 16)
+
+    def _skip_string(self):
+        """문자열을 객체 생성 없이 건너뜀"""
+        self._next()  # 여는 따옴표
+        while True:
+            c = self._next()
+            if c == ord('\\'):
+                self._next()
+            elif c == ord('"'):
+                return
+
+    # ----- 컨테이너 순회 -----
+
+    def iter_keys(self):
+        """객체의 키를 하나씩 생성 (호출자는 각 키마다 read_value 또는 skip_value를 호출해야 함)"""
+        self._expect('{')
+        if self._skip_ws() == ord('}'):
+            self._pos += 1
+            return
+        while True:
+            if self._skip_ws() != ord('"'):
+                raise ValueError("JSON 형식 오류: 키 필요")
+            key = self._read_string()
+            self._expect(':')
+            yield key
+            if self._end_of_item('}'):
+                return
+
+    def iter_array(self):
+        """리스트 항목을 하나씩 파싱해 생성"""
+        self._expect('[')
+        if self._skip_ws() == ord(']'):
+            self._pos += 1
+            return
+        while True:
+            yield self.read_value()
+            if self._end_of_item(']'):
+                return
+
+    def seek_path(self, key_path):
+        """점으로 구분한 경로("disks.2.current_count")의 값 시작 위치로 이동
+
+        객체는 키 이름, 리스트는 숫자 인덱스로 찾음
+
+        Returns:
+            bool: 경로가 존재하면 True
+        """
+        if not key_path:
+            return True
+        for part in key_path.split("."):
+            c = self._skip_ws()
+            if c == ord('{'):
+                found = False
+                for key in self.iter_keys():
+                    if key == part:
+                        found = True
+                        break
+                    self.skip_value()
+                if not found:
+                    return False
+            elif c == ord('['):
+                try:
+                    target = int(part)
+                except ValueError:
+                    return False
+                self._expect('[')
+                if self._skip_ws() == ord(']'):
+                    return False
+                index = 0
+                while index < target:
+                    self.skip_value()
+                    if self._end_of_item(']'):
+                        return False
+                    index += 1
+            else:
+                return False
+        return True
+
+
+def load_path(file_path, key_path, default=None, buf_size=DEFAULT_BUF_SIZE):
+    """파일에서 경로 값 1개만 파싱 (파일이나 경로가 없으면 default)"""
+    try:
+        with open(file_path, 'rb') as f:
+            stream = JsonStream(f, buf_size)
+            if not stream.seek_path(key_path):
+                return default
+            return stream.read_value()
+    except (OSError, ValueError):
+        return default
+
+
+def iter_items(file_path, key_path=None, buf_size=DEFAULT_BUF_SIZE):
+    """파일에서 경로(없으면 최상위)의 리스트 항목을 하나씩 생성"""
+    with open(file_path, 'rb') as f:
+        stream = JsonStream(f, buf_size)
+        if not stream.seek_path(key_path):
+            return
+        if stream._skip_ws() != ord('['):
+            return
+        for item in stream.iter_array():
+            yield item
+
+
+def load_keys(file_path, keys, buf_size=DEFAULT_BUF_SIZE):
+    """파일 최상위 객체에서 keys에 있는 키만 파싱해 dict로 반환 (나머지 키는 건너뜀)"""
+    result = {}
+    with open(file_path, 'rb') as f:
+        stream = JsonStream(f, buf_size)
+        for key in stream.iter_keys():
+            if key in keys:
+                result[key] = stream.read_value()
+            else:
+                stream.skip_value()
+    return result
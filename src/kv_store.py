@@ -0,0 +1,442 @@
+"""
+단일 파일 로그 구조 키-값 저장소
+여러 /data/*.json 파일을 하나의 추가 기록(append-only) 파일로 통합
+
+파일 구조:
+    헤더 (5바이트): 매직 "PKVS" + 버전(1)
+    레코드 반복: 종류(1) + 키 길이(1) + 값 길이(2) + 키 + 값(JSON) + CRC32(4)
+
+같은 키를 다시 쓰면 새 레코드가 파일 끝에 추가되고 이전 레코드는 죽은 공간이 됨
+부팅 시 레코드 헤더와 키만 읽어 RAM 인덱스(키 → 위치)를 만들며 값은 get() 시점에 해당 레코드만 파싱
+죽은 공간이 커지면 compact()가 살아 있는 레코드만 새 파일로 옮긴 뒤 rename으로 교체
+"""
+
+import struct
+
+from io_stats import tracked_open
+
+try:
+    from binascii import crc32
+except ImportError:
+    def crc32(data, value=0):
+        """binascii.crc32가 없는 펌웨어용 간이 체크섬"""
+        for b in data:
+            value = ((value << 5) + value + b) & 0xFFFFFFFF
+        return value
+
+KV_MAGIC = b"PKVS"
+KV_VERSION = 1
+FILE_HEADER_SIZE = len(KV_MAGIC) + 1
+
+RECORD_FMT = "<BBH"
+RECORD_HEADER_SIZE = struct.calcsize(RECORD_FMT)
+CRC_SIZE = 4
+
+RECORD_PUT = 1
+RECORD_DELETE = 2
+
+DEFAULT_PATH = "/data/state.kv"
+
+# 키 → 기존 JSON 파일 (어댑터가 처음 읽을 때 저장소로 옮기고 파일 삭제)
+# settings/medication/global_data는 아직 DataManager가 JSON 파일을 직접 관리하므로 넣지 않음
+LEGACY_FILES = {
+    "disk_states": "/data/disk_states.json",
+    "boot_target": "/data/boot_target.json",
+    "setup_complete": "/data/setup_complete.json",
+    "wifi_config": "/data/wifi_config.json",
+}
+
+
+def _sync_file(f):
+    """파일 버퍼를 저장장치까지 기록"""
+    import os
+    f.flush()
+    try:
+        os.fsync(f.fileno())  # CPython
+    except (AttributeError, OSError):
+        try:
+            os.sync()  # MicroPython
+        except (AttributeError, OSError):
+            pass
+
+
+def _record_crc(header, key_bytes, value_bytes):
+    """레코드 헤더 + 키 + 값의 CRC32"""
+    return crc32(value_bytes, crc32(key_bytes, crc32(header))) & 0xFFFFFFFF
+
+
+class KVStore:
+    """로그 구조 키-값 저장소 (키별 get/put, 값은 JSON 직렬화)"""
+
+    def __init__(self, file_path=DEFAULT_PATH):
+        """저장소 초기화 (파일은 open()에서 열림)"""
+        self.file_path = file_path
+        self.tmp_path = file_path + ".tmp"
+        self._index = {}      # 키 → (레코드 위치, 레코드 크기, CRC)
+        self._end = 0         # 다음 레코드 기록 위치
+        self._dead_bytes = 0  # 덮어쓰기/삭제로 죽은 레코드 바이트 수
+        self._opened = False
+
+    def open(self):
+        """파일을 스캔해 키 인덱스 구성, 없으면 새로 생성 (끝부분 손상 시 compact로 정리)"""
+        import os
+        self._recover_compaction(os)
+
+        try:
+            torn = self._scan()
+        except OSError:
+            self._create()
+            torn = False
+        self._opened = True
+
+        if torn:
+            # 기록 도중 전원이 끊긴 마지막 레코드 제거
+            self.compact()
+
+    def _ensure_open(self):
+        """처음 사용할 때 open() 호출"""
+        if not self._opened:
+            self.open()
+
+    def _recover_compaction(self, os):
+        """compact 도중 중단된 경우 정리 (rename 전이면 임시 파일 폐기, 기존 파일 삭제 후면 교체 마무리)"""
+        try:
+            os.stat(self.tmp_path)
+        except OSError:
+            return
+        try:
+            os.stat(self.file_path)
+            os.remove(self.tmp_path)
+        except OSError:
+            os.rename(self.tmp_path, self.file_path)
+
+    def _create(self):
+        """빈 저장소 파일 생성 (/data 디렉토리가 없으면 생성)"""
+        import os
+        data_dir = self.file_path.rsplit("/", 1)[0]
+        if data_dir:
+            try:
+                os.mkdir(data_dir)
+            except OSError:
+                pass  # 이미 존재
+        with tracked_open(self.file_path, 'wb') as f:
+            f.write(KV_MAGIC + bytes([KV_VERSION]))
+            _sync_file(f)
+        self._index = {}
+        self._end = FILE_HEADER_SIZE
+        self._dead_bytes = 0
+
+    def _scan(self):
+        """레코드 헤더와 키만 읽어 인덱스 구성
+
+        Returns:
+            bool: 파일 끝에 불완전하거나 CRC가 맞지 않는 레코드가 있으면 True
+        """
+        index = {}
+        dead = 0
+        header_buf = bytearray(RECORD_HEADER_SIZE)
+        with open(self.file_path, 'rb') as f:
+            file_header = f.read(FILE_HEADER_SIZE)
+            if len(file_header) != FILE_HEADER_SIZE or file_header[:4] != KV_MAGIC or file_header[4] != KV_VERSION:
+                raise OSError("저장소 헤더 손상")
+
+            f.seek(0, 2)
+            size = f.tell()
+            pos = FILE_HEADER_SIZE
+            last = None
+            while pos + RECORD_HEADER_SIZE <= size:
+                f.seek(pos)
+                f.readinto(header_buf)
+                kind, key_len, value_len = struct.unpack(RECORD_FMT, header_buf)
+                record_size = RECORD_HEADER_SIZE + key_len + value_len + CRC_SIZE
+                if kind not in (RECORD_PUT, RECORD_DELETE) or key_len == 0 or pos + record_size > size:
+                    break
+                key = f.read(key_len).decode()
+
+                old = index.pop(key, None)
+                if old is not None:
+                    dead += old[1]
+                if kind == RECORD_PUT:
+                    index[key] = (pos, record_size, None)
+                else:
+                    dead += record_size
+                last = (key, pos, record_size, old)
+                pos += record_size
+
+            # 추가 기록만 하므로 손상 가능한 레코드는 마지막 하나뿐 - 그것만 CRC 검증
+            torn = pos != size
+            if last is not None and not torn:
+                key, last_pos, last_size, previous = last
+                if self._read_record(f, last_pos, last_size) is None:
+                    torn = True
+                    index.pop(key, None)
+                    if previous is not None:
+                        index[key] = previous
+                    pos = last_pos
+
+        self._index = index
+        self._end = pos
+        self._dead_bytes = dead
+        return torn
+
+    def _read_record(self, f, pos, record_size):
+        """레코드 전체를 읽어 CRC 검증 후 (종류, 키, 값 바이트, CRC) 반환, 손상 시 None"""
+        f.seek(pos)
+        data = f.read(record_size)
+        if len(data) != record_size:
+            return None
+        kind, key_len, value_len = struct.unpack_from(RECORD_FMT, data, 0)
+        key_end = RECORD_HEADER_SIZE + key_len
+        value_end = key_end + value_len
+        crc = struct.unpack_from("<I", data, value_end)[0]
+        if _record_crc(data[:RECORD_HEADER_SIZE], data[RECORD_HEADER_SIZE:key_end], data[key_end:value_end]) != crc:
+            return None
+        return kind, data[RECORD_HEADER_SIZE:key_end].decode(), data[key_end:value_end], crc
+
+    def _append(self, kind, key, value_bytes):
+        """레코드 1개를 파일 끝에 기록, (위치, 크기, CRC) 반환"""
+        key_bytes = key.encode()
+        if not 0 < len(key_bytes) < 256 or len(value_bytes) > 0xFFFF:
+            raise ValueError("키 또는 값 크기 초과")
+        header = struct.pack(RECORD_FMT, kind, len(key_bytes), len(value_bytes))
+        crc = _record_crc(header, key_bytes, value_bytes)
+
+        pos = self._end
+        with tracked_open(self.file_path, 'r+b') as f:
+            f.seek(pos)
+            f.write(header)
+            f.write(key_bytes)
+            f.write(value_bytes)
+            f.write(struct.pack("<I", crc))
+            _sync_file(f)
+
+        record_size = RECORD_HEADER_SIZE + len(key_bytes) + len(value_bytes) + CRC_SIZE
+        self._end = pos + record_size
+        return pos, record_size, crc
+
+    def keys(self):
+        """저장된 키 목록"""
+        self._ensure_open()
+        return list(self._index.keys())
+
+    def contains(self, key):
+        """키 존재 여부 (파일 접근 없음)"""
+        self._ensure_open()
+        return key in self._index
+
+    def get(self, key, default=None):
+        """키의 값 읽기 (해당 레코드만 읽고 파싱), 없거나 손상되었으면 default"""
+        self._ensure_open()
+        entry = self._index.get(key)
+        if entry is None:
+            return default
+        try:
+            with open(self.file_path, 'rb') as f:
+                record = self._read_record(f, entry[0], entry[1])
+            if record is None:
+                return default
+            import json
+            return json.loads(record[2])
+        except (OSError, ValueError):
+            return default
+
+    def get_many(self, keys=None):
+        """여러 키를 파일 한 번 열어 읽기 (부팅 시 일괄 로드용), keys가 None이면 모든 키
+
+        Returns:
+            dict: 키 → 값 (없거나 손상된 키는 제외)
+        """
+        self._ensure_open()
+        import json
+        if keys is None:
+            keys = list(self._index.keys())
+        result = {}
+        # 파일 위치 순으로 읽어 탐색 거리 최소화
+        entries = sorted((self._index[key][0], key) for key in keys if key in self._index)
+        if not entries:
+            return result
+        with open(self.file_path, 'rb') as f:
+            for pos, key in entries:
+                record = self._read_record(f, pos, self._index[key][1])
+                if record is None:
+                    continue
+                try:
+                    result[key] = json.loads(record[2])
+                except ValueError:
+                    pass
+        return result
+
+    def put(self, key, value):
+        """키의 값 기록 (JSON 직렬화 결과가 기존 값과 같으면 기록 생략)
+
+        Returns:
+            bool: 실제로 기록했으면 True
+        """
+        self._ensure_open()
+        import json
+        value_bytes = json.dumps(value).encode()
+
+        old = self._index.get(key)
+        if old is not None:
+            key_bytes = key.encode()
+            header = struct.pack(RECORD_FMT, RECORD_PUT, len(key_bytes), len(value_bytes))
+            if old[2] is None:
+                with open(self.file_path, 'rb') as f:
+                    record = self._read_record(f, old[0], old[1])
+                if record is not None:
+                    old = (old[0], old[1], record[3])
+                    self._index[key] = old
+            if old[2] == _record_crc(header, key_bytes, value_bytes):
+                return False
+
+        self._index[key] = self._append(RECORD_PUT, key, value_bytes)
+        if old is not None:
+            self._dead_bytes += old[1]
+        return True
+
+    def delete(self, key):
+        """키 삭제 (삭제 레코드 추가)"""
+        self._ensure_open()
+        old = self._index.pop(key, None)
+        if old is None:
+            return False
+        _, record_size, _ = self._append(RECORD_DELETE, key, b"")
+        self._dead_bytes += old[1] + record_size
+        return True
+
+    def stats(self):
+        """저장소 크기 정보 (파일 크기, 살아 있는 바이트, 죽은 바이트, 키 개수)"""
+        self._ensure_open()
+        return {
+            "file_size": self._end,
+            "live_bytes": self._end - FILE_HEADER_SIZE - self._dead_bytes,
+            "dead_bytes": self._dead_bytes,
+            "keys": len(self._index),
+        }
+
+    def compact(self):
+        """살아 있는 레코드만 임시 파일로 복사한 뒤 rename으로 교체"""
+        import os
+        new_index = {}
+        pos = FILE_HEADER_SIZE
+        with open(self.file_path, 'rb') as src, tracked_open(self.tmp_path, 'wb') as dst:
+            dst.write(KV_MAGIC + bytes([KV_VERSION]))
+            for key, entry in self._index.items():
+                src.seek(entry[0])
+                data = src.read(entry[1])
+                if len(data) != entry[1]:
+                    continue
+                dst.write(data)
+                new_index[key] = (pos, entry[1], entry[2])
+                pos += entry[1]
+            _sync_file(dst)
+
+        try:
+            os.rename(self.tmp_path, self.file_path)
+        except OSError:
+            # 대상 파일 덮어쓰기를 지원하지 않는 파일시스템 (FAT 등) - 중단 시 open()에서 마무리
+            os.remove(self.file_path)
+            os.rename(self.tmp_path, self.file_path)
+
+        self._index = new_index
+        self._end = pos
+        self._dead_bytes = 0
+
+    def maybe_compact(self, min_dead_bytes=4096):
+        """죽은 공간이 기준 이상이고 살아 있는 데이터보다 많으면 compact (유휴 시간 호출용)"""
+        if not self._opened or self._dead_bytes < min_dead_bytes:
+            return False
+        if self._dead_bytes < self._end - FILE_HEADER_SIZE - self._dead_bytes:
+            return False
+        try:
+            self.compact()
+            return True
+        except OSError:
+            return False
+
+
+class LegacyJsonKey:
+    """기존 JSON 파일을 키 하나로 대체하는 어댑터
+
+    처음 읽을 때 저장소에 키가 없고 기존 파일이 있으면 저장소로 옮긴 뒤 파일을 삭제하므로
+    모듈별로 하나씩 저장소로 옮길 수 있음
+    """
+
+    def __init__(self, store, key, legacy_path=None):
+        self.store = store
+        self.key = key
+        self.legacy_path = legacy_path if legacy_path is not None else LEGACY_FILES.get(key)
+
+    def _migrate(self):
+        """기존 JSON 파일이 있으면 저장소로 이동 (부팅 후 키별 1회만 확인)
+
+        업로드 도구 등으로 새로 복사된 파일도 다음 부팅 때 저장소 값을 대체함
+        """
+        if self.legacy_path is None or self.key in _checked_legacy_keys:
+            return
+        _checked_legacy_keys.add(self.key)
+        try:
+            import json
+            with open(self.legacy_path, 'r') as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.store.put(self.key, value)
+        try:
+            import os
+            os.remove(self.legacy_path)
+        except OSError:
+            pass
+
+    def load(self, default=None):
+        """값 읽기 (없으면 default)"""
+        self._migrate()
+        return self.store.get(self.key, default)
+
+    def save(self, value):
+        """값 저장"""
+        self._migrate()
+        return self.store.put(self.key, value)
+
+    def remove(self):
+        """값 삭제 (기존 파일도 함께 삭제)"""
+        if self.legacy_path is not None:
+            try:
+                import os
+                os.remove(self.legacy_path)
+            except OSError:
+                pass
+        return self.store.delete(self.key)
+
+
+# 전역 저장소 인스턴스 (싱글톤)
+_kv_store = None
+
+# 이번 부팅에서 기존 JSON 파일 확인을 마친 키
+_checked_legacy_keys = set()
+
+
+def get_kv_store():
+    """전역 저장소 인스턴스 반환 (처음 호출 시 생성)"""
+    global _kv_store
+    if _kv_store is None:
+        _kv_store = KVStore()
+    return _kv_store
+
+
+def load_state(key, default=None):
+    """전역 저장소에서 키 읽기 (기존 JSON 파일 자동 이전)"""
+    try:
+        return LegacyJsonKey(get_kv_store(), key).load(default)
+    except Exception:
+        return default
+
+
+def save_state(key, value):
+    """전역 저장소에 키 저장 (기존 JSON 파일 자동 이전)"""
+    return LegacyJsonKey(get_kv_store(), key).save(value)
+
+
+def remove_state(key):
+    """전역 저장소에서 키 삭제"""
+    return LegacyJsonKey(get_kv_store(), key).remove()
@@ -344,24 +344,19 @@ def start_application(screen_name, **kwargs):
 def check_boot_target():
     """부팅 타겟 확인 (D버튼으로 설정된 특정 화면으로 부팅)"""
     try:
-        import json
-        import os
+        from kv_store import load_state
         
-        boot_file = "/data/boot_target.json"
-        
-        # 파일이 존재하는지 확인
-        try:
-            with open(boot_file, 'r') as f:
-                data = json.load(f)
-                boot_target = data.get('boot_target', None)
-                if boot_target:
-                    # print(f"[INFO] 부팅 타겟 발견: {boot_target}")
-                    # 부팅 타겟 파일은 화면에서 사용한 후 삭제하도록 유지
-                    return boot_target
-                return None
-        except OSError:
-            # 파일이 없으면 일반 부팅
+        # 상태 저장소의 boot_target 키 확인 (기존 boot_target.json은 자동 이전)
+        data = load_state("boot_target")
+        if not data:
+            # 키가 없으면 일반 부팅
             return None
+        boot_target = data.get('boot_target', None)
+        if boot_target:
+            # print(f"[INFO] 부팅 타겟 발견: {boot_target}")
+            # 부팅 타겟은 화면에서 사용한 후 삭제하도록 유지
+            return boot_target
+        return None
             
     except Exception as e:
         # print(f"[WARN] 부팅 타겟 확인 실패: {e}")
@@ -4,6 +4,7 @@
 """
 
 import time
+import refill_history
 
 class MedicationTracker:
     """약물 추적 및 관리 클래스"""
@@ -143,7 +144,7 @@ class MedicationTracker:
                 "current_count": self.data_manager.get_disk_count(disk_num),
                 "last_refill": disk_info.get("last_refill"),
                 "medication_type": disk_info.get("medication_type", "unknown"),
-                "refill_count": len([r for r in medication_data.get("refill_history", []) if r.get("disk") == disk_num])
+                "refill_count": refill_history.refill_count(medication_data, disk_num)
             }
             
         except Exception as e:
@@ -173,18 +174,12 @@ class MedicationTracker:
             return False
     
     def get_refill_history(self, disk_num=None, limit=10):
-        """리필 기록 조회"""
+        """리필 기록 조회 (최근 원본 기록 + 날짜/디스크별 요약)"""
         try:
             medication_data = self.data_manager.load_medication_data()
-            refill_history = medication_data.get("refill_history", [])
             
-            # 특정 디스크 필터링
-            if disk_num is not None:
-                refill_history = [r for r in refill_history if r.get("disk") == disk_num]
-            
-            # 최신 순으로 정렬 및 제한
-            refill_history.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-            return refill_history[:limit]
+            # 최신 순으로 원본 기록을 먼저, 부족하면 요약 항목으로 채움
+            return refill_history.query(medication_data, disk_num, limit)
             
         except Exception as e:
             # print(f"[ERROR] 리필 기록 조회 실패: {e}")
@@ -0,0 +1,209 @@
+"""
+모터 위치 상태 파일
+디스크 칸 위치, 도어 레벨, 코일 시퀀스 위치, 모터별 누적 스텝을 고정 크기 슬롯 2개에 번갈아 기록하는 바이너리 파일
+
+파일 구조:
+    헤더 (4바이트): 매직 "PMOT"
+    슬롯 2개 (29바이트 x 2):
+        디스크 1~3 칸 위치(1 x 3) + 도어 레벨(1) + 플래그(1) + 모터 1~4 시퀀스 위치(2, 4비트씩)
+        + 모터 1~4 누적 스텝(4 x 4) + 순번(2) + CRC32(4)
+
+플래그:
+    FLAG_HOMED - 원점 보정 이후 모든 이동이 정상 완료됨 (리미트 미감지 등 실패 시 해제, 다음 원점 보정까지 유지)
+    FLAG_CLEAN - 진행 중인 이동 없음 (이동 시작 시 해제, 완료 시 설정, 이동 중 전원이 끊기면 해제된 채 남음)
+
+두 플래그가 모두 설정된 슬롯이면 재부팅 후 원점 보정과 도어 닫기 없이 위치를 그대로 사용할 수 있음
+
+도어 레벨 위치 표 (별도 파일, 보정할 때만 기록):
+    매직 "PDOR" + 레벨 1~3 닫힘 기준 하프스텝 수(2 x 3) + CRC32(4)
+"""
+
+import struct
+
+from io_stats import tracked_open
+
+try:
+    from binascii import crc32
+except ImportError:
+    def crc32(data):
+        """binascii.crc32가 없는 펌웨어용 간이 체크섬"""
+        value = 0
+        for b in data:
+            value = ((value << 5) + value + b) & 0xFFFFFFFF
+        return value
+
+DEFAULT_PATH = "/data/motion_state.bin"
+STATE_MAGIC = b"PMOT"
+HEADER_SIZE = len(STATE_MAGIC)
+
+SLOT_DATA_FMT = "<BBBBBHIIIIH"
+SLOT_DATA_SIZE = struct.calcsize(SLOT_DATA_FMT)
+SLOT_SIZE = SLOT_DATA_SIZE + 4  # + CRC32
+FILE_SIZE = HEADER_SIZE + SLOT_SIZE * 2
+
+DOOR_TABLE_PATH = "/data/door_levels.bin"
+DOOR_MAGIC = b"PDOR"
+DOOR_TABLE_FMT = "<HHH"
+DOOR_TABLE_SIZE = len(DOOR_MAGIC) + struct.calcsize(DOOR_TABLE_FMT) + 4
+# 기본 레벨 위치 (4096스텝/360도 기준 0=닫힘, 140도/280도/420도)
+DOOR_LEVEL_STEPS = (0, 1593, 3187, 4781)
+
+FLAG_HOMED = 0x01
+FLAG_CLEAN = 0x02
+FLAGS_TRUSTED = FLAG_HOMED | FLAG_CLEAN
+
+
+class MotionState:
+    """저장된 모터 상태 1개 (리스트 인덱스 0은 사용 안함, StepperMotorController와 같은 배치)"""
+
+    def __init__(self, positions=None, door_level=0, flags=0, phases=None, step_counts=None, seq=0):
+        self.positions = positions or [0, 0, 0, 0]        # 디스크 1~3 칸 위치
+        self.door_level = door_level                      # 0=닫힘, 1~3단
+        self.flags = flags
+        self.phases = phases or [0, 0, 0, 0, 0]           # 모터 1~4 시퀀스 위치 (motor_steps, 0~7)
+        self.step_counts = step_counts or [0, 0, 0, 0, 0]  # 모터 1~4 누적 스텝
+        self.seq = seq
+
+    @property
+    def trusted(self):
+        """원점 보정 이후 정상 완료된 이동만 있었고 마지막 이동이 끝난 상태"""
+        return self.flags & FLAGS_TRUSTED == FLAGS_TRUSTED
+
+    def pack(self):
+        p = self.positions
+        phases = self.phases
+        phase_word = phases[1] | (phases[2] << 4) | (phases[3] << 8) | (phases[4] << 12)
+        c = self.step_counts
+        return struct.pack(SLOT_DATA_FMT, p[1], p[2], p[3], self.door_level, self.flags, phase_word,
+                           c[1] & 0xFFFFFFFF, c[2] & 0xFFFFFFFF, c[3] & 0xFFFFFFFF, c[4] & 0xFFFFFFFF,
+                           self.seq)
+
+    @classmethod
+    def unpack(cls, data):
+        """슬롯 데이터 → MotionState, 값 범위가 맞지 않으면 None"""
+        p1, p2, p3, door_level, flags, phase_word, c1, c2, c3, c4, seq = struct.unpack(SLOT_DATA_FMT, data)
+        if p1 > 9 or p2 > 9 or p3 > 9 or door_level > 3:
+            return None
+        phases = [0] + [(phase_word >> shift) & 0x0F for shift in (0, 4, 8, 12)]
+        if max(phases) > 7:
+            return None
+        return cls([0, p1, p2, p3], door_level, flags, phases, [0, c1, c2, c3, c4], seq)
+
+
+class MotionStateFile:
+    """모터 상태 파일 (슬롯 2개 번갈아 기록, 마지막으로 기록한 상태를 메모리에 유지)"""
+
+    def __init__(self, file_path=DEFAULT_PATH):
+        """상태 파일 초기화 (파일은 load()에서 읽음)"""
+        self.file_path = file_path
+        self.state = None   # 마지막으로 읽거나 기록한 상태 (없으면 None)
+        self._index = -1    # 현재 상태가 들어 있는 슬롯
+        self.writes = 0
+
+    def load(self):
+        """두 슬롯 중 유효하고 순번이 큰 상태 읽기
+
+        Returns:
+            MotionState: 파일이 없거나 두 슬롯 모두 손상되었으면 None
+        """
+        self.state, self._index = None, -1
+        try:
+            with open(self.file_path, 'rb') as f:
+                data = f.read(FILE_SIZE)
+        except OSError:
+            return None
+        if len(data) != FILE_SIZE or data[:HEADER_SIZE] != STATE_MAGIC:
+            return None
+
+        for index in (0, 1):
+            offset = HEADER_SIZE + index * SLOT_SIZE
+            slot = data[offset:offset + SLOT_DATA_SIZE]
+            if struct.unpack_from("<I", data, offset + SLOT_DATA_SIZE)[0] != crc32(slot):
+                continue
+            state = MotionState.unpack(slot)
+            if state is None:
+                continue
+            # 순번 비교 (16비트 순환 고려)
+            if self.state is None or ((state.seq - self.state.seq) & 0xFFFF) < 0x8000:
+                self.state, self._index = state, index
+        return self.state
+
+    def save(self, state):
+        """상태 기록 (현재 슬롯이 아닌 쪽 슬롯만 덮어쓰기, 파일이 없거나 손상되었으면 새로 생성)
+
+        Returns:
+            bool: 기록 성공 여부
+        """
+        state.seq = 0 if self.state is None else (self.state.seq + 1) & 0xFFFF
+        data = state.pack()
+        data += struct.pack("<I", crc32(data))
+        try:
+            if self._index < 0:
+                with tracked_open(self.file_path, 'wb') as f:
+                    f.write(STATE_MAGIC + data + bytes(SLOT_SIZE))
+                target_index = 0
+            else:
+                target_index = 1 - self._index
+                with tracked_open(self.file_path, 'r+b') as f:
+                    f.seek(HEADER_SIZE + target_index * SLOT_SIZE)
+                    f.write(data)
+        except OSError:
+            return False
+        self.state, self._index = state, target_index
+        self.writes += 1
+        return True
+
+
+_files = {}
+
+
+def get_state_file(file_path=DEFAULT_PATH):
+    """경로별 공유 상태 파일 (같은 부팅에서 생성된 PillBoxMotorSystem들이 같은 객체 사용, 처음 호출 시 로드)"""
+    state_file = _files.get(file_path)
+    if state_file is None:
+        state_file = MotionStateFile(file_path)
+        state_file.load()
+        _files[file_path] = state_file
+    return state_file
+
+
+def reset_state_files():
+    """공유 상태 파일 해제 (다음 get_state_file에서 다시 로드, 호스트 시뮬레이션의 재부팅에 사용)"""
+    _files.clear()
+
+
+def load_door_table(file_path=DOOR_TABLE_PATH):
+    """보정된 도어 레벨 위치 표 읽기
+
+    Returns:
+        list: [0, 1단, 2단, 3단] 하프스텝 수, 파일이 없거나 손상되었으면 None
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read(DOOR_TABLE_SIZE)
+    except OSError:
+        return None
+    if len(data) != DOOR_TABLE_SIZE or data[:len(DOOR_MAGIC)] != DOOR_MAGIC:
+        return None
+    body = data[:-4]
+    if struct.unpack_from("<I", data, len(body))[0] != crc32(body):
+        return None
+    steps = [0] + list(struct.unpack_from(DOOR_TABLE_FMT, body, len(DOOR_MAGIC)))
+    if not steps[0] < steps[1] < steps[2] < steps[3]:
+        return None
+    return steps
+
+
+def save_door_table(steps, file_path=DOOR_TABLE_PATH):
+    """도어 레벨 위치 표 기록 (파일 전체를 새로 씀, 보정할 때만 호출)
+
+    Returns:
+        bool: 기록 성공 여부
+    """
+    body = DOOR_MAGIC + struct.pack(DOOR_TABLE_FMT, steps[1], steps[2], steps[3])
+    try:
+        with tracked_open(file_path, 'wb') as f:
+            f.write(body + struct.pack("<I", crc32(body)))
+    except OSError:
+        return False
+    return True
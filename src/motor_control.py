@@ -3,50 +3,54 @@
 필박스의 알약 충전/배출을 위한 스테퍼 모터 제어
 """
 
-from machine import Pin
+from array import array
+import math
 import time
 
+try:
+    from micropython import const
+except ImportError:
+    def const(value):
+        return value
+
+from shift_bus import get_bus
+from motion_state import MotionState, get_state_file, FLAG_HOMED, FLAG_CLEAN, DEFAULT_PATH as MOTION_STATE_PATH
+from motion_state import DOOR_LEVEL_STEPS, DOOR_TABLE_PATH, load_door_table, save_door_table
+from coil_power import CoilPower
+
+# 1이면 프레임 재생 루프에 스텝 간격 계측(step_timing.py) 코드 포함
+# 0이면 `if STEP_TIMING:` 블록이 MicroPython 컴파일 단계에서 제거되어 재생 루프 비용 없음
+STEP_TIMING = const(0)
+
+# 스텝 방식: 이름 → (프레임당 하프스텝 수, 사용하는 stepper_sequence 인덱스 홀짝)
+# 위치/시퀀스 인덱스(motor_steps)는 방식과 관계없이 항상 하프스텝 단위 (0~7)
+#   "half" - 8스텝 하프스텝 (기본, 칸 이동처럼 정밀한 위치)
+#   "full" - 두 코일 풀스텝 (홀수 인덱스 0x0C/0x06/0x03/0x09, 토크가 커서 빠르게 이동 가능)
+#   "wave" - 한 코일 웨이브 구동 (짝수 인덱스 0x08/0x04/0x02/0x01, 코일 전류 절반)
+STEP_MODES = {
+    "half": (1, None),
+    "full": (2, 1),
+    "wave": (2, 0),
+}
+
 class InputShiftRegister:
-    """74HC165D 입력 시프트 레지스터 제어 클래스"""
+    """74HC165D 입력 시프트 레지스터 (공유 버스 ShiftBus에서 읽기)"""
     
-    def __init__(self, clock_pin=3, pload_pin=15, data_pin=10):
-        """입력 시프트 레지스터 초기화"""
-        # 핀 설정 (button_interface.py와 동일)
-        self.pload_pin = Pin(pload_pin, Pin.OUT)      # PL 핀 (IO15)
-        self.data_pin = Pin(data_pin, Pin.IN)         # Q7 출력 (IO10)
-        self.clock_pin = Pin(clock_pin, Pin.OUT)      # CLK 핀 (IO3)
+    def __init__(self, bus):
+        """입력 시프트 레지스터 초기화
         
-        # 기본 파라미터
-        self.NUMBER_OF_SHIFT_CHIPS = 1
-        self.DATA_WIDTH = self.NUMBER_OF_SHIFT_CHIPS * 8
-        self.PULSE_WIDTH_USEC = 5
-        
-        # 초기 상태 설정
-        self.clock_pin.value(0)
-        self.pload_pin.value(1)
+        Args:
+            bus: shift_bus.ShiftBus (74HC595D와 같은 CLK/PL 핀을 쓰므로 버스가 읽기/쓰기 순서를 관리)
+        """
+        self.bus = bus
         
     def read_byte(self):
-        """1바이트 데이터 읽기 (test_74hc165.py와 동일한 로직)"""
-        bytes_val = 0
-
-        # 병렬 입력을 래치
-        self.pload_pin.value(0)  # Load data (Active LOW)
-        time.sleep_us(self.PULSE_WIDTH_USEC)
-        self.pload_pin.value(1)  # Stop loading
-        time.sleep_us(self.PULSE_WIDTH_USEC)
-
-        # 직렬 데이터 읽기 (test_74hc165.py와 동일한 순서)
-        for i in range(self.DATA_WIDTH):
-            bit_val = self.data_pin.value()
-            bytes_val |= (bit_val << ((self.DATA_WIDTH - 1) - i))
-
-            # CLK 상승엣지
-            self.clock_pin.value(1)
-            time.sleep_us(self.PULSE_WIDTH_USEC)
-            self.clock_pin.value(0)
-            time.sleep_us(self.PULSE_WIDTH_USEC)
-
-        return bytes_val
+        """1바이트 데이터 읽기 (이번 틱에 이미 스캔했으면 같은 값, 버튼/리미트 스위치가 공유)"""
+        return self.bus.read_inputs()
+    
+    def scan(self):
+        """새로 스캔하여 1바이트 읽기 (스텝 직후 리미트 스위치 확인 등)"""
+        return self.bus.scan()
 
 class LimitSwitch:
     """리미트 스위치 클래스"""
@@ -66,10 +70,366 @@ class LimitSwitch:
         #     # print(f"  [BTN] 리미트 스위치 {self.bit_position} 감지! (데이터: 0b{data:08b})")
         return is_pressed
 
+class MotionProgram:
+    """미리 계산한 다중 모터 스텝 프레임 (재생 루프에서 계산 없이 바로 시프트)
+    
+    frames: 스텝마다 74HC595D에 보낼 [상위 바이트, 하위 바이트] (bytearray, 2바이트/스텝)
+    samples: 스텝마다 리미트 스위치 샘플 여부 (bytearray, 1이면 해당 스텝 출력 후 샘플)
+    cyclic: True이면 8스텝 주기 프레임을 반복 재생 (리미트 스위치로 끝나는 이동)
+    stride: 프레임당 하프스텝 수 (STEP_MODES, 풀스텝/웨이브는 2)
+    """
+    
+    def __init__(self, frames, samples, moves, cyclic, coordinated=False, stride=1):
+        self.frames = frames
+        self.samples = samples
+        self.length = len(samples)
+        self.moves = moves    # [(모터 번호, 방향, 스텝 수, 시작 시퀀스 인덱스)]
+        self.cyclic = cyclic
+        self.coordinated = coordinated  # True이면 모든 모터가 마지막 프레임에 함께 도착 (스텝을 고르게 분배)
+        self.stride = stride
+    
+    def count(self, steps, played):
+        """played 프레임 재생까지 steps 스텝 모터가 이동한 스텝 수 (스텝 방식 단위)"""
+        if self.cyclic:
+            return played
+        if self.coordinated:
+            return played * steps // self.length
+        return min(played, steps)
+    
+    def apply(self, controller, played):
+        """played 스텝 재생 후의 모터 시퀀스 인덱스/코일 상태를 컨트롤러에 반영"""
+        sequence = controller.stepper_sequence
+        for motor_index, direction, steps, start in self.moves:
+            count = self.count(steps, played)
+            if count > 0:
+                step = (start + direction * count * self.stride) % 8
+                controller.motor_steps[motor_index] = step
+                controller.motor_states[motor_index] = sequence[step]
+        controller.power.settle(controller.motor_states)
+    
+    def coils2(self, start):
+        """재생 중 평균 통전 코일 수 x2 (하프스텝 1.5개, 풀스텝 2개, 웨이브 1개)"""
+        if self.stride == 1:
+            return 3
+        return 4 if start % 2 else 2
+
+
+class VelocityProfile:
+    """스텝 수가 정해진 이동의 스텝 간격 계획 (가속 구간 → 등속 → 감속 구간)
+    
+    가속 구간은 MotionPlanner.ramp()를 그대로 공유하고 감속 구간은 역순으로 읽으므로
+    이동 길이와 관계없이 스텝 간격 목록을 따로 만들지 않음
+    """
+    
+    def __init__(self, steps, ramp, up, down, cruise_delay):
+        self.steps = steps
+        self.ramp = ramp                  # 가속 구간 스텝 간격 (us, array('H'))
+        self.up = up                      # 가속 스텝 수
+        self.cruise_end = steps - down    # 감속 시작 스텝
+        self.cruise_delay = cruise_delay  # 등속 구간 스텝 간격 (us)
+    
+    def delay_at(self, k):
+        """k번째 스텝 후 지연 (us)"""
+        if k < self.up:
+            return self.ramp[k]
+        if k < self.cruise_end:
+            return self.cruise_delay
+        return self.ramp[self.steps - 1 - k]
+    
+    def delays(self):
+        """전체 스텝 간격 목록 (array('H'), 타이밍 시뮬레이션/테스트용)"""
+        return array('H', [self.delay_at(k) for k in range(self.steps)])
+    
+    def duration_us(self):
+        """이동 시간 (스텝 간 지연 합계, 프레임 전송 시간 제외)"""
+        ramp = self.ramp
+        down = self.steps - self.cruise_end
+        return (sum(ramp[k] for k in range(self.up)) + sum(ramp[k] for k in range(down)) +
+                (self.cruise_end - self.up) * self.cruise_delay)
+
+
+class MotionPlanner:
+    """28BYJ-48 가속/감속 속도 계획
+    
+    start_speed: 정지 상태에서 바로 낼 수 있는 속도 (steps/s, 이보다 빠르게 출발하면 탈조)
+    max_speed: 최고 속도 (steps/s)
+    accel: 최대 가속도 (steps/s^2)
+    shape: "trapezoid" (등가속) 또는 "scurve" (가속도가 0에서 시작해 0으로 끝나는 S자 속도)
+    """
+    
+    SHAPES = ("trapezoid", "scurve")
+    
+    def __init__(self, start_speed=2000, max_speed=2000, accel=6000, shape="trapezoid"):
+        self.start_speed = start_speed
+        self.max_speed = max_speed
+        self.accel = accel
+        self.shape = shape
+        self._ramp = None
+        self.configure()
+    
+    def configure(self, start_speed=None, max_speed=None, accel=None, shape=None):
+        """튜닝 값 변경 (None이면 유지), 가속 구간은 다음 계획 때 다시 계산"""
+        if start_speed is not None:
+            self.start_speed = start_speed
+        if max_speed is not None:
+            self.max_speed = max_speed
+        if accel is not None:
+            self.accel = accel
+        if shape is not None:
+            self.shape = shape
+        if self.shape not in self.SHAPES:
+            raise ValueError("지원하지 않는 속도 곡선: " + str(self.shape))
+        if self.start_speed <= 0 or self.max_speed <= 0:
+            raise ValueError("속도는 0보다 커야 함")
+        self._ramp = None
+    
+    def ramp(self):
+        """출발 속도 → 최고 속도 가속 구간의 스텝 간격 (us, array('H')) - 튜닝 값마다 1번만 계산"""
+        if self._ramp is None:
+            self._ramp = self._build_ramp()
+        return self._ramp
+    
+    def _build_ramp(self):
+        v0 = self.start_speed
+        v1 = self.max_speed
+        a = self.accel
+        delays = array('H')
+        if v1 <= v0 or a <= 0:
+            return delays
+        
+        if self.shape == "trapezoid":
+            # 등가속: k스텝 이동 후 속도 v = sqrt(v0^2 + 2ak), 스텝 간격 = 속도 증가량 / a
+            v = v0
+            k = 1
+            while True:
+                v_next = math.sqrt(v0 * v0 + 2 * a * k)
+                if v_next > v1:
+                    break
+                delays.append(min(65535, int((v_next - v) / a * 1000000 + 0.5)))
+                v = v_next
+                k += 1
+            return delays
+        
+        # S자: v(t) = v0 + dv(3u^2 - 2u^3), u = t/T (최대 가속도 1.5dv/T = a)
+        # 위치 s(t) = v0t + dvT(u^3 - u^4/2), 각 스텝 도착 시간은 뉴턴법으로 계산
+        dv = v1 - v0
+        period = 1.5 * dv / a
+        distance = v0 * period + dv * period / 2
+        t = 0.0
+        k = 1
+        while k <= distance:
+            t_next = t + 1.0 / (v0 + dv * self._smooth(t / period))
+            for _ in range(4):
+                u = min(1.0, t_next / period)
+                position = v0 * t_next + dv * period * (u * u * u - u * u * u * u / 2)
+                t_next -= (position - k) / (v0 + dv * self._smooth(u))
+            delays.append(min(65535, int((t_next - t) * 1000000 + 0.5)))
+            t = t_next
+            k += 1
+        return delays
+    
+    @staticmethod
+    def _smooth(u):
+        """0~1 구간 S자 보간 (3u^2 - 2u^3)"""
+        if u >= 1.0:
+            return 1.0
+        return u * u * (3 - 2 * u)
+    
+    def cruise_delay(self):
+        """등속 구간 스텝 간격 (us)"""
+        return int(1000000 / self.max_speed + 0.5)
+    
+    def plan(self, steps):
+        """steps 스텝 이동의 속도 계획 (짧은 이동은 최고 속도에 닿기 전에 감속하는 삼각형 계획)"""
+        ramp = self.ramp()
+        if steps >= 2 * len(ramp):
+            up = down = len(ramp)
+        else:
+            down = steps // 2
+            up = steps - down
+        return VelocityProfile(steps, ramp, up, down, self.cruise_delay())
+    
+    def duration_us(self, steps):
+        """steps 스텝 이동 시간 예상 (us)"""
+        return self.plan(steps).duration_us()
+
+
+class LimitSampler:
+    """칸 이동 중 리미트 스위치 샘플 위치 결정 (74HC165D 읽기 횟수 절감)
+    
+    칸 가운데에서는 max_gap 스텝마다, 다음 캠이 눌릴 것으로 예상되는 위치(직전 캠 + 캠 간격)의
+    margin 스텝 앞부터는 매 스텝 확인
+    캠 간격은 디스크마다 칸별로 조금씩 다르므로 한 바퀴 동안 칸별 간격을 기록하여 다음 바퀴부터는 좁은 구간
+    (min_margin)만 매 스텝 확인하고, 기록이 없는 칸은 디스크 평균 간격 ± 평균 오차로 정한 구간 사용
+    
+    max_gap은 캠이 스위치를 누르고 있는 스텝 수(약 20)보다 작아야 함 - 예상보다 일찍 온 캠도 건너뛰지 않고
+    max_gap 안쪽에서 감지 (감지가 늦은 만큼 더 돌지만 여전히 캠이 스위치를 누른 위치에서 정지)
+    """
+    
+    def __init__(self, steps_per_compartment=273, compartments=15, max_gap=16, margin=16, min_margin=3,
+                 max_margin=64):
+        self.compartments = compartments
+        self.max_gap = max_gap
+        self.min_margin = min_margin
+        self.max_margin = max_margin
+        # 디스크 평균 캠 간격 / 평균 오차 (16배 고정소수점, 인덱스 0 사용 안함)
+        self._expected16 = [steps_per_compartment << 4] * 5
+        self._error16 = [((margin - min_margin) << 4) // 3] * 5
+        self.expected = [steps_per_compartment] * 5
+        self.margins = [margin] * 5
+        # 디스크별 칸마다 직전 캠에서의 간격 (0 = 아직 모름), 다음 캠 번호 (None = 모름), 직전 캠 위치가 정확한지
+        self.spacing = [None] + [array('H', bytes(2 * compartments)) for _ in range(4)]
+        self.index = [None] * 5
+        self.exact = [False] * 5
+        self.early = 0  # 매 스텝 확인 구간 전에 온 캠
+        self.late = 0   # 매 스텝 확인 구간(예상 + margin)을 지나서 온 캠
+    
+    def begin(self, motor_index, at_cam):
+        """이동 시작 - at_cam: 리미트 스위치가 눌린 상태 (직전 이동이 캠에서 멈춤)"""
+        if not at_cam:
+            self.lost(motor_index)
+        elif self.index[motor_index] is None:
+            # 어느 캠인지 모름 → 칸별 기록을 버리고 여기부터 다시 기록
+            spacing = self.spacing[motor_index]
+            for k in range(self.compartments):
+                spacing[k] = 0
+            self.index[motor_index] = 0
+            self.exact[motor_index] = True
+    
+    def lost(self, motor_index):
+        """캠 번호를 모르게 됨 (원점 보정, 캠이 아닌 위치에서 출발, 중단된 이동)"""
+        self.index[motor_index] = None
+        self.exact[motor_index] = False
+    
+    def window(self, motor_index):
+        """다음 캠까지 매 스텝 확인을 시작할 스텝 수 (직전 캠 기준)"""
+        k = self.index[motor_index]
+        if k is not None and self.exact[motor_index]:
+            spacing = self.spacing[motor_index][k]
+            if spacing:
+                return spacing - self.min_margin
+        return self.expected[motor_index] - self.margins[motor_index]
+    
+    def next_gap(self, motor_indices, windows, position):
+        """position(샘플 직후)에서 다음 샘플까지 스텝 수 - windows: {모터 번호: 매 스텝 확인 시작 위치, 모르면 None}"""
+        gap = self.max_gap
+        for m in motor_indices:
+            start = windows[m]
+            if start is None:
+                return 1
+            ahead = start - position
+            if ahead < gap:
+                if ahead <= 1:
+                    return 1
+                gap = ahead
+        return gap
+    
+    def observe(self, motor_index, steps, exact):
+        """캠 감지 기록 - steps: 직전 캠 이후 스텝 수, exact: 바로 앞 스텝도 샘플했는지 (정확한 캠 위치)"""
+        k = self.index[motor_index]
+        known = self.exact[motor_index]
+        self.exact[motor_index] = exact
+        if k is None:
+            return
+        self.index[motor_index] = (k + 1) % self.compartments
+        if not known:
+            return
+        spacing = self.spacing[motor_index]
+        recorded = spacing[k]
+        stale = recorded and (not exact or abs(steps - recorded) > self.min_margin)
+        if stale:
+            # 기록과 다름 (미끄러짐, 다른 동작으로 디스크가 움직임 등) → 칸별 기록을 버리고 여기부터 다시 기록
+            for i in range(self.compartments):
+                spacing[i] = 0
+            self.index[motor_index] = 0
+        
+        margin = self.margins[motor_index]
+        error = steps - self.expected[motor_index]
+        if not exact:
+            # 매 스텝 확인 구간 전에 감지 → 실제 위치는 모르므로 구간만 넓힘
+            self.early += 1
+            error = 2 * margin
+        elif abs(error) <= margin:
+            if not stale:
+                spacing[k] = steps
+            expected16 = self._expected16[motor_index]
+            expected16 += ((steps << 4) - expected16) >> 2
+            self._expected16[motor_index] = expected16
+            self.expected[motor_index] = (expected16 + 8) >> 4
+        else:
+            # 구간 밖에서 감지 (시작 위치가 캠 경계가 아니었던 경우 등) → 예상값은 두고 구간만 넓힘
+            if error < 0:
+                self.early += 1
+            else:
+                self.late += 1
+        error = min(abs(error), 2 * margin)
+        error16 = self._error16[motor_index]
+        error16 += ((error << 4) - error16) >> 2
+        self._error16[motor_index] = error16
+        self.margins[motor_index] = max(self.min_margin, min(self.max_margin, self.min_margin + ((3 * error16) >> 4)))
+
+
+class CompartmentStats:
+    """디스크별 칸 이동 스텝 수 통계 (걸림/미끄러짐 판정)
+    
+    모터마다 평균/분산 2개(array('f'))를 최근 약 window칸 지수 이동 평균으로 갱신 (이상값은 허용 범위로 잘라서 반영)
+    허용 범위 = 평균 ± max(min_tolerance, sigmas x 표준편차)
+        다음 캠까지 허용 범위 x 2를 넘도록 캠이 오지 않으면 걸림(stall) → 이동 중단
+        허용 범위보다 길면 미끄러짐(slip, 탈조), 짧으면 short (캠이 너무 일찍 감지됨) → 기록만
+    min_count칸을 기록하기 전에는 판정하지 않고 걸림 한계는 1.5칸
+    """
+    
+    def __init__(self, steps_per_compartment=273, window=16, sigmas=4, min_tolerance=12, min_count=4):
+        self.steps_per_compartment = steps_per_compartment
+        self.window = window
+        self.sigmas = sigmas
+        self.min_tolerance = min_tolerance
+        self.min_count = min_count
+        self.mean = array('f', [steps_per_compartment] * 5)  # 인덱스 0 사용 안함
+        self.var = array('f', [0.0] * 5)
+        self.count = array('H', bytes(10))
+    
+    def tolerance(self, motor_index):
+        """평균에서 정상으로 보는 스텝 차이"""
+        return max(self.min_tolerance, int(self.sigmas * math.sqrt(self.var[motor_index]) + 0.5))
+    
+    def stall_limit(self, motor_index):
+        """직전 캠(또는 출발 위치)에서 이 스텝 수를 넘도록 캠이 오지 않으면 걸림"""
+        if self.count[motor_index] < self.min_count:
+            return self.steps_per_compartment * 3 // 2
+        return int(self.mean[motor_index] + 0.5) + 2 * self.tolerance(motor_index)
+    
+    def record(self, motor_index, steps, learn=True):
+        """캠 사이 스텝 수 판정 (None = 정상, "slip" / "short"), learn이면 통계에 반영
+        
+        learn=False는 드문 샘플에서 감지한 캠 (실제 캠은 steps보다 조금 앞이므로 short 판정만 확실함)
+        """
+        mean = self.mean[motor_index]
+        count = self.count[motor_index]
+        tolerance = self.tolerance(motor_index)
+        kind = None
+        if count >= self.min_count:
+            if steps > mean + tolerance:
+                kind = "slip"
+            elif steps < mean - tolerance:
+                kind = "short"
+        if not learn:
+            return kind
+        x = min(max(steps, mean - tolerance), mean + tolerance) if count else steps
+        n = min(count + 1, self.window)
+        delta = x - mean
+        mean += delta / n
+        self.mean[motor_index] = mean
+        self.var[motor_index] += (delta * (x - mean) - self.var[motor_index]) / n
+        self.count[motor_index] = min(count + 1, 0xFFFF)
+        return kind
+
+
 class StepperMotorController:
     """74HC595D + ULN2003 스테퍼모터 제어 클래스"""
     
-    def __init__(self, di_pin=2, sh_cp_pin=3, st_cp_pin=15, data_out_pin=10):
+    def __init__(self, di_pin=2, sh_cp_pin=3, st_cp_pin=15, data_out_pin=10,
+                 output="bitbang", spi_id=1, spi_baudrate=1000000):
         """
         초기화
         Args:
@@ -77,19 +437,22 @@ class StepperMotorController:
             sh_cp_pin: 74HC595D Shift Clock 핀 (GPIO3) - 74HC165D와 공유
             st_cp_pin: 74HC595D Storage Clock 핀 (GPIO15) - 74HC165D와 공유
             data_out_pin: 74HC165D Data Output 핀 (GPIO10)
+            output: 74HC595D 출력 방식
+                "bitbang" - Pin.value 비트뱅 (기본값, 기존 방식)
+                "softspi" - machine.SoftSPI (C 구현 비트뱅, 프레임당 호출 1회)
+                "spi" - machine.SPI(spi_id) 하드웨어 SPI
+                        (ESP32-C6는 범용 SPI가 1개뿐이고 디스플레이가 SPI(1)을 사용하므로 보통 "softspi" 사용)
+            spi_id: 하드웨어 SPI 버스 번호 (output="spi"일 때)
+            spi_baudrate: SPI 클럭 (Hz)
         """
-        # 74HC595D 핀 설정
-        self.di = Pin(di_pin, Pin.OUT)
-        self.sh_cp = Pin(sh_cp_pin, Pin.OUT)
-        self.st_cp = Pin(st_cp_pin, Pin.OUT)
-        
-        # 초기 상태 설정
-        self.di.value(0)
-        self.sh_cp.value(0)
-        self.st_cp.value(0)
+        # 74HC595D 출력 / 74HC165D 입력 공유 버스 (버튼 인터페이스와 같은 객체, 출력 방식이 다르면 새로 생성)
+        self.output_mode = output
+        self.bus = get_bus(output, di_pin=di_pin, sh_cp_pin=sh_cp_pin, st_cp_pin=st_cp_pin,
+                           data_out_pin=data_out_pin, spi_id=spi_id, spi_baudrate=spi_baudrate)
+        self._output = self.bus.output
         
-        # 입력 시프트 레지스터 초기화 (리미트 스위치용)
-        self.input_shift_register = InputShiftRegister(sh_cp_pin, st_cp_pin, data_out_pin)
+        # 입력 시프트 레지스터 초기화 (리미트 스위치용, 버스에서 틱마다 1번 스캔한 값을 공유)
+        self.input_shift_register = InputShiftRegister(self.bus)
         
         # 리미트 스위치 초기화 (사용자 요청 매핑)
         # 모터 1→LIMIT SW1 (Pin 5), 모터 2→LIMIT SW2 (Pin 6), 모터 3→LIMIT SW3 (Pin 7)
@@ -128,11 +491,55 @@ class StepperMotorController:
         # 속도 설정 (디스크 회전과 동일한 속도) - 모터 우선순위 모드
         self.step_delay_us = 500  # 스텝 간 지연 시간 (마이크로초) - 디스크 회전과 동일 (0.5ms)
         
+        # 모터별 가속/감속 계획 (튜닝: set_motion_limits)
+        # 디스크(모터 1~3)는 리미트 스위치 타이밍이 바뀌지 않도록 기존 속도 그대로 (가속 없음),
+        # 도어(모터 4)는 기존 속도로 출발해 최고 속도까지 가속
+        start_speed = 1000000 // self.step_delay_us
+        self.motion_planners = [
+            None,  # 인덱스 0 사용 안함
+            MotionPlanner(start_speed, start_speed),
+            MotionPlanner(start_speed, start_speed),
+            MotionPlanner(start_speed, start_speed),
+            MotionPlanner(start_speed, 2500, 5000),
+        ]
+        # 풀스텝/웨이브 구동 계획 (속도 단위 = 프레임/s, 1프레임 = 2하프스텝이므로 같은 축 속도는 절반 값)
+        # 풀스텝은 두 코일 토크로 도어 최고 속도/가속도를 높이고, 웨이브는 토크가 작아 하프스텝 출발 속도와 같은 축 속도로 제한
+        frame_speed = start_speed // 2
+        self.mode_planners = {
+            "half": self.motion_planners,
+            "full": [
+                None,
+                MotionPlanner(frame_speed, frame_speed),
+                MotionPlanner(frame_speed, frame_speed),
+                MotionPlanner(frame_speed, frame_speed),
+                MotionPlanner(frame_speed, 1600, 3000),
+            ],
+            "wave": [
+                None,
+                MotionPlanner(frame_speed, frame_speed),
+                MotionPlanner(frame_speed, frame_speed),
+                MotionPlanner(frame_speed, frame_speed),
+                MotionPlanner(frame_speed, frame_speed),
+            ],
+        }
+        
         # 비블로킹 제어를 위한 변수들
         self.motor_running = [False, False, False, False, False]  # 각 모터별 실행 상태 (인덱스 0 사용 안함)
         self.motor_direction = [1, 1, 1, 1, 1]  # 각 모터별 방향 (인덱스 0 사용 안함)
         self.last_step_times = [0, 0, 0, 0, 0]  # 각 모터별 마지막 스텝 시간 (인덱스 0 사용 안함)
         
+        # 칸 이동 리미트 스위치 샘플 위치 (디스크별 캠 간격 학습, LimitMotionJob sample_every=None)
+        self.limit_sampler = LimitSampler(self.steps_per_compartment, self.steps_per_rev // self.steps_per_compartment)
+        
+        # 디스크별 칸 이동 스텝 수 통계 (캠이 오지 않으면 걸림으로 중단, LimitMotionJob.faults로 보고)
+        self.compartment_stats = CompartmentStats(self.steps_per_compartment)
+        
+        # 스텝 간격 계측기 (enable_step_timing, STEP_TIMING = const(1) 빌드에서만 기록)
+        self.step_timing = None
+        
+        # 코일 통전 집계 / 이동 후 유지 시간(power.hold_ms)이 지나면 코일 자동 OFF (release_idle_coils)
+        self.power = CoilPower()
+        
         # 초기화 시 모든 코일 OFF 상태로 설정
         self.turn_off_all_coils()
         
@@ -166,35 +573,13 @@ class StepperMotorController:
         return False
     
     def shift_out(self, data, latch=True):
-        """74HC595D에 8비트 데이터 전송 (타이밍 안정화 버전)
+        """74HC595D에 8비트 데이터 전송 (선택된 출력 방식 사용)
         
         Args:
             data: 전송할 8비트 데이터
             latch: True이면 latch 수행, False이면 시프트만 수행 (기본값: True)
         """
-        # 디버깅: 첫 번째 전송에서만 출력
-        if not hasattr(self, '_shift_debug_printed'):
-            # print(f"  [SEARCH] 74HC595D 전송: 0x{data:02X} ({bin(data)})")
-            self._shift_debug_printed = True
-        
-        for i in range(8):
-            # MSB first
-            bit = (data >> (7 - i)) & 1
-            self.di.value(bit)
-            time.sleep_us(1)  # 타이밍 안정화를 위한 딜레이
-            
-            # Shift clock pulse (타이밍 안정화)
-            self.sh_cp.value(1)
-            time.sleep_us(1)  # 타이밍 안정화를 위한 딜레이
-            self.sh_cp.value(0)
-            time.sleep_us(1)  # 타이밍 안정화를 위한 딜레이
-        
-        # Storage clock pulse (latch) - latch=True일 때만 수행
-        if latch:
-            self.st_cp.value(1)
-            time.sleep_us(1)  # 타이밍 안정화를 위한 딜레이
-            self.st_cp.value(0)
-            time.sleep_us(1)  # 타이밍 안정화를 위한 딜레이
+        self._output.shift_byte(data, latch)
     
     def update_motor_output(self):
         """모든 모터 상태를 74HC595D에 출력 (test_74hc595_stepper.py와 동일)"""
@@ -226,17 +611,9 @@ class StepperMotorController:
         #     # print(f"  [SEARCH] 출력 데이터: 0x{upper_byte:02X} 0x{lower_byte:02X}")
         #     self._debug_printed = True
 
-        # 상위 바이트 전송 (모터 3, 4 포함) - 두 번째 칩으로 전송
         # 시프트 레지스터 체인에서는 모든 데이터를 먼저 시프트하고 마지막에 한 번만 latch
-        self.shift_out(upper_byte, latch=False)  # 시프트만 수행 (latch 없음)
-        # 두 번째 칩으로 데이터가 전파되는 시간 확보 (시프트 레지스터 체인 지연)
-        time.sleep_us(10)  # 바이트 전송 간 추가 딜레이 (모터 4 안정화)
-        
-        # 하위 바이트 전송 (모터 1, 2 포함) - 첫 번째 칩으로 전송
-        self.shift_out(lower_byte, latch=True)  # 마지막 바이트 시 latch 수행
-        
-        # Latch 후 안정화 시간 (모든 출력 핀이 안정화될 때까지 대기)
-        time.sleep_us(10)  # 최종 출력 안정화를 위한 추가 딜레이 (모터 4 포함)
+        self._output.write_frame(upper_byte, lower_byte)
+        self.power.settle(self.motor_states)
     
     def set_motor_step(self, motor_index, step_value, update_output=True):
         """특정 모터의 스텝 설정 (test_74hc595_stepper.py와 동일)"""
@@ -311,116 +688,1295 @@ class StepperMotorController:
         self.update_motor_output()
         # print("모든 모터 정지 (모든 코일 OFF)")
     
+    def release_idle_coils(self):
+        """이동 후 유지 시간(power.hold_ms)이 지난 모터 코일 OFF (회전자 위치 motor_steps는 유지), OFF한 모터 수 반환"""
+        due = self.power.due()
+        if not due:
+            return 0
+        for motor_index in due:
+            self.motor_states[motor_index] = 0x00
+        self.power.releases += len(due)
+        self.update_motor_output()
+        return len(due)
+    
+    def idle_ms(self, ms):
+        """ms 동안 대기 (약 낙하 대기 등), 그 사이 유지 시간이 지난 코일은 OFF"""
+        hold = self.power.hold_left_ms()
+        if hold is not None and hold < ms:
+            time.sleep_ms(hold)
+            self.release_idle_coils()
+            ms -= hold
+        time.sleep_ms(ms)
+    
+    def _power_start(self, program):
+        """프레임 재생 시작: 프로그램에서 움직이는 모터를 이동 중 통전으로 기록"""
+        power = self.power
+        for motor_index, _, count, start in program.moves:
+            if count > 0:
+                power.start(motor_index, program.coils2(start))
+    
+    
+    def enable_step_timing(self, shift=4, bins=256):
+        """스텝 간격 계측 시작 (히스토그램 bin 폭 2^shift us), 기록기(StepTiming) 반환
+        
+        STEP_TIMING = const(0)으로 빌드하면 재생 루프에 계측 코드가 없으므로 아무것도 기록되지 않음
+        """
+        from step_timing import StepTiming
+        self.step_timing = StepTiming(shift, bins)
+        return self.step_timing
+    
+    def disable_step_timing(self):
+        """스텝 간격 계측 중지"""
+        self.step_timing = None
     
     def calibrate_multiple_motors(self, motor_indices):
-        """여러 모터 동시 원점 보정"""
+        """여러 모터 동시 원점 보정 (미리 계산한 프레임 재생, 매 스텝 리미트 스위치 확인)"""
         # print(f"모터 {motor_indices} 동시 원점 보정 시작...")
         
         # 모든 모터를 먼저 정지
         self.stop_all_motors()
         
-        # 보정할 모터들의 상태 추적
-        calibration_done = [False] * len(motor_indices)
-        
-        # 모든 모터가 보정될 때까지 반복
-        while not all(calibration_done):
-            # 각 모터별로 1스텝씩 진행
-            for i, motor_index in enumerate(motor_indices):
-                if not calibration_done[i]:
-                    # 리미트 스위치 확인
-                    if self.is_limit_switch_pressed(motor_index):
-                        # 이 모터는 보정 완료
-                        calibration_done[i] = True
-                        self.motor_positions[motor_index] = 0
-                        self.motor_steps[motor_index] = 0
-                        # print(f"[OK] 모터 {motor_index} 원점 보정 완료")
-                    else:
-                        # 이 모터는 1스텝 진행
-                        self.motor_steps[motor_index] = (self.motor_steps[motor_index] - 1) % 8
-                        current_step = self.motor_steps[motor_index]
-                        self.motor_states[motor_index] = self.stepper_sequence[current_step]
-            
-            # 모든 모터 상태를 한 번에 출력
-            self.update_motor_output()
-            
-            # 회전 속도 조절
-            time.sleep_us(self.step_delay_us)
+        # 모든 모터가 리미트 스위치에 닿을 때까지 동시에 1스텝씩 진행 (1칸 넘게 캠이 오지 않으면 걸림으로 중단)
+        result = self.run_until_limits(motor_indices, direction=-1, compartments=0, sample_every=1)
         
         # 모든 모터 정지
         self.stop_all_motors()
         # print(f"모터 {motor_indices} 동시 원점 보정 완료!")
-        return True
+        return result is not None
+    
+    # ===== 프레임 미리 계산 (모션 컴파일) =====
+    
+    def _frame_word(self, states):
+        """모터 1~4 코일 상태 → 16비트 프레임 (update_motor_output과 같은 비트 배치)"""
+        return ((states[1] & 0x0F) | ((states[2] & 0x0F) << 4) |
+                ((states[3] & 0x0F) << 8) | ((states[4] & 0x0F) << 12))
+    
+    def compile_motion(self, moves, sample_every=0, cyclic=False, coordinated=False, mode="half"):
+        """모터별 방향/스텝 수로 스텝 프레임 미리 계산
+        
+        Args:
+            moves: {모터 번호: (방향, 스텝 수)} - 목록에 없는 모터는 현재 코일 상태 유지
+            sample_every: N스텝마다 리미트 스위치 샘플 위치 표시 (0이면 샘플 없음)
+            cyclic: True이면 스텝 수와 관계없이 8스텝 주기 프레임만 계산 (반복 재생용)
+            coordinated: True이면 스텝 수가 적은 모터의 스텝을 전체 구간에 고르게 분배하여
+                         모든 모터가 마지막 프레임에 함께 도착
+            mode: 스텝 방식 (STEP_MODES), 스텝 수는 그 방식의 스텝 단위 (풀스텝/웨이브 1스텝 = 2하프스텝)
+                  풀스텝/웨이브는 모터 시퀀스 인덱스가 방식의 홀짝과 맞아야 함 (MoveJob이 하프스텝 1번으로 맞춤)
+        
+        Returns:
+            MotionProgram
+        """
+        if mode not in STEP_MODES:
+            raise ValueError("지원하지 않는 스텝 방식: " + str(mode))
+        stride, parity = STEP_MODES[mode]
+        if parity is not None:
+            for motor_index in moves:
+                if self.motor_steps[motor_index] % 2 != parity:
+                    raise ValueError("시퀀스 위치가 스텝 방식과 맞지 않음: 모터 " + str(motor_index))
+        sequence = self.stepper_sequence
+        states = list(self.motor_states)
+        steps = list(self.motor_steps)
+        move_list = [(motor_index, direction, count, self.motor_steps[motor_index])
+                     for motor_index, (direction, count) in moves.items()]
+        
+        length = 8 if cyclic else max([count for _, _, count, _ in move_list] or [0])
+        frames = bytearray(length * 2)
+        samples = bytearray(length)
+        for k in range(length):
+            for motor_index, direction, count, _ in move_list:
+                if cyclic:
+                    moved = True
+                elif coordinated:
+                    moved = (k + 1) * count // length > k * count // length
+                else:
+                    moved = k < count
+                if moved:
+                    steps[motor_index] = (steps[motor_index] + direction * stride) % 8
+                    states[motor_index] = sequence[steps[motor_index]]
+            word = self._frame_word(states)
+            frames[k * 2] = word >> 8
+            frames[k * 2 + 1] = word & 0xFF
+            if sample_every and (k + 1) % sample_every == 0:
+                samples[k] = 1
+        return MotionProgram(frames, samples, move_list, cyclic, coordinated and not cyclic, stride)
+    
+    def run_motion(self, program, delay_us=None, on_sample=None, profile=None):
+        """미리 계산한 프레임 재생 (고정 길이 프로그램)
+        
+        Args:
+            program: compile_motion 결과 (cyclic이면 profile 필요)
+            delay_us: 스텝 간 지연 (None이면 step_delay_us)
+            on_sample: 샘플 위치마다 호출 on_sample(재생한 스텝 수), True를 반환하면 중단
+            profile: VelocityProfile (지정하면 delay_us 대신 가속/감속 스텝 간격으로 profile.steps 스텝 재생)
+        
+        Returns:
+            int: 재생한 스텝 수
+        """
+        if STEP_TIMING:
+            timing = self.step_timing
+            if timing is not None:
+                timing.begin("motion")
+        self._power_start(program)
+        if profile is not None:
+            played = self._run_profiled(program, profile)
+            if STEP_TIMING:
+                if timing is not None:
+                    timing.end()
+            return played
+        if delay_us is None:
+            delay_us = self.step_delay_us
+        write_frame = self._output.write_frame
+        sleep_us = time.sleep_us
+        frames = program.frames
+        samples = program.samples
+        
+        played = 0
+        i = 0
+        for k in range(program.length):
+            if STEP_TIMING:
+                if timing is not None:
+                    timing.mark()
+            write_frame(frames[i], frames[i + 1])
+            sleep_us(delay_us)
+            i += 2
+            played = k + 1
+            if samples[k] and on_sample is not None and on_sample(played):
+                break
+        
+        program.apply(self, played)
+        if STEP_TIMING:
+            if timing is not None:
+                timing.end()
+        return played
+    
+    def _run_profiled(self, program, profile, start=0, count=None):
+        """가속/감속 스텝 간격으로 프레임 재생 (감속 구간은 가속 구간 간격을 역순으로 사용)
+        
+        start: 이미 재생한 스텝 수 (나눠서 재생할 때 이어서 시작할 프레임과 속도 계획 위치)
+        count: 이번에 재생할 스텝 수 (None이면 계획 끝까지)
+        """
+        write_frame = self._output.write_frame
+        sleep_us = time.sleep_us
+        frames = program.frames
+        ramp = profile.ramp
+        up = profile.up
+        cruise_end = profile.cruise_end
+        cruise_delay = profile.cruise_delay
+        last = profile.steps - 1
+        end = profile.steps if count is None else start + count
+        mask = 15 if program.cyclic else -1  # 8프레임 주기 반복 (-1이면 순서대로)
+        if STEP_TIMING:
+            timing = self.step_timing
+        self._power_start(program)
+        
+        i = (start * 2) & mask
+        for k in range(start, end):
+            if STEP_TIMING:
+                if timing is not None:
+                    timing.mark()
+            write_frame(frames[i], frames[i + 1])
+            if k < up:
+                sleep_us(ramp[k])
+            elif k < cruise_end:
+                sleep_us(cruise_delay)
+            else:
+                sleep_us(ramp[last - k])
+            i = (i + 2) & mask
+        
+        program.apply(self, end)
+        return end - start
+    
+    def set_motion_limits(self, motor_index, max_speed=None, accel=None, start_speed=None, shape=None, mode="half"):
+        """모터별 최고 속도(steps/s)/가속도(steps/s^2)/출발 속도/속도 곡선 설정 (mode: 해당 스텝 방식의 계획, 단위도 그 방식의 스텝)"""
+        if 1 <= motor_index <= 4 and mode in self.mode_planners:
+            self.mode_planners[mode][motor_index].configure(start_speed, max_speed, accel, shape)
+            return True
+        return False
+    
+    def planner_for(self, moves, mode="half"):
+        """이동할 모터들의 속도 계획기 (mode 스텝 방식 기준)
+        
+        여러 모터가 함께 도착하는 이동에서는 가장 긴 모터 기준 속도에 스텝 비율을 곱한 값이
+        각 모터의 한계를 넘지 않도록 한계를 합성
+        """
+        planners = self.mode_planners[mode]
+        counts = [(motor_index, count) for motor_index, (_, count) in moves.items() if count > 0]
+        if len(counts) == 1:
+            return planners[counts[0][0]]
+        lead = max(count for _, count in counts)
+        start_speed = max_speed = accel = None
+        shape = "trapezoid"
+        for motor_index, count in counts:
+            planner = planners[motor_index]
+            scale = lead / count
+            if start_speed is None or planner.start_speed * scale < start_speed:
+                start_speed = planner.start_speed * scale
+            if max_speed is None or planner.max_speed * scale < max_speed:
+                max_speed = planner.max_speed * scale
+            if accel is None or planner.accel * scale < accel:
+                accel = planner.accel * scale
+            if count == lead:
+                shape = planner.shape
+        return MotionPlanner(start_speed, max_speed, accel, shape)
+    
+    def move_motors(self, moves, coordinated=True, mode="half"):
+        """여러 모터를 가속/감속 계획으로 이동 (coordinated=True이면 모든 모터가 함께 도착)
+        
+        Args:
+            moves: {모터 번호: (방향, 하프스텝 수)}
+            mode: 스텝 방식 (STEP_MODES, 이동 거리는 방식과 관계없이 하프스텝 단위)
+        
+        Returns:
+            int: 이동한 하프스텝 수 (가장 긴 모터 기준)
+        """
+        job = MoveJob(moves, coordinated, mode=mode)
+        job.run(self)
+        return job.result
+    
+    def run_until_limits(self, motor_indices, direction=-1, compartments=0, sample_every=None,
+                         delay_us=None, max_steps=None):
+        """여러 모터를 미리 계산한 8스텝 주기 프레임으로 동시에 회전, 리미트 스위치로 모터별 정지
+        
+        리미트 스위치는 샘플 위치마다 74HC165D를 1번만 읽어 모든 모터 비트를 함께 확인하고,
+        모터 하나가 끝나면 남은 모터로 프레임을 다시 계산 (LimitMotionJob을 끝까지 실행)
+        
+        Args:
+            motor_indices: 회전할 모터 번호 목록 (리미트 스위치가 있는 모터 1~3)
+            direction: 회전 방향 (-1 = 배출/충전 방향)
+            compartments: 0이면 원점 보정 (리미트 스위치가 눌릴 때까지, 시작 전 먼저 확인),
+                          N이면 리미트 해제 후 재감지를 N번 (N칸 이동)
+            sample_every: N스텝마다 리미트 스위치 확인
+                          (None이면 limit_sampler가 칸 가운데는 드물게, 캠 예상 위치 근처는 매 스텝 확인)
+            delay_us: 스텝 간 지연 (None이면 step_delay_us)
+            max_steps: 최대 스텝 수 (초과 시 중단, None이면 제한 없음)
+        
+        Returns:
+            dict: {모터 번호: 이동한 스텝 수}, max_steps 초과 또는 걸림(캠이 오지 않음) 시 None
+        """
+        job = LimitMotionJob(motor_indices, direction, compartments, sample_every, delay_us, max_steps)
+        job.run(self)
+        return job.result
+    
+    def _finish_calibration(self, motor_index):
+        """원점 보정 완료 처리 (코일 상태는 유지)"""
+        self.motor_positions[motor_index] = 0
+        # motor_steps(시퀀스 위치)는 회전자가 멈춘 위치 그대로 둠 (0으로 되돌리면 다음 스텝에서 최대 4하프스텝 튐)
     
     def next_compartment(self, motor_index):
         """다음 칸으로 이동 - 리미트 스위치 기반 (리미트 해제 후 재감지)"""
         if 1 <= motor_index <= 4:
             # print(f"  [RETRY] 모터 {motor_index} 리미트 스위치 기반 이동 시작")
             
-            # 리미트 스위치 기반 이동: 리미트가 떼어졌다가 다시 눌릴 때 정지
-            step_count = 0
-            limit_released = False  # 리미트 스위치 해제 상태
-            
-            # print(f"  📍 모터 {motor_index} 리미트 스위치 대기 중...")
-            
-            # 리미트 스위치가 떼어졌다가 다시 눌릴 때까지 회전
-            while True:
-                # 1스텝씩 이동 (시계방향)
-                self.motor_steps[motor_index] = (self.motor_steps[motor_index] - 1) % 8
-                current_step = self.motor_steps[motor_index]
-                self.motor_states[motor_index] = self.stepper_sequence[current_step]
-                self.update_motor_output()
-                
-                # 최대 속도
-                time.sleep_us(500)  # 0.5ms - 최대 속도
-                step_count += 1
-                
-                # 리미트 스위치 상태 확인
-                is_pressed = self.is_limit_switch_pressed(motor_index)
-                
-                if not is_pressed and not limit_released:
-                    # 리미트 스위치가 떼어짐 - 계속 진행
-                    # print(f"  [BTN] 모터 {motor_index} 리미트 스위치 해제됨 (계속 진행)")
-                    limit_released = True
-                elif is_pressed and limit_released:
-                    # 리미트 스위치가 다시 눌림 - 1칸 이동 완료
-                    # print(f"  [BTN] 모터 {motor_index} 리미트 스위치 재감지! 1칸 이동 완료")
-                    break
-                
-                # 진행 상황 출력 (20스텝마다)
-                if step_count % 20 == 0:
-                    # print(f"    📍 모터 {motor_index} 진행: {step_count}스텝 (리미트 대기)")
-                    pass
+            # 리미트 스위치가 떼어졌다가 다시 눌릴 때까지 회전 (캠 예상 위치 근처는 매 스텝 확인, 0.5ms - 최대 속도)
+            # 캠이 오지 않으면 칸 이동 통계의 걸림 한계에서 중단
+            if self.run_until_limits([motor_index], direction=-1, compartments=1, delay_us=500) is None:
+                return False
             
             # 1칸 이동 완료 (리미트 스위치 해제 후 재감지)
-            # print(f"  [OK] 모터 {motor_index} 1칸 이동 완료 ({step_count}스텝, 리미트 스위치 기반)")
+            # print(f"  [OK] 모터 {motor_index} 1칸 이동 완료 (리미트 스위치 기반)")
             self.motor_positions[motor_index] = (self.motor_positions[motor_index] + 1) % 10
             return True
         return False
     
     
 
+
+class MotionJob:
+    """모션 엔진 작업 기본 클래스
+    
+    run(controller, deadline)은 deadline(ticks_us)까지만 진행하고 끝났으면 True를 반환
+    (deadline=None이면 끝날 때까지 블로킹 실행), 끝난 작업은 result와 on_done 콜백으로 결과 전달
+    """
+    
+    def __init__(self, on_done=None):
+        self.on_done = on_done  # 완료 시 호출 on_done(job)
+        self.done = False
+        self.result = None
+        self.error = None
+    
+    def run(self, controller, deadline=None):
+        return True
+
+
+class MoveJob(MotionJob):
+    """스텝 수가 정해진 이동 (가속/감속 계획, 여러 모터 동시 도착)
+    
+    구간(세그먼트)마다 속도 계획을 1번 세우고, 나눠서 실행할 때는 남은 시간 안에 끝나는 스텝만큼
+    그 계획을 이어서 재생 (다음 조각은 멈춘 스텝의 간격과 단계(가속/등속/감속)에서 계속, 정지부터 다시 가속하지 않음)
+    
+    이동 거리는 스텝 방식과 관계없이 하프스텝 단위이고, 풀스텝/웨이브는
+    [시퀀스 홀짝을 맞추는 하프스텝 1번] → [본 이동] → [남은 하프스텝 1번]으로 나눠 정확히 그 거리만큼 이동
+    """
+    
+    def __init__(self, moves, coordinated=True, on_done=None, mode="half"):
+        MotionJob.__init__(self, on_done)
+        self.moves = {m: move for m, move in moves.items() if 1 <= m <= 4 and move[1] > 0}
+        self.coordinated = coordinated
+        self.mode = mode
+        self.segments = None
+        self.program = None
+        self.lead = 0
+        self.played = 0
+        self.moved = {}   # 모터별 이동한 하프스텝 수
+    
+    def _start(self, controller):
+        if self.mode not in STEP_MODES:
+            raise ValueError("지원하지 않는 스텝 방식: " + str(self.mode))
+        stride, parity = STEP_MODES[self.mode]
+        self.moved = {m: 0 for m in self.moves}
+        if stride == 1:
+            self.segments = [(self.moves, "half")]
+            return
+        head = {}
+        body = {}
+        tail = {}
+        for m, (direction, count) in self.moves.items():
+            if controller.motor_steps[m] % 2 != parity:
+                head[m] = (direction, 1)
+                count -= 1
+            if count >= stride:
+                body[m] = (direction, count // stride)
+            if count % stride:
+                tail[m] = (direction, count % stride)
+        self.segments = [(moves, mode) for moves, mode in ((head, "half"), (body, self.mode), (tail, "half")) if moves]
+    
+    def _next_segment(self, controller):
+        moves, mode = self.segments.pop(0)
+        counts = set(count for _, count in moves.values())
+        self.lead = max(counts)
+        self.played = 0
+        self.base = dict(self.moved)
+        if len(counts) == 1:
+            # 모든 모터 스텝 수가 같으면 8프레임 주기만 계산 (긴 도어 이동도 버퍼 16바이트)
+            self.program = controller.compile_motion(moves, cyclic=True, mode=mode)
+        else:
+            self.program = controller.compile_motion(moves, coordinated=self.coordinated, mode=mode)
+        self.profile = controller.planner_for(moves, mode).plan(self.lead)
+    
+    def _chunk(self, remaining, budget_us):
+        """속도 계획에서 이어지는 스텝 중 budget_us 안에 끝나는 스텝 수 (최소 1스텝)"""
+        delay_at = self.profile.delay_at
+        k = self.played
+        end = k + remaining
+        spent = delay_at(k)
+        k += 1
+        while k < end:
+            spent += delay_at(k)
+            if spent > budget_us:
+                break
+            k += 1
+        return k - self.played
+    
+    def run(self, controller, deadline=None):
+        if not self.moves:
+            self.result = 0
+            return True
+        if STEP_TIMING:
+            timing = controller.step_timing
+            if timing is not None:
+                if self.segments is None:
+                    timing.begin("move")
+                else:
+                    timing.resume()
+        if self.segments is None:
+            self._start(controller)
+        while True:
+            if self.program is None:
+                self._next_segment(controller)
+            program = self.program
+            remaining = self.lead - self.played
+            if deadline is None:
+                steps = remaining
+            else:
+                steps = self._chunk(remaining, time.ticks_diff(deadline, time.ticks_us()))
+            controller._run_profiled(program, self.profile, self.played, steps)
+            self.played += steps
+            # 재생한 만큼 하프스텝 이동량 반영 (중간에 멈춰도 누적 스텝이 실제 위치와 같도록)
+            for motor_index, _, count, _ in program.moves:
+                self.moved[motor_index] = self.base[motor_index] + program.count(count, self.played) * program.stride
+            if self.played < self.lead:
+                return False
+            self.program = None
+            if not self.segments:
+                break
+            if deadline is not None and time.ticks_diff(deadline, time.ticks_us()) <= 0:
+                return False
+        if STEP_TIMING:
+            if timing is not None:
+                timing.end()
+        self.result = max(self.moved.values())
+        return True
+
+
+class LimitMotionJob(MotionJob):
+    """리미트 스위치로 끝나는 이동 (원점 보정 / N칸 이동, StepperMotorController.run_until_limits 참고)
+    
+    고정 스텝 간격(출발 속도 이하)으로 회전하므로 8스텝 경계마다 멈췄다가 이어서 진행해도 탈조 없음
+    직전 캠(또는 출발 위치)에서 compartment_stats.stall_limit을 넘도록 캠이 오지 않는 모터는 걸림으로 멈추고
+    (result = None), 걸림/미끄러짐은 faults에 [(종류, 모터 번호, 스텝 수)]로 남김
+    모터별 결과: steps_taken(이동 스텝), failed(걸림 + max_steps까지 캠이 오지 않은 모터, 나머지는 N칸 완료)
+    """
+    
+    def __init__(self, motor_indices, direction=-1, compartments=0, sample_every=None,
+                 delay_us=None, max_steps=None, on_done=None):
+        MotionJob.__init__(self, on_done)
+        self.motor_indices = motor_indices
+        self.direction = direction
+        self.compartments = compartments
+        self.sample_every = sample_every
+        self.delay_us = delay_us
+        self.max_steps = max_steps
+        self.active = None
+        self.program = None
+        self.faults = []
+        self.failed = list(motor_indices)  # 끝나기 전에는 모두 실패로 봄
+    
+    def _start(self, controller):
+        if self.delay_us is None:
+            self.delay_us = controller.step_delay_us
+        active = [m for m in self.motor_indices if controller.limit_switches[m] is not None]
+        self.masks = {m: 1 << controller.limit_switches[m].bit_position for m in active}
+        self.released = {m: False for m in active}
+        self.counts = {m: 0 for m in active}
+        self.steps_taken = {m: 0 for m in active}
+        self.total = 0
+        self.stalled = []
+        sampler = controller.limit_sampler
+        stats = controller.compartment_stats
+        
+        data = controller.input_shift_register.read_byte()
+        if self.compartments == 0:
+            # 원점 보정: 이미 눌린 모터는 이동하지 않음
+            for m in list(active):
+                sampler.lost(m)
+                if not data & self.masks[m]:
+                    controller._finish_calibration(m)
+                    active.remove(m)
+        # 모터별 직전 캠 위치 / 매 스텝 확인 시작 위치 (캠에서 출발하지 않았으면 모름 → 매 스텝 확인)
+        # 걸림 판정 위치는 캠에서 출발하지 않았어도 같음 (다음 캠까지 1칸 이내)
+        self.edges = {}
+        self.windows = {}
+        self.limits = {}
+        for m in active:
+            at_cam = self.compartments and not data & self.masks[m]
+            if self.compartments:
+                sampler.begin(m, at_cam)
+            self.edges[m] = 0 if at_cam else None
+            self.windows[m] = sampler.window(m) if at_cam else None
+            self.limits[m] = stats.stall_limit(m)
+        self.last = 0
+        self.active = active
+    
+    def run(self, controller, deadline=None):
+        if STEP_TIMING:
+            timing = controller.step_timing
+            if timing is not None:
+                if self.active is None:
+                    timing.begin("limit")
+                else:
+                    timing.resume()
+        if self.active is None:
+            self._start(controller)
+        write_frame = controller._output.write_frame
+        read_byte = controller.input_shift_register.scan  # 샘플은 항상 스텝 직후이므로 캐시 확인 없이 스캔
+        sleep_us = time.sleep_us
+        ticks_us = time.ticks_us
+        ticks_diff = time.ticks_diff
+        active = self.active
+        masks = self.masks
+        released = self.released
+        counts = self.counts
+        compartments = self.compartments
+        sample_every = self.sample_every
+        sampler = controller.limit_sampler
+        stats = controller.compartment_stats
+        edges = self.edges
+        windows = self.windows
+        limits = self.limits
+        faults = self.faults
+        delay_us = self.delay_us
+        max_steps = self.max_steps
+        
+        while active:
+            if self.program is None:
+                self.program = controller.compile_motion({m: (self.direction, 8) for m in active}, cyclic=True)
+                self.played = 0
+                if sample_every:
+                    self.countdown = sample_every
+                else:
+                    self.countdown = sampler.next_gap(active, windows, self.total)
+                self.i = 0
+            program = self.program
+            frames = program.frames
+            controller._power_start(program)
+            played = self.played
+            countdown = self.countdown
+            last = self.last
+            i = self.i
+            finished = None
+            while finished is None:
+                if STEP_TIMING:
+                    if timing is not None:
+                        timing.mark()
+                write_frame(frames[i], frames[i + 1])
+                sleep_us(delay_us)
+                i = (i + 2) & 15  # 8프레임 주기
+                played += 1
+                countdown -= 1
+                if not countdown:
+                    # 샘플 위치: 74HC165D 1번 읽기로 모든 모터 확인
+                    data = read_byte()
+                    position = self.total + played
+                    for m in active:
+                        pressed = not data & masks[m]
+                        if compartments == 0:
+                            if pressed:
+                                finished = finished or []
+                                finished.append(m)
+                                continue
+                        elif not pressed:
+                            released[m] = True
+                        elif released[m]:
+                            released[m] = False
+                            counts[m] += 1
+                            if edges[m] is not None:
+                                steps = position - edges[m]
+                                exact = position - last == 1
+                                if sampler.exact[m]:
+                                    # 직전 캠 위치가 정확할 때만 판정, 통계에는 이번 캠도 정확할 때만 반영
+                                    kind = stats.record(m, steps, exact)
+                                    if kind is not None:
+                                        faults.append((kind, m, steps))
+                                sampler.observe(m, steps, exact)
+                            edges[m] = position
+                            windows[m] = position + sampler.window(m)
+                            limits[m] = position + stats.stall_limit(m)
+                            if counts[m] >= compartments:
+                                finished = finished or []
+                                finished.append(m)
+                            continue
+                        if position >= limits[m]:
+                            # 캠이 오지 않음 (디스크 걸림, 리미트 스위치 고장) → 이 모터만 중단
+                            faults.append(("stall", m, position - (edges[m] or 0)))
+                            self.stalled.append(m)
+                            finished = finished or []
+                            finished.append(m)
+                    
+                    if max_steps is not None and position >= max_steps and finished is None:
+                        finished = []
+                    
+                    last = position
+                    if sample_every:
+                        countdown = sample_every
+                    else:
+                        countdown = sampler.next_gap(active, windows, position)
+                
+                # 8스텝 경계에서 시간 확인 (나눠서 실행할 때만)
+                if i == 0 and finished is None and deadline is not None and ticks_diff(ticks_us(), deadline) >= 0:
+                    break
+            
+            # 재생한 만큼 모터 상태 반영 (중간에 멈춰도 다른 코드가 보는 코일 상태가 실제 출력과 같도록)
+            program.apply(controller, played)
+            self.last = last
+            if finished is None:
+                self.played = played
+                self.countdown = countdown
+                self.i = i
+                return False
+            
+            self.program = None
+            self.total += played
+            for m in active:
+                self.steps_taken[m] += played
+            for m in finished:
+                active.remove(m)
+                if m in self.stalled:
+                    sampler.lost(m)
+                elif compartments == 0:
+                    controller._finish_calibration(m)
+            if max_steps is not None and self.total >= max_steps and active:
+                for m in active:
+                    sampler.lost(m)
+                if STEP_TIMING:
+                    if timing is not None:
+                        timing.end()
+                self.failed = self.stalled + active
+                self.result = None
+                return True
+        
+        if STEP_TIMING:
+            if timing is not None:
+                timing.end()
+        self.failed = list(self.stalled)
+        self.result = None if self.stalled else self.steps_taken
+        return True
+
+
+class PauseJob(MotionJob):
+    """대기 (약이 떨어질 시간 등) - 엔진에서는 기다리는 동안 다른 처리를 막지 않음"""
+    
+    def __init__(self, ms, on_done=None):
+        MotionJob.__init__(self, on_done)
+        self.ms = ms
+        self.until = None
+    
+    def remaining_ms(self):
+        if self.until is None:
+            return self.ms
+        return max(0, time.ticks_diff(self.until, time.ticks_ms()))
+    
+    def run(self, controller, deadline=None):
+        if self.until is None:
+            self.until = time.ticks_add(time.ticks_ms(), self.ms)
+        left = self.remaining_ms()
+        if left and deadline is None:
+            controller.idle_ms(left)
+            left = 0
+        return left == 0
+
+
+class CallJob(MotionJob):
+    """큐 순서에 맞춰 함수 호출 (이동 사이 수량 감소 등), 반환값이 result"""
+    
+    def __init__(self, func, on_done=None):
+        MotionJob.__init__(self, on_done)
+        self.func = func
+    
+    def run(self, controller, deadline=None):
+        self.result = self.func()
+        return True
+
+
+class MotionEngine:
+    """비블로킹 모션 엔진
+    
+    이동 명령을 큐에 넣고, update()가 호출될 때마다 slice_us 동안만 진행한 뒤 돌아옴
+    (메인 루프에서 LVGL/버튼 처리와 번갈아 호출하거나 start_timer()로 machine.Timer에서 호출)
+    작업이 끝나면 job.done/job.result가 설정되고 on_done(job) 콜백 호출
+    """
+    
+    def __init__(self, controller, slice_us=20000):
+        self.controller = controller
+        self.slice_us = slice_us  # update 1회당 모터 구동 시간 (이 시간마다 화면/버튼 처리 기회)
+        self.queue = []
+        self._updating = False
+        self._timer = None
+        self._scheduled = False
+    
+    def submit(self, job, on_done=None):
+        """작업 추가 (큐 순서대로 실행), job 반환"""
+        if on_done is not None:
+            job.on_done = on_done
+        self.queue.append(job)
+        return job
+    
+    def move(self, moves, on_done=None, coordinated=True, mode="half"):
+        """가속/감속 이동 추가 - moves: {모터 번호: (방향, 하프스텝 수)}, mode: 스텝 방식 (STEP_MODES)"""
+        return self.submit(MoveJob(moves, coordinated, mode=mode), on_done)
+    
+    def advance(self, motor_indices, compartments=1, on_done=None, delay_us=500, max_steps=None):
+        """리미트 스위치 기반 N칸 이동 추가 (여러 모터 동시, result = {모터 번호: 스텝 수})"""
+        return self.submit(LimitMotionJob(motor_indices, -1, compartments, None, delay_us, max_steps), on_done)
+    
+    def pause(self, ms, on_done=None):
+        """대기 추가"""
+        return self.submit(PauseJob(ms), on_done)
+    
+    def call(self, func, on_done=None):
+        """함수 호출 추가"""
+        return self.submit(CallJob(func), on_done)
+    
+    def busy(self):
+        """남은 작업이 있는지"""
+        return len(self.queue) > 0
+    
+    def update(self, slice_us=None):
+        """큐 작업을 slice_us 동안 진행 (대기 작업은 기다리지 않고 바로 돌아옴)
+        
+        Returns:
+            bool: 남은 작업이 있으면 True
+        """
+        if self._updating:
+            return True
+        self._updating = True
+        try:
+            if slice_us is None:
+                slice_us = self.slice_us
+            deadline = time.ticks_add(time.ticks_us(), slice_us)
+            # 대기 작업 중이거나 큐가 비어도 유지 시간이 지난 코일은 OFF
+            self.controller.release_idle_coils()
+            while self.queue:
+                if not self._run_head(deadline):
+                    break
+                if time.ticks_diff(deadline, time.ticks_us()) <= 0:
+                    break
+        finally:
+            self._updating = False
+        return len(self.queue) > 0
+    
+    def _run_head(self, deadline):
+        """큐 맨 앞 작업 실행, 끝났으면 큐에서 빼고 완료 처리 후 True"""
+        job = self.queue[0]
+        try:
+            finished = job.run(self.controller, deadline)
+        except Exception as e:
+            # print(f"[ERROR] 모션 작업 실패: {e}")
+            job.error = e
+            finished = True
+            try:
+                self.controller.stop_all_motors()
+            except:
+                pass
+        if not finished:
+            return False
+        self.queue.pop(0)
+        job.done = True
+        if job.on_done is not None:
+            try:
+                job.on_done(job)
+            except Exception as e:
+                # print(f"[ERROR] 모션 완료 콜백 실패: {e}")
+                pass
+        return True
+    
+    def finish(self, job):
+        """job까지 큐 작업을 나누지 않고 끝까지 실행 (기존 블로킹 동작), job.result 반환"""
+        while not job.done and self.queue:
+            self._run_head(None)
+        return job.result
+    
+    def wait(self, job, idle=None):
+        """job이 끝날 때까지 update 반복, 구간 사이마다 idle() 호출 (화면 갱신 등)
+        
+        Returns:
+            job.result
+        """
+        while not job.done:
+            self.update()
+            if idle is not None:
+                idle()
+            if not job.done and self.queue and isinstance(self.queue[0], PauseJob):
+                # 대기 작업 중에는 남은 시간만큼(최대 20ms) 쉬면서 화면 갱신
+                time.sleep_ms(min(20, self.queue[0].remaining_ms()))
+        return job.result
+    
+    def cancel_all(self):
+        """남은 작업 취소 및 모든 모터 정지"""
+        self.queue = []
+        self.controller.stop_all_motors()
+    
+    def start_timer(self, timer_id=1, period_ms=25):
+        """machine.Timer로 period_ms마다 update 실행 (micropython.schedule로 메인 컨텍스트에서 실행)
+        
+        타이머 콜백은 메인 루프 코드 사이에 끼어들어 실행되므로, 버튼 스캔 등으로 공유 버스(ShiftBus)가
+        사용 중이면 그 주기는 건너뜀
+        """
+        from machine import Timer
+        import micropython
+        self._schedule = micropython.schedule
+        self._update_ref = self._scheduled_update  # 콜백마다 할당하지 않도록 미리 바인딩
+        self._timer = Timer(timer_id)
+        self._timer.init(mode=Timer.PERIODIC, period=period_ms, callback=self._timer_cb)
+    
+    def stop_timer(self):
+        """타이머 구동 중지"""
+        if self._timer is not None:
+            self._timer.deinit()
+            self._timer = None
+    
+    def _timer_cb(self, t):
+        # 인터럽트 컨텍스트에서 호출될 수 있으므로 할당 없이 예약만 수행
+        if not self._scheduled and self.queue:
+            try:
+                self._schedule(self._update_ref, 0)
+                self._scheduled = True
+            except:
+                pass
+    
+    def _scheduled_update(self, _):
+        self._scheduled = False
+        if self.controller.bus.busy:
+            # 메인 코드가 버튼 스캔/프레임 전송 중에 끼어든 경우: 버스를 건드리지 않고 다음 타이머 주기에 진행
+            return
+        self.update()
+
+
+class DoorController:
+    """도어(모터 4) 레벨 위치 표와 현재 레벨 관리 (이동은 PillBoxMotorSystem이 실행)
+    
+    레벨 위치 표: 닫힘 기준 하프스텝 수 [0, 1단, 2단, 3단] (보정 파일이 있으면 처음 사용할 때 1번 읽어 캐시)
+    pending: 미뤄 둔 목표 레벨 (close_door(defer=True)) - 다음 도어 명령과 합쳐 한 번에 이동
+    """
+    
+    def __init__(self, table_path=DOOR_TABLE_PATH):
+        """
+        Args:
+            table_path: 보정된 레벨 위치 표 파일 (None이면 기본 표만 사용, 호스트 시뮬레이션 등)
+        """
+        self.table_path = table_path
+        self.level = 0          # 현재 레벨 (0=닫힘, 1~3단)
+        self.pending = None     # 미뤄 둔 목표 레벨 (없으면 None)
+        self._steps = None      # 레벨 위치 표 캐시
+    
+    def steps(self):
+        """레벨 위치 표 [0, 1단, 2단, 3단] (처음 호출 시 보정 파일 로드, 없으면 기본값)"""
+        steps = self._steps
+        if steps is None:
+            steps = None if self.table_path is None else load_door_table(self.table_path)
+            if steps is None:
+                steps = list(DOOR_LEVEL_STEPS)
+            self._steps = steps
+        return steps
+    
+    def target(self, level, lower=True):
+        """목표 레벨 결정 (lower=False이면 열기만: 현재 레벨(미뤄 둔 목표가 있으면 그 레벨)보다 낮추지 않음)"""
+        current = self.level if self.pending is None else self.pending
+        if not lower and level < current:
+            return current
+        return level
+    
+    def plan(self, level):
+        """현재 레벨에서 level까지 이동할 (방향, 스텝 수), 움직일 필요 없으면 None
+        
+        도어는 한 방향으로 420도까지 도는 슬라이드이므로 최단 경로 = 두 레벨 사이를 바로 이동
+        방향: -1=열기(역방향), 1=닫기(정방향) - 하드웨어에 맞게 반대 방향
+        """
+        steps = self.steps()
+        delta = steps[level] - steps[self.level]
+        if delta == 0:
+            return None
+        return (-1, delta) if delta > 0 else (1, -delta)
+    
+    def calibrate(self, level, steps):
+        """레벨 위치 보정 (1~3단 하프스텝 수 저장, 레벨 순서대로 증가해야 함)
+        
+        Returns:
+            int: 도어가 이 레벨에 있으면 새 위치로 옮길 하프스텝 차이 (열기 방향 양수), 아니면 0
+        """
+        table = list(self.steps())
+        if not 1 <= level <= 3:
+            raise ValueError("보정할 수 없는 도어 레벨: %d" % level)
+        old = table[level]
+        table[level] = steps
+        if not table[0] < table[1] < table[2] < table[3] <= 0xFFFF:
+            raise ValueError("도어 레벨 위치는 레벨 순서대로 증가해야 함: %s" % table)
+        self._steps = table
+        if self.table_path is not None and not save_door_table(table, self.table_path):
+            # print("[WARN] 도어 레벨 위치 저장 실패 (이번 부팅에만 적용)")
+            pass
+        return steps - old if self.level == level else 0
+
+
 class PillBoxMotorSystem:
     """필박스 모터 시스템 관리 클래스"""
     
-    def __init__(self):
-        """필박스 모터 시스템 초기화"""
+    def __init__(self, state_path=MOTION_STATE_PATH, door_table_path=DOOR_TABLE_PATH):
+        """필박스 모터 시스템 초기화
+        
+        Args:
+            state_path: 위치 상태 파일 경로 (None이면 저장하지 않음, 호스트 벤치마크 등)
+            door_table_path: 보정된 도어 레벨 위치 표 파일 경로 (state_path가 None이면 사용 안 함)
+        """
         self.motor_controller = StepperMotorController()
         
         # 필박스 설정
         self.num_disks = 3  # 3개 디스크 (모터 1,2,3)
         self.compartments_per_disk = 15  # 디스크당 15칸
         
-        # 도어 위치 추적 (0=닫힘, 1=1단, 2=2단, 3=3단)
-        self.current_door_level = 0  # 초기 상태: 닫혀 있음
+        # 도어 위치 추적 (0=닫힘, 1=1단, 2=2단, 3=3단) - current_door_level은 door.level
+        self.door = DoorController(door_table_path if state_path else None)  # 초기 상태: 닫혀 있음
+        # 도어 이동 스텝 방식 (긴 이동이라 풀스텝으로 빠르게, 레벨 위치는 하프스텝 단위 그대로)
+        # 디스크 칸 이동은 리미트 스위치 위치 정밀도를 위해 항상 하프스텝
+        self.door_step_mode = "full"
+        
+        # 비블로킹 모션 엔진 (이동 명령 큐, 메인 루프/타이머에서 update)
+        self.engine = MotionEngine(self.motor_controller)
+        # 블로킹 API(rotate_disk, open_door_to_level 등)가 기다리는 동안 구간마다 호출할 함수
+        # (기본값: LVGL 화면 갱신, None이면 기존처럼 끝날 때까지 한 번에 실행)
+        self.idle_callback = self._refresh_display
+        
+        # 위치 상태 저장 (이동 완료마다 기록, 부팅 시 검증되면 원점 보정/도어 닫기 생략)
+        self.step_counts = [0, 0, 0, 0, 0]  # 모터 1~4 누적 스텝 (인덱스 0 사용 안함)
+        self.state_trusted = False  # 부팅 시 저장된 위치를 그대로 사용했는지
+        self.state_file = None
+        self._homed = False         # 원점 보정 이후 모든 이동이 정상 완료됨
+        self._moves_in_flight = 0
+        self._state_seq = -1        # 마지막으로 반영한 상태 순번 (다른 인스턴스가 기록했는지 확인용)
+        
+        # 칸 이동 이상 기록 [(종류, 모터 번호, 스텝 수)] - "stall"(걸림, 이동 실패) / "slip" / "short"
+        # 배출 화면이 take_faults()로 가져가 알람 시스템에 보고
+        self.faults = []
+        # 마지막 advance_disks(_async)에서 N칸 이동을 마친 디스크 (일부 디스크가 걸려도 나머지는 약이 떨어짐)
+        self.advanced_disks = []
+        if state_path:
+            try:
+                self.state_file = get_state_file(state_path)
+                self._restore_state()
+            except Exception as e:
+                # print(f"[WARN] 위치 상태 로드 실패: {e}")
+                self.state_file = None
         
         # print("[OK] PillBoxMotorSystem 초기화 완료")
     
+    @property
+    def current_door_level(self):
+        """현재 도어 레벨 (0=닫힘, 1~3단)"""
+        return self.door.level
+    
+    @current_door_level.setter
+    def current_door_level(self, level):
+        self.door.level = level
+    
+    def _refresh_display(self):
+        """모터 동작 중 화면 갱신 (LVGL이 로드된 경우에만, LVGL 콜백 안에서는 건너뜀)"""
+        import sys
+        lv = sys.modules.get("lvgl")
+        if lv is None:
+            return
+        try:
+            nesting = getattr(lv, "_nesting", None)
+            if nesting is None or nesting.value == 0:
+                lv.timer_handler()
+        except Exception:
+            pass
+    
+    def wait(self, job):
+        """엔진 작업이 끝날 때까지 대기 (기다리는 동안 idle_callback으로 화면 갱신), job.result 반환"""
+        if job not in self.engine.queue:
+            self.engine.submit(job)
+        moving = self._begin_job(job)
+        try:
+            if self.idle_callback is None:
+                # 화면 갱신 없이 한 번에 실행 (큐 앞의 작업부터 순서대로)
+                self.engine.finish(job)
+            else:
+                self.engine.wait(job, self.idle_callback)
+        finally:
+            if moving:
+                self._end_job(job)
+        if job.error is not None:
+            raise job.error
+        return job.result
+    
+    def wait_ms(self, ms):
+        """ms 동안 대기 (time.sleep_ms 대신 사용하면 기다리는 동안 화면이 갱신됨)"""
+        return self.wait(PauseJob(ms))
+
+    # ===== 위치 상태 저장 (motion_state) =====
+    # 이동 시작 시 CLEAN 해제, 끝나면 위치와 함께 CLEAN 설정 (중첩된 이동은 가장 바깥 이동이 끝날 때 1번 기록)
+    # 같은 부팅에서 생성된 인스턴스들은 같은 상태 파일 객체를 공유하고, 이동 전에 다른 인스턴스가 기록한 위치를 가져옴
+    
+    def _restore_state(self):
+        """저장된 상태 반영, 신뢰할 수 있으면(HOMED+CLEAN, 디스크 리미트 스위치 눌림) 위치/도어 레벨 복원
+        
+        Returns:
+            bool: 저장된 위치를 그대로 사용하면 True (원점 보정 불필요)
+        """
+        state = self.state_file.state
+        if state is None:
+            return False
+        self.step_counts = list(state.step_counts)
+        self._state_seq = state.seq
+        if not state.trusted:
+            # print(f"[INFO] 위치 상태 신뢰 불가 (플래그 {state.flags:#x}), 원점 보정 필요")
+            return False
+        # 디스크는 항상 칸 경계(캠이 리미트 스위치를 누른 위치)에서 멈추므로 눌려 있지 않으면 위치가 바뀐 것
+        motor_controller = self.motor_controller
+        for motor_num in range(1, self.num_disks + 1):
+            if not motor_controller.is_limit_switch_pressed(motor_num):
+                # print(f"[INFO] 디스크 {motor_num} 리미트 스위치 미감지, 원점 보정 필요")
+                return False
+        self._apply_state(state)
+        self.state_trusted = True
+        return True
+    
+    def _apply_state(self, state):
+        """저장된 상태를 컨트롤러 위치/시퀀스 위치/도어 레벨에 반영"""
+        motor_controller = self.motor_controller
+        for motor_num in range(1, 5):
+            if motor_num <= 3:
+                motor_controller.motor_positions[motor_num] = state.positions[motor_num]
+            motor_controller.motor_steps[motor_num] = state.phases[motor_num]
+        self.current_door_level = state.door_level
+        self.step_counts = list(state.step_counts)
+        self._homed = bool(state.flags & FLAG_HOMED)
+        self._state_seq = state.seq
+    
+    def _sync_state(self):
+        """다른 인스턴스가 이후에 기록한 상태가 있으면 가져옴 (모터는 같은 하드웨어이므로)"""
+        state_file = self.state_file
+        if state_file is None or state_file.state is None or state_file.state.seq == self._state_seq:
+            return
+        self._apply_state(state_file.state)
+    
+    def _save_state(self, clean):
+        """현재 위치 기록 (실패해도 동작에는 영향 없음)"""
+        state_file = self.state_file
+        if state_file is None:
+            return False
+        motor_controller = self.motor_controller
+        flags = (FLAG_HOMED if self._homed else 0) | (FLAG_CLEAN if clean else 0)
+        state = MotionState([0] + [motor_controller.motor_positions[m] % 10 for m in (1, 2, 3)],
+                            self.current_door_level, flags,
+                            [0] + [motor_controller.motor_steps[m] & 7 for m in (1, 2, 3, 4)],
+                            list(self.step_counts))
+        try:
+            if not state_file.save(state):
+                return False
+        except Exception as e:
+            # print(f"[WARN] 위치 상태 저장 실패: {e}")
+            return False
+        self._state_seq = state.seq
+        return True
+    
+    def _begin_move(self):
+        """이동 시작 (가장 바깥 이동이고 저장된 상태가 CLEAN이면 CLEAN 해제 기록)"""
+        if self._moves_in_flight == 0:
+            self._sync_state()
+            stored = self.state_file.state if self.state_file is not None else None
+            if stored is None or stored.flags & FLAG_CLEAN:
+                self._save_state(False)
+        self._moves_in_flight += 1
+    
+    def _end_move(self, success=True):
+        """이동 끝 (실패하면 원점 보정 전까지 HOMED 해제, 가장 바깥 이동이면 위치 기록)"""
+        if not success:
+            self._homed = False
+        self._moves_in_flight = max(0, self._moves_in_flight - 1)
+        if self._moves_in_flight == 0:
+            self._save_state(True)
+    
+    def _begin_job(self, job):
+        """모터 이동 작업이면 이동 시작 처리 후 True (대기/호출 작업은 False)"""
+        if not isinstance(job, (MoveJob, LimitMotionJob)):
+            return False
+        self._begin_move()
+        return True
+    
+    def _end_job(self, job):
+        """모터 이동 작업 끝: 누적 스텝 반영, 실패(오류/리미트 미감지)이면 HOMED 해제"""
+        if isinstance(job, MoveJob):
+            for motor_num, steps in job.moved.items():
+                self.step_counts[motor_num] += steps
+            success = job.error is None and job.done
+        else:
+            for motor_num, steps in getattr(job, "steps_taken", {}).items():
+                self.step_counts[motor_num] += steps
+            self.faults.extend(job.faults)
+            success = job.error is None and job.done and job.result is not None
+        self._end_move(success)
+    
+    def take_faults(self):
+        """지난 호출 이후 칸 이동 이상 기록을 가져오고 비움"""
+        faults = self.faults
+        self.faults = []
+        return faults
+    
+    def ensure_homed(self):
+        """부팅 시 원점 확인: 저장된 위치를 신뢰할 수 있으면 그대로 사용, 아니면 모든 디스크 동시 원점 보정
+        
+        Returns:
+            bool: 위치가 확정되었으면 True
+        """
+        if self.state_trusted:
+            # print("[OK] 저장된 위치 사용 (원점 보정 생략)")
+            return True
+        return self.calibrate_all_disks_simultaneous()
+
+    # ===== asyncio API (await rotate_disk_async(...) 등) =====
+    # lv_utils.event_loop(asynchronous=True)와 같은 asyncio 루프에서 실행하면
+    # 모터는 엔진 구간(slice_us)마다, 약 낙하 대기는 asyncio.sleep_ms로 다른 태스크(화면 갱신 등)에 양보
+    
+    async def run_job(self, job):
+        """엔진 작업을 await로 실행 (엔진 구간마다 다른 태스크에 양보), job.result 반환"""
+        import asyncio
+        engine = self.engine
+        if job not in engine.queue:
+            engine.submit(job)
+        moving = self._begin_job(job)
+        try:
+            while not job.done:
+                engine.update()
+                if job.done:
+                    break
+                if engine.queue and isinstance(engine.queue[0], PauseJob):
+                    # 동기 API가 넣은 대기 작업이 앞에 있으면 남은 시간만큼(최대 20ms) 양보
+                    await asyncio.sleep_ms(min(20, engine.queue[0].remaining_ms()))
+                else:
+                    await asyncio.sleep_ms(0)
+        finally:
+            if moving:
+                self._end_job(job)
+        if job.error is not None:
+            raise job.error
+        return job.result
+    
+    async def _idle_async(self, ms):
+        """ms 동안 양보하며 대기 (약 낙하 대기), 그 사이 유지 시간이 지난 코일은 OFF (controller.idle_ms의 async 버전)"""
+        import asyncio
+        controller = self.motor_controller
+        hold = controller.power.hold_left_ms()
+        if hold is not None and hold < ms:
+            await asyncio.sleep_ms(hold)
+            controller.release_idle_coils()
+            ms -= hold
+        await asyncio.sleep_ms(ms)
+    
+    async def rotate_disk_async(self, disk_num, steps, drop_ms=500):
+        """디스크 회전 (rotate_disk의 async 버전) - 칸마다 약 낙하 대기(drop_ms)는 양보"""
+        motor_num = disk_num
+        if not 1 <= motor_num <= 3:
+            # print(f"  [ERROR] 잘못된 디스크 번호: {disk_num}")
+            return False
+        motor_controller = self.motor_controller
+        self._begin_move()
+        try:
+            for step_idx in range(steps):
+                if await self.run_job(LimitMotionJob([motor_num], -1, compartments=1, delay_us=500)) is None:
+                    raise RuntimeError("디스크 걸림")
+                motor_controller.motor_positions[motor_num] = (motor_controller.motor_positions[motor_num] + 1) % 10
+                await self._idle_async(drop_ms)
+            motor_controller.stop_motor(motor_num)
+            self._end_move(True)
+            return True
+        except Exception as e:
+            # print(f"  [ERROR] 디스크 회전 실패: {e}")
+            motor_controller.stop_motor(motor_num)
+            self._end_move(False)
+            return False
+    
+    async def rotate_disks_async(self, disk_nums, steps=1, drop_ms=500):
+        """여러 디스크 회전 (asyncio.gather) - 이동은 엔진 큐 순서대로, 약 낙하 대기는 겹쳐서 진행
+    
+        Returns:
+            list: 디스크별 성공 여부
+        """
+        import asyncio
+        return await asyncio.gather(*[self.rotate_disk_async(disk_num, steps, drop_ms) for disk_num in disk_nums])
+    
+    async def advance_disks_async(self, disk_nums, compartments=1, drop_ms=500):
+        """여러 디스크를 함께 N칸씩 이동 (advance_disks의 async 버전) - 약 낙하 대기 1번은 양보"""
+        motor_nums = self._disk_motors(disk_nums)
+        if not motor_nums:
+            return False
+        success = False
+        self.advanced_disks = []
+        self._begin_move()
+        try:
+            job = self._advance_job(motor_nums, compartments)
+            await self.run_job(job)
+            success = self._finish_advance(motor_nums, compartments, job)
+            if self.advanced_disks:
+                await self._idle_async(drop_ms)
+            return success
+        except Exception as e:
+            # print(f"  [ERROR] 디스크 동시 이동 실패: {e}")
+            return False
+        finally:
+            for motor_num in motor_nums:
+                self.motor_controller.stop_motor(motor_num)
+            self._end_move(success)
+    
+    async def _move_door_async(self, level, lower):
+        """도어를 목표 레벨로 이동 (_move_door의 async 버전)"""
+        if level < 0 or level > 3:
+            # print(f"[ERROR] 잘못된 배출구 레벨: {level} (0-3 범위, 0=닫힘)")
+            return False
+        try:
+            self.motor_controller.stop_all_motors()
+            self._sync_state()
+            door = self.door
+            level = door.target(level, lower)
+            door.pending = None
+            move = door.plan(level)
+            if move is None:
+                return True
+            direction, steps = move
+            self._begin_move()
+            try:
+                await self.run_job(MoveJob({4: (direction, steps)}, mode=self.door_step_mode))
+            except BaseException:
+                self._end_move(False)
+                raise
+            door.level = level
+            self._end_move(True)
+            self.motor_controller.stop_all_motors()
+            return True
+        except Exception as e:
+            # print(f"[ERROR] 도어 이동 실패: {e}")
+            try:
+                self.motor_controller.stop_all_motors()
+            except:
+                pass
+            return False
+    
+    async def open_door_to_level_async(self, level):
+        """도어를 지정된 레벨까지 열기 (open_door_to_level의 async 버전), level=0이면 닫기"""
+        return await self._move_door_async(level, level == 0)
+    
+    async def move_door_to_level_async(self, level):
+        """도어를 지정된 레벨로 바로 이동 (move_door_to_level의 async 버전)"""
+        return await self._move_door_async(level, True)
+    
+    async def close_door_async(self, defer=False):
+        """도어 완전히 닫기 (close_door의 async 버전)"""
+        if defer:
+            return self.close_door(defer)
+        return await self._move_door_async(0, True)
+    
+    async def flush_door_async(self):
+        """미뤄 둔 도어 목표로 이동 (flush_door의 async 버전)"""
+        if self.door.pending is None:
+            return True
+        return await self._move_door_async(self.door.pending, True)
+    
+    def run_async(self, coro):
+        """동기 코드에서 코루틴을 끝까지 실행, 결과 반환
+    
+        lv_utils.event_loop(asynchronous=True)가 실행 중이면 그 태스크가 화면을 갱신하고,
+        아니면 idle_callback을 주기적으로 호출하는 태스크를 함께 실행
+        (이미 asyncio 태스크 안이라면 run_async 대신 await로 호출)
+        """
+        import asyncio
+        import sys
+        lv_utils = sys.modules.get("lv_utils")
+        ui_loop = lv_utils.event_loop.current_instance() if lv_utils else None
+        refresh = None
+        if self.idle_callback is not None and not (ui_loop and ui_loop.asynchronous):
+            refresh = self.idle_callback
+    
+        async def main():
+            refresher = asyncio.create_task(self._refresh_task(refresh)) if refresh else None
+            try:
+                return await coro
+            finally:
+                if refresher is not None:
+                    refresher.cancel()
+    
+        return asyncio.run(main())
+    
+    async def _refresh_task(self, refresh, period_ms=40):
+        """period_ms마다 화면 갱신 (lv_utils 기본 25Hz와 같은 주기)"""
+        import asyncio
+        while True:
+            refresh()
+            await asyncio.sleep_ms(period_ms)
+    
     def calibrate_all_disks_simultaneous(self):
         """모든 디스크 동시 원점 보정"""
         # print("모든 디스크 동시 원점 보정 시작...")
         
         # 모터 1, 2, 3을 동시에 보정
-        if self.motor_controller.calibrate_multiple_motors([1, 2, 3]):
+        self._begin_move()
+        success = False
+        try:
+            success = self.motor_controller.calibrate_multiple_motors([1, 2, 3])
+        finally:
+            if success:
+                # 원점 보정 완료: 이후 이동이 모두 정상 완료되는 동안 저장된 위치를 신뢰할 수 있음
+                self._homed = True
+            self._end_move(success)
+        if success:
             # print("모든 디스크 동시 보정 완료!")
             return True
         else:
@@ -439,32 +1995,23 @@ class PillBoxMotorSystem:
             motor_indices = [disk_index + 1 for disk_index in disk_indices]
             print(f"모터 번호: {motor_indices}")
             
-            # 원점보정 방식으로 연속적으로 3칸씩 회전 (리미트 스위치 무시)
+            # 원점보정 방식으로 연속적으로 회전 (리미트 스위치 무시) - 프레임 미리 계산 후 재생
             print(f"  연속 동시 회전 시작: {steps_per_disk}칸")
+            motor_controller = self.motor_controller
+            program = motor_controller.compile_motion(
+                {motor_index: (-1, steps_per_disk) for motor_index in motor_indices if 1 <= motor_index <= 3})
+            self._begin_move()
+            success = False
+            try:
+                motor_controller.run_motion(program)
+                success = True
+                for motor_index, _, count, _ in program.moves:
+                    self.step_counts[motor_index] += count * program.stride
+            finally:
+                self._end_move(success)
             
-            # 각 스텝마다 모든 모터를 동시에 1스텝씩 진행 (원점보정 방식)
-            for step in range(steps_per_disk):
-                print(f"  동시 회전 {step+1}/{steps_per_disk}칸")
-                
-                # 각 모터별로 1스텝씩 진행 (원점보정과 동일한 방식)
-                for motor_index in motor_indices:
-                    if 1 <= motor_index <= 3:
-                        # 이 모터는 1스텝 진행 (리미트 스위치 확인 없이)
-                        old_step = self.motor_controller.motor_steps[motor_index]
-                        self.motor_controller.motor_steps[motor_index] = (self.motor_controller.motor_steps[motor_index] - 1) % 8
-                        current_step = self.motor_controller.motor_steps[motor_index]
-                        self.motor_controller.motor_states[motor_index] = self.motor_controller.stepper_sequence[current_step]
-                        print(f"    모터 {motor_index}: {old_step} -> {current_step}, 상태: {self.motor_controller.motor_states[motor_index]}")
-                
-                # 모든 모터 상태를 한 번에 출력 (원점보정과 동일)
-                print(f"    update_motor_output 호출")
-                self.motor_controller.update_motor_output()
-                
-                # 회전 속도 조절 (원점보정과 동일한 속도)
-                time.sleep_us(self.motor_controller.step_delay_us)
-            
-            # 약이 떨어질 시간 대기 (최종에만)
-            time.sleep_ms(500)
+            # 약이 떨어질 시간 대기 (최종에만) - 유지 시간이 지나면 코일 OFF
+            motor_controller.idle_ms(500)
             
             # 모든 모터 정지 (최종에만)
             self.motor_controller.stop_all_motors()
@@ -488,22 +2035,23 @@ class PillBoxMotorSystem:
                 # print(f"  [FAST] 모터 {motor_num} 우선순위 모드 활성화")
                 
                 # 실제 하드웨어 제어: 리미트 스위치 기반 1칸씩 이동
+                motor_controller = self.motor_controller
+                self._begin_move()
                 for step_idx in range(steps):
                     # print(f"    📍 디스크 {disk_num} {step_idx+1}/{steps}칸 이동 중...")
                     
-                    # 다음 칸으로 이동 (리미트 스위치 기반) - 블로킹 모드
-                    success = self.motor_controller.next_compartment(motor_num)
-                    
-                    if not success:
-                        # print(f"    [ERROR] 디스크 {disk_num} {step_idx+1}칸 이동 실패")
-                        return False
+                    # 다음 칸으로 이동 (리미트 스위치 기반, next_compartment와 같은 동작) - 엔진으로 실행하며 화면 갱신
+                    if self.wait(LimitMotionJob([motor_num], -1, compartments=1, delay_us=500)) is None:
+                        raise RuntimeError("디스크 걸림")
+                    motor_controller.motor_positions[motor_num] = (motor_controller.motor_positions[motor_num] + 1) % 10
                     
                     # 각 칸 이동 후 잠시 대기 (약이 떨어질 시간)
-                    time.sleep_ms(500)
+                    self.wait_ms(500)
                 
                 # print(f"  [OK] 디스크 {disk_num} {steps}칸 회전 완료")
                 # 동작 완료 후 코일 OFF
                 self.motor_controller.stop_motor(motor_num)
+                self._end_move(True)
                 return True
             else:
                 # print(f"  [ERROR] 잘못된 디스크 번호: {disk_num}")
@@ -514,7 +2062,65 @@ class PillBoxMotorSystem:
             # 실패 시에도 코일 OFF
             if 1 <= motor_num <= 3:
                 self.motor_controller.stop_motor(motor_num)
+                self._end_move(False)
+            return False
+    
+    def advance_disks(self, disk_nums, compartments=1, drop_ms=500):
+        """여러 디스크를 함께 N칸씩 이동 (한 프레임으로 동시 구동, 디스크별 리미트 스위치로 정지) 후 약 낙하 대기 1번
+        
+        Returns:
+            bool: 모든 디스크가 N칸 이동했으면 True
+        """
+        motor_nums = self._disk_motors(disk_nums)
+        if not motor_nums:
+            return False
+        success = False
+        self.advanced_disks = []
+        self._begin_move()
+        try:
+            job = self._advance_job(motor_nums, compartments)
+            self.wait(job)
+            success = self._finish_advance(motor_nums, compartments, job)
+            if self.advanced_disks:
+                # 약이 떨어질 시간 (디스크 수와 관계없이 1번, 일부 디스크만 이동했어도 그 디스크의 약)
+                self.wait_ms(drop_ms)
+            return success
+        except Exception as e:
+            # print(f"  [ERROR] 디스크 동시 이동 실패: {e}")
             return False
+        finally:
+            # 동작 완료/실패 후 코일 OFF
+            for motor_num in motor_nums:
+                self.motor_controller.stop_motor(motor_num)
+            self._end_move(success)
+    
+    def _disk_motors(self, disk_nums):
+        """디스크 번호 → 모터 번호 목록 (중복 제거, 잘못된 번호가 있으면 빈 목록)"""
+        motor_nums = []
+        for disk_num in disk_nums:
+            if not 1 <= disk_num <= 3:
+                # print(f"  [ERROR] 잘못된 디스크 번호: {disk_num}")
+                return []
+            if disk_num not in motor_nums:
+                motor_nums.append(disk_num)
+        return motor_nums
+    
+    def _advance_job(self, motor_nums, compartments):
+        """디스크 동시 N칸 이동 작업 (캠 예상 위치 근처는 매 스텝 리미트 확인, 0.5ms 간격 - next_compartment와 같은 속도)
+        칸마다 캠이 학습한 걸림 한계 안에 오지 않으면 그 디스크를 중단, 전체는 (N+1)칸 분량에서 중단 (스위치 고장 안전장치)"""
+        max_steps = (compartments + 1) * self.motor_controller.steps_per_compartment
+        return LimitMotionJob(motor_nums, -1, compartments, delay_us=500, max_steps=max_steps)
+    
+    def _finish_advance(self, motor_nums, compartments, job):
+        """동시 이동 결과 반영: N칸 이동한 디스크만 칸 위치 갱신하고 advanced_disks에 기록, 모두 이동했으면 True"""
+        positions = self.motor_controller.motor_positions
+        for motor_num in motor_nums:
+            if motor_num in job.failed:
+                # print(f"  [ERROR] 디스크 {motor_num} 리미트 스위치 미감지 (걸림 / 최대 스텝 초과)")
+                continue
+            positions[motor_num] = (positions[motor_num] + compartments) % 10
+            self.advanced_disks.append(motor_num)
+        return len(self.advanced_disks) == len(motor_nums)
     
     def control_motor4_direct(self, level=1):
         """모터 4 직접 제어 (배출구 슬라이드) - 기존 호환성 유지용 (deprecated)"""
@@ -522,71 +2128,79 @@ class PillBoxMotorSystem:
         return self.open_door_to_level(level)
     
     def open_door_to_level(self, level):
-        """도어를 지정된 레벨까지 열기 (현재 위치에서 목표 레벨로 이동, 닫지 않음)"""
+        """도어를 지정된 레벨까지 열기 (현재 위치에서 목표 레벨로 이동, 닫지 않음)
+        
+        현재 레벨보다 낮은 레벨은 움직이지 않음 (미뤄 둔 닫기가 있으면 닫힌 것으로 보고 목표 레벨로 바로 이동)
+        """
+        # print(f"🚪 도어 열기 시작: 현재 레벨={self.current_door_level}, 목표 레벨={level}")
+        return self._move_door(level, False)
+    
+    def move_door_to_level(self, level):
+        """도어를 지정된 레벨로 바로 이동 (열기/낮추기/닫기 모두 두 레벨 사이 1번 이동)"""
+        return self._move_door(level, True)
+    
+    def close_door(self, defer=False):
+        """도어 완전히 닫기 (레벨 0으로 이동) - 강제로 닫기
+        
+        Args:
+            defer: True이면 바로 움직이지 않고 닫기를 미뤄 둠 - 다음 도어 명령(열기 등)과 합쳐
+                   현재 레벨에서 그 목표로 1번만 이동 (flush_door()로 미뤄 둔 닫기 실행)
+        """
+        # print(f"🚪 도어 닫기 시작: 현재 레벨={self.current_door_level}")
+        if defer:
+            self.door.pending = 0
+            return True
+        return self._move_door(0, True)
+    
+    def flush_door(self):
+        """미뤄 둔 도어 목표가 있으면 지금 이동"""
+        if self.door.pending is None:
+            return True
+        return self._move_door(self.door.pending, True)
+    
+    def _move_door(self, level, lower):
+        """도어를 목표 레벨로 이동 (미뤄 둔 목표는 이번 이동으로 대체)
+        
+        Args:
+            level: 목표 레벨 (0=닫힘, 1~3단)
+            lower: False이면 현재 레벨보다 낮은 레벨로는 움직이지 않음 (open_door_to_level)
+        """
+        # 레벨 범위 확인
+        if level < 0 or level > 3:
+            # print(f"[ERROR] 잘못된 배출구 레벨: {level} (0-3 범위, 0=닫힘)")
+            return False
         try:
-            # print(f"🚪 도어 열기 시작: 현재 레벨={self.current_door_level}, 목표 레벨={level}")
-            
             # [FAST] 모터 4 사용 전 모든 모터 전원 OFF
             self.motor_controller.stop_all_motors()
+            self._sync_state()  # 다른 인스턴스가 옮긴 도어 레벨 반영
             
-            # 모터 4 (배출구 슬라이드) 레벨별 제어
-            motor_index = 4
-            
-            # 레벨 범위 확인
-            if level < 0 or level > 3:
-                # print(f"[ERROR] 잘못된 배출구 레벨: {level} (0-3 범위, 0=닫힘)")
-                return False
-            
-            # 이미 해당 레벨에 있으면 동작하지 않음
-            if self.current_door_level == level:
-                # print(f"  [INFO] 도어가 이미 레벨 {level}에 있음")
-                return True
-            
-            # 하위 단수로 내려가지 않도록 체크 (목표 레벨이 현재 레벨보다 낮으면 동작하지 않음)
-            if level < self.current_door_level:
-                # print(f"  [INFO] 도어가 현재 레벨 {self.current_door_level}에 있고, 목표 레벨 {level}은 하위 단수이므로 동작하지 않음")
+            door = self.door
+            level = door.target(level, lower)
+            door.pending = None
+            move = door.plan(level)
+            if move is None:
+                # 이미 해당 레벨에 있음
                 return True
+            direction, steps = move
+            # print(f"  [INFO] 도어 {door.level} → {level}: {steps}스텝 (방향 {direction})")
             
-            # 4096스텝/360도 기준으로 각 레벨별 누적 스텝 계산
-            level_steps = {
-                0: 0,      # 닫힘 (0도)
-                1: 1593,   # 140도 = 4096 ÷ 360° × 140° = 1593스텝
-                2: 3187,   # 280도 = 4096 ÷ 360° × 280° = 3187스텝
-                3: 4781    # 420도 = 4096 ÷ 360° × 420° = 4781스텝
-            }
-            
-            current_steps = level_steps[self.current_door_level]
-            target_steps = level_steps[level]
-            steps_to_move = target_steps - current_steps
-            
-            # print(f"  [INFO] 현재 스텝: {current_steps}, 목표 스텝: {target_steps}, 이동 스텝: {steps_to_move}")
-            
-            if steps_to_move == 0:
-                # 이미 목표 레벨에 있음
-                return True
-            
-            # 방향 결정 (양수=역방향(열기), 음수=정방향(닫기)) - 하드웨어에 맞게 반대 방향
-            # 하위 단수로 내려가지 않도록 이미 체크했으므로 steps_to_move는 항상 양수
-            direction = -1  # 열기 방향 (역방향)
-            steps = steps_to_move
-            
-            # 도어 이동
-            success = self._rotate_motor4_steps(motor_index, direction, steps)
-            if not success:
+            # 도어 이동 (모터 4)
+            self._begin_move()
+            if not self._rotate_motor4_steps(4, direction, steps):
                 # print(f"    [ERROR] 도어 이동 실패")
+                self._end_move(False)
                 return False
             
             # 도어 위치 업데이트
-            self.current_door_level = level
-            # print(f"  [OK] 도어 레벨 {level}로 이동 완료")
+            door.level = level
+            self._end_move(True)
             
             # [FAST] 모터 4 사용 후 모든 모터 전원 OFF
             self.motor_controller.stop_all_motors()
-            
             return True
             
         except Exception as e:
-            # print(f"[ERROR] 도어 열기 실패: {e}")
+            # print(f"[ERROR] 도어 이동 실패: {e}")
             # [FAST] 예외 발생 시에도 모든 모터 전원 OFF
             try:
                 self.motor_controller.stop_all_motors()
@@ -594,81 +2208,28 @@ class PillBoxMotorSystem:
                 pass
             return False
     
-    def close_door(self):
-        """도어 완전히 닫기 (레벨 0으로 이동) - 강제로 닫기"""
-        try:
-            # print(f"🚪 도어 닫기 시작: 현재 레벨={self.current_door_level}")
-            
-            # [FAST] 모터 4 사용 전 모든 모터 전원 OFF
-            self.motor_controller.stop_all_motors()
-            
-            # 모터 4 (배출구 슬라이드) 레벨별 제어
-            motor_index = 4
-            
-            # 이미 닫혀 있으면 동작하지 않음
-            if self.current_door_level == 0:
-                # print(f"  [INFO] 도어가 이미 닫혀 있음")
-                return True
-            
-            # 4096스텝/360도 기준으로 각 레벨별 누적 스텝 계산
-            level_steps = {
-                0: 0,      # 닫힘 (0도)
-                1: 1593,   # 140도 = 4096 ÷ 360° × 140° = 1593스텝
-                2: 3187,   # 280도 = 4096 ÷ 360° × 280° = 3187스텝
-                3: 4781    # 420도 = 4096 ÷ 360° × 420° = 4781스텝
-            }
-            
-            current_steps = level_steps[self.current_door_level]
-            target_steps = level_steps[0]  # 닫힘 (0도)
-            steps_to_move = target_steps - current_steps  # 음수 (닫기 방향)
-            
-            # print(f"  [INFO] 현재 스텝: {current_steps}, 목표 스텝: {target_steps}, 이동 스텝: {steps_to_move}")
-            
-            # 방향 결정 (양수=역방향(열기), 음수=정방향(닫기)) - 하드웨어에 맞게 반대 방향
-            direction = 1  # 닫기 방향 (정방향)
-            steps = abs(steps_to_move)
-            
-            # 도어 이동
-            success = self._rotate_motor4_steps(motor_index, direction, steps)
-            if not success:
-                # print(f"    [ERROR] 도어 닫기 실패")
-                return False
-            
-            # 도어 위치 업데이트
-            self.current_door_level = 0
-            # print(f"  [OK] 도어 닫기 완료")
-            
-            # [FAST] 모터 4 사용 후 모든 모터 전원 OFF
-            self.motor_controller.stop_all_motors()
-            
+    def calibrate_door_level(self, level, steps):
+        """도어 레벨 위치 보정 (1~3단 하프스텝 수, 보정 파일에 저장) - 도어가 그 레벨에 있으면 새 위치로 이동
+        
+        Raises:
+            ValueError: 레벨 범위 밖이거나 위치가 레벨 순서대로 증가하지 않음
+        """
+        delta = self.door.calibrate(level, steps)
+        if delta == 0:
             return True
-            
-        except Exception as e:
-            # print(f"[ERROR] 도어 닫기 실패: {e}")
-            # [FAST] 예외 발생 시에도 모든 모터 전원 OFF
-            try:
-                self.motor_controller.stop_all_motors()
-            except:
-                pass
-            return False
+        self._begin_move()
+        success = self._rotate_motor4_steps(4, -1 if delta > 0 else 1, abs(delta))
+        self._end_move(success)
+        self.motor_controller.stop_all_motors()
+        return success
     
     def _rotate_motor4_steps(self, motor_index, direction, steps):
         """모터 4 스텝 회전 (내부 함수)"""
         try:
-            total_steps = steps
-            for i in range(0, total_steps, 8):
-                remaining_steps = min(8, total_steps - i)
-                
-                # 진행 상황 출력 (100스텝마다만)
-                if i % 100 == 0 or i == total_steps - 8:
-                    # print(f"    📍 모터 4 {i+1}/{total_steps}스텝 진행 중...")
-                    pass
-                # step_motor_continuous 함수 사용 - 완전 블로킹
-                success = self.motor_controller.step_motor_continuous(motor_index, direction, remaining_steps)
-                if not success:
-                    # print(f"    [ERROR] 모터 4 회전 중단됨")
-                    return False
-            
+            # 가속/감속 계획으로 이동 (모터 4 속도 한계: motor_controller.set_motion_limits(4, ..., mode=door_step_mode))
+            # 엔진으로 나눠 실행하며 구간 사이마다 화면 갱신
+            # print(f"    📍 모터 4 {steps}스텝 ({self.door_step_mode})")
+            self.wait(MoveJob({motor_index: (direction, steps)}, mode=self.door_step_mode))
             return True
             
         except Exception as e:
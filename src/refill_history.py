@@ -0,0 +1,117 @@
+"""
+충전 기록(refill_history) 압축 정책
+최근 충전 기록 N개는 원본 그대로 두고, 오래된 기록은 날짜/디스크별 요약으로,
+보관 기간이 지난 요약은 디스크별 누적 횟수로 합쳐 약물 문서 크기를 일정하게 유지
+
+약물 문서 필드:
+    refill_history: 원본 기록 [{"disk", "timestamp", "count"}, ...] (오래된 것 먼저)
+    refill_summary: 날짜/디스크별 요약 [{"date", "disk", "refills", "first", "last",
+                    "last_count", "max_count"}, ...] (오래된 것 먼저)
+    refill_totals: 요약에서도 밀려난 디스크별 누적 충전 횟수 {"1": n, ...}
+"""
+
+RAW_KEEP = 20          # 원본으로 유지할 최근 기록 수
+SUMMARY_KEEP = 90      # 유지할 날짜/디스크별 요약 수
+COMPACT_SLACK = 10     # 원본이 RAW_KEEP + COMPACT_SLACK을 넘으면 즉시 압축 (유휴 압축이 밀린 경우)
+
+
+def needs_compaction(medication_data, raw_keep=RAW_KEEP, summary_keep=SUMMARY_KEEP):
+    """압축할 기록이 남아 있는지 확인"""
+    return (len(medication_data.get("refill_history", [])) > raw_keep or
+            len(medication_data.get("refill_summary", [])) > summary_keep)
+
+
+def compact_step(medication_data, max_events=8, raw_keep=RAW_KEEP, summary_keep=SUMMARY_KEEP):
+    """가장 오래된 원본 기록을 최대 max_events개 요약으로 이동 (문서를 제자리 수정)
+
+    Returns:
+        int: 이동한 원본 기록 + 누적으로 합친 요약 개수 (0이면 변경 없음)
+    """
+    history = medication_data.setdefault("refill_history", [])
+    summary = medication_data.setdefault("refill_summary", [])
+
+    moved = 0
+    excess = min(len(history) - raw_keep, max_events)
+    if excess > 0:
+        for record in history[:excess]:
+            _add_to_summary(summary, record)
+        del history[:excess]
+        moved += excess
+
+    excess = min(len(summary) - summary_keep, max_events)
+    if excess > 0:
+        totals = medication_data.setdefault("refill_totals", {})
+        for entry in summary[:excess]:
+            disk_key = str(entry.get("disk"))
+            totals[disk_key] = totals.get(disk_key, 0) + entry.get("refills", 0)
+        del summary[:excess]
+        moved += excess
+
+    return moved
+
+
+def _add_to_summary(summary, record):
+    """원본 기록 1개를 날짜/디스크별 요약에 합침 (같은 날짜/디스크 요약은 최근 것부터 확인)"""
+    timestamp = record.get("timestamp", "")
+    day = timestamp[:10]
+    clock = timestamp[11:19]
+    disk = record.get("disk")
+    count = record.get("count", 0)
+
+    for entry in reversed(summary):
+        if entry["date"] == day and entry["disk"] == disk:
+            entry["refills"] += 1
+            if clock >= entry["last"]:
+                entry["last"] = clock
+                entry["last_count"] = count
+            if clock < entry["first"]:
+                entry["first"] = clock
+            entry["max_count"] = max(entry["max_count"], count)
+            return
+        if entry["date"] < day:
+            break
+
+    summary.append({
+        "date": day,
+        "disk": disk,
+        "refills": 1,
+        "first": clock,
+        "last": clock,
+        "last_count": count,
+        "max_count": count,
+    })
+
+
+def query(medication_data, disk_num=None, limit=10):
+    """원본 기록과 요약을 합쳐 최신 순으로 반환
+
+    요약 항목은 원본 기록 형식으로 변환되며 "refills"(그날 충전 횟수)와 "summary": True가 추가됨
+    """
+    history = medication_data.get("refill_history", [])
+    if disk_num is not None:
+        history = [r for r in history if r.get("disk") == disk_num]
+    result = sorted(history, key=lambda x: x.get("timestamp", ""), reverse=True)[:limit]
+
+    if len(result) < limit:
+        for entry in reversed(medication_data.get("refill_summary", [])):
+            if disk_num is not None and entry.get("disk") != disk_num:
+                continue
+            result.append({
+                "disk": entry["disk"],
+                "timestamp": f"{entry['date']}T{entry['last']}",
+                "count": entry["last_count"],
+                "refills": entry["refills"],
+                "summary": True,
+            })
+            if len(result) >= limit:
+                break
+    return result
+
+
+def refill_count(medication_data, disk_num):
+    """디스크의 전체 충전 횟수 (원본 + 요약 + 누적)"""
+    total = len([r for r in medication_data.get("refill_history", []) if r.get("disk") == disk_num])
+    for entry in medication_data.get("refill_summary", []):
+        if entry.get("disk") == disk_num:
+            total += entry.get("refills", 0)
+    return total + medication_data.get("refill_totals", {}).get(str(disk_num), 0)
@@ -423,26 +423,9 @@ class ScreenManager:
     def _set_boot_to_main(self):
         """메인화면으로 부팅하도록 플래그 설정"""
         try:
-            import json
-            import os
+            from kv_store import save_state
             
-            # /data 디렉토리 존재 확인 및 생성
-            data_dir = "/data"
-            try:
-                if data_dir not in os.listdir("/"):
-                    os.mkdir(data_dir)
-            except OSError as e:
-                if e.errno == 17:  # EEXIST - 디렉토리가 이미 존재
-                    pass
-                else:
-                    raise
-            
-            boot_data = {"boot_target": "main"}
-            boot_file = "/data/boot_target.json"
-            
-            # 부팅 타겟 파일 생성/업데이트
-            with open(boot_file, 'w') as f:
-                json.dump(boot_data, f)
+            save_state("boot_target", {"boot_target": "main"})
             
         except Exception as e:
             # print(f"[ERROR] 메인화면 부팅 플래그 설정 실패: {e}")
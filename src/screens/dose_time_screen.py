@@ -807,24 +807,20 @@ class DoseTimeScreen:
     def _is_d_button_entry(self):
         """D버튼으로 진입한 경우인지 확인"""
         try:
-            import json
-            import os
+            from kv_store import load_state
             
-            # boot_target.json 파일 확인 (MicroPython 방식)
-            boot_file = "/data/boot_target.json"
-            try:
-                with open(boot_file, 'r') as f:
-                    data = json.load(f)
-                    boot_target = data.get('boot_target', None)
-                    print(f"[DEBUG] boot_target 확인: {boot_target}")
-                    if boot_target == 'dose_time':
-                        print("[DEBUG] D버튼으로 진입한 경우 감지됨 (boot_target: dose_time)")
-                        return True
-                    return False
-            except OSError:
-                # 파일이 없으면 일반적인 설정 과정
-                print("[DEBUG] boot_target.json 파일이 없음 - 일반적인 설정 과정")
+            # 상태 저장소의 boot_target 키 확인
+            data = load_state("boot_target")
+            if not data:
+                # 키가 없으면 일반적인 설정 과정
+                print("[DEBUG] boot_target 없음 - 일반적인 설정 과정")
                 return False
+            boot_target = data.get('boot_target', None)
+            print(f"[DEBUG] boot_target 확인: {boot_target}")
+            if boot_target == 'dose_time':
+                print("[DEBUG] D버튼으로 진입한 경우 감지됨 (boot_target: dose_time)")
+                return True
+            return False
         except Exception as e:
             print(f"[DEBUG] D버튼 진입 감지 실패: {e}")
             return False
@@ -832,27 +828,10 @@ class DoseTimeScreen:
     def _restart_to_main(self):
         """재부팅 후 메인화면으로 돌아가기"""
         try:
-            import json
-            import os
-            
-            # /data 디렉토리 존재 확인 및 생성
-            data_dir = "/data"
-            try:
-                if data_dir not in os.listdir("/"):
-                    os.mkdir(data_dir)
-            except OSError as e:
-                if e.errno == 17:
-                    pass
-                else:
-                    raise
-            
-            # boot_target.json을 사용하여 메인화면으로 부팅하도록 설정
-            boot_data = {"boot_target": "main"}
-            boot_file = "/data/boot_target.json"
+            from kv_store import save_state
             
-            # 부팅 타겟 파일 생성/업데이트
-            with open(boot_file, 'w') as f:
-                json.dump(boot_data, f)
+            # 상태 저장소의 boot_target 키를 사용하여 메인화면으로 부팅하도록 설정
+            save_state("boot_target", {"boot_target": "main"})
             
             # 설정 완료 메시지 표시
             self._show_completion_message()
@@ -215,6 +215,8 @@ class MainScreen:
         if self._data_manager is None:
             from data_manager import DataManager
             self._data_manager = DataManager()
+            # 배출 시퀀스 중 수량 변경은 메모리에 모았다가 한 번만 저장
+            self._data_manager.enable_write_back(idle_flush_ms=5000)
             # print("[DEBUG] 데이터 관리자 지연 로딩 완료")
         return self._data_manager
     
@@ -906,7 +908,8 @@ class MainScreen:
         try:
             # print("[INFO] MainScreen 참조 정리 시작")
             
-            # 지연 로딩된 객체들 정리
+            # 지연 로딩된 객체들 정리 (쓰기 지연된 데이터는 먼저 저장)
+            self._flush_pending_data()
             self._ui_style = None
             self._data_manager = None
             self._medication_tracker = None
@@ -992,6 +995,10 @@ class MainScreen:
     def update(self):
         """화면 업데이트 (ScreenManager에서 주기적으로 호출) - 메모리 최적화"""
         try:
+            # 이동 후 유지 시간이 지난 모터 코일 OFF (모터 시스템이 로드된 경우에만)
+            if self._motor_system is not None:
+                self._motor_system.motor_controller.release_idle_coils()
+            
             # 업데이트 빈도 제한 (1초마다)
             current_time_ms = time.ticks_ms()
             if hasattr(self, 'last_update_time') and time.ticks_diff(current_time_ms, self.last_update_time) < 1000:
@@ -1037,6 +1044,17 @@ class MainScreen:
                 self._sync_ntp_time()
                 self.last_ntp_sync = current_time_ms
             
+            # 쓰기 지연된 약물 데이터 저장 (유휴 시간 경과 시)
+            if self._data_manager is not None:
+                self._data_manager.poll_flush()
+                
+                # 오래된 충전 기록 요약 압축 (압축할 기록이 없으면 즉시 반환)
+                self._data_manager.compact_refill_history()
+            
+            # 상태 저장소 죽은 공간 정리 (기준 미만이면 즉시 반환)
+            from kv_store import get_kv_store
+            get_kv_store().maybe_compact()
+            
         except Exception as e:
             # print(f"[ERROR] 메인 스크린 업데이트 실패: {e}")
             pass
@@ -1877,6 +1895,15 @@ class MainScreen:
             # print(f"[ERROR] 디스크 알약 상태 확인 실패: {e}")
             return False
     
+    def _flush_pending_data(self):
+        """쓰기 지연된 약물 데이터 즉시 저장 (리셋 전 호출)"""
+        try:
+            if self._data_manager is not None:
+                self._data_manager.flush()
+        except Exception as e:
+            # print(f"[WARN] 데이터 flush 실패: {e}")
+            pass
+    
     def _restart_to_dose_time(self):
         """시간-분 설정 화면으로 재부팅 (Pill 로딩 방식 응용)"""
         try:
@@ -1893,6 +1920,9 @@ class MainScreen:
             import time
             time.sleep(0.1)
             
+            # 쓰기 지연된 데이터 저장 후 리셋
+            self._flush_pending_data()
+            
             # print("[INFO] ESP 리셋 시작...")
             import machine
             machine.reset()
@@ -1917,6 +1947,9 @@ class MainScreen:
             import time
             time.sleep(0.1)
             
+            # 쓰기 지연된 데이터 저장 후 리셋
+            self._flush_pending_data()
+            
             # print("[INFO] ESP 리셋 시작...")
             import machine
             machine.reset()
@@ -1928,26 +1961,9 @@ class MainScreen:
     def _set_boot_to_dose_time(self):
         """시간-분 설정으로 부팅하도록 플래그 설정"""
         try:
-            import json
-            import os
-            
-            # /data 디렉토리 존재 확인 및 생성
-            data_dir = "/data"
-            try:
-                if data_dir not in os.listdir("/"):
-                    os.mkdir(data_dir)
-            except OSError as e:
-                if e.errno == 17:  # EEXIST - 디렉토리가 이미 존재
-                    pass
-                else:
-                    raise
+            from kv_store import save_state
             
-            boot_data = {"boot_target": "dose_time"}
-            boot_file = "/data/boot_target.json"
-            
-            # 부팅 타겟 파일 생성/업데이트
-            with open(boot_file, 'w') as f:
-                json.dump(boot_data, f)
+            save_state("boot_target", {"boot_target": "dose_time"})
             
         except Exception as e:
             # print(f"[ERROR] 시간 설정 부팅 플래그 설정 실패: {e}")
@@ -1956,26 +1972,9 @@ class MainScreen:
     def _set_boot_to_meal_time(self):
         """복용시간선택으로 부팅하도록 플래그 설정"""
         try:
-            import json
-            import os
+            from kv_store import save_state
             
-            # /data 디렉토리 존재 확인 및 생성
-            data_dir = "/data"
-            try:
-                if data_dir not in os.listdir("/"):
-                    os.mkdir(data_dir)
-            except OSError as e:
-                if e.errno == 17:  # EEXIST - 디렉토리가 이미 존재
-                    pass
-                else:
-                    raise
-            
-            boot_data = {"boot_target": "meal_time"}
-            boot_file = "/data/boot_target.json"
-            
-            # 부팅 타겟 파일 생성/업데이트
-            with open(boot_file, 'w') as f:
-                json.dump(boot_data, f)
+            save_state("boot_target", {"boot_target": "meal_time"})
             
         except Exception as e:
             # print(f"[ERROR] 복용시간선택 부팅 플래그 설정 실패: {e}")
@@ -2028,6 +2027,9 @@ class MainScreen:
             
             # print("[INFO] 즉시 재부팅합니다...")
             
+            # 쓰기 지연된 데이터 저장 후 리셋
+            self._flush_pending_data()
+            
             # print("[INFO] ESP 재부팅 시작...")
             import machine
             machine.reset()
@@ -2080,31 +2082,12 @@ class MainScreen:
             pass
     
     def _reset_setup_flag(self):
-        """설정 완료 플래그를 false로 리셋 (스타트업 메뉴 사용 가능하게) - boot_target.json 공통 사용"""
+        """설정 완료 플래그를 false로 리셋 (스타트업 메뉴 사용 가능하게) - boot_target 키 공통 사용"""
         try:
-            import json
-            import os
+            from kv_store import save_state
             
-            # /data 디렉토리 존재 확인 및 생성
-            data_dir = "/data"
-            try:
-                if data_dir not in os.listdir("/"):
-                    os.mkdir(data_dir)
-                    # print(f"[INFO] /data 디렉토리 생성됨")
-            except OSError as e:
-                if e.errno == 17:  # EEXIST - 디렉토리가 이미 존재
-                    # print(f"[INFO] /data 디렉토리가 이미 존재함")
-                    pass
-                else:
-                    raise
-            
-            # boot_target.json을 사용하여 WiFi 스캔으로 부팅하도록 설정
-            boot_data = {"boot_target": "wifi_scan"}
-            boot_file = "/data/boot_target.json"
-            
-            # 부팅 타겟 파일 생성/업데이트
-            with open(boot_file, 'w') as f:
-                json.dump(boot_data, f)
+            # 상태 저장소의 boot_target 키를 사용하여 WiFi 스캔으로 부팅하도록 설정
+            save_state("boot_target", {"boot_target": "wifi_scan"})
             
             # print("[OK] 설정 완료 플래그를 false로 리셋 - 스타트업으로 부팅 설정됨")
             
@@ -2878,7 +2861,10 @@ class MainScreen:
             
             # 최근 배출한 일정과 비교
             if self.last_dispensed_dose_index is None:
-                # 배출 기록이 없으면 중복 아님
+                # 재부팅 등으로 메모리 기록이 없으면 오늘 배출 인덱스로 1시간 이내 배출 확인
+                data_manager = self.data_manager
+                if data_manager:
+                    return data_manager.was_dispensed_recently(current_index, 60)
                 return False
             
             if self.last_dispensed_dose_index != current_index:
@@ -2985,9 +2971,27 @@ class MainScreen:
             return 1  # 기본값: 1단
     
     def _dispense_from_selected_disks_no_alarm(self, motor_system, selected_disks, dose_index=None):
-        """선택된 디스크들에서 순차적으로 배출 (알람 없음)"""
+        """선택된 디스크들에서 순차적으로 배출 (알람 없음) - async 배출 시퀀스를 끝까지 실행
+        배출 1회의 모터 코일 추정 에너지는 motor_controller.power.dispenses에 기록"""
+        power = getattr(getattr(motor_system, 'motor_controller', None), 'power', None)
+        if power is not None:
+            power.begin_dispense()
+        try:
+            return motor_system.run_async(
+                self._dispense_from_selected_disks_async(motor_system, selected_disks, dose_index))
+        finally:
+            if power is not None:
+                try:
+                    mj = power.end_dispense(self.current_dose_index if dose_index is None else dose_index)
+                    # print(f"[INFO] 배출 코일 에너지: {mj} mJ (오늘 {power.today_mj()} mJ)")
+                except Exception as e:
+                    # print(f"[WARN] 코일 에너지 기록 실패: {e}")
+                    pass
+    
+    async def _dispense_from_selected_disks_async(self, motor_system, selected_disks, dose_index=None):
+        """선택된 디스크들에서 순차적으로 배출 (알람 없음, 모터 이동/약 낙하 대기 중 다른 태스크에 양보)"""
+        import asyncio
         try:
-            import time
             # print(f"[INFO] 선택된 디스크들 순차 배출 시작: {selected_disks}")
             # print(f"[DEBUG] motor_system 타입: {type(motor_system)}")
             # print(f"[DEBUG] selected_disks 타입: {type(selected_disks)}, 값: {selected_disks}")
@@ -3004,55 +3008,72 @@ class MainScreen:
             
             # 첫 배출 시 도어를 닫히고 시작 (초기 시작 시 기본 닫혀 있는 상태)
             if not hasattr(self, 'door_initialized') or not self.door_initialized:
-                close_success = motor_system.close_door()
-                if close_success:
+                if getattr(motor_system, 'state_trusted', False):
+                    # 재부팅 전 저장된 도어 레벨을 신뢰할 수 있으면 다시 닫지 않고 그 레벨에서 이어서 열기
                     self.door_initialized = True
-                    # print(f"[INFO] 첫 배출 시 도어 초기화 완료 (닫힘)")
+                else:
+                    # 닫기는 미뤄 두고 아래 도어 이동과 합쳐 현재 레벨에서 목표 레벨로 1번만 이동
+                    close_success = await motor_system.close_door_async(defer=True)
+                    if close_success:
+                        self.door_initialized = True
+                        # print(f"[INFO] 첫 배출 시 도어 초기화 완료 (닫힘)")
             
             # 도어 레벨 계산 (배출 시작 전에 한 번만)
             door_level = self._get_door_level_for_dose(dose_index)
             
             # 알람 없이 바로 배출 시작
             
-            for i, disk_num in enumerate(selected_disks):
-                # print(f"[INFO] 디스크 {disk_num} 배출 중... ({i+1}/{len(selected_disks)})")
-                self._update_status(f"디스크 {disk_num} 배출 중...")
-                
-                # 배출 전 디스크 수량 재확인 (순차 소진 방식)
-                current_count = self.data_manager.get_disk_count(disk_num)
-                if current_count <= 0:
+            # 배출 전 디스크 수량 재확인 (순차 소진 방식) - 비어 있는 디스크는 건너뜀
+            dispense_disks = []
+            for disk_num in selected_disks:
+                if self.data_manager.get_disk_count(disk_num) > 0:
+                    dispense_disks.append(disk_num)
+                else:
                     # print(f"[WARN] 디스크 {disk_num}가 비어있음, 다음 디스크로 넘어감")
-                    continue
-                
-                # 1. 디스크 회전 (카트리지 회전)
-                disk_success = motor_system.rotate_disk(disk_num, 1)  # 1칸만 회전
-                if not disk_success:
-                    # print(f"[ERROR] 디스크 {disk_num} 회전 실패")
+                    pass
+            
+            disk_success = True
+            if dispense_disks:
+                # print(f"[INFO] 디스크 {dispense_disks} 동시 배출 중...")
+                self._update_status(f"디스크 {', '.join(str(d) for d in dispense_disks)} 배출 중...")
+                
+                # 1. 디스크 동시 회전 (모든 디스크를 한 번에 1칸씩, 디스크별 리미트 스위치로 정지)
+                #    약 낙하 대기 1번 포함 - 모터 동작/대기 중에도 화면 갱신 (await로 양보)
+                disk_success = await motor_system.advance_disks_async(dispense_disks, 1)
+                # 걸린 디스크만 실패 - 1칸 이동을 마친 디스크는 약이 떨어졌으므로 도어를 열고 수량 감소
+                moved_disks = list(getattr(motor_system, 'advanced_disks', dispense_disks if disk_success else []))
+                # 디스크 걸림/미끄러짐은 알람 시스템에 보고 (걸림이면 복용 실패 처리)
+                self._report_motor_faults(motor_system, dose_index)
+                if not moved_disks:
+                    # print(f"[ERROR] 디스크 {dispense_disks} 회전 실패")
+                    self._flush_pending_data()
+                    await motor_system.flush_door_async()  # 미뤄 둔 도어 닫기 실행
                     return False
-                time.sleep_ms(100)
-                
-                # 2. 도어 열기 (해당 시간대 레벨로, 첫 번째 디스크일 때만 열기)
-                if i == 0:  # 첫 번째 디스크일 때만 도어 열기
-                    door_success = motor_system.open_door_to_level(door_level)
-                    if not door_success:
-                        # print(f"[ERROR] 도어 레벨 {door_level}로 열기 실패")
-                        # 도어 열기 실패해도 배출은 계속 진행
-                        pass
-                    time.sleep_ms(100)
+                await asyncio.sleep_ms(100)
                 
-                # 3. 약이 떨어질 시간 대기
-                time.sleep(2)  # 2초 대기
+                # 2. 도어를 해당 시간대 레벨로 (위/아래 모두 두 레벨 사이를 바로 이동)
+                door_success = await motor_system.move_door_to_level_async(door_level)
+                if not door_success:
+                    # print(f"[ERROR] 도어 레벨 {door_level}로 열기 실패")
+                    # 도어 열기 실패해도 배출은 계속 진행
+                    pass
+                await asyncio.sleep_ms(100)
                 
-                # print(f"[OK] 디스크 {disk_num} 배출 완료")
+                # 3. 약이 떨어질 시간 대기 (디스크 수와 관계없이 1번)
+                await asyncio.sleep_ms(2000)  # 2초 대기
                 
-                # 배출된 디스크의 수량 감소
-                self._decrease_disk_count(disk_num)
+                # print(f"[OK] 디스크 {moved_disks} 배출 완료")
                 
-                # 마지막 디스크가 아니면 잠시 대기
-                if i < len(selected_disks) - 1:
-                    time.sleep(1)  # 1초 간격
+                # 배출된 디스크들의 수량 감소 (걸린 디스크 제외)
+                for disk_num in moved_disks:
+                    self._decrease_disk_count(disk_num)
+            else:
+                await motor_system.flush_door_async()  # 미뤄 둔 도어 닫기 실행
+            
+            # 약 갯수 업데이트는 각 디스크마다 _decrease_disk_count()로 메모리에 반영됨
+            # 배출 시퀀스 종료 시 한 번만 저장
+            self._flush_pending_data()
             
-            # 약 갯수 업데이트는 각 디스크마다 _decrease_disk_count()로 이미 처리됨
             # 모든 약을 다 먹었는지 확인
             total_count = self._get_total_pill_count()
             
@@ -3064,20 +3085,35 @@ class MainScreen:
                 # 약을 충전하세요 음성 출력 (모든 약 배출됨)
                 self._check_and_play_load_pill_notification()
                 # 도어 완전히 닫기 (음성 출력 후)
-                close_success = motor_system.close_door()
+                close_success = await motor_system.close_door_async()
                 if not close_success:
                     # print(f"[ERROR] 도어 닫기 실패")
                     pass
             
             # print(f"[OK] 모든 디스크 배출 완료: {selected_disks}")
-            return True
+            # 일부 디스크가 걸렸으면 나머지 약은 배출했어도 이번 복용은 실패
+            return disk_success
             
         except Exception as e:
             # print(f"[ERROR] 선택된 디스크 배출 실패: {e}")
             import sys
             sys.print_exception(e)
+            # 실패 전까지 감소된 수량 저장
+            self._flush_pending_data()
             return False
     
+    def _report_motor_faults(self, motor_system, dose_index):
+        """배출 중 기록된 모터 이상을 알람 시스템에 전달"""
+        try:
+            if not hasattr(motor_system, 'take_faults'):
+                return
+            faults = motor_system.take_faults()
+            if faults and self.alarm_system:
+                self.alarm_system.report_motor_faults(dose_index, faults)
+        except Exception as e:
+            # print(f"[WARN] 모터 이상 보고 실패: {e}")
+            pass
+    
     def _decrease_disk_count(self, disk_num):
         """배출된 디스크의 수량 감소"""
         try:
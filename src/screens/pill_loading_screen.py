@@ -89,7 +89,7 @@ class PillLoadingScreen:
         self.sequential_mode = False
         self.current_sequential_index = 0
         self.sequential_disks = None  # 지연 초기화
-        self.disk_states_file = "/data/disk_states.json"
+        self.disk_states_key = "disk_states"  # 상태 저장소 키 (기존 /data/disk_states.json)
         
         # 화면 생성 완전 제거 - show() 시점에 생성
         self._screen_created = False
@@ -874,31 +874,12 @@ class PillLoadingScreen:
             pass
     
     def _mark_setup_complete(self):
-        """초기 설정 완료 플래그 설정 - boot_target.json 공통 사용"""
+        """초기 설정 완료 플래그 설정 - boot_target 키 공통 사용"""
         try:
-            import json
-            import os
+            from kv_store import save_state
             
-            # /data 디렉토리 존재 확인 및 생성
-            data_dir = "/data"
-            try:
-                if data_dir not in os.listdir("/"):
-                    os.mkdir(data_dir)
-                    # print(f"[INFO] /data 디렉토리 생성됨")
-            except OSError as e:
-                if e.errno == 17:  # EEXIST - 디렉토리가 이미 존재
-                    # print(f"[INFO] /data 디렉토리가 이미 존재함")
-                    pass
-                else:
-                    raise
-            
-            # boot_target.json을 사용하여 메인화면으로 부팅하도록 설정
-            boot_data = {"boot_target": "main"}
-            boot_file = "/data/boot_target.json"
-            
-            # 부팅 타겟 파일 생성/업데이트
-            with open(boot_file, 'w') as f:
-                json.dump(boot_data, f)
+            # 상태 저장소의 boot_target 키를 사용하여 메인화면으로 부팅하도록 설정
+            save_state("boot_target", {"boot_target": "main"})
             
             # print("[OK] 초기 설정 완료 - 메인화면으로 부팅 설정됨")
             
@@ -1828,29 +1809,13 @@ class PillLoadingScreen:
         try:
             print("부팅 타겟 설정 시작...")
             
-            # /data 디렉토리 존재 확인 및 생성
-            import os
-            data_dir = "/data"
-            try:
-                if data_dir not in os.listdir("/"):
-                    os.mkdir(data_dir)
-                    print("/data 디렉토리 생성됨")
-            except OSError as e:
-                if e.errno == 17:  # EEXIST - 디렉토리가 이미 존재
-                    print("/data 디렉토리가 이미 존재함")
-                    pass
-                else:
-                    raise
-            
-            # boot_target.json 파일 생성 (main.py에서 읽는 경로와 동일)
+            # 상태 저장소 boot_target 키 기록 (main.py에서 읽는 키와 동일)
             boot_config = {
                 "boot_target": "main"
             }
             
-            import json
-            boot_file = "/data/boot_target.json"
-            with open(boot_file, "w") as f:
-                json.dump(boot_config, f)
+            from kv_store import save_state
+            save_state("boot_target", boot_config)
             
             print("부팅 타겟 설정 완료: 메인화면")
             
@@ -1891,77 +1856,26 @@ class PillLoadingScreen:
             if all_disks_ready:
                 # print(f"  [INFO] 모든 디스크 모터 회전 시작 (리미트 스위치 눌림 감지 3번까지)")
                 
-                # 모든 디스크의 리미트 스위치 상태 추적 변수
-                prev_limit_states = [False, False, False]
-                current_limit_states = [False, False, False]
-                step_count = 0
                 max_steps = 8000  # 최대 8000스텝 후 강제 종료 (안전장치)
                 
-                # 초기 리미트 스위치 상태 확인 (모든 디스크)
-                for motor_idx in range(1, 4):  # 모터 번호 1, 2, 3
-                    current_limit_states[motor_idx - 1] = self.motor_system.motor_controller.is_limit_switch_pressed(motor_idx)
-                    # print(f"  [INFO] 디스크 {motor_idx} 초기 리미트 스위치 상태: {'눌림' if current_limit_states[motor_idx - 1] else '안눌림'}")
-                
-                # 초기 상태가 눌린 경우 첫 번째 감지를 무시하기 위한 플래그
-                skip_first_detections = current_limit_states.copy()
-                
                 try:
                     # 모든 디스크 동시 회전 + 리미트 스위치 감지 방식
                     motor_controller = self.motor_system.motor_controller
-                    import time
                     
                     # 모든 모터를 먼저 정지
                     motor_controller.stop_all_motors()
                     
                     # 모든 디스크를 동시에 3칸씩 이동 (리미트 스위치 감지)
-                    step_count = 0
-                    limit_released = [False, False, False]  # 각 디스크별 리미트 스위치 해제 상태
-                    compartment_count = [0, 0, 0]  # 각 디스크별 이동한 칸 수
-                    compartment_done = [False, False, False]  # 각 디스크별 3칸 이동 완료 상태
-                    counting_started = [False, False, False]  # 각 디스크별 카운트 시작 상태
+                    # 스텝 프레임은 미리 계산하여 재생하고, 리미트 스위치는 칸 가운데는 드물게, 캠 예상 위치 근처는 매 스텝 확인
+                    # 모션 엔진으로 나눠 실행하여 이동 중에도 화면 갱신 (asyncio 루프에서 다른 태스크에 양보)
+                    from motor_control import LimitMotionJob
+                    motor_controller.motor_states[4] = 0x00  # 모터4는 항상 OFF 상태로 유지
+                    job = LimitMotionJob([1, 2, 3], direction=-1, compartments=3,
+                                         delay_us=1000, max_steps=max_steps)
+                    self.motor_system.run_async(self.motor_system.run_job(job))
                     
-                    while not all(compartment_done):  # 안전장치 증가
-                        step_count += 1
-                        
-                        # 모든 모터를 동시에 1스텝씩 진행 (내부 상태만 업데이트)
-                        for motor_idx in range(1, 4):  # 모터 번호 1, 2, 3
-                            if not compartment_done[motor_idx - 1]:
-                                motor_controller.motor_steps[motor_idx] = (motor_controller.motor_steps[motor_idx] - 1) % 8
-                                current_step = motor_controller.motor_steps[motor_idx]
-                                motor_controller.motor_states[motor_idx] = motor_controller.stepper_sequence[current_step]
-                        
-                        # 모터4는 항상 OFF 상태로 유지
-                        motor_controller.motor_states[4] = 0x00
-                        
-                        motor_controller.update_motor_output()
-                        
-                        # 회전 속도 조절 (더 빠르게)
-                        time.sleep_us(1000)
-                        
-                        # 최적화: 10스텝마다만 시프트 레지스터 출력 및 리미트 스위치 감지
-                        if step_count % 50 == 0:
-                            # 모든 모터 상태를 한 번에 출력 (10스텝마다)
-                            
-                            # 리미트 스위치 상태 확인 (10스텝마다)
-                            for motor_idx in range(1, 4):  # 모터 번호 1, 2, 3
-                                if not compartment_done[motor_idx - 1]:
-                                    is_pressed = motor_controller.is_limit_switch_pressed(motor_idx)
-                                    
-                                    if not is_pressed and not limit_released[motor_idx - 1]:
-                                        # 리미트 스위치가 떼어짐 - 카운트 시작
-                                        limit_released[motor_idx - 1] = True
-                                        counting_started[motor_idx - 1] = True
-                                    elif is_pressed and limit_released[motor_idx - 1] and counting_started[motor_idx - 1]:
-                                        # 리미트 스위치가 다시 눌림 - 1칸 이동 완료
-                                        compartment_count[motor_idx - 1] += 1
-                                        limit_released[motor_idx - 1] = False  # 다음 칸을 위해 리셋
-                                        
-                                        # 3칸 이동 완료 확인 (4번째 눌림 시에 3칸으로 업데이트)
-                                        if compartment_count[motor_idx - 1] >= 3:
-                                            compartment_done[motor_idx - 1] = True
-                    
-                    # 모든 디스크가 3칸씩 이동한 후 알약 개수 업데이트 (완료된 디스크만)
-                    if all(compartment_done):
+                    # 모든 디스크가 3칸씩 이동한 후 알약 개수 업데이트 (job.failed: 걸림/캠 미감지 디스크)
+                    if not job.failed:
                         print("모든 디스크 3칸 이동 완료 - 알약 개수 업데이트")
                         for disk_idx in range(3):
                             if self._is_disk_selected(disk_idx):
@@ -2031,20 +1945,6 @@ class PillLoadingScreen:
         try:
             print("디스크 충전 상태 저장 시작...")
             
-            # /data 디렉토리 존재 확인 및 생성
-            import os
-            data_dir = "/data"
-            try:
-                if data_dir not in os.listdir("/"):
-                    os.mkdir(data_dir)
-                    print("/data 디렉토리 생성됨")
-            except OSError as e:
-                if e.errno == 17:  # EEXIST - 디렉토리가 이미 존재
-                    print("/data 디렉토리가 이미 존재함")
-                    pass
-                else:
-                    raise
-            
             # 실제로 존재하는 디스크 상태만 저장
             config = {
                 'disk_1_loaded': self.disk_states.get(0, DiskState(0)).loaded_count if 0 in self.disk_states else 0,
@@ -2053,9 +1953,8 @@ class PillLoadingScreen:
                 'saved_at': time.time()
             }
             
-            import json  # 지연 임포트
-            with open(self.disk_states_file, 'w') as f:
-                json.dump(config, f)
+            from kv_store import save_state  # 지연 임포트
+            save_state(self.disk_states_key, config)
             
             print(f"디스크 충전 상태 저장됨: 디스크1={config['disk_1_loaded']}, 디스크2={config['disk_2_loaded']}, 디스크3={config['disk_3_loaded']}")
             print("디스크 충전 상태 저장 완료")
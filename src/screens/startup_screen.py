@@ -163,8 +163,8 @@ class StartupScreen:
     def _run_calibration_async(self, motor_system):
         """비동기 원점 보정 실행 (3개 모터 동시 보정)"""
         try:
-            # 3개 디스크 동시 보정
-            if motor_system.calibrate_all_disks_simultaneous():
+            # 3개 디스크 동시 보정 (재부팅 전 저장된 위치를 신뢰할 수 있으면 보정 생략)
+            if motor_system.ensure_homed():
                 self.calibration_progress = 100
                 self.calibration_done = True
             else:
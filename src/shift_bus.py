@@ -0,0 +1,256 @@
+"""
+74HC595D / 74HC165D 공유 버스
+74HC595D(모터 출력)와 74HC165D(버튼/리미트 스위치 입력)는 SH_CP=CLK(IO3), ST_CP=PL(IO15)을 함께 쓰므로
+출력 프레임과 입력 스캔을 버스 객체 하나가 순서대로 처리
+
+    - 입력은 한 틱에 1번만 스캔하고 같은 바이트를 버튼(비트 0~3)과 리미트 스위치(비트 5~7)에 나눠줌
+      (틱: 마지막 스캔 이후 모터 프레임이 바뀌지 않았고 max_age_us가 지나지 않은 구간)
+    - 입력 클럭으로 74HC595D 시프트 레지스터가 밀리지 않도록 읽는 동안 현재 프레임을 다시 시프트
+      (다음 PL/ST_CP 상승 에지에서 같은 출력이 래치됨)
+
+버스는 모듈에 하나만 두고 get_bus()로 공유 (StepperMotorController와 ButtonInterface가 같은 객체 사용)
+"""
+
+from machine import Pin
+import time
+
+
+class BitBangShiftOutput:
+    """74HC595D 비트뱅 출력 (Pin.value + sleep_us, 비트당 핀 쓰기 3회)"""
+
+    PULSE_WIDTH_USEC = 5  # 74HC165D 읽기 펄스 폭
+
+    def __init__(self, di_pin=2, sh_cp_pin=3, st_cp_pin=15, data_out_pin=10):
+        """74HC595D 핀 설정 (data_out_pin: 74HC165D Q7)"""
+        self.di = Pin(di_pin, Pin.OUT)
+        self.sh_cp = Pin(sh_cp_pin, Pin.OUT)
+        self.st_cp = Pin(st_cp_pin, Pin.OUT)
+        self.q7 = Pin(data_out_pin, Pin.IN)
+
+        # 74HC595D 시프트 레지스터에 들어 있는 16비트 (읽기 중 다시 시프트할 값)
+        self._frame = bytearray(2)
+        self.writes = 0  # latch 횟수 (입력 캐시 무효화 기준)
+
+        # 초기 상태 설정
+        self.di.value(0)
+        self.sh_cp.value(0)
+        self.st_cp.value(0)
+
+    def shift_byte(self, data, latch=True):
+        """8비트 데이터 전송 (MSB first, latch=False이면 시프트만 수행)"""
+        for i in range(8):
+            # MSB first
+            bit = (data >> (7 - i)) & 1
+            self.di.value(bit)
+            time.sleep_us(1)  # 타이밍 안정화를 위한 딜레이
+
+            # Shift clock pulse (타이밍 안정화)
+            self.sh_cp.value(1)
+            time.sleep_us(1)  # 타이밍 안정화를 위한 딜레이
+            self.sh_cp.value(0)
+            time.sleep_us(1)  # 타이밍 안정화를 위한 딜레이
+        frame = self._frame
+        frame[0] = frame[1]
+        frame[1] = data
+
+        # Storage clock pulse (latch) - latch=True일 때만 수행
+        if latch:
+            self.st_cp.value(1)
+            time.sleep_us(1)  # 타이밍 안정화를 위한 딜레이
+            self.st_cp.value(0)
+            time.sleep_us(1)  # 타이밍 안정화를 위한 딜레이
+            self.writes += 1
+
+    def write_frame(self, upper_byte, lower_byte):
+        """16비트 프레임 전송 (상위 바이트 먼저, 마지막에 한 번만 latch)"""
+        # 상위 바이트 전송 (모터 3, 4 포함) - 두 번째 칩으로 전송
+        self.shift_byte(upper_byte, latch=False)
+        # 두 번째 칩으로 데이터가 전파되는 시간 확보 (시프트 레지스터 체인 지연)
+        time.sleep_us(10)  # 바이트 전송 간 추가 딜레이 (모터 4 안정화)
+
+        # 하위 바이트 전송 (모터 1, 2 포함) - 첫 번째 칩으로 전송
+        self.shift_byte(lower_byte, latch=True)
+
+        # Latch 후 안정화 시간 (모든 출력 핀이 안정화될 때까지 대기)
+        time.sleep_us(10)  # 최종 출력 안정화를 위한 추가 딜레이 (모터 4 포함)
+
+    def read_input(self):
+        """74HC165D 1바이트 읽기 (SpiShiftOutput.read_input과 같은 순서)
+
+        PL(=ST_CP) 펄스로 입력을 래치한 뒤 8비트를 읽고, 클럭마다 DI에 현재 프레임 비트를 내보내
+        16클럭 후 74HC595D 시프트 레지스터가 원래 프레임으로 돌아오게 함
+        """
+        pulse = self.PULSE_WIDTH_USEC
+        di = self.di
+        sh_cp = self.sh_cp
+        q7 = self.q7
+        frame = (self._frame[0] << 8) | self._frame[1]
+
+        # 병렬 입력을 래치 (ST_CP 상승 에지는 시프트 레지스터 = 현재 프레임이므로 출력 변화 없음)
+        self.st_cp.value(0)  # Load data (Active LOW)
+        time.sleep_us(pulse)
+        self.st_cp.value(1)  # Stop loading
+        time.sleep_us(pulse)
+
+        # 직렬 데이터 읽기 (앞 8클럭) + 프레임 다시 시프트 (16클럭)
+        value = 0
+        for i in range(16):
+            if i < 8:
+                value = (value << 1) | q7.value()
+            di.value((frame >> (15 - i)) & 1)
+            sh_cp.value(1)
+            time.sleep_us(pulse if i < 8 else 1)
+            sh_cp.value(0)
+            time.sleep_us(pulse if i < 8 else 1)
+
+        # PL(=74HC595D ST_CP)을 LOW로 되돌려 다음 모터 출력 latch가 상승 에지가 되도록 함
+        self.st_cp.value(0)
+        return value
+
+
+class SpiShiftOutput:
+    """74HC595D SPI 출력 (2바이트 프레임을 spi.write 1회로 전송 후 latch 1회)
+
+    SCK=SH_CP(IO3), MOSI=DI(IO2), MISO=74HC165D Q7(IO10)을 SPI 버스에 연결하므로
+    74HC165D 읽기도 같은 버스로 수행해야 함 (read_input)
+    """
+
+    def __init__(self, spi, st_cp_pin=15):
+        """SPI 버스와 latch(ST_CP) 핀 설정"""
+        self.spi = spi
+        self.st_cp = Pin(st_cp_pin, Pin.OUT)
+        self.st_cp.value(0)
+
+        # 프레임/수신 버퍼 미리 할당 (스텝마다 할당하지 않음)
+        self._frame = bytearray(2)
+        self._rx = bytearray(2)
+        self._byte = bytearray(1)
+        self.writes = 0  # latch 횟수 (입력 캐시 무효화 기준)
+
+    def shift_byte(self, data, latch=True):
+        """8비트 데이터 전송 (latch=False이면 시프트만 수행)"""
+        self._byte[0] = data
+        self.spi.write(self._byte)
+        frame = self._frame
+        frame[0] = frame[1]
+        frame[1] = data
+        if latch:
+            self.st_cp.value(1)
+            self.st_cp.value(0)
+            self.writes += 1
+
+    def write_frame(self, upper_byte, lower_byte):
+        """16비트 프레임 전송 (상위 바이트 먼저, latch 1회)"""
+        frame = self._frame
+        frame[0] = upper_byte
+        frame[1] = lower_byte
+        self.spi.write(frame)
+        self.st_cp.value(1)
+        self.st_cp.value(0)
+        self.writes += 1
+
+    def read_input(self):
+        """74HC165D 1바이트 읽기
+
+        PL(=ST_CP) 펄스로 입력을 래치한 뒤, 읽는 동안 현재 프레임을 다시 시프트하여
+        74HC595D 시프트 레지스터 내용을 유지 (다음 PL 상승 에지에서 같은 출력이 래치됨)
+        """
+        self.st_cp.value(0)  # Load data (Active LOW)
+        self.st_cp.value(1)  # Stop loading
+        self.spi.write_readinto(self._frame, self._rx)
+        # ST_CP를 LOW로 되돌려 다음 write_frame의 latch가 상승 에지가 되도록 함
+        # (HIGH로 두면 다음 프레임이 다음 읽기 때까지 래치되지 않아 정지/리미트 판단이 1스텝 늦어짐)
+        self.st_cp.value(0)
+        return self._rx[0]
+
+
+class ShiftBus:
+    """74HC595D 출력 / 74HC165D 입력 버스 중재 (출력 방식별 백엔드를 감싸 읽기/쓰기를 순서대로 처리)"""
+
+    def __init__(self, output, mode="bitbang", max_age_us=2000):
+        """
+        Args:
+            output: BitBangShiftOutput 또는 SpiShiftOutput
+            mode: 출력 방식 이름 ("bitbang", "softspi", "spi")
+            max_age_us: 모터 프레임이 바뀌지 않아도 이 시간이 지나면 다시 스캔
+        """
+        self.output = output
+        self.mode = mode
+        self.max_age_us = max_age_us
+        self.busy = False        # 프레임 전송/입력 스캔 중 (타이머 예약 작업은 이때 버스를 건드리지 않음)
+        self.inputs = 0xFF       # 마지막으로 스캔한 입력 바이트 (눌림 = 0)
+        self.scans = 0           # 실제 스캔 횟수
+        self.cached_reads = 0    # 스캔 없이 캐시로 응답한 횟수
+        self._scan_writes = -1   # 스캔 시점의 출력 latch 횟수
+        self._scan_time = 0
+
+    def write_frame(self, upper_byte, lower_byte):
+        """16비트 프레임 전송 (스텝 재생 루프는 속도를 위해 output.write_frame을 직접 사용)"""
+        self.busy = True
+        try:
+            self.output.write_frame(upper_byte, lower_byte)
+        finally:
+            self.busy = False
+
+    def scan(self):
+        """입력 스캔 (새 틱 시작), 입력 바이트 반환"""
+        self.busy = True
+        try:
+            value = self.output.read_input()
+        finally:
+            self.busy = False
+        self.inputs = value
+        self.scans += 1
+        self._scan_writes = self.output.writes
+        self._scan_time = time.ticks_us()
+        return value
+
+    def read_inputs(self):
+        """이번 틱의 입력 바이트 (이미 스캔했으면 캐시, 모터 프레임이 바뀌었거나 max_age_us가 지났으면 다시 스캔)"""
+        if (self.output.writes == self._scan_writes and
+                time.ticks_diff(time.ticks_us(), self._scan_time) < self.max_age_us):
+            self.cached_reads += 1
+            return self.inputs
+        return self.scan()
+
+    def is_low(self, bit_position):
+        """입력 비트가 LOW인지 (버튼/리미트 스위치 눌림)"""
+        return not self.read_inputs() & (1 << bit_position)
+
+    def invalidate(self):
+        """캐시 무효화 (다음 read_inputs에서 다시 스캔)"""
+        self._scan_writes = -1
+
+
+_bus = None
+
+
+def create_bus(output="bitbang", di_pin=2, sh_cp_pin=3, st_cp_pin=15, data_out_pin=10,
+               spi_id=1, spi_baudrate=1000000):
+    """출력 방식에 맞는 버스 생성 (StepperMotorController 출력 방식 참고)"""
+    if output == "bitbang":
+        return ShiftBus(BitBangShiftOutput(di_pin, sh_cp_pin, st_cp_pin, data_out_pin), output)
+    if output in ("spi", "softspi"):
+        from machine import SPI, SoftSPI
+        if output == "spi":
+            spi = SPI(spi_id, baudrate=spi_baudrate, polarity=0, phase=0,
+                      sck=Pin(sh_cp_pin), mosi=Pin(di_pin), miso=Pin(data_out_pin))
+        else:
+            spi = SoftSPI(baudrate=spi_baudrate, polarity=0, phase=0,
+                          sck=Pin(sh_cp_pin), mosi=Pin(di_pin), miso=Pin(data_out_pin))
+        return ShiftBus(SpiShiftOutput(spi, st_cp_pin), output)
+    raise ValueError("지원하지 않는 출력 방식: " + str(output))
+
+
+def get_bus(output=None, **pins):
+    """공유 버스 (없으면 생성, output이 지정되고 현재 버스와 다르면 새로 생성하여 교체)"""
+    global _bus
+    if _bus is None or (output is not None and output != _bus.mode):
+        _bus = create_bus(output or "bitbang", **pins)
+    return _bus
+
+
+def reset_bus():
+    """공유 버스 해제 (다음 get_bus에서 새로 생성, 호스트 시뮬레이션 시나리오 사이에 사용)"""
+    global _bus
+    _bus = None
@@ -0,0 +1,126 @@
+"""
+스텝 간격 계측 (모터 재생 루프의 실제 프레임 간격 히스토그램)
+motor_control.STEP_TIMING = const(1)로 빌드했을 때만 재생 루프에서 호출됨 (0이면 계측 코드가 컴파일 단계에서 제거)
+
+    controller.enable_step_timing()      # StepperMotorController
+    ... 이동 ...
+    controller.step_timing.dump()        # 시리얼로 출력 → tests/bench_step_jitter.py <로그 파일>로 그래프 확인
+
+mark()는 할당 없이 미리 만든 array('H') 히스토그램(bin = 2^shift us)에 ticks_us 간격을 더하고,
+이동이 끝나면(end) 요약(개수, 최소, 평균, p99, 최대, 구간 끊김 수)을 최근 이동 목록에 남김
+"""
+
+from array import array
+import time
+
+MAX_MOVES = 8  # 보관할 최근 이동 요약 수
+
+
+class StepTiming:
+    """스텝 간격 기록기 (이동 1개씩 begin → mark x N → end)"""
+
+    def __init__(self, shift=4, bins=256):
+        """
+        Args:
+            shift: 히스토그램 bin 폭 2^shift us (기본 16us)
+            bins: bin 개수 (마지막 bin은 그 이상 모두, 기본 256개 = 4ms까지)
+        """
+        self.shift = shift
+        self.bins = bins
+        self.hist = array('H', bytes(2 * bins))   # 현재(마지막) 이동
+        self.total = array('H', bytes(2 * bins))  # enable 이후 전체
+        self.moves = [None] * MAX_MOVES            # 최근 이동 요약 (순환)
+        self.move_count = 0
+        self.label = None
+        self._last = -1
+        self._reset_move()
+
+    def _reset_move(self):
+        hist = self.hist
+        for i in range(self.bins):
+            hist[i] = 0
+        self.count = 0
+        self.min_us = 0
+        self.max_us = 0
+        self.sum_us = 0
+        self.gaps = 0
+
+    def begin(self, label):
+        """새 이동 시작 (label: 요약에 남길 문자열 상수)"""
+        self._reset_move()
+        self.label = label
+        self._last = -1
+
+    def resume(self):
+        """나눠서 실행하는 이동의 다음 구간 시작 (구간 사이 쉬는 시간은 간격에 넣지 않음)"""
+        if self._last >= 0:
+            self.gaps += 1
+        self._last = -1
+
+    def mark(self):
+        """프레임 1개 출력 직전 호출 (직전 프레임과의 간격 기록, 할당 없음)"""
+        now = time.ticks_us()
+        last = self._last
+        self._last = now
+        if last < 0:
+            return
+        d = time.ticks_diff(now, last)
+        i = d >> self.shift
+        if i >= self.bins:
+            i = self.bins - 1
+        hist = self.hist
+        if hist[i] < 0xFFFF:
+            hist[i] += 1
+        if self.count == 0 or d < self.min_us:
+            self.min_us = d
+        if d > self.max_us:
+            self.max_us = d
+        self.sum_us += d
+        self.count += 1
+
+    def end(self):
+        """이동 끝: 요약을 최근 이동 목록에 추가하고 전체 히스토그램에 합침"""
+        hist = self.hist
+        total = self.total
+        for i in range(self.bins):
+            if hist[i]:
+                total[i] = min(0xFFFF, total[i] + hist[i])
+        self.moves[self.move_count % MAX_MOVES] = self.summary()
+        self.move_count += 1
+        self._last = -1
+
+    def percentile(self, p, hist=None):
+        """히스토그램 기준 p(0~100) 백분위 간격 (해당 bin의 상한, us)"""
+        hist = self.hist if hist is None else hist
+        count = 0
+        for n in hist:
+            count += n
+        if not count:
+            return 0
+        target = (count * p + 99) // 100
+        seen = 0
+        for i in range(self.bins):
+            seen += hist[i]
+            if seen >= target:
+                return ((i + 1) << self.shift) - 1
+        return (self.bins << self.shift) - 1
+
+    def summary(self):
+        """현재 이동 요약 (label, 개수, 최소, 평균, p99, 최대, 구간 끊김 수)"""
+        count = self.count
+        p99 = min(self.percentile(99), self.max_us) if count else 0
+        return (self.label, count, self.min_us, self.sum_us // count if count else 0, p99, self.max_us, self.gaps)
+
+    def recent(self):
+        """최근 이동 요약 목록 (오래된 것부터)"""
+        n = min(self.move_count, MAX_MOVES)
+        return [self.moves[(self.move_count - n + k) % MAX_MOVES] for k in range(n)]
+
+    def dump(self):
+        """최근 이동 요약과 마지막 이동/전체 히스토그램 출력 (tests/bench_step_jitter.py가 읽는 형식)"""
+        for label, count, min_us, mean_us, p99_us, max_us, gaps in self.recent():
+            print("STEPTIME move %s n=%d min=%d mean=%d p99=%d max=%d gaps=%d" %
+                  (label, count, min_us, mean_us, p99_us, max_us, gaps))
+        for name, hist in (("last", self.hist), ("total", self.total)):
+            bins = " ".join("%d:%d" % (i, n) for i, n in enumerate(hist) if n)
+            print("STEPTIME hist %s shift=%d %s" % (name, self.shift, bins))
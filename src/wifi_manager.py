@@ -5,7 +5,6 @@ ESP32의 WiFi 기능을 활용한 네트워크 스캔, 연결, 관리
 
 import network
 import time
-import json
 import ntptime
 
 class WiFiManager:
@@ -20,8 +19,9 @@ class WiFiManager:
         # print("📡 WiFi 초기화 중... (0.2초 대기)")
         time.sleep(0.2)
         
-        # WiFi 설정 저장 파일
+        # WiFi 설정 저장 (상태 저장소 wifi_config 키, 기존 파일은 처음 읽을 때 이전)
         self.config_file = "/data/wifi_config.json"
+        self._config = None  # 저장소 어댑터 (지연 생성)
         
         # 스캔된 네트워크 목록
         self.scanned_networks = []
@@ -216,32 +216,23 @@ class WiFiManager:
                 return network['signal']
         return 0
     
+    def _config_store(self):
+        """WiFi 설정 저장소 어댑터 반환 (처음 호출 시 생성)"""
+        if self._config is None:
+            from kv_store import get_kv_store, LegacyJsonKey
+            self._config = LegacyJsonKey(get_kv_store(), "wifi_config", self.config_file)
+        return self._config
+    
     def _save_config(self, ssid, password):
-        """WiFi 설정을 파일에 저장"""
+        """WiFi 설정을 상태 저장소에 저장"""
         try:
-            import os
-            
-            # /data 디렉토리 존재 확인 및 생성
-            data_dir = "/data"
-            try:
-                if data_dir not in os.listdir("/"):
-                    os.mkdir(data_dir)
-                    # print(f"[INFO] /data 디렉토리 생성됨")
-            except OSError as e:
-                if e.errno == 17:  # EEXIST - 디렉토리가 이미 존재
-                    # print(f"[INFO] /data 디렉토리가 이미 존재함")
-                    pass
-                else:
-                    raise
-            
             config = {
                 'ssid': ssid,
                 'password': password,
                 'saved_at': time.time()
             }
             
-            with open(self.config_file, 'w') as f:
-                json.dump(config, f)
+            self._config_store().save(config)
             
             # print(f"[SAVE] WiFi 설정 저장됨: {ssid}")
             
@@ -252,23 +243,7 @@ class WiFiManager:
     def _load_saved_config(self):
         """저장된 WiFi 설정 불러오기"""
         try:
-            import os
-            
-            # /data 디렉토리 존재 확인 및 생성
-            data_dir = "/data"
-            try:
-                if data_dir not in os.listdir("/"):
-                    os.mkdir(data_dir)
-                    # print(f"[INFO] /data 디렉토리 생성됨")
-            except OSError as e:
-                if e.errno == 17:  # EEXIST - 디렉토리가 이미 존재
-                    # print(f"[INFO] /data 디렉토리가 이미 존재함")
-                    pass
-                else:
-                    raise
-            
-            with open(self.config_file, 'r') as f:
-                config = json.load(f)
+            config = self._config_store().load({})
             
             ssid = config.get('ssid', '')
             password = config.get('password', '')
@@ -285,23 +260,7 @@ class WiFiManager:
     def try_auto_connect(self, timeout=5000):
         """저장된 WiFi 설정으로 자동 연결 시도 (Public 메서드)"""
         try:
-            import os
-            
-            # /data 디렉토리 존재 확인 및 생성
-            data_dir = "/data"
-            try:
-                if data_dir not in os.listdir("/"):
-                    os.mkdir(data_dir)
-                    # print(f"[INFO] /data 디렉토리 생성됨")
-            except OSError as e:
-                if e.errno == 17:  # EEXIST - 디렉토리가 이미 존재
-                    # print(f"[INFO] /data 디렉토리가 이미 존재함")
-                    pass
-                else:
-                    raise
-            
-            with open(self.config_file, 'r') as f:
-                config = json.load(f)
+            config = self._config_store().load({})
             
             ssid = config.get('ssid', '')
             password = config.get('password', '')
@@ -321,8 +280,7 @@ class WiFiManager:
     def forget_network(self):
         """저장된 WiFi 설정 삭제"""
         try:
-            import os
-            os.remove(self.config_file)
+            self._config_store().remove()
             self.disconnect()
             # print("🗑️ WiFi 설정 삭제됨")
         except Exception as e:
@@ -332,30 +290,14 @@ class WiFiManager:
     def forget_specific_network(self, ssid):
         """특정 네트워크의 연결 정보 삭제"""
         try:
-            import os
-            
-            # /data 디렉토리 존재 확인 및 생성
-            data_dir = "/data"
-            try:
-                if data_dir not in os.listdir("/"):
-                    os.mkdir(data_dir)
-                    # print(f"[INFO] /data 디렉토리 생성됨")
-            except OSError as e:
-                if e.errno == 17:  # EEXIST - 디렉토리가 이미 존재
-                    # print(f"[INFO] /data 디렉토리가 이미 존재함")
-                    pass
-                else:
-                    raise
-            
             # 현재 저장된 설정 확인
             try:
-                with open(self.config_file, 'r') as f:
-                    config = json.load(f)
+                config = self._config_store().load({})
                 saved_ssid = config.get('ssid', '')
                 
                 # 요청한 SSID와 저장된 SSID가 일치하면 삭제
                 if saved_ssid == ssid:
-                    os.remove(self.config_file)
+                    self._config_store().remove()
                     self.disconnect()
                     # print(f"🗑️ {ssid} 네트워크 연결 정보 삭제됨")
                     return True
@@ -372,23 +314,7 @@ class WiFiManager:
     def get_saved_password(self, ssid):
         """저장된 비밀번호 확인"""
         try:
-            import os
-            
-            # /data 디렉토리 존재 확인 및 생성
-            data_dir = "/data"
-            try:
-                if data_dir not in os.listdir("/"):
-                    os.mkdir(data_dir)
-                    # print(f"[INFO] /data 디렉토리 생성됨")
-            except OSError as e:
-                if e.errno == 17:  # EEXIST - 디렉토리가 이미 존재
-                    # print(f"[INFO] /data 디렉토리가 이미 존재함")
-                    pass
-                else:
-                    raise
-            
-            with open(self.config_file, 'r') as f:
-                config = json.load(f)
+            config = self._config_store().load({})
             
             saved_ssid = config.get('ssid', '')
             saved_password = config.get('password', '')
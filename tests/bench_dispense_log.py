@@ -0,0 +1,186 @@
+"""
+배출 기록 저장 벤치마크 (호스트 PC용, CPython)
+기존 JSON 전체 재작성 방식과 링버퍼(dispense_log.bin) 방식의
+배출 1회당 쓰기 지연시간과 플래시 기록 바이트 수 비교
+
+실행: python tests/bench_dispense_log.py
+"""
+
+import builtins
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+
+from data_manager import DataManager  # noqa: E402
+
+DISPENSE_COUNT = 300
+SAMPLE_LOG_FILE = os.path.join(SRC_DIR, "data", "dispense_log.json")
+
+
+class WriteCounter:
+    """builtins.open을 감싸서 쓰기 바이트 수와 쓰기 모드 파일 열기 횟수 집계"""
+
+    def __init__(self):
+        self.bytes_written = 0
+        self.files_written = 0
+        self._original_open = builtins.open
+
+    def __enter__(self):
+        counter = self
+        original_open = self._original_open
+
+        class CountingFile:
+            def __init__(self, f):
+                self._f = f
+
+            def write(self, data):
+                counter.bytes_written += len(data)
+                return self._f.write(data)
+
+            def __getattr__(self, name):
+                return getattr(self._f, name)
+
+            def __iter__(self):
+                return iter(self._f)
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                self._f.close()
+
+        def counting_open(file, mode='r', *args, **kwargs):
+            if 'w' in mode or 'a' in mode or '+' in mode:
+                counter.files_written += 1
+            return CountingFile(original_open(file, mode, *args, **kwargs))
+
+        builtins.open = counting_open
+        return self
+
+    def __exit__(self, *args):
+        builtins.open = self._original_open
+
+
+def legacy_log_dispense(log_file, dose_index, success):
+    """기존 DataManager.log_dispense 방식 (전체 로드 → 추가 → 100개 유지 → 전체 저장)"""
+    try:
+        with open(log_file, 'r') as f:
+            logs = json.load(f)
+    except OSError:
+        logs = []
+    t = time.localtime()
+    logs.append({
+        "timestamp": f"{t[0]:04d}-{t[1]:02d}-{t[2]:02d}T{t[3]:02d}:{t[4]:02d}:{t[5]:02d}",
+        "dose_index": dose_index,
+        "success": success,
+        "date": f"{t[0]:04d}-{t[1]:02d}-{t[2]:02d}",
+        "time": f"{t[3]:02d}:{t[4]:02d}:{t[5]:02d}"
+    })
+    if len(logs) > 100:
+        logs = logs[-100:]
+    with open(log_file, 'w') as f:
+        json.dump(logs, f)
+
+
+def run(name, fn):
+    """배출 기록 DISPENSE_COUNT회 실행 후 결과 반환"""
+    with WriteCounter() as counter:
+        start = time.perf_counter()
+        for i in range(DISPENSE_COUNT):
+            fn(i % 3, True)
+        elapsed = time.perf_counter() - start
+    return {
+        "name": name,
+        "avg_us": elapsed / DISPENSE_COUNT * 1e6,
+        "bytes_per_dispense": counter.bytes_written / DISPENSE_COUNT,
+    }
+
+
+def check_migration_retry(work_dir, expected):
+    """마이그레이션이 중단된 경우 다음 링버퍼 로드에서 다시 이전되는지 확인
+
+    1. ring.extend 중 예외: JSON 파일 유지 → 다음 로드에서 이전 후 삭제
+    2. extend 후 JSON 삭제 전 전원 차단 (그 뒤 새 배출 1회): 중복 없이 합쳐지고 새 기록이 최신
+    """
+    from dispense_log import DispenseLogRing
+
+    retry_dir = os.path.join(work_dir, "retry")
+    os.mkdir(retry_dir)
+    json_file = os.path.join(retry_dir, "dispense_log.json")
+    shutil.copy(SAMPLE_LOG_FILE, json_file)
+
+    original_extend = DispenseLogRing.extend
+
+    def failing_extend(self, records):
+        raise OSError("simulated write failure")
+
+    DispenseLogRing.extend = failing_extend
+    try:
+        count = DataManager(retry_dir)._get_dispense_ring().count
+    finally:
+        DispenseLogRing.extend = original_extend
+    kept = count == 0 and os.path.exists(json_file)
+
+    count = DataManager(retry_dir)._get_dispense_ring().count
+    retried = count == expected and not os.path.exists(json_file)
+
+    data_manager = DataManager(retry_dir)
+    data_manager._get_current_time = lambda: (2099, 1, 1, 0, 0, 0, 0, 0)
+    data_manager.log_dispense(2, True)
+    shutil.copy(SAMPLE_LOG_FILE, json_file)
+    ring = DataManager(retry_dir)._get_dispense_ring()
+    merged = (ring.count == expected + 1 and not os.path.exists(json_file)
+              and ring.read_recent(1)[0]["dose_index"] == 2)
+
+    for ok, name in ((kept, "기록 실패 시 JSON 유지"), (retried, "다음 로드에서 재이전 후 삭제"),
+                     (merged, "중단 후 재이전: 중복 없음, 새 기록이 최신")):
+        print(f"  {'OK ' if ok else 'FAIL'} {name}")
+    return kept and retried and merged
+
+
+def main():
+    print("배출 기록 저장 벤치마크")
+    print("=" * 60)
+
+    work_dir = tempfile.mkdtemp(prefix="pillbox_bench_")
+    try:
+        # 기존 방식: 샘플 로그에서 시작
+        legacy_file = os.path.join(work_dir, "legacy_dispense_log.json")
+        shutil.copy(SAMPLE_LOG_FILE, legacy_file)
+        legacy = run("JSON 전체 재작성", lambda d, s: legacy_log_dispense(legacy_file, d, s))
+
+        # 링버퍼 방식: 같은 샘플 로그를 마이그레이션한 뒤 시작
+        ring_dir = os.path.join(work_dir, "ring")
+        os.mkdir(ring_dir)
+        shutil.copy(SAMPLE_LOG_FILE, os.path.join(ring_dir, "dispense_log.json"))
+        data_manager = DataManager(ring_dir)
+        # 호스트에는 WiFi 매니저(NTP 시간)가 없으므로 시스템 시간 사용 (기존 방식과 동일 조건)
+        data_manager._get_current_time = lambda: time.localtime()[:8]
+        migrated = data_manager._get_dispense_ring().count
+        ring = run("링버퍼", data_manager.log_dispense)
+
+        for result in (legacy, ring):
+            print(f"{result['name']:<16} 평균 {result['avg_us']:8.1f} us/회, "
+                  f"기록 {result['bytes_per_dispense']:8.1f} bytes/회")
+
+        print("-" * 60)
+        print(f"마이그레이션된 기존 기록: {migrated}개")
+        print(f"링버퍼 보관 기록: {data_manager._get_dispense_ring().count}개 "
+              f"(용량 {data_manager._get_dispense_ring().capacity}개, JSON 방식은 100개)")
+        print(f"기록 바이트 감소: {legacy['bytes_per_dispense'] / ring['bytes_per_dispense']:.0f}배")
+        print("-" * 60)
+        print("중단된 마이그레이션 재시도")
+        ok = check_migration_retry(work_dir, migrated)
+    finally:
+        shutil.rmtree(work_dir)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+복용 1회 배출 시간 비교 (호스트 PC용, CPython + tests/hostsim)
+
+    디스크 1~3개를 배출하는 복용 1회를 두 방식으로 실행하여 시뮬레이션 시계 기준 시간 비교
+      - 순차: 디스크마다 rotate_disk(1칸 + 500ms) → 100ms → (첫 디스크만 도어 열기 + 100ms) → 2초 → 다음 디스크 전 1초
+      - 동시: advance_disks(모든 디스크 함께 1칸, 디스크별 리미트 스위치로 정지 + 500ms 1번) → 100ms → 도어 → 100ms → 2초
+    디스크마다 캠까지 남은 스텝이 다르도록 시작 위치를 다르게 두고,
+    두 방식의 최종 모터 위치가 같은지(각 디스크가 자기 리미트 스위치에서 정지) 확인
+    블로킹 실행(idle_callback=None)과 기기 기본 경로(엔진 구간 사이마다 RENDER_US 화면 갱신) 모두 측정
+
+실행: python tests/bench_dose_latency.py
+"""
+
+import os
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(TESTS_DIR, "..", "src")
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, TESTS_DIR)
+
+import hostsim  # noqa: E402
+
+clock = hostsim.install()
+
+from hostsim.board import PillboxBoard  # noqa: E402
+from motor_control import PillBoxMotorSystem  # noqa: E402
+
+CAM_OFFSETS = {1: 0, 2: 90, 3: 181}  # 디스크별 시작 위치 (캠까지 남은 스텝이 서로 다름)
+DOOR_LEVEL = 1
+DOSES = ([1], [1, 2], [1, 2, 3])
+RENDER_US = 15000  # 화면 갱신 1회 비용 (lv.timer_handler)
+
+
+def make_system(render_us=None):
+    """render_us=None이면 화면 갱신 없이 블로킹 실행, 아니면 엔진 구간 사이마다 render_us 화면 갱신"""
+    board = PillboxBoard(cam_offsets=CAM_OFFSETS)
+    system = PillBoxMotorSystem(state_path=None)
+    system.idle_callback = None if render_us is None else (lambda: clock.advance_us(render_us))
+    return system, board.steppers
+
+
+def sequential_dose(system, disks):
+    """기존 순차 배출 순서"""
+    for i, disk_num in enumerate(disks):
+        assert system.rotate_disk(disk_num, 1)
+        system.wait_ms(100)
+        if i == 0:
+            assert system.open_door_to_level(DOOR_LEVEL)
+            system.wait_ms(100)
+        system.wait_ms(2000)
+        if i < len(disks) - 1:
+            system.wait_ms(1000)
+
+
+def coordinated_dose(system, disks):
+    """동시 배출 순서 (MainScreen._dispense_from_selected_disks_async와 같은 순서)"""
+    assert system.advance_disks(disks, 1)
+    system.wait_ms(100)
+    assert system.open_door_to_level(DOOR_LEVEL)
+    system.wait_ms(100)
+    system.wait_ms(2000)
+
+
+def run(dose, disks, render_us=None):
+    """(경과 ms, 디스크 이동 ms, 모델 위치, 칸 위치, 코일 OFF 여부)"""
+    system, steppers = make_system(render_us)
+    last_move = {}
+    for m in disks:
+        steppers[m].listeners.append(lambda position, m=m: last_move.__setitem__(m, clock.now_us))
+    start = clock.now_us
+    dose(system, disks)
+    elapsed_ms = (clock.now_us - start) / 1000
+    move_ms = (max(last_move.values()) - start) / 1000
+    positions = {m: steppers[m].position for m in disks}
+    coils_off = not any(stepper.energized for stepper in steppers.values())
+    return elapsed_ms, move_ms, positions, list(system.motor_controller.motor_positions[1:4]), coils_off
+
+
+def compare(render_us):
+    """순차 vs 동시 표 출력, 검사 통과 여부"""
+    print(f"{'디스크':<12}{'순차 ms':>10}{'동시 ms':>10}{'단축 %':>8}{'동시 이동 ms':>14}  위치")
+    ok = True
+    for disks in DOSES:
+        seq_ms, _, seq_positions, seq_slots, _ = run(sequential_dose, disks, render_us)
+        co_ms, move_ms, positions, slots, coils_off = run(coordinated_dose, disks, render_us)
+        same = positions == seq_positions and slots == seq_slots
+        # 디스크별 자기 캠에서 정지: 캠까지 남은 스텝 (시작 위치가 이미 눌린 디스크는 다음 칸 273스텝)
+        expected = {m: -(273 - CAM_OFFSETS[m]) for m in disks}
+        at_cam = positions == expected
+        saved = (1 - co_ms / seq_ms) * 100
+        ok = ok and same and at_cam and coils_off and (co_ms < seq_ms or len(disks) == 1)
+        print(f"{str(disks):<12}{seq_ms:>10.0f}{co_ms:>10.0f}{saved:>8.1f}{move_ms:>14.1f}  {positions}"
+              f"{'' if same and at_cam else ' (불일치)'}")
+    return ok
+
+
+def main():
+    print("복용 1회 배출 시간: 순차 vs 동시 이동")
+    print("=" * 78)
+    print("블로킹 실행 (화면 갱신 없음)")
+    ok = compare(None)
+    print(f"나눠 실행 (기기 기본 경로, 구간마다 화면 갱신 {RENDER_US / 1000:.0f} ms)")
+    ok = compare(RENDER_US) and ok
+
+    # 3개 디스크 복용 1회 = 가장 먼 디스크 1칸 이동 + 약 낙하 대기 1번 + 도어 + 대기: 1개 디스크와의 차이는 이동 시간 차이뿐
+    one_ms = run(coordinated_dose, [1])[0]
+    three_ms = run(coordinated_dose, [1, 2, 3])[0]
+    overhead_ms = three_ms - one_ms
+    ok = ok and overhead_ms < 50
+    print("-" * 78)
+    print(f"디스크 3개 - 1개 동시 배출 시간 차이: {overhead_ms:.1f} ms")
+    print("동시 배출: 디스크 수와 관계없이 이동 1번 + 약 낙하 대기 1번" if ok else "배출 시간 검사 실패")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+스트리밍 JSON 읽기 최대 메모리 벤치마크 (호스트 PC용, CPython)
+30일 운용 분량의 데이터 파일을 만들어 json.load 전체 로드와
+json_stream 부분 파싱의 최대 할당량(tracemalloc peak)과 시간 비교
+
+CPython의 json.load는 파일 전체 문자열을 먼저 읽으므로 MicroPython보다 수치가 크게 나오지만,
+전체 객체 그래프 대비 필요한 값만 만드는 차이는 두 환경에서 같음
+스트리밍 파서는 파이썬 코드라 C 구현 json.load보다 느리므로 값 일부만 필요한 경로에만 사용함
+
+실행: python tests/bench_json_stream.py
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+
+from dispense_log import log_to_record  # noqa: E402
+from json_stream import iter_items, load_path  # noqa: E402
+
+DAYS = 30
+DOSE_TIMES = ("08:00", "12:30", "19:00")
+SAMPLE_DIR = os.path.join(SRC_DIR, "data")
+
+
+def make_30_day_files(data_dir):
+    """하루 3회 배출, 디스크별 하루 2회 충전 기준 30일 데이터 파일 생성"""
+    logs = []
+    refills = []
+    for day in range(1, DAYS + 1):
+        date_str = f"2025-11-{day:02d}"
+        for dose_index, dose_time in enumerate(DOSE_TIMES):
+            logs.append({
+                "timestamp": f"{date_str}T{dose_time}:05",
+                "dose_index": dose_index,
+                "success": True,
+                "date": date_str,
+                "time": f"{dose_time}:05",
+            })
+        for disk in (1, 2, 3):
+            for refill in range(2):
+                refills.append({"disk": disk, "timestamp": f"{date_str}T09:{refill * 10 + disk:02d}:00",
+                                "count": 15 - refill})
+
+    with open(os.path.join(SAMPLE_DIR, "medication.json")) as f:
+        medication = json.load(f)
+    medication["refill_history"] = refills
+
+    with open(os.path.join(data_dir, "dispense_log.json"), "w") as f:
+        json.dump(logs, f)
+    with open(os.path.join(data_dir, "medication.json"), "w") as f:
+        json.dump(medication, f)
+
+
+def measure(fn, repeat=20):
+    """최대 할당량(bytes)과 1회 평균 시간(us) 측정"""
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = (time.perf_counter() - start) / repeat
+    return result, peak, elapsed * 1e6
+
+
+def full_load(path):
+    """기존 방식: 파일 전체 로드"""
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    print(f"스트리밍 JSON 읽기 벤치마크 ({DAYS}일 데이터)")
+    print("=" * 78)
+
+    data_dir = tempfile.mkdtemp(prefix="pillbox_json_bench_")
+    try:
+        make_30_day_files(data_dir)
+        medication_file = os.path.join(data_dir, "medication.json")
+        log_file = os.path.join(data_dir, "dispense_log.json")
+
+        cases = [
+            ("disks.2.current_count",
+             lambda: full_load(medication_file)["disks"]["2"]["current_count"],
+             lambda: load_path(medication_file, "disks.2.current_count")),
+            ("low_stock_threshold",
+             lambda: full_load(medication_file).get("low_stock_threshold", 3),
+             lambda: load_path(medication_file, "low_stock_threshold", 3)),
+            ("disks (카운터 이전)",
+             lambda: full_load(medication_file).get("disks", {}),
+             lambda: load_path(medication_file, "disks")),
+            ("배출 기록 → 레코드",
+             lambda: [log_to_record(log) for log in full_load(log_file)],
+             lambda: [log_to_record(log) for log in iter_items(log_file)]),
+        ]
+
+        for name in ("medication.json", "dispense_log.json"):
+            print(f"{name:<20} {os.path.getsize(os.path.join(data_dir, name)):7d} bytes")
+        print("-" * 78)
+        print(f"{'읽기':<22}{'json.load 최대':>14}{'스트리밍 최대':>14}{'json.load':>12}{'스트리밍':>12}")
+        for name, full_fn, stream_fn in cases:
+            full_result, full_peak, full_us = measure(full_fn)
+            stream_result, stream_peak, stream_us = measure(stream_fn)
+            assert full_result == stream_result, f"{name}: 결과 불일치"
+            print(f"{name:<22}{full_peak:>12d} B{stream_peak:>12d} B{full_us:>9.0f} us{stream_us:>9.0f} us")
+    finally:
+        shutil.rmtree(data_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+부팅 시 상태 로드 벤치마크 (호스트 PC용, CPython)
+기존 8개 /data/*.json 파일을 각각 열어 파싱하는 방식과
+단일 상태 저장소(state.kv)를 열어 모든 키를 읽는 방식의 시간과 파일 열기 횟수 비교
+
+실행: python tests/bench_kv_boot_load.py
+"""
+
+import builtins
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+
+from kv_store import KVStore  # noqa: E402
+
+SAMPLE_DIR = os.path.join(SRC_DIR, "data")
+STATE_FILES = [
+    "settings.json",
+    "medication.json",
+    "global_data.json",
+    "dispense_log.json",
+    "disk_states.json",
+    "boot_target.json",
+    "setup_complete.json",
+    "wifi_config.json",
+]
+REPEAT = 200
+
+
+class OpenCounter:
+    """builtins.open 호출 횟수 집계"""
+
+    def __init__(self):
+        self.opens = 0
+        self._original_open = builtins.open
+
+    def __enter__(self):
+        counter = self
+        original_open = self._original_open
+
+        def counting_open(*args, **kwargs):
+            counter.opens += 1
+            return original_open(*args, **kwargs)
+
+        builtins.open = counting_open
+        return self
+
+    def __exit__(self, *args):
+        builtins.open = self._original_open
+
+
+def load_json_files(data_dir):
+    """기존 방식: 파일 8개를 각각 열어 파싱"""
+    state = {}
+    for name in STATE_FILES:
+        try:
+            with open(os.path.join(data_dir, name), 'r') as f:
+                state[name[:-5]] = json.load(f)
+        except OSError:
+            pass
+    return state
+
+
+def load_kv_store(store_path):
+    """저장소 방식: 인덱스 스캔 후 모든 키 읽기"""
+    store = KVStore(store_path)
+    store.open()
+    return store.get_many()
+
+
+def run(name, fn):
+    """REPEAT회 로드 후 1회 평균 시간과 파일 열기 횟수 반환"""
+    with OpenCounter() as counter:
+        start = time.perf_counter()
+        for _ in range(REPEAT):
+            state = fn()
+        elapsed = time.perf_counter() - start
+    return {
+        "name": name,
+        "avg_us": elapsed / REPEAT * 1e6,
+        "opens": counter.opens / REPEAT,
+        "state": state,
+    }
+
+
+def main():
+    print("부팅 시 상태 로드 벤치마크")
+    print("=" * 60)
+
+    work_dir = tempfile.mkdtemp(prefix="pillbox_kv_bench_")
+    try:
+        json_dir = os.path.join(work_dir, "json")
+        shutil.copytree(SAMPLE_DIR, json_dir)
+        json_bytes = sum(os.path.getsize(os.path.join(json_dir, name)) for name in STATE_FILES)
+
+        # 같은 샘플 데이터를 저장소 하나로 옮기고, 운용 중 덮어쓰기로 생긴 죽은 레코드도 재현
+        store_path = os.path.join(work_dir, "state.kv")
+        store = KVStore(store_path)
+        store.open()
+        for name in STATE_FILES:
+            with open(os.path.join(json_dir, name), 'r') as f:
+                store.put(name[:-5], json.load(f))
+        for target in ("main", "dose_time", "meal_time"):
+            store.put("boot_target", {"boot_target": target})
+
+        legacy = run("JSON 파일 8개", lambda: load_json_files(json_dir))
+        kv = run("state.kv", lambda: load_kv_store(store_path))
+        assert legacy["state"] == kv["state"], "두 방식의 로드 결과가 다름"
+
+        for result in (legacy, kv):
+            print(f"{result['name']:<14} 평균 {result['avg_us']:8.1f} us/부팅, "
+                  f"파일 열기 {result['opens']:4.1f}회")
+
+        stats = store.stats()
+        print("-" * 60)
+        print(f"JSON 파일 합계: {json_bytes} bytes, 저장소: {stats['file_size']} bytes "
+              f"(죽은 공간 {stats['dead_bytes']} bytes)")
+        print(f"속도 비율: {legacy['avg_us'] / kv['avg_us']:.2f}배")
+    finally:
+        shutil.rmtree(work_dir)
+
+
+if __name__ == "__main__":
+    main()
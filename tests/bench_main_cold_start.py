@@ -0,0 +1,160 @@
+"""
+메인 화면 콜드 스타트 데이터 로드 벤치마크 (호스트 PC용, CPython)
+메인 화면 진입 시 데이터 호출(디스크 할당, 복용 시간, 디스크 수량/부족 여부, 오늘 배출 여부)을
+새 DataManager로 실행하여 스키마 적용 전후의 시간과 최대 할당량(tracemalloc peak) 비교
+
+    기존 방식: global_data.json 한 파일에 화면 백업이 들어 있고 로드 시 전체를 디코드
+              (스키마 적용 전 _load_global_data_from_file을 그대로 재현)
+    스키마 방식: 운용 데이터만 global_data.json에서 디코드, 화면 백업(screen_backup.json)은
+              화면 백업/복원이 필요할 때만 디코드
+    첫 부팅: 이전 버전 파일을 1회 마이그레이션하고 저장하는 비용 (업그레이드 직후 한 번만 발생)
+
+실행: python tests/bench_main_cold_start.py
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+
+from data_manager import DataManager  # noqa: E402
+
+SAMPLE_DIR = os.path.join(SRC_DIR, "data")
+REPEAT = 200
+WIFI_NETWORKS = 15  # WiFi 스캔 화면 백업에 남는 검색 결과 수
+
+
+class LegacyDataManager(DataManager):
+    """스키마 적용 전 전역 데이터 로더 (화면 백업까지 한 번에 디코드)"""
+
+    def _load_global_data_from_file(self):
+        import gc
+        gc.collect()
+        import json as json_module
+        with open(self.global_data_file, 'r') as f:
+            data = json_module.load(f)
+        self._dose_times = data.get('dose_times', [])
+        self._selected_meals = data.get('selected_meals', [])
+        self._dose_count = data.get('dose_count', 1)
+        self._auto_assigned_disks = data.get('auto_assigned_disks', [])
+        self._unused_disks = data.get('unused_disks', [])
+        self._screen_data_backup = data.get('screen_data_backup', {})
+        return True
+
+
+def make_legacy_files(data_dir):
+    """샘플 데이터 + 설정 마법사를 끝낸 상태의 화면 백업 (스키마 버전 없는 파일)"""
+    shutil.copy(os.path.join(SAMPLE_DIR, "medication.json"), data_dir)
+    with open(os.path.join(SAMPLE_DIR, "global_data.json")) as f:
+        global_data = json.load(f)
+    backup = global_data["screen_data_backup"]
+    backup["wifi_scan"] = {
+        "networks": [{"ssid": f"AP_{i:02d}_2.4GHz", "rssi": -40 - i * 3, "security": "WPA2", "channel": 1 + i % 11}
+                     for i in range(WIFI_NETWORKS)],
+        "selected_index": 0,
+    }
+    backup["pill_loading"] = {
+        "current_disk": 3,
+        "disk_states": {str(d): {"loaded_count": 15, "is_loading": False, "steps": [0, 273, 546]} for d in (1, 2, 3)},
+    }
+    with open(os.path.join(data_dir, "global_data.json"), "w") as f:
+        json.dump(global_data, f)
+
+
+def main_screen_cold_start(data_dir, manager_class=DataManager):
+    """메인 화면 진입 시 데이터 호출 순서"""
+    data_manager = manager_class(data_dir)
+    data_manager._get_current_time = lambda: time.localtime()[:8]
+    data_manager.get_auto_assigned_disks()
+    data_manager.get_dose_times()
+    for disk_num in (1, 2, 3):
+        data_manager.get_disk_count(disk_num)
+        data_manager.is_disk_low_stock(disk_num)
+    for dose_index in range(3):
+        data_manager.was_dispensed_today(dose_index)
+    return data_manager
+
+
+def measure(fn, setup=None, repeat=REPEAT):
+    """1회 평균 시간(us)과 최대 할당량(bytes)"""
+    total = 0.0
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        total += time.perf_counter() - start
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return total / repeat * 1e6, peak
+
+
+def main():
+    print("메인 화면 콜드 스타트 데이터 로드 벤치마크")
+    print("=" * 64)
+
+    legacy_dir = tempfile.mkdtemp(prefix="pillbox_cold_legacy_")
+    schema_dir = tempfile.mkdtemp(prefix="pillbox_cold_schema_")
+    upgrade_dir = tempfile.mkdtemp(prefix="pillbox_cold_upgrade_")
+    try:
+        make_legacy_files(legacy_dir)
+        legacy_files = {}
+        for name in os.listdir(legacy_dir):
+            with open(os.path.join(legacy_dir, name), 'rb') as f:
+                legacy_files[name] = f.read()
+
+        # 카운터/링버퍼 파일을 만들어 두어 첫 실행의 이전 비용이 측정에 섞이지 않게 함
+        main_screen_cold_start(legacy_dir, LegacyDataManager)
+        for name, content in legacy_files.items():
+            with open(os.path.join(schema_dir, name), 'wb') as f:
+                f.write(content)
+        main_screen_cold_start(schema_dir)
+
+        def reset_upgrade_dir():
+            for name in os.listdir(upgrade_dir):
+                os.remove(os.path.join(upgrade_dir, name))
+            for name in os.listdir(schema_dir):
+                if name not in legacy_files:
+                    shutil.copy(os.path.join(schema_dir, name), upgrade_dir)
+            for name, content in legacy_files.items():
+                with open(os.path.join(upgrade_dir, name), 'wb') as f:
+                    f.write(content)
+
+        print(f"global_data.json 기존 {len(legacy_files['global_data.json']):6d} bytes")
+        print(f"global_data.json 분리 {os.path.getsize(os.path.join(schema_dir, 'global_data.json')):6d} bytes"
+              f" + screen_backup.json {os.path.getsize(os.path.join(schema_dir, 'screen_backup.json'))} bytes")
+        print("-" * 64)
+
+        cases = [
+            ("기존 방식 (전체 디코드)", lambda: main_screen_cold_start(legacy_dir, LegacyDataManager), None),
+            ("스키마 방식 (화면 백업 지연)", lambda: main_screen_cold_start(schema_dir), None),
+            ("첫 부팅 (마이그레이션 1회)", lambda: main_screen_cold_start(upgrade_dir), reset_upgrade_dir),
+        ]
+        print(f"{'경로':<28}{'시간':>12}{'최대 할당':>14}")
+        for name, fn, setup in cases:
+            us, peak = measure(fn, setup)
+            print(f"{name:<28}{us:>9.0f} us{peak:>12d} B")
+
+        # 결과 일치 확인
+        legacy = main_screen_cold_start(legacy_dir, LegacyDataManager)
+        schema = main_screen_cold_start(schema_dir)
+        assert legacy.get_auto_assigned_disks() == schema.get_auto_assigned_disks()
+        assert legacy.restore_screen_data("wifi_scan") == schema.restore_screen_data("wifi_scan")
+    finally:
+        for data_dir in (legacy_dir, schema_dir, upgrade_dir):
+            shutil.rmtree(data_dir)
+
+
+if __name__ == "__main__":
+    main()
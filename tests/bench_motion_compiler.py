@@ -0,0 +1,203 @@
+"""
+미리 계산한 스텝 프레임(모션 컴파일) 검증 및 벤치마크 (호스트 PC용, CPython + tests/hostsim)
+
+    1. 기존 스텝별 계산 루프(원점 보정, 3칸 동시 충전, 1칸 이동, 여러 디스크 동시 회전)와
+       compile_motion/run_motion/run_until_limits가 같은 프레임 순서와 최종 모터 상태를 만드는지 확인
+       (74HC595/165 핀 모델 + 28BYJ-48 위치 모델 + 273스텝마다 눌리는 캠 리미트 스위치)
+    2. 스텝당 호스트 CPU 시간과 스텝 간격 편차 비교 (가짜 핀 위에서 측정한 파이썬 호출 비용)
+
+실행: python tests/bench_motion_compiler.py
+"""
+
+import os
+import sys
+import time as host_time
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(TESTS_DIR, "..", "src")
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, TESTS_DIR)
+
+import hostsim  # noqa: E402
+
+clock = hostsim.install()
+
+import time as time_module  # noqa: E402  (hostsim이 sleep_us를 추가한 time 모듈)
+
+from hostsim.hc165 import ShiftRegister165  # noqa: E402
+from hostsim.hc595 import ShiftRegister595  # noqa: E402
+from hostsim.stepper import CamLimitSwitch, StepperModel  # noqa: E402
+from motor_control import StepperMotorController  # noqa: E402
+
+CAM_OFFSETS = {1: 0, 2: 90, 3: 181}  # 디스크별 시작 위치 (캠까지 남은 스텝이 서로 다름)
+# 캠이 스위치를 누르는 스텝 수 - 기존 충전 루프의 50스텝 간격 샘플이 캠을 건너뛰지 않도록 넓게
+# (건너뛰면 현재 코드는 캠이 오지 않는 디스크를 걸림으로 중단하므로 같은 프레임 비교가 안 됨)
+CAM_WIDTH = 60
+LIMIT_BITS = {1: 5, 2: 6, 3: 7}
+
+
+# ----- 기존 스텝별 계산 루프 (변경 전 코드) -----
+
+def legacy_calibrate(controller, motor_indices):
+    controller.stop_all_motors()
+    calibration_done = [False] * len(motor_indices)
+    while not all(calibration_done):
+        for i, motor_index in enumerate(motor_indices):
+            if not calibration_done[i]:
+                if controller.is_limit_switch_pressed(motor_index):
+                    calibration_done[i] = True
+                    controller.motor_positions[motor_index] = 0
+                    # 시퀀스 위치(motor_steps)는 유지 (0으로 되돌리면 회전자 위치와 어긋나 다음 스텝에서 튐)
+                else:
+                    controller.motor_steps[motor_index] = (controller.motor_steps[motor_index] - 1) % 8
+                    current_step = controller.motor_steps[motor_index]
+                    controller.motor_states[motor_index] = controller.stepper_sequence[current_step]
+        controller.update_motor_output()
+        time_module.sleep_us(controller.step_delay_us)
+    controller.stop_all_motors()
+
+
+def legacy_loading(controller):
+    controller.stop_all_motors()
+    step_count = 0
+    limit_released = [False, False, False]
+    compartment_count = [0, 0, 0]
+    compartment_done = [False, False, False]
+    while not all(compartment_done):
+        step_count += 1
+        for motor_idx in range(1, 4):
+            if not compartment_done[motor_idx - 1]:
+                controller.motor_steps[motor_idx] = (controller.motor_steps[motor_idx] - 1) % 8
+                current_step = controller.motor_steps[motor_idx]
+                controller.motor_states[motor_idx] = controller.stepper_sequence[current_step]
+        controller.motor_states[4] = 0x00
+        controller.update_motor_output()
+        time_module.sleep_us(1000)
+        if step_count % 50 == 0:
+            for motor_idx in range(1, 4):
+                if not compartment_done[motor_idx - 1]:
+                    is_pressed = controller.is_limit_switch_pressed(motor_idx)
+                    if not is_pressed and not limit_released[motor_idx - 1]:
+                        limit_released[motor_idx - 1] = True
+                    elif is_pressed and limit_released[motor_idx - 1]:
+                        compartment_count[motor_idx - 1] += 1
+                        limit_released[motor_idx - 1] = False
+                        if compartment_count[motor_idx - 1] >= 3:
+                            compartment_done[motor_idx - 1] = True
+    controller.stop_all_motors()
+
+
+def legacy_next_compartment(controller, motor_index):
+    limit_released = False
+    while True:
+        controller.motor_steps[motor_index] = (controller.motor_steps[motor_index] - 1) % 8
+        current_step = controller.motor_steps[motor_index]
+        controller.motor_states[motor_index] = controller.stepper_sequence[current_step]
+        controller.update_motor_output()
+        time_module.sleep_us(500)
+        is_pressed = controller.is_limit_switch_pressed(motor_index)
+        if not is_pressed and not limit_released:
+            limit_released = True
+        elif is_pressed and limit_released:
+            break
+    controller.motor_positions[motor_index] = (controller.motor_positions[motor_index] + 1) % 10
+
+
+def legacy_rotate_multiple(controller, motor_indices, steps):
+    for _ in range(steps):
+        for motor_index in motor_indices:
+            controller.motor_steps[motor_index] = (controller.motor_steps[motor_index] - 1) % 8
+            current_step = controller.motor_steps[motor_index]
+            controller.motor_states[motor_index] = controller.stepper_sequence[current_step]
+        controller.update_motor_output()
+        time_module.sleep_us(controller.step_delay_us)
+
+
+# ----- 컴파일 방식 (현재 코드) -----
+
+def compiled_calibrate(controller, motor_indices):
+    controller.calibrate_multiple_motors(motor_indices)
+
+
+def compiled_loading(controller):
+    controller.stop_all_motors()
+    controller.motor_states[4] = 0x00
+    controller.run_until_limits([1, 2, 3], direction=-1, compartments=3, sample_every=50, delay_us=1000)
+    controller.stop_all_motors()
+
+
+def compiled_next_compartment(controller, motor_index):
+    controller.next_compartment(motor_index)
+
+
+def compiled_rotate_multiple(controller, motor_indices, steps):
+    controller.run_motion(controller.compile_motion({m: (-1, steps) for m in motor_indices}))
+
+
+SCENARIOS = [
+    ("원점 보정 (모터 1~3)", lambda c: legacy_calibrate(c, [1, 2, 3]), lambda c: compiled_calibrate(c, [1, 2, 3])),
+    ("3칸 동시 충전", legacy_loading, compiled_loading),
+    ("1칸 이동 (모터 2) x3", lambda c: [legacy_next_compartment(c, 2) for _ in range(3)],
+     lambda c: [compiled_next_compartment(c, 2) for _ in range(3)]),
+    ("동시 회전 600스텝", lambda c: legacy_rotate_multiple(c, [1, 2, 3], 600),
+     lambda c: compiled_rotate_multiple(c, [1, 2, 3], 600)),
+]
+
+
+def make_rig():
+    """핀 모델 + 모터/캠 모델 + 컨트롤러 (SoftSPI 출력: 전송 프레임이 spi.frames에 기록됨)"""
+    hostsim.reset()
+    outputs = ShiftRegister595()
+    inputs = ShiftRegister165()
+    steppers = {}
+    for motor_index in (1, 2, 3):
+        steppers[motor_index] = StepperModel(outputs, motor_index)
+        CamLimitSwitch(steppers[motor_index], inputs, LIMIT_BITS[motor_index], width=CAM_WIDTH,
+                       offset=CAM_OFFSETS[motor_index])
+    controller = StepperMotorController(output="softspi")
+    return controller, steppers
+
+
+def run_recorded(fn):
+    """시나리오 실행 후 (중복 제거한 프레임 순서, 모터 상태, 모델 위치, 호스트 시간, 스텝 수)"""
+    controller, steppers = make_rig()
+    spi = controller._output.spi
+    # 시작 전 출력 프레임 (입력 스캔 때 같은 프레임을 다시 시프트하는 것은 출력 변화가 아님)
+    previous = spi.frames[-1] if spi.frames else None
+    spi.frames.clear()
+    start = host_time.perf_counter()
+    fn(controller)
+    elapsed = host_time.perf_counter() - start
+    frames = []
+    for frame in spi.frames:
+        if frame != (frames[-1] if frames else previous):
+            frames.append(frame)
+    positions = {m: steppers[m].position for m in steppers}
+    steps = sum(steppers[m].steps for m in steppers)
+    state = (list(controller.motor_steps), list(controller.motor_states), list(controller.motor_positions))
+    return frames, state, positions, elapsed, steps
+
+
+def main():
+    print("모션 컴파일 검증 / 벤치마크")
+    print("=" * 78)
+    print(f"{'시나리오':<22}{'프레임':>8}{'결과':>10}{'기존 us/스텝':>14}{'컴파일 us/스텝':>16}")
+    all_ok = True
+    for name, legacy_fn, compiled_fn in SCENARIOS:
+        legacy = run_recorded(legacy_fn)
+        compiled = run_recorded(compiled_fn)
+        same = legacy[:3] == compiled[:3]
+        all_ok = all_ok and same
+        steps = max(1, compiled[4])
+        print(f"{name:<22}{len(compiled[0]):>8}{'동일' if same else '불일치':>10}"
+              f"{legacy[3] / steps * 1e6:>14.1f}{compiled[3] / steps * 1e6:>16.1f}")
+        if not same:
+            print(f"    기존 위치 {legacy[2]}, 컴파일 위치 {compiled[2]}")
+
+    print("-" * 78)
+    print("모든 시나리오에서 기존 스텝별 계산과 같은 프레임" if all_ok else "불일치 발견")
+    return 0 if all_ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
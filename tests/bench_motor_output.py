@@ -0,0 +1,169 @@
+"""
+74HC595 출력 방식 비교 (호스트 PC용, CPython + tests/hostsim)
+StepperMotorController를 비트뱅 / SoftSPI / SPI 출력으로 각각 실행하여
+
+    1. 같은 동작 순서에서 74HC595 래치 출력 순서와 모터 상태가 같은지 확인 (74HC595/165 핀 모델)
+    2. 리미트 스위치를 연속으로 여러 번 읽을 때 모터 출력이 흔들리는지, 공유 버스가 몇 번 스캔하는지 확인
+       (캐시 사용 / 매번 강제 스캔), 버튼 스캔 1번을 같은 틱의 리미트 스위치 3개가 재사용하는지 확인
+    3. 스텝 처리량(호스트 steps/s)과 프레임당 핀 쓰기/sleep_us 호출/출력 지연 비교
+
+호스트 처리량은 가짜 Pin/SPI 위에서 측정한 파이썬 호출 비용이라 절대값은 기기와 다르지만,
+프레임당 파이썬 수준 호출 수 차이(비트뱅 약 100회 vs SPI 3회)가 그대로 반영됨
+
+실행: python tests/bench_motor_output.py
+"""
+
+import os
+import sys
+import time as host_time
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(TESTS_DIR, "..", "src")
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, TESTS_DIR)
+
+import hostsim  # noqa: E402
+
+clock = hostsim.install()
+
+from hostsim import machine  # noqa: E402
+from hostsim.hc165 import ShiftRegister165  # noqa: E402
+from hostsim.hc595 import ShiftRegister595  # noqa: E402
+from motor_control import StepperMotorController  # noqa: E402
+
+BACKENDS = ("bitbang", "softspi", "spi")
+BENCH_STEPS = 3000
+
+
+def run_sequence(controller, inputs):
+    """모터 1 정방향 20스텝, 4개 모터 동시 16스텝, 스텝마다 리미트 스위치 1회 읽기, 정지"""
+    controller.step_motor_continuous(1, 1, 20)
+    controller.step_all_motors_simultaneous([-1, 1, -1, 1], 16)
+    pressed = []
+    for step in range(30):
+        inputs.set_bit(6, 0 if step % 10 == 0 else 1)
+        controller.motor_steps[2] = (controller.motor_steps[2] - 1) % 8
+        controller.motor_states[2] = controller.stepper_sequence[controller.motor_steps[2]]
+        controller.update_motor_output()
+        pressed.append(controller.is_limit_switch_pressed(2))
+    controller.stop_motor(2)
+    return pressed
+
+
+def check_equivalence():
+    """출력 방식별 래치 출력 순서 비교"""
+    results = {}
+    for backend in BACKENDS:
+        hostsim.reset()
+        outputs = ShiftRegister595()
+        inputs = ShiftRegister165()
+        controller = StepperMotorController(output=backend)
+        pressed = run_sequence(controller, inputs)
+        results[backend] = (outputs.output_changes(), list(controller.motor_steps), pressed)
+
+    reference = results["bitbang"]
+    for backend in BACKENDS:
+        changes, steps, pressed = results[backend]
+        same = (changes, steps, pressed) == reference
+        print(f"{backend:<8} 래치 출력 변화 {len(changes):3d}회, 리미트 감지 {sum(pressed)}회: "
+              f"{'비트뱅과 동일' if same else '불일치'}")
+        assert same, f"{backend}: 비트뱅 출력과 다름"
+
+
+def check_repeated_reads():
+    """프레임 사이에 리미트 스위치를 3번 읽을 때(원점 보정 루프와 같은 패턴) 출력 흔들림 횟수와 실제 스캔 횟수"""
+    ok = True
+    for backend in BACKENDS:
+        for forced in (False, True):
+            hostsim.reset()
+            outputs = ShiftRegister595()
+            ShiftRegister165()
+            controller = StepperMotorController(output=backend)
+            bus = controller.bus
+            glitches = 0
+            scans = bus.scans
+            for _ in range(40):
+                controller.step_all_motors_simultaneous([-1, -1, -1, 0], 1)
+                states = controller.motor_states
+                expected = (states[1] & 0x0F) | ((states[2] & 0x0F) << 4) | ((states[3] & 0x0F) << 8) | ((states[4] & 0x0F) << 12)
+                for motor_index in (1, 2, 3):
+                    if forced:
+                        bus.scan()  # 캐시 없이 매번 읽기 (입력 클럭이 모터 출력을 바꾸지 않는지)
+                    else:
+                        controller.is_limit_switch_pressed(motor_index)
+                    if outputs.output != expected:
+                        glitches += 1
+            scans = bus.scans - scans
+            ok = ok and glitches == 0 and (forced or scans == 40)
+            print(f"{backend:<8} {'강제 스캔' if forced else '캐시 사용'} 읽기 120회: 실제 스캔 {scans:3d}회, "
+                  f"모터 상태와 다르게 래치된 출력 {glitches}회")
+    return ok
+
+
+def check_button_fanout():
+    """메인 루프 틱: 버튼 스캔 1번을 같은 틱의 리미트 스위치 3개가 재사용, 입력 변화는 다음 틱에 반영"""
+    from button_interface import ButtonInterface
+    hostsim.reset()
+    ShiftRegister595()
+    inputs = ShiftRegister165()
+    controller = StepperMotorController()
+    buttons = ButtonInterface()
+    bus = controller.bus
+    pressed = []
+    buttons.set_callback('A', lambda: pressed.append(clock.now_us))
+    clock.sleep_ms(100)  # 디바운싱 기준 시각(0)에서 벗어나기
+    scans = bus.scans
+    limits = []
+    for tick in range(10):
+        inputs.set_bit(0, 0 if tick == 3 else 1)   # SW1(A) 3번째 틱에 눌림
+        inputs.set_bit(5, 0 if tick >= 5 else 1)   # 리미트 스위치 1 5번째 틱부터 눌림
+        buttons.update()
+        limits.append(tuple(controller.is_limit_switch_pressed(m) for m in (1, 2, 3)))
+        clock.sleep_ms(10)  # 메인 루프 대기 (다음 틱)
+    scans = bus.scans - scans
+    ok = (scans == 10 and len(pressed) == 1 and limits[4] == (False, False, False)
+          and limits[5] == (True, False, False) and buttons.get_raw_button_states() == bus.inputs)
+    print(f"메인 루프 10틱: 버튼 + 리미트 스위치 3개 읽기 40회 → 스캔 {scans}회, "
+          f"버튼 A 눌림 {len(pressed)}회, 리미트 1 감지 틱 {[i for i, l in enumerate(limits) if l[0]]}: "
+          f"{'통과' if ok else '실패'}")
+    return ok
+
+
+def bench_throughput():
+    """모델 없이 가짜 핀만으로 스텝 처리량 측정"""
+    print(f"{'출력':<10}{'steps/s (호스트)':>18}{'핀 쓰기/프레임':>16}{'sleep_us/프레임':>17}{'출력 지연/프레임':>18}")
+    for backend in BACKENDS:
+        hostsim.reset()
+        controller = StepperMotorController(output=backend)
+        controller.step_delay_us = 0
+
+        machine.reset()
+        clock.reset()
+        start = host_time.perf_counter()
+        controller.step_all_motors_simultaneous([-1, -1, -1, 1], BENCH_STEPS)
+        elapsed = host_time.perf_counter() - start
+
+        pin_writes = machine.stats["pin_writes"] / BENCH_STEPS
+        # step_delay_us=0에서도 step_all_motors_simultaneous가 스텝마다 sleep_us(0)을 1회 호출
+        sleeps = clock.sleep_calls / BENCH_STEPS - 1
+        frame_us = clock.now_us / BENCH_STEPS
+        print(f"{backend:<10}{BENCH_STEPS / elapsed:>18.0f}{pin_writes:>16.0f}{sleeps:>17.0f}{frame_us:>15.0f} us")
+
+
+def main():
+    print("74HC595 출력 방식 비교")
+    print("=" * 79)
+    check_equivalence()
+    print("-" * 79)
+    ok = check_repeated_reads()
+    print("-" * 79)
+    ok = check_button_fanout() and ok
+    print("-" * 79)
+    bench_throughput()
+    print("-" * 79)
+    print("공유 버스 검사 통과" if ok else "공유 버스 검사 실패")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
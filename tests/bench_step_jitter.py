@@ -0,0 +1,204 @@
+"""
+스텝 간격(지터) 계측 보기 (호스트 PC용, CPython + tests/hostsim)
+
+    python tests/bench_step_jitter.py              # 가상 보드에서 계측 후 표시
+    python tests/bench_step_jitter.py device.log   # 기기에서 StepTiming.dump()로 출력한 로그 표시
+
+기기에서 계측하려면 motor_control.py의 STEP_TIMING = const(1)로 바꿔 올린 뒤
+controller.enable_step_timing() → 이동 → controller.step_timing.dump() 출력을 로그로 저장
+
+가상 보드 시나리오 (STEP_TIMING=1로 실행):
+    1. 고정 간격 600스텝 (run_motion, 비트뱅 / SoftSPI): 프레임 전송 비용이 간격에 더해지는 양
+    2. 리미트 스위치 1칸 이동 (매 스텝 74HC165 스캔)
+    3. 도어 가속/감속 이동 (MoveJob): 간격 분포 = 속도 곡선
+    4. 타이머 구동 엔진 + 10ms마다 300us 걸리는 다른 인터럽트: p99/최대에 끼어든 시간이 나타나는지
+    5. STEP_TIMING=0: 계측기를 켜도 기록 없음, 출력 프레임은 계측 시와 같음
+"""
+
+import contextlib
+import io
+import os
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(TESTS_DIR, "..", "src")
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, TESTS_DIR)
+
+import hostsim  # noqa: E402
+
+clock = hostsim.install()
+
+import motor_control  # noqa: E402
+from hostsim import check, machine  # noqa: E402
+from hostsim.board import PillboxBoard  # noqa: E402
+from motor_control import LimitMotionJob, MoveJob, PillBoxMotorSystem, StepperMotorController  # noqa: E402
+
+BAR_WIDTH = 40
+
+
+# ----- 로그 해석 / 표시 -----
+
+def parse(lines):
+    """StepTiming.dump() 출력 → (이동 요약 목록, {"last"/"total": (shift, {bin: 개수})})"""
+    moves = []
+    hists = {}
+    for line in lines:
+        line = line.strip()
+        if not line.startswith("STEPTIME "):
+            continue
+        parts = line.split()
+        if parts[1] == "move":
+            fields = dict(part.split("=") for part in parts[3:])
+            moves.append((parts[2],) + tuple(int(fields[k]) for k in ("n", "min", "mean", "p99", "max", "gaps")))
+        elif parts[1] == "hist":
+            shift = int(parts[3].split("=")[1])
+            bins = {}
+            for part in parts[4:]:
+                i, n = part.split(":")
+                bins[int(i)] = int(n)
+            hists[parts[2]] = (shift, bins)
+    return moves, hists
+
+
+def render(moves, hists, title):
+    print(f"[{title}]")
+    print(f"  {'이동':<8}{'스텝 간격 수':>12}{'최소':>8}{'평균':>8}{'p99':>8}{'최대':>8}{'끊김':>6}  (us)")
+    for label, count, min_us, mean_us, p99_us, max_us, gaps in moves:
+        print(f"  {label:<8}{count:>12}{min_us:>8}{mean_us:>8}{p99_us:>8}{max_us:>8}{gaps:>6}")
+    if "last" in hists:
+        shift, bins = hists["last"]
+        if bins:
+            peak = max(bins.values())
+            width = 1 << shift
+            print(f"  마지막 이동 간격 분포 (bin {width}us)")
+            for i in sorted(bins):
+                n = bins[i]
+                bar = "#" * max(1, n * BAR_WIDTH // peak)
+                print(f"    {i * width:>5}-{(i + 1) * width - 1:<5} {n:>6} {bar}")
+
+
+def dump_and_parse(timing):
+    """기기와 같은 dump() 출력을 거쳐 해석 (로그 형식 확인)"""
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        timing.dump()
+    return parse(out.getvalue().splitlines())
+
+
+# ----- 가상 보드 시나리오 -----
+
+def scenario_fixed(results):
+    for output in ("bitbang", "softspi"):
+        PillboxBoard()
+        controller = StepperMotorController(output=output)
+        timing = controller.enable_step_timing()
+        program = controller.compile_motion({1: (-1, 600), 2: (-1, 600)})
+        controller.run_motion(program, delay_us=500)
+        controller.stop_all_motors()
+        moves, hists = dump_and_parse(timing)
+        render(moves, hists, f"고정 간격 500us x 600스텝 ({output})")
+        _, count, min_us, mean_us, p99_us, max_us, _ = moves[-1]
+        check(results, "간격 599개 기록, 최소 ≤ 평균 ≤ p99 ≤ 최대",
+              count == 599 and min_us <= mean_us <= p99_us <= max_us,
+              f"프레임 전송 비용 약 {mean_us - 500}us/스텝")
+
+
+def scenario_limit(results):
+    PillboxBoard(cam_offsets={1: 0})
+    system = PillBoxMotorSystem(state_path=None)
+    system.idle_callback = None
+    timing = system.motor_controller.enable_step_timing()
+    steps = system.wait(LimitMotionJob([1], -1, compartments=1, sample_every=1, delay_us=500))
+    moves, hists = dump_and_parse(timing)
+    render(moves, hists, "리미트 스위치 1칸 (매 스텝 스캔)")
+    label, count, _, mean_us, _, _, gaps = moves[-1]
+    # 엔진 구간(20ms)마다 끊겼다가 이어지므로 간격 수 = 스텝 수 - 구간 수
+    check(results, "스텝 수 - 구간 수만큼 기록", label == "limit" and count == steps[1] - 1 - gaps,
+          f"{steps[1]}스텝, 구간 끊김 {gaps}회")
+
+
+def scenario_door(results):
+    PillboxBoard()
+    system = PillBoxMotorSystem(state_path=None)
+    system.idle_callback = None
+    timing = system.motor_controller.enable_step_timing()
+    system.engine.finish(system.engine.submit(MoveJob({4: (-1, 1593)})))
+    moves, hists = dump_and_parse(timing)
+    render(moves, hists, "도어 1단 가속/감속 (한 번에 실행)")
+    _, count, min_us, _, _, max_us, _ = moves[-1]
+    planner = system.motor_controller.motion_planners[4]
+    fastest = 1000000 // planner.max_speed
+    slowest = 1000000 // planner.start_speed
+    check(results, "간격 범위 = 최고 속도 ~ 출발 속도 (+ 전송 비용)",
+          count == 1592 and fastest <= min_us and max_us < slowest + 200, f"{min_us}~{max_us}us")
+
+
+def scenario_interrupts(results):
+    PillboxBoard(cam_offsets={1: 0, 2: 0})
+    system = PillBoxMotorSystem(state_path=None)
+    timing = system.motor_controller.enable_step_timing()
+    engine = system.engine
+
+    # 10ms마다 300us 동안 CPU를 쓰는 다른 인터럽트 (WiFi 등)
+    other = machine.Timer(2)
+    other.init(mode=machine.Timer.PERIODIC, period=10, callback=lambda t: clock.advance_us(300))
+    # 매 스텝 스캔 (스텝마다 같은 비용이어야 끼어든 시간만 구분됨)
+    job = engine.submit(LimitMotionJob([1, 2], -1, compartments=1, sample_every=1, delay_us=500))
+    engine.start_timer(period_ms=25)
+    while not job.done:
+        clock.sleep_ms(5)
+    engine.stop_timer()
+    other.deinit()
+    system.motor_controller.stop_all_motors()
+    moves, hists = dump_and_parse(timing)
+    render(moves, hists, "타이머 구동 + 10ms마다 300us 인터럽트")
+    _, count, min_us, _, p99_us, max_us, _ = moves[-1]
+    # 500us 대기 중에 끝난 인터럽트는 간격을 늘리지 않고, 대기 끝을 넘긴 만큼만 늘어남 (최대 300us)
+    check(results, "끼어든 인터럽트가 최대 간격에 나타남", min_us + 100 < max_us <= min_us + 300 + 16,
+          f"최소 {min_us}us, 최대 {max_us}us")
+    shift, bins = hists["last"]
+    undisturbed = sum(n for i, n in bins.items() if (i << shift) <= min_us + 16)
+    check(results, "대부분 스텝은 영향 없음", undisturbed * 100 >= count * 90, f"{undisturbed}/{count}")
+
+
+def scenario_disabled(results):
+    frames = {}
+    for enabled in (1, 0):
+        motor_control.STEP_TIMING = enabled
+        board = PillboxBoard()
+        controller = StepperMotorController(output="softspi")
+        timing = controller.enable_step_timing()
+        start_us = clock.now_us
+        controller.run_motion(controller.compile_motion({3: (1, 300)}), delay_us=500)
+        frames[enabled] = (list(board.outputs.latches), clock.now_us - start_us, timing.move_count)
+    motor_control.STEP_TIMING = 1
+    print("[STEP_TIMING=0]")
+    check(results, "계측 코드 제외 시 기록 없음", frames[0][2] == 0 and frames[1][2] == 1)
+    check(results, "계측 여부와 관계없이 같은 출력/시간", frames[0][:2] == frames[1][:2])
+
+
+def main():
+    if len(sys.argv) > 1:
+        with open(sys.argv[1]) as f:
+            moves, hists = parse(f)
+        render(moves, hists, sys.argv[1])
+        return 0
+
+    motor_control.STEP_TIMING = 1  # 기기에서 const(1)로 빌드한 것과 같음
+    results = []
+    print("스텝 간격 계측 (가상 보드)")
+    print("=" * 72)
+    scenario_fixed(results)
+    scenario_limit(results)
+    scenario_door(results)
+    scenario_interrupts(results)
+    scenario_disabled(results)
+    ok = all(results)
+    print("-" * 72)
+    print("스텝 간격 계측 검사 통과" if ok else "스텝 간격 계측 검사 실패")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+DataManager 쓰기 지연(write-back) 모드 벤치마크 (호스트 PC용, CPython)
+3개 디스크 동시 복용 1회(디스크별 수량 조회 + 1 감소)의 파일 쓰기 횟수,
+기록 바이트, 소요 시간을 기존 방식(즉시 저장)과 비교
+(쓰기 지연 모드는 디스크별 카운터 슬롯을 모아 두었다가 flush()에서 카운터 파일을 1번 열어 기록)
+
+실행: python tests/bench_write_back.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+
+from data_manager import DataManager  # noqa: E402
+from bench_dispense_log import WriteCounter  # noqa: E402
+
+DOSE_COUNT = 50
+DISKS = [1, 2, 3]
+SAMPLE_MEDICATION_FILE = os.path.join(SRC_DIR, "data", "medication.json")
+
+
+def dispense_dose(data_manager):
+    """MainScreen._dispense_from_selected_disks_no_alarm의 데이터 접근 패턴"""
+    for disk_num in DISKS:
+        current_count = data_manager.get_disk_count(disk_num)
+        if current_count > 0:
+            data_manager.update_disk_count(disk_num, current_count - 1)
+    data_manager.flush()
+
+
+def run(name, write_back):
+    """DOSE_COUNT회 복용 실행 후 결과 반환"""
+    data_dir = tempfile.mkdtemp(prefix="pillbox_bench_")
+    try:
+        shutil.copy(SAMPLE_MEDICATION_FILE, os.path.join(data_dir, "medication.json"))
+        data_manager = DataManager(data_dir)
+        data_manager._get_current_time = lambda: time.localtime()[:8]
+        for disk_num in DISKS:
+            data_manager.update_disk_count(disk_num, DOSE_COUNT + 1)
+        if write_back:
+            data_manager.enable_write_back()
+
+        with WriteCounter() as counter:
+            start = time.perf_counter()
+            for _ in range(DOSE_COUNT):
+                dispense_dose(data_manager)
+            elapsed = time.perf_counter() - start
+
+        # 저장 결과 확인 (새 인스턴스로 다시 읽기)
+        final_counts = [DataManager(data_dir).get_disk_count(d) for d in DISKS]
+        return {
+            "name": name,
+            "files_per_dose": counter.files_written / DOSE_COUNT,
+            "bytes_per_dose": counter.bytes_written / DOSE_COUNT,
+            "ms_per_dose": elapsed / DOSE_COUNT * 1000,
+            "final_counts": final_counts,
+        }
+    finally:
+        shutil.rmtree(data_dir)
+
+
+def main():
+    print("DataManager 쓰기 지연 모드 벤치마크 (3개 디스크 복용)")
+    print("=" * 60)
+
+    results = [run("즉시 저장 (기존)", False), run("쓰기 지연 + flush", True)]
+    for r in results:
+        print(f"{r['name']:<16} 쓰기 파일 {r['files_per_dose']:4.1f}개/회, "
+              f"{r['bytes_per_dose']:7.0f} bytes/회, {r['ms_per_dose']:6.2f} ms/회, "
+              f"최종 수량 {r['final_counts']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+DataManager 원자적 쓰기 전원 차단 시험 (호스트 PC용, CPython)
+저장 과정의 모든 바이트 위치와 모든 rename/remove 시점에서 전원 차단을 흉내 낸 뒤
+재부팅(새 DataManager 생성)했을 때 항상 마지막으로 커밋된 상태가 열리는지 확인
+
+실행: python tests/fault_inject_data_store.py
+"""
+
+import builtins
+import os
+import shutil
+import sys
+import tempfile
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+
+from data_manager import DataManager  # noqa: E402
+
+
+class PowerLoss(BaseException):
+    """전원 차단 (DataManager의 except Exception에 잡히지 않도록 BaseException 사용)"""
+
+
+class FaultInjector:
+    """파일 쓰기/rename/remove를 가로채 budget 단위 소진 시 전원 차단 발생
+
+    바이트 1개와 rename/remove 1회가 각각 budget 1을 소모하며,
+    차단 이후의 모든 파일 작업도 실패함 (기기 정지 상태)
+    """
+
+    def __init__(self, budget=None):
+        self.budget = budget  # None이면 차단 없이 사용량만 측정
+        self.used = 0
+        self.dead = False
+        self.commit_point = None  # 첫 커밋(저널 개행 또는 카운터 슬롯 기록)이 완료된 시점의 사용량
+        self._open = builtins.open
+        self._rename = os.rename
+        self._remove = os.remove
+
+    def _consume(self, units):
+        """budget 소모, 초과분이 있으면 허용된 개수 반환"""
+        if self.dead:
+            raise PowerLoss()
+        if self.budget is None:
+            self.used += units
+            return units
+        allowed = max(0, min(units, self.budget - self.used))
+        self.used += allowed
+        return allowed
+
+    def __enter__(self):
+        injector = self
+
+        class FaultyFile:
+            def __init__(self, f, path):
+                self._f = f
+                self._path = path
+
+            def write(self, data):
+                allowed = injector._consume(len(data))
+                self._f.write(data[:allowed])
+                if allowed < len(data):
+                    injector.dead = True
+                    self._f.close()
+                    raise PowerLoss()
+                is_commit = ((self._path.endswith(".journal") and data.endswith("\n")) or
+                             self._path.endswith("disk_counters.bin"))
+                if is_commit and injector.commit_point is None:
+                    injector.commit_point = injector.used
+                return len(data)
+
+            def __getattr__(self, name):
+                return getattr(self._f, name)
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                self._f.close()
+
+        def faulty_open(path, mode='r', *args, **kwargs):
+            if injector.dead:
+                raise PowerLoss()
+            return FaultyFile(injector._open(path, mode, *args, **kwargs), str(path))
+
+        def make_op(original):
+            def op(*args):
+                if injector._consume(1) < 1:
+                    injector.dead = True
+                    raise PowerLoss()
+                return original(*args)
+            return op
+
+        builtins.open = faulty_open
+        os.rename = make_op(self._rename)
+        os.remove = make_op(self._remove)
+        return self
+
+    def __exit__(self, *args):
+        builtins.open = self._open
+        os.rename = self._rename
+        os.remove = self._remove
+        return isinstance(args[1], PowerLoss)
+
+
+def snapshot(data_dir):
+    """데이터 디렉토리 파일 내용 복사"""
+    files = {}
+    for name in os.listdir(data_dir):
+        with open(os.path.join(data_dir, name), 'rb') as f:
+            files[name] = f.read()
+    return files
+
+
+def restore(data_dir, files):
+    """스냅샷으로 데이터 디렉토리 복원"""
+    for name in os.listdir(data_dir):
+        os.remove(os.path.join(data_dir, name))
+    for name, content in files.items():
+        with open(os.path.join(data_dir, name), 'wb') as f:
+            f.write(content)
+
+
+SCENARIOS = [
+    ("settings.json", lambda dm: dm.save_settings({"dose_count": 2, "dose_days": 14}),
+     lambda dm: dm.load_settings().get("dose_count")),
+    ("refill (충전)", lambda dm: dm.update_disk_count(2, 7),
+     lambda dm: dm.get_disk_count(2)),
+    ("dispense (배출)", lambda dm: dm.update_disk_count(2, 4),
+     lambda dm: dm.get_disk_count(2)),
+    ("global_data.json", lambda dm: dm.save_dose_count(2),
+     lambda dm: dm.get_dose_count()),
+    ("screen_backup.json", lambda dm: dm.backup_screen_data("dose_time", {"current_dose_index": 2}),
+     lambda dm: dm.restore_screen_data("dose_time").get("current_dose_index")),
+]
+
+
+def run_scenario(data_dir, name, save, read):
+    """시나리오 1개에 대해 모든 차단 위치 시험, (시험 횟수, 실패 목록) 반환"""
+    base = snapshot(data_dir)
+    old_value = read(DataManager(data_dir))
+
+    # 차단 없이 한 번 저장하여 전체 budget과 커밋 지점 측정
+    with FaultInjector() as probe:
+        save(DataManager(data_dir))
+    new_value = read(DataManager(data_dir))
+    total = probe.used
+    commit_point = probe.commit_point if probe.commit_point is not None else total
+    assert old_value != new_value, f"{name}: 시나리오가 값을 바꾸지 않음"
+
+    failures = []
+    for budget in range(total + 1):
+        restore(data_dir, base)
+        dm = DataManager(data_dir)
+        with FaultInjector(budget):
+            save(dm)
+
+        # 재부팅
+        value = read(DataManager(data_dir))
+        expected = new_value if budget >= commit_point else old_value
+        if value != expected:
+            failures.append((budget, value, expected))
+
+        # 복구 후 저널이 남아 있으면 안 됨
+        if os.path.exists(os.path.join(data_dir, ".journal")):
+            failures.append((budget, "저널 잔존", None))
+
+    restore(data_dir, base)
+    return total + 1, failures
+
+
+def main():
+    print("DataManager 전원 차단 시험")
+    print("=" * 60)
+
+    data_dir = tempfile.mkdtemp(prefix="pillbox_fault_")
+    all_ok = True
+    try:
+        # 초기 커밋 상태 구성
+        dm = DataManager(data_dir)
+        dm.save_settings({"dose_count": 3, "dose_days": 30})
+        dm.update_disk_count(2, 6)
+        dm.update_disk_count(2, 5)  # 배출 후 상태 (medication.json에는 충전 시점 수량 6이 남음)
+        dm.save_dose_count(3)
+
+        for name, save, read in SCENARIOS:
+            runs, failures = run_scenario(data_dir, name, save, read)
+            status = "OK" if not failures else f"실패 {len(failures)}건"
+            print(f"{name:<18} 차단 위치 {runs:5d}개 시험: {status}")
+            for failure in failures[:5]:
+                print(f"    budget={failure[0]} 결과={failure[1]} 기대={failure[2]}")
+            all_ok = all_ok and not failures
+    finally:
+        shutil.rmtree(data_dir)
+
+    print("-" * 60)
+    print("모든 차단 위치에서 마지막 커밋 상태 복구" if all_ok else "복구 실패 발견")
+    return 0 if all_ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
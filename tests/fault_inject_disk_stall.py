@@ -0,0 +1,255 @@
+"""
+디스크 걸림/미끄러짐 감지 시험 (호스트 PC용, CPython + tests/hostsim)
+
+칸마다 캠 위치/폭 오차가 있는 가상 디스크(hostsim.stepper.ToleranceCamSwitch)에서 칸 이동 통계를 학습시킨 뒤
+    - 정상 이동 45회: 걸림/미끄러짐 오판 없음
+    - 디스크 걸림 (회전자가 돌지 않음): 학습한 한계 스텝에서 중단, next_compartment도 끝없이 돌지 않음
+    - 탈조로 늦게 온 캠 / 너무 일찍 감지된 캠: 이동은 완료하고 slip / short 기록
+    - 리미트 스위치 고장 상태의 원점 보정: 1.5칸 안에 실패
+    - 여러 디스크 배출 중 1개 걸림: 나머지 디스크는 칸 위치 갱신/수량 감소/도어 열기, 걸린 디스크만 실패
+    - AlarmSystem.report_motor_faults: 걸림은 복용 실패 처리(이력/심볼, 실패 로그는 배출한 쪽이 1번), 나머지는 기록만
+
+실행: python tests/fault_inject_disk_stall.py
+"""
+
+import os
+import sys
+import types
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(TESTS_DIR, "..", "src")
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, TESTS_DIR)
+
+import hostsim  # noqa: E402
+
+clock = hostsim.install()
+hostsim.install_asyncio()
+sys.modules.setdefault("lvgl", types.ModuleType("lvgl"))  # MainScreen import용 (배출 시퀀스는 lvgl을 쓰지 않음)
+
+from alarm_system import AlarmSystem  # noqa: E402
+from hostsim import check  # noqa: E402
+from hostsim.board import LIMIT_BITS, PillboxBoard  # noqa: E402
+from hostsim.stepper import ToleranceCamSwitch  # noqa: E402
+from motor_control import PillBoxMotorSystem  # noqa: E402
+from screens.main_screen import MainScreen  # noqa: E402
+
+LEARN_MOVES = 45
+
+
+class Jam:
+    """회전자가 돌지 않는 디스크 (코일 출력은 바뀌어도 캠 위치가 그대로)"""
+
+    def __init__(self, board, motor_index):
+        self.stepper = board.steppers[motor_index]
+        self.cam = board.cams[motor_index]
+        self.position = self.stepper.position
+        self.stepper.listeners.remove(self.cam._update)
+        self.start_steps = self.stepper.steps
+
+    def release(self):
+        self.stepper.listeners.append(self.cam._update)
+        self.cam._update(self.stepper.position)
+
+    @property
+    def steps(self):
+        return self.stepper.steps - self.start_steps
+
+
+def new_board(seed=3):
+    """가상 보드 + 오차 있는 캠 디스크 3개 + 모터 시스템 (원점 보정 후)"""
+    board = PillboxBoard(cam_class=ToleranceCamSwitch, cam_offsets={m: 50 * m for m in (1, 2, 3)},
+                         cam_args={m: {"seed": seed * 10 + m} for m in (1, 2, 3)})
+    system = PillBoxMotorSystem(state_path=None)
+    system.idle_callback = None
+    system.calibrate_all_disks_simultaneous()
+    return board, system
+
+
+def shift_cam(board, motor_index, steps, after):
+    """디스크가 after스텝 돈 뒤 캠이 steps만큼 밀림 (양수 = 늦게 옴, 탈조로 회전자가 덜 돈 경우)"""
+    stepper = board.steppers[motor_index]
+    cam = board.cams[motor_index]
+    start = stepper.position
+
+    def shift(position):
+        if start - position == after:
+            cam.offset -= steps
+            cam._update(position)
+            stepper.listeners.remove(shift)
+
+    stepper.listeners.insert(0, shift)
+
+
+class FakeDataManager:
+    def __init__(self):
+        self.logged = []
+
+    def log_dispense(self, dose_index, success):
+        self.logged.append((dose_index, success))
+
+
+class DispenseHost:
+    """MainScreen 배출 시퀀스가 쓰는 메서드만 가진 대역 (디스크 수량, 알람 시스템)"""
+
+    def __init__(self, counts, alarm_system):
+        self.data_manager = self
+        self.counts = dict(counts)
+        self.current_dose_index = 0
+        self.door_initialized = True
+        self.alarm_system = alarm_system
+
+    def get_disk_count(self, disk_num):
+        return self.counts[disk_num]
+
+    def _decrease_disk_count(self, disk_num):
+        self.counts[disk_num] -= 1
+
+    def _get_door_level_for_dose(self, dose_index):
+        return 2
+
+    def _get_total_pill_count(self):
+        return sum(self.counts.values())
+
+    def _update_status(self, text):
+        pass
+
+    def _flush_pending_data(self):
+        pass
+
+    _update_pill_count_display = _check_and_play_load_pill_notification = _flush_pending_data
+
+    _dispense_from_selected_disks_no_alarm = MainScreen._dispense_from_selected_disks_no_alarm
+    _dispense_from_selected_disks_async = MainScreen._dispense_from_selected_disks_async
+    _report_motor_faults = MainScreen._report_motor_faults
+
+
+def positions_moved(system, before, moved):
+    """moved 디스크만 1칸 진행"""
+    after = system.motor_controller.motor_positions
+    return all(after[m] == ((before[m] + 1) % 10 if m in moved else before[m]) for m in (1, 2, 3))
+
+
+def learn(system):
+    ok = all(system.advance_disks([1, 2, 3], 1, drop_ms=0) for _ in range(LEARN_MOVES))
+    return ok, system.take_faults()
+
+
+def scenario_normal(results):
+    print(f"정상 이동 {LEARN_MOVES}회 (캠 위치 ±6, 폭 20±4 스텝 오차)")
+    board, system = new_board()
+    ok, faults = learn(system)
+    stats = system.motor_controller.compartment_stats
+    check(results, "모든 이동 성공, 걸림/미끄러짐 오판 없음", ok and not faults, str(faults[:3]))
+    limits = [stats.stall_limit(m) for m in (1, 2, 3)]
+    print(f"  학습: 평균 {[round(stats.mean[m], 1) for m in (1, 2, 3)]} 스텝, "
+          f"허용 ±{[stats.tolerance(m) for m in (1, 2, 3)]}, 걸림 한계 {limits}")
+
+
+def scenario_jam(results):
+    print("디스크 걸림")
+    board, system = new_board()
+    learn(system)
+    limit = system.motor_controller.compartment_stats.stall_limit(2)
+
+    jam = Jam(board, 2)
+    positions = list(system.motor_controller.motor_positions)
+    start_us = clock.now_us
+    ok = system.advance_disks([1, 2, 3], 1, drop_ms=0)
+    elapsed_ms = (clock.now_us - start_us) / 1000
+    faults = system.take_faults()
+    stalls = [f for f in faults if f[0] == "stall"]
+    check(results, "걸린 디스크 2만 걸림으로 보고, 이동 실패", not ok and [f[1] for f in stalls] == [2], str(faults))
+    check(results, "학습한 한계 스텝 안에서 중단 (기존 2칸 한계 546스텝)",
+          jam.steps <= limit + system.motor_controller.limit_sampler.max_gap,
+          f"{jam.steps}스텝 / 한계 {limit}, {elapsed_ms:.0f} ms")
+    check(results, "다른 디스크는 1칸 이동 완료, 그 디스크만 칸 위치 갱신",
+          all(board.cams[m].edge_at(board.steppers[m].position) for m in (1, 3)) and
+          system.advanced_disks == [1, 3] and positions_moved(system, positions, [1, 3]))
+
+    jam_steps = jam.steps
+    ok = system.motor_controller.next_compartment(2)
+    check(results, "next_compartment도 한계에서 중단", not ok and jam.steps - jam_steps <= 2 * 273,
+          f"{jam.steps - jam_steps}스텝")
+    jam.release()
+    return faults
+
+
+def scenario_slip(results):
+    print("탈조 / 캠 조기 감지")
+    board, system = new_board()
+    learn(system)
+    shift_cam(board, 1, 40, after=100)   # 디스크 1: 40스텝 늦게 도착
+    shift_cam(board, 3, -40, after=100)  # 디스크 3: 40스텝 일찍 감지
+    ok = system.advance_disks([1, 2, 3], 1, drop_ms=0)
+    faults = system.take_faults()
+    kinds = {m: kind for kind, m, _ in faults}
+    check(results, "이동은 완료", ok)
+    check(results, "디스크 1 slip, 디스크 3 short 기록", kinds == {1: "slip", 3: "short"}, str(faults))
+    ok = all(system.advance_disks([1, 2, 3], 1, drop_ms=0) for _ in range(3))
+    check(results, "이후 정상 이동은 다시 오판 없음", ok and not system.take_faults())
+    return faults
+
+
+def scenario_broken_switch_calibration(results):
+    print("리미트 스위치 고장 상태의 원점 보정")
+    board, system = new_board()
+    jam = Jam(board, 3)
+    board.inputs.set_bit(LIMIT_BITS[3], 1)
+    ok = system.calibrate_all_disks_simultaneous()
+    check(results, "1.5칸(409스텝) 안에 실패", not ok and jam.steps <= 273 * 3 // 2, f"{jam.steps}스텝")
+
+
+def scenario_dispense(results):
+    print("배출 시퀀스 중 디스크 1개 걸림 (MainScreen._dispense_from_selected_disks_async)")
+    board, system = new_board()
+    learn(system)
+    alarms = AlarmSystem(FakeDataManager())
+    alarms.active_alarms[0] = {"dose_time": "08:00", "meal_name": "아침"}
+    host = DispenseHost({1: 5, 2: 5, 3: 5}, alarms)
+    positions = list(system.motor_controller.motor_positions)
+    jam = Jam(board, 2)
+    ok = host._dispense_from_selected_disks_no_alarm(system, [1, 2, 3], 0)
+    jam.release()
+    check(results, "복용은 실패, 걸린 디스크 2만 수량 그대로", not ok and host.counts == {1: 4, 2: 5, 3: 4},
+          str(host.counts))
+    check(results, "이동한 디스크 1, 3만 칸 위치 갱신", positions_moved(system, positions, [1, 3]))
+    check(results, "떨어진 약을 위해 도어는 복용 레벨로 열림", system.current_door_level == 2)
+    check(results, "걸림 이력 기록, 실패 로그는 여기서 남기지 않음",
+          [h["action"] for h in alarms.alarm_history] == ["motor_stall", "dispense_failed"] and
+          not alarms.data_manager.logged)
+
+
+def scenario_alarm(results, stall_faults, slip_faults):
+    print("알람 시스템 보고")
+    data_manager = FakeDataManager()
+    alarms = AlarmSystem(data_manager)
+    alarms.active_alarms[1] = {"dose_time": "12:30", "meal_name": "점심"}
+    stalled = alarms.report_motor_faults(1, slip_faults)
+    check(results, "slip/short는 기록만", not stalled and not data_manager.logged and
+          [h["action"] for h in alarms.alarm_history] == ["motor_" + f[0] for f in slip_faults])
+    alarms.alarm_history.clear()
+    stalled = alarms.report_motor_faults(1, stall_faults)
+    actions = [h["action"] for h in alarms.alarm_history]
+    check(results, "걸림은 _handle_dispense_failure로 복용 실패 처리 (실패 로그는 배출한 쪽이 1번 기록)",
+          stalled and not data_manager.logged and actions[-1] == "dispense_failed", str(actions))
+
+
+def main():
+    results = []
+    print("디스크 걸림/미끄러짐 감지 시험")
+    print("=" * 72)
+    scenario_normal(results)
+    stall_faults = scenario_jam(results)
+    slip_faults = scenario_slip(results)
+    scenario_broken_switch_calibration(results)
+    scenario_dispense(results)
+    scenario_alarm(results, stall_faults, slip_faults)
+    ok = all(results)
+    print("-" * 72)
+    print("걸림은 정해진 스텝 안에 실패로, 미끄러짐은 기록으로 보고" if ok else "걸림/미끄러짐 감지 검사 실패")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
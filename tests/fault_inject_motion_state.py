@@ -0,0 +1,243 @@
+"""
+모터 위치 상태 저장/재부팅 시험 (호스트 PC용, CPython + tests/hostsim)
+
+같은 모터/스위치 모델을 유지한 채 PillBoxMotorSystem을 다시 생성하여 재부팅을 흉내 내고 확인
+    - 첫 부팅(상태 파일 없음): 원점 보정 후 HOMED+CLEAN 상태 기록
+    - 정상 재부팅: 원점 보정과 도어 닫기 없이 칸 위치/도어 레벨/코일 시퀀스 위치 복원, 다음 이동이 정확히 1칸
+    - 이동 중 전원 차단: 다음 부팅에서 원점 보정
+    - 슬롯 기록 중 전원 차단(모든 바이트 위치): 잘못된 위치를 신뢰하지 않음
+    - 전원이 꺼진 동안 디스크가 돌아감(리미트 스위치 미감지) / 리미트 미감지 실패 후: 원점 보정
+    - 같은 부팅의 두 인스턴스: 다른 인스턴스가 옮긴 도어 레벨에서 이어서 이동
+
+실행: python tests/fault_inject_motion_state.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(TESTS_DIR, "..", "src")
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, TESTS_DIR)
+
+import hostsim  # noqa: E402
+
+clock = hostsim.install()
+
+import io_stats  # noqa: E402
+import motion_state  # noqa: E402
+import shift_bus  # noqa: E402
+from hostsim import check  # noqa: E402
+from hostsim.board import LIMIT_BITS, PillboxBoard  # noqa: E402
+from motor_control import PillBoxMotorSystem  # noqa: E402
+
+CAM_OFFSETS = {1: 40, 2: 130, 3: 220}  # 전원 투입 시 디스크 위치 (원점 보정이 필요한 위치)
+DOOR_STEPS = {0: 0, 1: 1593, 2: 3187, 3: 4781}
+
+
+class PowerLoss(BaseException):
+    """이동 중 전원 차단 (motor_control의 except Exception에 잡히지 않도록 BaseException 사용)"""
+
+
+def boot(state_path):
+    """재부팅: 버스/상태 파일 객체를 버리고 새 PillBoxMotorSystem 생성 (보드 모델의 회전자/캠 위치는 유지)"""
+    shift_bus.reset_bus()
+    motion_state.reset_state_files()
+    system = PillBoxMotorSystem(state_path=state_path)
+    system.idle_callback = None
+    return system
+
+
+def moved_steps(board):
+    return sum(stepper.steps for stepper in board.steppers.values())
+
+
+def read_file(state_path):
+    with open(state_path, 'rb') as f:
+        return f.read()
+
+
+def write_file(state_path, data):
+    with open(state_path, 'wb') as f:
+        f.write(data)
+
+
+def dose(system):
+    """복용 1회 (디스크 1, 2 동시 1칸 + 도어 2단)"""
+    return system.advance_disks([1, 2], 1, drop_ms=0) and system.open_door_to_level(2)
+
+
+def scenario_warm_reboot(work_dir, results):
+    print("정상 재부팅")
+    state_path = os.path.join(work_dir, "warm.bin")
+    board = PillboxBoard(cam_offsets=CAM_OFFSETS)  # 전원이 꺼져도 회전자/캠 위치 유지
+    system = boot(state_path)
+    check(results, "첫 부팅은 저장된 상태 없음", not system.state_trusted)
+    check(results, "첫 부팅 원점 보정", system.ensure_homed() and moved_steps(board) > 0)
+    before = system.state_file.writes
+    check(results, "복용 1회", dose(system))
+    writes = system.state_file.writes - before
+    positions = list(system.motor_controller.motor_positions[1:4])
+    phases = list(system.motor_controller.motor_steps[1:5])
+    counts = list(system.step_counts)
+
+    steps_before = moved_steps(board)
+    start_us = clock.now_us
+    system = boot(state_path)
+    check(results, "재부팅 후 저장된 위치 신뢰", system.state_trusted)
+    check(results, "원점 보정 생략 (모터 이동 없음)",
+          system.ensure_homed() and moved_steps(board) == steps_before,
+          f"{(clock.now_us - start_us) / 1000:.1f} ms")
+    check(results, "칸 위치/코일 시퀀스 위치/누적 스텝 복원",
+          list(system.motor_controller.motor_positions[1:4]) == positions and
+          list(system.motor_controller.motor_steps[1:5]) == phases and system.step_counts == counts)
+    check(results, "도어 레벨 2 복원 (다시 닫지 않음)", system.current_door_level == 2)
+
+    # 복원한 시퀀스 위치에서 이어서 구동하면 다음 칸까지 정확히 273스텝
+    disk_before = board.steppers[1].position
+    ok = system.advance_disks([1], 1, drop_ms=0)
+    check(results, "재부팅 후 다음 칸 이동 273스텝", ok and board.steppers[1].position - disk_before == -273,
+          f"{board.steppers[1].position - disk_before}")
+    ok = system.open_door_to_level(3)
+    check(results, "도어 2단 → 3단 이동량", ok and board.steppers[4].position == -DOOR_STEPS[3],
+          f"{board.steppers[4].position}")
+    print(f"  복용 1회 상태 기록: {writes}회 (이동 시작/완료), 슬롯 {motion_state.SLOT_SIZE}바이트")
+
+
+def scenario_power_loss_mid_move(work_dir, results):
+    print("이동 중 전원 차단")
+    state_path = os.path.join(work_dir, "cut.bin")
+    board = PillboxBoard(cam_offsets=CAM_OFFSETS)  # 전원이 꺼져도 회전자/캠 위치 유지
+    system = boot(state_path)
+    system.ensure_homed()
+    state = {"flash": None}
+    start = board.steppers[1].position
+
+    def cut(position):
+        if position <= start - 120:
+            # 차단 시점의 플래시 내용 (이후 finally 등에서 기록한 내용은 실제로는 남지 않음)
+            state["flash"] = read_file(state_path)
+            raise PowerLoss()
+
+    board.steppers[1].listeners.append(cut)
+    try:
+        system.advance_disks([1], 1, drop_ms=0)
+    except PowerLoss:
+        pass
+    board.steppers[1].listeners.remove(cut)
+    write_file(state_path, state["flash"])
+
+    system = boot(state_path)
+    check(results, "CLEAN 플래그 해제된 상태는 신뢰하지 않음", not system.state_trusted)
+    steps_before = moved_steps(board)
+    check(results, "다음 부팅에서 원점 보정", system.ensure_homed() and moved_steps(board) > steps_before)
+    check(results, "원점 보정 후 모든 리미트 스위치 눌림",
+          all(system.motor_controller.is_limit_switch_pressed(m) for m in (1, 2, 3)))
+
+
+def scenario_torn_slot(work_dir, results):
+    print("슬롯 기록 중 전원 차단 (모든 바이트 위치)")
+    state_path = os.path.join(work_dir, "torn.bin")
+    board = PillboxBoard(cam_offsets=CAM_OFFSETS)  # 전원이 꺼져도 회전자/캠 위치 유지
+    system = boot(state_path)
+    system.ensure_homed()
+    dose(system)
+
+    # 마지막 기록(이동 완료) 직전의 파일 내용
+    snapshots = []
+    state_file = system.state_file
+    save = state_file.save
+    state_file.save = lambda state: snapshots.append(read_file(state_path)) or save(state)
+    system.advance_disks([3], 1, drop_ms=0)
+    del state_file.save
+    before = snapshots[-1]
+    after = read_file(state_path)
+    final = motion_state.MotionStateFile(state_path).load()
+    changed = [i for i in range(len(after)) if before[i] != after[i]]
+    start, end = changed[0], changed[-1] + 1
+
+    bad = 0
+    trusted_new = 0
+    for cut in range(start, end):
+        write_file(state_path, after[:cut] + before[cut:])
+        loaded = motion_state.MotionStateFile(state_path).load()
+        if loaded is not None and loaded.trusted:
+            if loaded.pack() != final.pack():
+                bad += 1
+            else:
+                trusted_new += 1
+    check(results, "중간에 끊긴 슬롯은 신뢰하지 않음 (직전 슬롯 = 이동 시작 기록)", bad == 0 and trusted_new == 0,
+          f"차단 위치 {end - start}곳")
+    write_file(state_path, after)
+
+
+def scenario_moved_while_off(work_dir, results):
+    print("전원이 꺼진 동안 디스크 회전 / 리미트 미감지 실패")
+    state_path = os.path.join(work_dir, "moved.bin")
+    board = PillboxBoard(cam_offsets=CAM_OFFSETS)  # 전원이 꺼져도 회전자/캠 위치 유지
+    system = boot(state_path)
+    system.ensure_homed()
+    dose(system)
+
+    cam = board.cams[2]
+    cam.offset += 100  # 디스크 2가 100스텝 돌아간 상태
+    cam._update(board.steppers[2].position)
+    system = boot(state_path)
+    check(results, "리미트 스위치 미감지 시 신뢰하지 않음", not system.state_trusted)
+    system.ensure_homed()
+
+    # 디스크 3 리미트 스위치 고장 → 캠이 오지 않아 걸림으로 실패 → 원점 보정 전까지 HOMED 해제
+    board.steppers[3].listeners.remove(board.cams[3]._update)
+    board.inputs.set_bit(LIMIT_BITS[3], 1)
+    check(results, "리미트 미감지 이동 실패", not system.advance_disks([3], 1, drop_ms=0))
+    ok = system.advance_disks([1], 1, drop_ms=0)
+    stored = system.state_file.state
+    check(results, "실패 이후 정상 이동도 HOMED 없이 기록", ok and stored.flags == motion_state.FLAG_CLEAN)
+    board.steppers[3].listeners.append(board.cams[3]._update)
+    board.cams[3]._update(board.steppers[3].position)
+    system = boot(state_path)
+    check(results, "다음 부팅에서 원점 보정 필요", not system.state_trusted)
+
+
+def scenario_two_instances(work_dir, results):
+    print("같은 부팅의 두 인스턴스")
+    state_path = os.path.join(work_dir, "shared.bin")
+    board = PillboxBoard(cam_offsets=CAM_OFFSETS)  # 전원이 꺼져도 회전자/캠 위치 유지
+    startup = boot(state_path)
+    startup.ensure_homed()
+    main = PillBoxMotorSystem(state_path=state_path)  # 원점 보정 후 생성 (MainScreen 지연 로딩)
+    main.idle_callback = None
+    check(results, "원점 보정 후 생성한 인스턴스는 저장된 위치 사용", main.state_trusted)
+    loading = PillBoxMotorSystem(state_path=state_path)
+    loading.idle_callback = None
+    loading.open_door_to_level(2)
+    main.open_door_to_level(3)
+    check(results, "다른 인스턴스가 연 도어 레벨에서 이어서 이동", board.steppers[4].position == -DOOR_STEPS[3],
+          f"{board.steppers[4].position}")
+    check(results, "상태 파일 도어 레벨", main.state_file.state.door_level == 3)
+
+
+def main():
+    work_dir = tempfile.mkdtemp(prefix="motion_state_")
+    io_stats.init_tracker(os.path.join(work_dir, "io_stats.bin"))
+    results = []
+    try:
+        print("모터 위치 상태 저장 / 재부팅 시험")
+        print("=" * 72)
+        scenario_warm_reboot(work_dir, results)
+        scenario_power_loss_mid_move(work_dir, results)
+        scenario_torn_slot(work_dir, results)
+        scenario_moved_while_off(work_dir, results)
+        scenario_two_instances(work_dir, results)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    ok = all(results)
+    print("-" * 72)
+    print("모든 재부팅 시나리오에서 검증된 위치만 사용" if ok else "위치 상태 검사 실패")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""
+호스트 PC용 MicroPython 하드웨어 대체 패키지 (CPython)
+가짜 machine 모듈(Pin, SPI, SoftSPI, Timer), micropython 모듈(schedule)과 시뮬레이션 시계를 등록하여
+motor_control.py 같은 기기용 모듈을 PC에서 수정 없이 실행
+(74HC595/74HC165/스테퍼/버튼 모델을 한 번에 연결하려면 hostsim.board.PillboxBoard 사용,
+시나리오 검사 결과 기록/출력은 hostsim.check)
+
+    import hostsim
+    clock = hostsim.install()          # motor_control import 전에 호출
+    from motor_control import StepperMotorController
+
+time 모듈에는 MicroPython 전용 함수(sleep_us, sleep_ms, ticks_us, ticks_ms, ticks_diff, ticks_add)를
+시뮬레이션 시계 기준으로 추가하고, time.sleep도 실제로 기다리지 않고 시뮬레이션 시간만 진행시킴
+"""
+
+import sys
+import time as _time
+
+from . import machine, micropython
+
+TICKS_PERIOD = 1 << 30  # MicroPython ticks 값 범위 (ticks_diff/ticks_add 랩어라운드 기준)
+
+
+class _Alarm:
+    """시각 예약 호출 1개 (SimClock.call_at)"""
+
+    def __init__(self, at_us, func):
+        self.next_us = at_us
+        self.func = func
+
+    def _fire(self, clock):
+        clock.timers.remove(self)
+        self.func()
+
+
+class SimClock:
+    """시뮬레이션 시계 (마이크로초 단위, sleep 호출 시에만 진행)
+
+    시계가 진행하는 동안 예약 시각이 지난 machine.Timer 콜백(인터럽트)과 call_at 호출을 시각 순서대로 실행하고,
+    인터럽트가 micropython.schedule로 예약한 함수는 인터럽트 직후 실행 (예약 함수 실행 중이면 끝난 뒤 실행)
+    """
+
+    def __init__(self):
+        self.now_us = 0
+        self.sleep_calls = 0
+        self.timers = []  # 실행 중인 machine.Timer / 예약 호출 (next_us 순서로 실행)
+
+    def advance_us(self, us):
+        target = self.now_us + int(us)
+        micropython.run_pending()
+        if self.timers:
+            self._run_timers(target)
+        if target > self.now_us:
+            self.now_us = target
+
+    def _run_timers(self, target):
+        while True:
+            due = None
+            for timer in self.timers:
+                if timer.next_us <= target and (due is None or timer.next_us < due.next_us):
+                    due = timer
+            if due is None:
+                return
+            if due.next_us > self.now_us:
+                self.now_us = due.next_us
+            due._fire(self)
+            micropython.run_pending()
+
+    def call_at(self, at_ms, func):
+        """시뮬레이션 시각 at_ms에 func() 호출 (버튼 누름 등 외부 입력 예약)"""
+        self.timers.append(_Alarm(int(at_ms * 1000), func))
+
+    def sleep_us(self, us):
+        self.sleep_calls += 1
+        if us > 0:
+            self.advance_us(us)
+
+    def sleep_ms(self, ms):
+        self.sleep_us(int(ms * 1000))
+
+    def sleep(self, s):
+        self.sleep_us(int(s * 1000000))
+
+    def ticks_us(self):
+        return self.now_us % TICKS_PERIOD
+
+    def ticks_ms(self):
+        return (self.now_us // 1000) % TICKS_PERIOD
+
+    def reset(self):
+        self.now_us = 0
+        self.sleep_calls = 0
+        self.timers = []
+
+
+def ticks_diff(end, start):
+    """MicroPython time.ticks_diff (랩어라운드 처리)"""
+    diff = (end - start) % TICKS_PERIOD
+    if diff >= TICKS_PERIOD // 2:
+        diff -= TICKS_PERIOD
+    return diff
+
+
+def ticks_add(ticks, delta):
+    """MicroPython time.ticks_add"""
+    return (ticks + delta) % TICKS_PERIOD
+
+
+clock = SimClock()
+_installed = False
+
+
+def install():
+    """가짜 machine 모듈 등록 및 time 모듈에 시뮬레이션 함수 추가 (여러 번 호출해도 1회만 적용)"""
+    global _installed
+    if not _installed:
+        sys.modules["machine"] = machine
+        sys.modules.setdefault("micropython", micropython)
+        _time.sleep = clock.sleep
+        _time.sleep_ms = clock.sleep_ms
+        _time.sleep_us = clock.sleep_us
+        _time.ticks_us = clock.ticks_us
+        _time.ticks_ms = clock.ticks_ms
+        _time.ticks_cpu = clock.ticks_us
+        _time.ticks_diff = ticks_diff
+        _time.ticks_add = ticks_add
+        machine.set_clock(clock)
+        _installed = True
+    return clock
+
+
+def install_asyncio():
+    """시뮬레이션 시계 기준 asyncio 대체 모듈(hostsim.aio)을 sys.modules["asyncio"]로 등록 (install 후 호출)"""
+    from . import aio
+    aio._loop.clock = clock
+    sys.modules["asyncio"] = aio
+    return aio
+
+
+def reset():
+    """시계와 핀 상태 초기화 (시나리오 사이에 호출), 기기용 공유 버스(shift_bus)가 로드되어 있으면 해제"""
+    clock.reset()
+    machine.reset()
+    micropython.reset()
+    shift_bus = sys.modules.get("shift_bus")
+    if shift_bus is not None:
+        shift_bus.reset_bus()
+
+
+def check(results, name, ok, detail=""):
+    """시나리오 검사 1개 결과 기록 및 출력 (스크립트는 all(results)로 종료 코드 결정)"""
+    results.append(ok)
+    print(f"  {'OK ' if ok else 'FAIL'} {name}{'  ' + detail if detail else ''}")
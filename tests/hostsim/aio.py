@@ -0,0 +1,187 @@
+"""
+MicroPython asyncio 대체 모듈 (시뮬레이션 시계 기준, 단일 스레드 결정적 스케줄러)
+기기용 코드가 쓰는 API만 제공: create_task, sleep, sleep_ms, gather, run, Event, Task.cancel, CancelledError
+
+    import hostsim
+    clock = hostsim.install()
+    asyncio = hostsim.install_asyncio()   # sys.modules["asyncio"]로 등록
+
+실행할 태스크가 없으면 가장 먼저 깨어날 태스크의 시각까지 시계를 진행 (실제 기기에서 CPU가 쉬는 시간)
+그 시간 합계는 idle_us에 기록
+"""
+
+import heapq
+
+
+class CancelledError(BaseException):
+    pass
+
+
+class _Sleep:
+    def __init__(self, us):
+        self.us = us
+
+    def __await__(self):
+        yield ("sleep", self.us)
+
+
+class Task:
+    """코루틴 실행 단위 (await하면 끝날 때까지 기다린 뒤 결과 반환)"""
+
+    def __init__(self, coro, loop):
+        self.coro = coro
+        self.loop = loop
+        self.done = False
+        self.result = None
+        self.exception = None
+        self.waiters = []
+        self._cancel = False
+
+    def __await__(self):
+        while not self.done:
+            yield ("wait", self)
+        if self.exception is not None:
+            raise self.exception
+        return self.result
+
+    def cancel(self):
+        if not self.done:
+            self._cancel = True
+            self.loop._wake(self)
+        return True
+
+
+class Event:
+    def __init__(self):
+        self.state = False
+        self.waiters = []
+
+    def set(self):
+        self.state = True
+        for task in self.waiters:
+            _loop._wake(task)
+        self.waiters = []
+
+    def clear(self):
+        self.state = False
+
+    def is_set(self):
+        return self.state
+
+    def __await__(self):
+        while not self.state:
+            yield ("event", self)
+        return True
+
+    def wait(self):
+        return self
+
+
+class Loop:
+    def __init__(self):
+        self.clock = None
+        self.ready = []
+        self.sleeping = []  # (깨어날 시각 us, 순번, 태스크) 힙
+        self._seq = 0
+        self.idle_us = 0
+
+    def reset(self):
+        self.ready = []
+        self.sleeping = []
+        self.idle_us = 0
+
+    def _wake(self, task):
+        if task not in self.ready:
+            self.ready.append(task)
+
+    def create_task(self, coro):
+        task = Task(coro, self)
+        self.ready.append(task)
+        return task
+
+    def _step(self, task):
+        if task.done:
+            return
+        try:
+            if task._cancel:
+                task._cancel = False
+                request = task.coro.throw(CancelledError())
+            else:
+                request = task.coro.send(None)
+        except StopIteration as e:
+            self._finish(task, e.value, None)
+            return
+        except BaseException as e:
+            self._finish(task, None, e)
+            return
+        kind, target = request
+        if kind == "sleep":
+            self._seq += 1
+            heapq.heappush(self.sleeping, (self.clock.now_us + max(0, target), self._seq, task))
+        elif kind == "wait":
+            target.waiters.append(task)
+        elif kind == "event":
+            target.waiters.append(task)
+
+    def _finish(self, task, result, exception):
+        task.done = True
+        task.result = result
+        task.exception = exception
+        for waiter in task.waiters:
+            self._wake(waiter)
+        task.waiters = []
+
+    def run_until_complete(self, main):
+        while not main.done:
+            if self.ready:
+                self._step(self.ready.pop(0))
+                continue
+            if not self.sleeping:
+                raise RuntimeError("deadlock: 실행할 태스크도, 깨어날 태스크도 없음")
+            wake_us, _, task = heapq.heappop(self.sleeping)
+            if task.done:
+                continue
+            if wake_us > self.clock.now_us:
+                self.idle_us += wake_us - self.clock.now_us
+                self.clock.advance_us(wake_us - self.clock.now_us)  # 쉬는 동안에도 타이머 인터럽트 실행
+            self._step(task)
+            # 같은 시각에 깨어날 태스크는 순번대로 이어서 실행
+        if main.exception is not None:
+            raise main.exception
+        return main.result
+
+
+_loop = Loop()
+
+
+def get_event_loop():
+    return _loop
+
+
+def create_task(coro):
+    return _loop.create_task(coro)
+
+
+def sleep_ms(ms):
+    return _Sleep(int(ms * 1000))
+
+
+def sleep(s):
+    return _Sleep(int(s * 1000000))
+
+
+async def gather(*aws, return_exceptions=False):
+    tasks = [aw if isinstance(aw, Task) else create_task(aw) for aw in aws]
+    results = []
+    for task in tasks:
+        try:
+            results.append(await task)
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            results.append(e)
+    return results
+
+
+def run(coro):
+    return _loop.run_until_complete(create_task(coro))
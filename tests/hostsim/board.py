@@ -0,0 +1,105 @@
+"""
+필박스 보드 모델 (74HC595 x2 → ULN2003 → 28BYJ-48 x4, 74HC165 ← 버튼 SW1~4 / 디스크 캠 리미트 스위치 1~3)
+
+    import hostsim
+    clock = hostsim.install()
+    from hostsim.board import PillboxBoard
+    board = PillboxBoard(cam_offsets={1: 0, 2: 90, 3: 181})
+    system = PillBoxMotorSystem(state_path=None)   # 기기용 코드는 수정 없이 그대로 사용
+    ...
+    board.print_report("배출 1회")
+
+    # 칸마다 캠 위치/폭 오차가 있는 디스크 (cam_args: 모터별 추가 인자)
+    from hostsim.stepper import ToleranceCamSwitch
+    board = PillboxBoard(cam_class=ToleranceCamSwitch, cam_offsets={1: 50, 2: 100, 3: 150},
+                         cam_args={m: {"seed": 30 + m} for m in (1, 2, 3)})
+
+report()는 모터별 스텝/위치, 래치한 프레임 수, 시프트한 비트 수, 입력 스캔 수, 핀 쓰기 수, 시뮬레이션 경과 시간을
+보드 생성(또는 마지막 mark()) 이후 기준으로 집계
+"""
+
+from . import clock, machine, micropython, reset
+from .hc165 import ShiftRegister165
+from .hc595 import ShiftRegister595
+from .stepper import CamLimitSwitch, StepperModel
+
+LIMIT_BITS = {1: 5, 2: 6, 3: 7}            # 디스크 1~3 리미트 스위치 (motor_control.StepperMotorController와 같은 배치)
+BUTTON_BITS = {"A": 0, "B": 1, "C": 2, "D": 3}  # SW1~SW4 (button_interface.ButtonInterface와 같은 배치)
+
+
+class ButtonPanel:
+    """버튼 SW1~SW4 (74HC165 비트 0~3, 눌림 = LOW)"""
+
+    def __init__(self, inputs):
+        self.inputs = inputs
+        self.presses = {name: 0 for name in BUTTON_BITS}
+
+    def press(self, name):
+        self.inputs.set_bit(BUTTON_BITS[name], 0)
+        self.presses[name] += 1
+
+    def release(self, name):
+        self.inputs.set_bit(BUTTON_BITS[name], 1)
+
+    def tap(self, name, at_ms, hold_ms=100):
+        """시뮬레이션 시각 at_ms에 눌렀다가 hold_ms 뒤에 뗌"""
+        clock.call_at(at_ms, lambda: self.press(name))
+        clock.call_at(at_ms + hold_ms, lambda: self.release(name))
+
+
+class PillboxBoard:
+    """필박스 보드 전체 모델 (생성 시 hostsim.reset()으로 핀/시계/공유 버스 초기화)"""
+
+    def __init__(self, cam_offsets=None, cam_width=20, door=True, cam_class=CamLimitSwitch, cam_args=None):
+        reset()
+        self.outputs = ShiftRegister595()
+        self.inputs = ShiftRegister165()
+        self.buttons = ButtonPanel(self.inputs)
+        self.steppers = {}
+        self.cams = {}
+        cam_offsets = cam_offsets or {}
+        cam_args = cam_args or {}
+        for motor_index in (1, 2, 3):
+            stepper = StepperModel(self.outputs, motor_index)
+            self.steppers[motor_index] = stepper
+            self.cams[motor_index] = cam_class(stepper, self.inputs, LIMIT_BITS[motor_index],
+                                               width=cam_width, offset=cam_offsets.get(motor_index, 0),
+                                               **cam_args.get(motor_index, {}))
+        if door:
+            self.steppers[4] = StepperModel(self.outputs, 4)
+        self.mark()
+
+    def mark(self):
+        """집계 기준점 설정 (report()는 이 시점 이후 값)"""
+        self._base = self._totals()
+
+    def _totals(self):
+        return {
+            "time_us": clock.now_us,
+            "steps": {m: stepper.steps for m, stepper in self.steppers.items()},
+            "frames": len(self.outputs.latches),
+            "bits": self.outputs.shifts,
+            "scans": self.inputs.reads,
+            "pin_writes": machine.stats["pin_writes"],
+            "spi_bytes": machine.stats["spi_bytes"],
+            "sleeps": clock.sleep_calls,
+            "scheduled": micropython.stats["scheduled"],
+        }
+
+    def report(self):
+        """기준점 이후 집계 dict (steps는 모터별 스텝 수, positions는 현재 위치)"""
+        now = self._totals()
+        base = self._base
+        report = {key: now[key] - base[key] for key in now if key != "steps"}
+        report["steps"] = {m: now["steps"][m] - base["steps"].get(m, 0) for m in now["steps"]}
+        report["positions"] = {m: stepper.position for m, stepper in self.steppers.items()}
+        report["energized"] = [m for m, stepper in self.steppers.items() if stepper.energized]
+        return report
+
+    def print_report(self, title):
+        r = self.report()
+        steps = ", ".join(f"M{m} {r['steps'][m]}" for m in sorted(r["steps"]))
+        print(f"[{title}] {r['time_us'] / 1000:.1f} ms, 스텝 {steps}")
+        print(f"    프레임 {r['frames']}, 시프트 비트 {r['bits']}, 입력 스캔 {r['scans']}, "
+              f"핀 쓰기 {r['pin_writes']}, SPI 바이트 {r['spi_bytes']}, sleep {r['sleeps']}, schedule {r['scheduled']}")
+        return r
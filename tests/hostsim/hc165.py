@@ -0,0 +1,47 @@
+"""
+74HC165 모델 (8비트 병렬 입력 → 직렬 출력)
+PL(=74HC595 ST_CP와 같은 핀)이 LOW인 동안 병렬 입력을 로드하고,
+PL이 HIGH일 때 CLK(=74HC595 SH_CP) 상승 에지마다 한 비트씩 시프트 (Q7 = 현재 최상위 비트)
+"""
+
+from . import machine
+
+
+class ShiftRegister165:
+    """74HC165 (핀 리스너 + 입력 제공 함수로 동작)"""
+
+    def __init__(self, clock_pin=3, pload_pin=15, data_pin=10, inputs=0xFF):
+        self.inputs = inputs  # 병렬 입력 (비트 = 1이면 HIGH, 버튼/리미트 스위치는 눌리면 0)
+        self.register = inputs
+        self.loading = True
+        self.reads = 0        # PL 상승 횟수 (입력 래치 횟수, 74HC595 latch 펄스 포함)
+        machine.add_listener(clock_pin, self._on_clock)
+        machine.add_listener(pload_pin, self._on_pload)
+        machine.set_input(data_pin, self._q7)
+
+    def _on_pload(self, level):
+        if level == 0:
+            self.loading = True
+            self.register = self.inputs
+        else:
+            # PL이 LOW인 동안은 병렬 입력이 계속 로드되므로 상승 에지 순간의 입력이 시프트 대상
+            # (읽기 후 PL을 LOW로 두어도 다음 읽기에서 최신 입력을 읽음)
+            self.register = self.inputs
+            self.loading = False
+            self.reads += 1
+
+    def _on_clock(self, level):
+        if level and not self.loading:
+            self.register = (self.register << 1) & 0xFF
+
+    def _q7(self):
+        if self.loading:
+            self.register = self.inputs
+        return (self.register >> 7) & 1
+
+    def set_bit(self, bit, level):
+        """입력 비트 설정 (level 0 = 눌림)"""
+        if level:
+            self.inputs |= (1 << bit)
+        else:
+            self.inputs &= ~(1 << bit)
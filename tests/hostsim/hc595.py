@@ -0,0 +1,47 @@
+"""
+74HC595 2개 체인 모델 (16비트)
+SH_CP 상승 에지에서 DS 비트를 시프트하고 ST_CP 상승 에지에서 출력 래치에 복사
+래치된 출력은 모터 1(Q0~Q3 of 1번 칩) ~ 모터 4(Q4~Q7 of 2번 칩) 순서의 16비트 값
+"""
+
+from . import machine
+
+
+class ShiftRegister595:
+    """74HC595 체인 (핀 리스너로 동작)"""
+
+    def __init__(self, ds_pin=2, sh_cp_pin=3, st_cp_pin=15, width=16):
+        self.ds_pin = ds_pin
+        self.mask = (1 << width) - 1
+        self.shift = 0
+        self.output = 0
+        self.latches = []  # 래치될 때마다 출력 값 기록
+        self.shifts = 0    # 시프트한 비트 수 (SH_CP 상승 에지)
+        self.listeners = []  # 래치될 때마다 호출 callback(출력 값) (스테퍼 모델 등)
+        machine.add_listener(sh_cp_pin, self._on_shift_clock)
+        machine.add_listener(st_cp_pin, self._on_storage_clock)
+
+    def _on_shift_clock(self, level):
+        if level:
+            self.shifts += 1
+            bit = machine._levels.get(self.ds_pin, 0)
+            self.shift = ((self.shift << 1) | bit) & self.mask
+
+    def _on_storage_clock(self, level):
+        if level:
+            self.output = self.shift
+            self.latches.append(self.output)
+            for callback in self.listeners:
+                callback(self.output)
+
+    def motor_nibble(self, motor_index):
+        """모터 1~4의 현재 코일 출력 (4비트)"""
+        return (self.output >> ((motor_index - 1) * 4)) & 0x0F
+
+    def output_changes(self):
+        """연속 중복을 제거한 래치 출력 순서 (같은 값을 다시 래치한 경우 제외)"""
+        changes = []
+        for value in self.latches:
+            if not changes or changes[-1] != value:
+                changes.append(value)
+        return changes
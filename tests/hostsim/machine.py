@@ -0,0 +1,230 @@
+"""
+가짜 machine 모듈 (hostsim.install()이 sys.modules["machine"]으로 등록)
+
+Pin: 같은 번호의 Pin 객체는 레벨을 공유하며, 출력 변화를 리스너(시프트 레지스터 모델)에 전달하고
+     입력 핀은 등록된 제공 함수(74HC165 모델 등)에서 값을 읽음
+SPI / SoftSPI: 모드 0으로 비트마다 MOSI 설정 → MISO 샘플 → SCK 상승/하강을 핀에 그대로 재현하여
+     비트뱅 경로와 같은 모델로 결과를 비교할 수 있게 하고, 전송한 프레임을 frames에 기록
+Timer: 시뮬레이션 시계가 진행할 때 예약 시각마다 콜백 호출 (hostsim.SimClock 참고)
+"""
+
+_levels = {}       # 핀 번호 → 출력 레벨
+_listeners = {}    # 핀 번호 → [callback(level)] (레벨이 바뀔 때 호출)
+_inputs = {}       # 핀 번호 → 값 제공 함수 (입력 핀 읽기)
+_clock = None
+
+stats = {"pin_writes": 0, "pin_reads": 0, "spi_bytes": 0}
+
+
+def set_clock(clock):
+    """SPI 전송 시간을 반영할 시뮬레이션 시계 설정"""
+    global _clock
+    _clock = clock
+
+
+def reset():
+    """핀 상태, 리스너, 통계 초기화"""
+    _levels.clear()
+    _listeners.clear()
+    _inputs.clear()
+    for key in stats:
+        stats[key] = 0
+
+
+def add_listener(pin_id, callback):
+    """출력 레벨 변화 리스너 등록"""
+    _listeners.setdefault(pin_id, []).append(callback)
+
+
+def set_input(pin_id, provider):
+    """입력 핀 값 제공 함수 등록 (provider() → 0/1)"""
+    _inputs[pin_id] = provider
+
+
+def _pin_id(pin):
+    return pin.id if isinstance(pin, Pin) else pin
+
+
+def _write(pin_id, level):
+    stats["pin_writes"] += 1
+    if _levels.get(pin_id) == level:
+        return
+    _levels[pin_id] = level
+    listeners = _listeners.get(pin_id)
+    if listeners:
+        for callback in listeners:
+            callback(level)
+
+
+def _read(pin_id):
+    stats["pin_reads"] += 1
+    provider = _inputs.get(pin_id)
+    if provider is not None:
+        return provider()
+    return _levels.get(pin_id, 0)
+
+
+class Pin:
+    IN = 1
+    OUT = 3
+    OPEN_DRAIN = 7
+    PULL_UP = 2
+    PULL_DOWN = 1
+    IRQ_RISING = 1
+    IRQ_FALLING = 2
+
+    def __init__(self, pin_id, mode=-1, pull=-1, value=None):
+        self.id = pin_id
+        self.mode = mode
+        if value is not None:
+            _write(pin_id, 1 if value else 0)
+
+    def init(self, mode=-1, pull=-1, value=None):
+        self.mode = mode
+        if value is not None:
+            _write(self.id, 1 if value else 0)
+
+    def value(self, level=None):
+        if level is None:
+            return _read(self.id)
+        _write(self.id, 1 if level else 0)
+        return None
+
+    def __call__(self, level=None):
+        return self.value(level)
+
+    def on(self):
+        _write(self.id, 1)
+
+    def off(self):
+        _write(self.id, 0)
+
+    def irq(self, handler=None, trigger=3):
+        return None
+
+    def __repr__(self):
+        return f"Pin({self.id})"
+
+
+class SoftSPI:
+    """소프트웨어 SPI (모드 0만 재현, MSB first)"""
+
+    MSB = 0
+    LSB = 1
+
+    def __init__(self, baudrate=500000, polarity=0, phase=0, bits=8, firstbit=MSB, sck=None, mosi=None, miso=None):
+        self.frames = []
+        self.init(baudrate=baudrate, polarity=polarity, phase=phase, sck=sck, mosi=mosi, miso=miso)
+
+    def init(self, baudrate=None, polarity=0, phase=0, bits=8, firstbit=MSB, sck=None, mosi=None, miso=None):
+        if baudrate is not None:
+            self.baudrate = baudrate
+        if sck is not None:
+            self.sck = _pin_id(sck)
+        if mosi is not None:
+            self.mosi = _pin_id(mosi)
+        self.miso = _pin_id(miso) if miso is not None else getattr(self, "miso", None)
+        _write(self.sck, polarity)
+
+    def deinit(self):
+        pass
+
+    def _transfer(self, wbuf, rbuf=None):
+        """바이트마다 8비트를 핀 단위로 전송 (리스너가 없으면 기록만 하는 빠른 경로)"""
+        stats["spi_bytes"] += len(wbuf)
+        self.frames.append(bytes(wbuf))
+        if _clock is not None:
+            _clock.advance_us(len(wbuf) * 8 * 1000000 // self.baudrate)
+        pins_watched = self.sck in _listeners or (rbuf is not None and self.miso in _inputs)
+        for i, byte in enumerate(wbuf):
+            value = 0
+            for bit in range(7, -1, -1):
+                if pins_watched:
+                    _levels[self.mosi] = (byte >> bit) & 1
+                    if rbuf is not None and self.miso is not None:
+                        value = (value << 1) | _read(self.miso)
+                    _write(self.sck, 1)
+                    _write(self.sck, 0)
+            if rbuf is not None:
+                rbuf[i] = value if pins_watched else 0xFF
+
+    def write(self, buf):
+        self._transfer(buf)
+
+    def readinto(self, buf, write=0x00):
+        self._transfer(bytes([write]) * len(buf), buf)
+
+    def read(self, nbytes, write=0x00):
+        buf = bytearray(nbytes)
+        self.readinto(buf, write)
+        return bytes(buf)
+
+    def write_readinto(self, write_buf, read_buf):
+        self._transfer(write_buf, read_buf)
+
+
+class SPI(SoftSPI):
+    """하드웨어 SPI (호스트에서는 SoftSPI와 같은 동작, 버스 번호만 추가)"""
+
+    def __init__(self, spi_id, baudrate=1000000, polarity=0, phase=0, bits=8, firstbit=SoftSPI.MSB,
+                 sck=None, mosi=None, miso=None):
+        self.id = spi_id
+        super().__init__(baudrate=baudrate, polarity=polarity, phase=phase, sck=sck, mosi=mosi, miso=miso)
+
+
+class Timer:
+    """machine.Timer (시뮬레이션 시계가 period ms마다 콜백 호출, 콜백은 인터럽트처럼 실행 중인 코드 사이에 끼어듦)"""
+
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, timer_id=0):
+        self.id = timer_id
+        self.callback = None
+        self.period = None
+        self.mode = Timer.PERIODIC
+        self.next_us = 0
+        self.fires = 0
+
+    def init(self, mode=PERIODIC, period=None, freq=None, callback=None):
+        self.deinit()
+        self.mode = mode
+        self.period = period if period is not None else (1000 // freq if freq else None)
+        self.callback = callback
+        if self.period and _clock is not None:
+            self.next_us = _clock.now_us + self.period * 1000
+            _clock.timers.append(self)
+
+    def deinit(self):
+        self.callback = None
+        if _clock is not None and self in _clock.timers:
+            _clock.timers.remove(self)
+
+    def _fire(self, clock):
+        if self.mode == Timer.PERIODIC:
+            self.next_us += self.period * 1000
+        else:
+            clock.timers.remove(self)
+        self.fires += 1
+        if self.callback is not None:
+            self.callback(self)
+
+
+class RTC:
+    """machine.RTC 자리 표시 (datetime 고정값, 화면 모듈 import용)"""
+
+    def __init__(self):
+        self._datetime = (2025, 1, 1, 2, 8, 0, 0, 0)
+
+    def datetime(self, value=None):
+        if value is None:
+            return self._datetime
+        self._datetime = tuple(value)
+
+
+def reset_cause():
+    return 1
+
+
+def freq(hz=None):
+    return 160000000
@@ -0,0 +1,56 @@
+"""
+가짜 micropython 모듈 (hostsim.install()이 sys.modules["micropython"]으로 등록)
+
+schedule: 큐에 넣기만 하고 다음 실행 기회(타이머 인터럽트가 끝난 직후, 시뮬레이션 시계가 진행할 때)에 실행
+          (인터럽트 안에서 바로 실행되지 않고, 예약 함수끼리는 서로 끼어들지 않는 것은 기기와 같음, 큐 크기는 기기 기본값 8)
+const / native / viper: 호스트에서는 값/함수를 그대로 반환
+"""
+
+SCHEDULE_DEPTH = 8
+
+_queue = []
+_running = False
+stats = {"scheduled": 0, "queue_full": 0}
+
+
+def schedule(func, arg):
+    """func(arg) 실행 예약 (큐가 가득 차면 RuntimeError, 기기와 같음)"""
+    if len(_queue) >= SCHEDULE_DEPTH:
+        stats["queue_full"] += 1
+        raise RuntimeError("schedule queue full")
+    _queue.append((func, arg))
+    stats["scheduled"] += 1
+
+
+def run_pending():
+    """예약된 함수 실행 (예약 함수 안에서 호출되면 아무것도 하지 않음)"""
+    global _running
+    if _running or not _queue:
+        return
+    _running = True
+    try:
+        while _queue:
+            func, arg = _queue.pop(0)
+            func(arg)
+    finally:
+        _running = False
+
+
+def reset():
+    global _running
+    _queue.clear()
+    _running = False
+    for key in stats:
+        stats[key] = 0
+
+
+def const(value):
+    return value
+
+
+def native(func):
+    return func
+
+
+def viper(func):
+    return func
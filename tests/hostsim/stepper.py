@@ -0,0 +1,90 @@
+"""
+ULN2003 + 28BYJ-48 스테퍼 모터 모델과 디스크 캠 리미트 스위치 모델
+74HC595 래치 출력의 모터 니블(코일 상태) 변화를 하프 스텝 시퀀스 인덱스 변화로 해석하여 회전 위치를 추적하고,
+디스크 캠은 273스텝(1칸)마다 리미트 스위치를 누름 (74HC165 입력 비트 LOW)
+"""
+
+HALF_STEP_SEQUENCE = (0x08, 0x0C, 0x04, 0x06, 0x02, 0x03, 0x01, 0x09)
+STEPS_PER_COMPARTMENT = 273
+
+
+class StepperModel:
+    """래치 출력으로 움직이는 스테퍼 모터 (위치 단위: 하프 스텝, 감소 방향 = 배출 방향)"""
+
+    def __init__(self, outputs, motor_index, index=0):
+        self.motor_index = motor_index
+        self.position = 0
+        self.steps = 0          # 실제로 움직인 스텝 수 (방향 무관)
+        self.energized = False  # 코일 통전 여부
+        # 회전자가 멈춰 있는 시퀀스 위치 (전원 투입 시 컨트롤러 motor_steps 초기값 0과 같은 위치로 가정,
+        # 코일을 꺼도 회전자는 그 자리에 남음)
+        self._index = index
+        self._shift = (motor_index - 1) * 4
+        self.listeners = []     # 위치가 바뀔 때마다 호출 callback(위치)
+        outputs.listeners.append(self._on_latch)
+
+    def _on_latch(self, word):
+        nibble = (word >> self._shift) & 0x0F
+        self.energized = nibble != 0
+        if nibble not in HALF_STEP_SEQUENCE:
+            return
+        index = HALF_STEP_SEQUENCE.index(nibble)
+        if self._index is not None and index != self._index:
+            delta = (index - self._index) % 8
+            if delta > 4:
+                delta -= 8
+            self.position += delta
+            self.steps += abs(delta)
+            for callback in self.listeners:
+                callback(self.position)
+        self._index = index
+
+
+class CamLimitSwitch:
+    """디스크 캠 리미트 스위치 (배출 방향 회전량 기준 period 스텝마다 width 스텝 동안 눌림)"""
+
+    def __init__(self, stepper, inputs, bit, period=STEPS_PER_COMPARTMENT, width=20, offset=0):
+        self.inputs = inputs
+        self.bit = bit
+        self.period = period
+        self.width = width
+        self.offset = offset
+        stepper.listeners.append(self._update)
+        self._update(stepper.position)
+
+    def is_pressed_at(self, position):
+        return (self.offset - position) % self.period < self.width
+
+    def _update(self, position):
+        self.inputs.set_bit(self.bit, 0 if self.is_pressed_at(position) else 1)
+
+
+class ToleranceCamSwitch(CamLimitSwitch):
+    """칸마다 캠 위치/폭에 가공 오차가 있는 디스크 (1바퀴 revolution 스텝에 compartments개 캠)
+
+    k번째 캠은 round(k * revolution / compartments) + 위치 오차(±tolerance)에서 시작해
+    width ± width_tolerance 스텝 동안 눌림 (seed가 같으면 같은 디스크)
+    """
+
+    def __init__(self, stepper, inputs, bit, seed, tolerance=6, width=20, width_tolerance=4,
+                 revolution=4096, compartments=15, offset=0):
+        import random
+        rng = random.Random(seed)
+        self.revolution = revolution
+        self.starts = []
+        self.widths = []
+        for k in range(compartments):
+            self.starts.append(round(k * revolution / compartments) + rng.randint(-tolerance, tolerance))
+            self.widths.append(width + rng.randint(-width_tolerance, width_tolerance))
+        CamLimitSwitch.__init__(self, stepper, inputs, bit, period=revolution, width=width, offset=offset)
+
+    def is_pressed_at(self, position):
+        angle = (self.offset - position) % self.revolution
+        for start, width in zip(self.starts, self.widths):
+            if 0 <= (angle - start) % self.revolution < width:
+                return True
+        return False
+
+    def edge_at(self, position):
+        """position이 캠 앞 경계(배출 방향으로 처음 눌리는 스텝)인지"""
+        return self.is_pressed_at(position) and not self.is_pressed_at(position + 1)
@@ -0,0 +1,306 @@
+"""
+asyncio 모션 API 시뮬레이션 (호스트 PC용, CPython + tests/hostsim, 시뮬레이션 시계 기준 asyncio 대체 모듈)
+
+    1. MainScreen 배출 시퀀스(_dispense_from_selected_disks_async, 디스크 1, 2 + 도어 1단)를
+       lv_utils.event_loop(asynchronous=True)와 함께 실행하여 동작 순서, 동작 사이 대기 시간,
+       전체 시간(= 이동 시간 + 대기 합계), 화면 갱신 간격, CPU가 쉰 시간 확인
+    2. 화면 갱신 비용 0일 때 async 시퀀스와 같은 순서의 동기 시퀀스(advance_disks, wait_ms)가 같은 래치 출력 순서/전체 시간인지 확인
+    3. 여러 디스크 회전: rotate_disks_async(gather)는 약 낙하 대기가 겹쳐서
+       순차 rotate_disk보다 (디스크 수 - 1) x 500ms 짧은지, 최종 위치가 같은지 확인
+
+화면 갱신(lv.task_handler)은 render_us만큼 시뮬레이션 시간을 쓰는 가짜 lvgl 모듈로 대체
+
+실행: python tests/sim_async_dispense.py
+"""
+
+import os
+import sys
+import types
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(TESTS_DIR, "..", "src")
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, TESTS_DIR)
+
+import hostsim  # noqa: E402
+
+clock = hostsim.install()
+asyncio = hostsim.install_asyncio()
+
+RENDER_US = 8000        # 화면 갱신 1회 비용 (ST7735 부분 갱신 가정)
+DOOR_LEVEL = 1
+LIMIT_BITS = {1: 5, 2: 6, 3: 7}
+MOVE_GAP_US = 30000     # 같은 모터 위치 변화가 이 간격 이상 끊기면 다른 이동으로 구분 (구간 사이 화면 갱신보다 길게)
+
+
+class FakeLvgl(types.ModuleType):
+    """lv_utils/MainScreen import용 가짜 lvgl (task_handler 호출 시각 기록 후 render_us만큼 시간 진행)"""
+
+    def __init__(self):
+        types.ModuleType.__init__(self, "lvgl")
+        self._nesting = types.SimpleNamespace(value=0)
+        self.render_us = RENDER_US
+        self.refresh_times = []
+        self.ticks_ms = 0
+
+    def is_initialized(self):
+        return True
+
+    def init(self):
+        pass
+
+    def tick_inc(self, ms):
+        self.ticks_ms += ms
+
+    def task_handler(self):
+        self.refresh_times.append(clock.now_us)
+        clock.advance_us(self.render_us)
+
+    timer_handler = task_handler
+
+
+lv = FakeLvgl()
+sys.modules["lvgl"] = lv
+
+import lv_utils  # noqa: E402
+
+from hostsim.hc165 import ShiftRegister165  # noqa: E402
+from hostsim.hc595 import ShiftRegister595  # noqa: E402
+from hostsim.stepper import CamLimitSwitch, StepperModel  # noqa: E402
+from motor_control import PillBoxMotorSystem  # noqa: E402
+from screens.main_screen import MainScreen  # noqa: E402
+
+
+class DispenseHost:
+    """MainScreen 배출 시퀀스가 쓰는 메서드만 가진 대역 (상태 문구/수량 감소 시각 기록)"""
+
+    def __init__(self, counts):
+        self.data_manager = self
+        self.counts = dict(counts)
+        self.current_dose_index = 0
+        self.events = []
+
+    def get_disk_count(self, disk_num):
+        return self.counts[disk_num]
+
+    def _update_status(self, text):
+        self.events.append((clock.now_us, "상태: " + text))
+
+    def _get_door_level_for_dose(self, dose_index):
+        return DOOR_LEVEL
+
+    def _decrease_disk_count(self, disk_num):
+        self.counts[disk_num] -= 1
+        self.events.append((clock.now_us, f"수량 감소 {disk_num}"))
+
+    def _flush_pending_data(self):
+        self.events.append((clock.now_us, "저장"))
+
+    def _get_total_pill_count(self):
+        return sum(self.counts.values())
+
+    def _update_pill_count_display(self):
+        pass
+
+    def _check_and_play_load_pill_notification(self):
+        pass
+
+    alarm_system = None
+
+    _dispense_from_selected_disks_no_alarm = MainScreen._dispense_from_selected_disks_no_alarm
+    _dispense_from_selected_disks_async = MainScreen._dispense_from_selected_disks_async
+    _report_motor_faults = MainScreen._report_motor_faults
+
+
+def make_system():
+    """핀 모델 + 모터/캠 모델 + 모터 시스템, 모터별 이동 구간 기록 {모터: [[시작 us, 끝 us], ...]}"""
+    hostsim.reset()
+    asyncio.get_event_loop().reset()
+    lv.refresh_times = []
+    outputs = ShiftRegister595()
+    inputs = ShiftRegister165()
+    steppers = {}
+    spans = {m: [] for m in (1, 2, 3, 4)}
+    for motor_index in (1, 2, 3, 4):
+        steppers[motor_index] = StepperModel(outputs, motor_index)
+        if motor_index in LIMIT_BITS:
+            CamLimitSwitch(steppers[motor_index], inputs, LIMIT_BITS[motor_index])
+
+        def record(position, spans=spans[motor_index]):
+            if not spans or clock.now_us - spans[-1][1] > MOVE_GAP_US:
+                spans.append([clock.now_us, clock.now_us])
+            else:
+                spans[-1][1] = clock.now_us
+        steppers[motor_index].listeners.append(record)
+    system = PillBoxMotorSystem()
+    return system, steppers, spans, outputs
+
+
+def run_dispense(mode, render_us):
+    """배출 시퀀스 실행 - mode: "async"(lv_utils asyncio 이벤트 루프), "sync"(기존 동기 wait_ms, asyncio 없이)"""
+    system, steppers, spans, outputs = make_system()
+    lv.render_us = render_us
+    host = DispenseHost({1: 5, 2: 5, 3: 5})
+    ui_loop = None
+    start = clock.now_us
+    if mode == "async":
+        ui_loop = lv_utils.event_loop(asynchronous=True)
+        ok = host._dispense_from_selected_disks_no_alarm(system, [1, 2])
+        ui_loop.deinit()
+    else:
+        ok = sync_dispense(host, system, [1, 2])
+    end = clock.now_us
+    return {
+        "ok": ok, "start": start, "end": end, "events": host.events, "spans": spans,
+        "positions": {m: steppers[m].position for m in steppers}, "latches": outputs.output_changes(),
+        "refresh": [t for t in lv.refresh_times if start <= t <= end],
+        "idle_us": asyncio.get_event_loop().idle_us,
+    }
+
+
+def sync_dispense(host, system, disks):
+    """같은 순서의 동기 시퀀스 (advance_disks/move_door_to_level/wait_ms, 수량/상태 처리는 같은 순서)"""
+    system.close_door(defer=True)
+    host._update_status(f"디스크 {', '.join(str(d) for d in disks)} 배출 중...")
+    system.advance_disks(disks, 1)
+    system.wait_ms(100)
+    system.move_door_to_level(DOOR_LEVEL)
+    system.wait_ms(100)
+    system.wait_ms(2000)
+    for disk_num in disks:
+        host._decrease_disk_count(disk_num)
+    host._flush_pending_data()
+    return True
+
+
+def timeline(result):
+    """이동 구간 + 기록된 동작을 시각 순서로 [(시각 us, 이름)]"""
+    items = list(result["events"])
+    names = {1: "디스크 1", 2: "디스크 2", 3: "디스크 3", 4: "도어"}
+    for motor_index, spans in result["spans"].items():
+        for begin, end in spans:
+            items.append((begin, f"{names[motor_index]} 이동 시작"))
+            items.append((end, f"{names[motor_index]} 이동 끝"))
+    return sorted(items, key=lambda item: item[0])
+
+
+def union_us(spans):
+    """겹치는 구간을 합친 전체 길이 (us)"""
+    total = 0
+    end = None
+    for begin, stop in sorted(spans):
+        if end is None or begin > end:
+            total += stop - begin
+            end = stop
+        elif stop > end:
+            total += stop - end
+            end = stop
+    return total
+
+
+def find(items, name):
+    for at, item in items:
+        if item == name:
+            return at
+    raise AssertionError(f"동작 없음: {name}")
+
+
+def check_async_sequence():
+    """순서, 동작 사이 대기, 전체 시간, 화면 갱신 간격"""
+    result = run_dispense("async", RENDER_US)
+    items = timeline(result)
+    for at, name in items:
+        print(f"  {(at - result['start']) / 1000:>8.1f} ms  {name}")
+
+    # 디스크 1, 2는 함께 1칸 이동 (같은 캠 위치이므로 같은 프레임에서 시작/정지)
+    expected_order = ["상태: 디스크 1, 2 배출 중...", "디스크 1 이동 시작", "디스크 2 이동 시작", "디스크 1 이동 끝",
+                      "디스크 2 이동 끝", "도어 이동 시작", "도어 이동 끝", "수량 감소 1", "수량 감소 2", "저장"]
+    ok = result["ok"] and [name for _, name in items] == expected_order
+
+    # 동작 사이 대기 (ms): 설정한 대기 이상, 대기 끝 시각에 화면 갱신 중이면 최대 1회 갱신만큼 늦어질 수 있음
+    gaps = [
+        ("디스크 → 도어", find(items, "디스크 2 이동 끝"), find(items, "도어 이동 시작"), 500 + 100),
+        ("도어 → 수량 감소", find(items, "도어 이동 끝"), find(items, "수량 감소 1"), 100 + 2000),
+    ]
+    slack_ms = RENDER_US / 1000 + 1
+    for name, begin, end, wait_ms in gaps:
+        gap_ms = (end - begin) / 1000
+        within = wait_ms <= gap_ms <= wait_ms + slack_ms
+        ok = ok and within
+        print(f"  대기 {name:<16}{gap_ms:>9.1f} ms (설정 {wait_ms} ms) {'통과' if within else '실패'}")
+
+    # 전체 시간 = 이동 시간(동시 이동은 겹친 구간 1번) + 대기 합계 (+ 대기마다 최대 1회 갱신 지연)
+    total_ms = (result["end"] - result["start"]) / 1000
+    moving_ms = union_us([span for spans in result["spans"].values() for span in spans]) / 1000
+    waits_ms = sum(wait_ms for _, _, _, wait_ms in gaps)
+    total_ok = waits_ms + moving_ms <= total_ms <= waits_ms + moving_ms + len(gaps) * slack_ms + 2
+    ok = ok and total_ok
+    refresh = [result["start"]] + result["refresh"] + [result["end"]]
+    max_gap_ms = max(b - a for a, b in zip(refresh, refresh[1:])) / 1000
+    # lv_utils 갱신 주기(40ms) + 엔진 구간(20ms) + 갱신 1회
+    responsive = max_gap_ms <= 40 + 20 + RENDER_US / 1000 + 5
+    ok = ok and responsive
+    print(f"  전체 {total_ms:.1f} ms = 이동 {moving_ms:.1f} + 대기 {waits_ms} (+ 갱신 지연 {total_ms - moving_ms - waits_ms:.1f}) "
+          f"{'통과' if total_ok else '실패'}")
+    print(f"  화면 갱신 {len(result['refresh'])}회, 최대 간격 {max_gap_ms:.1f} ms {'통과' if responsive else '실패'}, "
+          f"CPU 쉰 시간 {result['idle_us'] / 1000:.0f} ms")
+    print(f"순서/대기/전체 시간: {'통과' if ok else '실패'}")
+    return ok
+
+
+def check_same_as_sync():
+    """화면 갱신 비용 0: async 시퀀스와 동기 시퀀스의 래치 출력 순서, 위치, 전체 시간이 같은지"""
+    async_result = run_dispense("async", 0)
+    sync_result = run_dispense("sync", 0)
+    async_ms = (async_result["end"] - async_result["start"]) / 1000
+    sync_ms = (sync_result["end"] - sync_result["start"]) / 1000
+    same = (async_result["latches"] == sync_result["latches"] and async_result["positions"] == sync_result["positions"]
+            and async_ms == sync_ms)
+    print(f"동기 {sync_ms:.1f} ms / async {async_ms:.1f} ms, 래치 출력 {len(async_result['latches'])}개, "
+          f"위치 {async_result['positions']}: {'동일' if same else '불일치'}")
+    return same
+
+
+def check_gather():
+    """디스크 1~3 각 1칸: 순차 rotate_disk vs rotate_disks_async(gather)"""
+    lv.render_us = 0
+    system, steppers, _, _ = make_system()
+    system.idle_callback = None
+    start = clock.now_us
+    for disk_num in (1, 2, 3):
+        assert system.rotate_disk(disk_num, 1)
+    sequential_ms = (clock.now_us - start) / 1000
+    sequential_positions = {m: steppers[m].position for m in steppers}
+
+    system, steppers, _, _ = make_system()
+    system.idle_callback = None
+    start = clock.now_us
+    results = asyncio.run(system.rotate_disks_async([1, 2, 3]))
+    gather_ms = (clock.now_us - start) / 1000
+    positions = {m: steppers[m].position for m in steppers}
+    coils_off = not any(stepper.energized for stepper in steppers.values())
+
+    saved_ms = sequential_ms - gather_ms
+    ok = (results == [True, True, True] and positions == sequential_positions and coils_off
+          and abs(saved_ms - 2 * 500) <= 1)
+    print(f"순차 {sequential_ms:.1f} ms, gather {gather_ms:.1f} ms, 단축 {saved_ms:.1f} ms (기대 1000), "
+          f"위치 {positions}, 코일 OFF {coils_off}: {'통과' if ok else '실패'}")
+    print(f"모터 위치(칸) {system.motor_controller.motor_positions[1:4]}")
+    return ok
+
+
+def main():
+    print("asyncio 모션 API 시뮬레이션")
+    print("=" * 78)
+    ok = check_async_sequence()
+    print("-" * 78)
+    ok = check_same_as_sync() and ok
+    print("-" * 78)
+    ok = check_gather() and ok
+    print("-" * 78)
+    print("모든 async 시퀀스 검사 통과" if ok else "async 시퀀스 검사 실패")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
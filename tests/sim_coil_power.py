@@ -0,0 +1,208 @@
+"""
+모터 코일 통전 관리 시뮬레이션 (호스트 PC용, CPython + tests/hostsim)
+
+    1. 집계 정확도: CoilPower 추정 에너지(이동 중은 스텝 방식 평균 코일 수)를
+       가상 보드의 래치 출력 기록으로 직접 적분한 값과 비교
+    2. 약 낙하 대기: rotate_disk / advance_disks(_async) / 3칸 동시 충전의 대기 중 코일이
+       유지 시간(hold_ms) 뒤 꺼지는지, 회전자 위치(motor_steps)와 다음 이동 위치가 그대로인지
+    3. 하루 복용 시뮬레이션: 기존 동작(hold_ms=None, 자동 OFF 없음)과 배출 1회/하루 에너지 비교,
+       날짜가 바뀌면 일별 합계 마감, dump() 출력 형식
+
+실행: python tests/sim_coil_power.py
+"""
+
+import contextlib
+import io
+import os
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(TESTS_DIR, "..", "src")
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, TESTS_DIR)
+
+import hostsim  # noqa: E402
+
+clock = hostsim.install()
+hostsim.install_asyncio()
+
+from coil_power import COIL_MW, CoilPower  # noqa: E402
+from hostsim import check  # noqa: E402
+from hostsim.board import PillboxBoard  # noqa: E402
+from motor_control import PillBoxMotorSystem  # noqa: E402
+
+HOLD_MS = 100
+# 하루 복용 일정 (배출 디스크, 도어 레벨) - main_screen 순서: 디스크 1칸 + 약 낙하 대기 → 도어 열기
+DAY_DOSES = (([1], 1), ([1, 2], 2), ([1, 2, 3], 3))
+
+
+class LatchMeter:
+    """래치 출력 기록으로 모터별 코일 통전 에너지 직접 적분 (uJ)"""
+
+    def __init__(self, board):
+        self.last_us = clock.now_us
+        self.word = board.outputs.output
+        self.energy_uj = {m: 0 for m in (1, 2, 3, 4)}
+        board.outputs.listeners.append(self._on_latch)
+
+    def _on_latch(self, word):
+        self._account()
+        self.word = word
+
+    def _account(self):
+        dt = clock.now_us - self.last_us
+        for m in self.energy_uj:
+            coils = bin((self.word >> ((m - 1) * 4)) & 0x0F).count("1")
+            self.energy_uj[m] += dt * coils * COIL_MW // 1000
+        self.last_us = clock.now_us
+
+    def total_mj(self):
+        self._account()
+        return sum(self.energy_uj.values()) / 1000
+
+
+def new_system(hold_ms=HOLD_MS):
+    board = PillboxBoard(cam_offsets={1: 0, 2: 0, 3: 0})
+    system = PillBoxMotorSystem(state_path=None)
+    system.idle_callback = None
+    system.motor_controller.power.hold_ms = hold_ms
+    return board, system
+
+
+# ----- 1. 집계 정확도 -----
+
+def scenario_accuracy(results):
+    print("추정 에너지 vs 래치 출력 적분 (디스크 이동 + 약 낙하 대기 + 도어 풀스텝/하프스텝)")
+    for hold_ms in (HOLD_MS, None):
+        board, system = new_system(hold_ms)
+        meter = LatchMeter(board)
+        power = system.motor_controller.power
+        system.advance_disks([1, 2, 3], 1)
+        system.rotate_disk(2, 2)
+        system.open_door_to_level(2)
+        system.door_step_mode = "half"
+        system.close_door()
+        system.rotate_multiple_disks_simultaneous([0, 1, 2], 1)
+        clock.sleep_ms(1000)
+        estimated = power.energy_mj()
+        measured = meter.total_mj()
+        error = abs(estimated - measured) / measured
+        check(results, f"hold_ms={hold_ms}: 오차 2% 이내", error <= 0.02,
+              f"추정 {estimated} mJ, 적분 {measured:.0f} mJ ({error * 100:.2f}%)")
+
+
+# ----- 2. 약 낙하 대기 -----
+
+def energized_ms(system, motor_index):
+    return system.motor_controller.power.report()["energized_ms"][motor_index - 1]
+
+
+def scenario_drop_waits(results):
+    print(f"약 낙하 대기 중 코일 (유지 {HOLD_MS}ms 후 OFF)")
+    runs = {}
+    for hold_ms in (None, HOLD_MS):
+        board, system = new_system(hold_ms)
+        controller = system.motor_controller
+        on_before = {}
+        start_us = clock.now_us
+        ok = system.rotate_disk(1, 3)
+        rotate_ms = (clock.now_us - start_us) / 1000
+        on_before["rotate"] = energized_ms(system, 1)
+        ok = system.advance_disks([2, 3], 1) and ok
+        on_before["advance"] = energized_ms(system, 2)
+        ok = system.run_async(system.advance_disks_async([2, 3], 1)) and ok
+        on_before["async"] = energized_ms(system, 2) - on_before["advance"]
+        ok = system.rotate_multiple_disks_simultaneous([0], 2) and ok
+        on_before["loading"] = energized_ms(system, 1) - on_before["rotate"]
+        ok = system.advance_disks([1, 2, 3], 1) and ok
+        positions = {m: board.steppers[m].position for m in (1, 2, 3)}
+        phases = all(controller.motor_steps[m] == board.steppers[m]._index for m in (1, 2, 3))
+        runs[hold_ms] = (ok, on_before, positions, phases, rotate_ms, controller.power.releases)
+
+    ok_old, old, old_positions, _, old_ms, _ = runs[None]
+    ok_new, new, new_positions, phases, new_ms, releases = runs[HOLD_MS]
+    print(f"  {'동작':<34}{'기존 통전 ms':>12}{'관리 통전 ms':>14}")
+    labels = {"rotate": "rotate_disk 3칸 (칸마다 500ms 대기)", "advance": "advance_disks 1칸 + 500ms 대기",
+              "async": "advance_disks_async 1칸 + 500ms", "loading": "3칸 동시 충전 + 500ms 대기"}
+    for key, label in labels.items():
+        print(f"  {label:<34}{old[key]:>12}{new[key]:>14}")
+    check(results, "모든 이동 성공, 최종 위치가 기존 동작과 같음", ok_old and ok_new and old_positions == new_positions,
+          str(new_positions))
+    check(results, "자동 OFF 후에도 motor_steps = 회전자 위치", phases)
+    check(results, "rotate_disk: 칸마다 대기 중 코일 OFF (대기 3번 중 유지 시간만 통전)",
+          old["rotate"] - new["rotate"] >= 3 * (500 - HOLD_MS) - 30 and abs(new_ms - old_ms) < 1,
+          f"{old['rotate'] - new['rotate']} ms 절감, 자동 OFF {releases}회")
+    check(results, "advance_disks / async / 동시 충전 대기도 유지 시간 뒤 OFF",
+          all(old[k] - new[k] >= 500 - HOLD_MS - 30 for k in ("advance", "async", "loading")))
+
+
+# ----- 3. 하루 복용 -----
+
+def run_day(hold_ms, days=2):
+    """days일 동안 하루 3회 배출 + 마지막에 도어 닫기 → (배출별 mJ, 일별 mJ, power)"""
+    board, system = new_system(hold_ms)
+    power = system.motor_controller.power
+    today = [(2026, 10, 17)]
+    power._today = lambda: today[0]
+    per_dose = []
+    for day in range(days):
+        today[0] = (2026, 10, 17 + day)
+        for dose_index, (disks, level) in enumerate(DAY_DOSES):
+            power.begin_dispense()
+            assert system.advance_disks(disks, 1)
+            system.wait_ms(100)
+            assert system.open_door_to_level(level)
+            system.wait_ms(2000)
+            per_dose.append(power.end_dispense(dose_index))
+            clock.sleep_ms(60000)
+        power.begin_dispense()
+        assert system.close_door()
+        per_dose.append(power.end_dispense(len(DAY_DOSES)))
+    today[0] = (2026, 10, 17 + days)
+    power.today_mj()  # 마지막 날 마감
+    return per_dose, [mj for _, mj in power.days], power
+
+
+def scenario_day(results):
+    print(f"하루 복용 {len(DAY_DOSES)}회 + 도어 닫기 (2일, 기존 동작 vs 자동 OFF {HOLD_MS}ms)")
+    old_doses, old_days, _ = run_day(None)
+    new_doses, new_days, power = run_day(HOLD_MS)
+    names = [f"배출 {i + 1} (디스크 {len(d)}개, {lv}단)" for i, (d, lv) in enumerate(DAY_DOSES)] + ["도어 닫기"]
+    print(f"  {'':<28}{'기존 mJ':>10}{'관리 mJ':>10}{'절감 %':>8}")
+    for k, name in enumerate(names):
+        print(f"  {name:<28}{old_doses[k]:>10}{new_doses[k]:>10}{(1 - new_doses[k] / old_doses[k]) * 100:>8.1f}")
+    print(f"  {'하루 합계':<28}{old_days[0]:>10}{new_days[0]:>10}{(1 - new_days[0] / old_days[0]) * 100:>8.1f}"
+          f"   ({CoilPower.mah(old_days[0]):.2f} → {CoilPower.mah(new_days[0]):.2f} mAh @3.7V)")
+    # 배출 기록/일별 합계는 각각 mJ 단위로 내림하므로 기록 수만큼 차이 허용
+    check(results, "날짜별 합계 2일 마감, 배출 기록 합 = 일별 합",
+          len(new_days) == 2 and abs(sum(new_doses) - sum(new_days)) <= len(new_doses), f"{new_days}")
+    check(results, "디스크 배출마다 에너지 감소 (약 낙하 대기 중 코일 OFF)",
+          all(new_doses[k] < old_doses[k] for k in range(len(DAY_DOSES))))
+    check(results, "하루 에너지 20% 이상 절감", new_days[0] * 10 <= old_days[0] * 8,
+          f"{old_days[0]} → {new_days[0]} mJ")
+
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        power.dump()
+    lines = out.getvalue().splitlines()
+    kinds = [line.split()[1] for line in lines if line.startswith("COILPOWER ")]
+    check(results, "dump(): 모터 4줄 + 오늘 + 일별 + 최근 배출 기록",
+          len(lines) == len(kinds) and kinds[:5] == ["motor"] * 4 + ["today"] and
+          kinds.count("day") == 2 and kinds.count("dispense") == min(8, len(new_doses)), lines[4])
+
+
+def main():
+    results = []
+    print("모터 코일 통전 관리 시뮬레이션")
+    print("=" * 72)
+    scenario_accuracy(results)
+    scenario_drop_waits(results)
+    scenario_day(results)
+    ok = all(results)
+    print("-" * 72)
+    print("코일 통전 집계와 유지 시간 후 자동 OFF 검사 통과" if ok else "코일 통전 관리 검사 실패")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
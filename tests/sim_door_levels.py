@@ -0,0 +1,246 @@
+"""
+도어(모터 4) 레벨 위치 표 / 레벨 간 직접 이동 / 도어 명령 합치기 시뮬레이션 (호스트 PC용, CPython + tests/hostsim)
+
+    1. 레벨 위치 표: 기본값, 보정(도어가 그 레벨에 있으면 새 위치로 이동), 보정 파일 저장 후 새 인스턴스가
+       처음 도어를 움직일 때 1번만 로드, 순서가 맞지 않는 보정은 ValueError, 손상된 파일은 기본값
+    2. 레벨 간 직접 이동: 모든 (출발, 목표) 조합에서 도착 위치 = 표 위치, 이동 스텝 = 두 레벨 차이,
+       누적 스텝(step_counts[4])과 위치 상태 파일의 도어 레벨 반영, open_door_to_level은 기존처럼 열기만
+    3. 합치기: 미뤄 둔 닫기(close_door(defer=True)) + 열기 = 현재 레벨에서 목표로 1번 이동 (동기/async),
+       flush_door로 미뤄 둔 닫기 실행
+    4. 하루 복용: 기존 방식(첫 배출 전 닫기, 낮은 레벨은 닫은 뒤 다시 열기)과
+       새 방식(닫기 미룸 + 레벨 간 직접 이동)의 도어 이동 시간 비교 (여러 날)
+
+실행: python tests/sim_door_levels.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(TESTS_DIR, "..", "src")
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, TESTS_DIR)
+
+import hostsim  # noqa: E402
+
+clock = hostsim.install()
+hostsim.install_asyncio()
+
+import motion_state  # noqa: E402
+import motor_control  # noqa: E402
+from hostsim import check  # noqa: E402
+from hostsim.board import PillboxBoard  # noqa: E402
+from motion_state import DOOR_LEVEL_STEPS  # noqa: E402
+from motor_control import PillBoxMotorSystem  # noqa: E402
+
+# 하루 복용 일정의 도어 레벨 (main_screen: 아침=1단, 점심=2단, 저녁=3단)
+DAY_LEVELS = (1, 2, 3)
+DAYS = 3
+
+
+class TableLoads:
+    """motor_control.load_door_table 호출 횟수 기록"""
+
+    def __init__(self):
+        self.calls = 0
+        self._load = motor_control.load_door_table
+        motor_control.load_door_table = self
+
+    def __call__(self, file_path):
+        self.calls += 1
+        return self._load(file_path)
+
+
+def new_system(level=0, state_dir=None, table=DOOR_LEVEL_STEPS):
+    """가상 보드 + 모터 시스템, 도어를 level 위치에 놓고 시작"""
+    board = PillboxBoard(cam_offsets={1: 0, 2: 0, 3: 0})
+    if state_dir is None:
+        system = PillBoxMotorSystem(state_path=None)
+    else:
+        motion_state.reset_state_files()
+        system = PillBoxMotorSystem(state_path=os.path.join(state_dir, "motion_state.bin"),
+                                    door_table_path=os.path.join(state_dir, "door_levels.bin"))
+    system.idle_callback = None
+    system.current_door_level = level
+    board.steppers[4].position = -table[level]
+    return board, system
+
+
+def door_position(board):
+    """닫힘 기준 도어 위치 (열기 방향 양수, 하프스텝)"""
+    return -board.steppers[4].position
+
+
+# ----- 1. 레벨 위치 표 -----
+
+def scenario_table(results, state_dir):
+    print("레벨 위치 표 보정 / 저장 / 로드")
+    loads = TableLoads()
+    board, system = new_system(state_dir=state_dir)
+    check(results, "기본 표 = 0/1593/3187/4781 (140도/280도/420도)", system.door.steps() == list(DOOR_LEVEL_STEPS))
+
+    assert system.move_door_to_level(2)
+    ok = system.calibrate_door_level(2, 3300)
+    check(results, "도어가 있는 레벨 보정: 새 위치로 이동", ok and door_position(board) == 3300, f"{door_position(board)}")
+    ok = system.calibrate_door_level(3, 4900)
+    check(results, "다른 레벨 보정: 움직이지 않음", ok and door_position(board) == 3300)
+
+    errors = 0
+    for level, steps in ((2, 5000), (1, 0), (0, 10), (3, 70000)):
+        try:
+            system.calibrate_door_level(level, steps)
+        except ValueError:
+            errors += 1
+    check(results, "순서가 맞지 않거나 범위 밖 보정은 ValueError, 표는 그대로",
+          errors == 4 and system.door.steps() == [0, 1593, 3300, 4900])
+
+    loads.calls = 0
+    board, system = new_system(state_dir=state_dir, table=[0, 1593, 3300, 4900])
+    for level in (1, 3, 2, 0):
+        assert system.move_door_to_level(level)
+    check(results, "새 인스턴스: 보정 파일 표 사용, 처음 1번만 로드",
+          system.door.steps() == [0, 1593, 3300, 4900] and loads.calls == 1 and door_position(board) == 0,
+          f"로드 {loads.calls}회")
+
+    with open(os.path.join(state_dir, "door_levels.bin"), "r+b") as f:
+        f.seek(6)
+        f.write(b"\xff")
+    board, system = new_system(state_dir=state_dir)
+    check(results, "손상된 보정 파일은 기본 표", system.door.steps() == list(DOOR_LEVEL_STEPS))
+    motor_control.load_door_table = loads._load
+
+
+# ----- 2. 레벨 간 직접 이동 -----
+
+def scenario_direct(results, state_dir):
+    print("레벨 간 직접 이동 (모든 출발/목표 조합, 풀스텝)")
+    table = DOOR_LEVEL_STEPS
+    exact = True
+    counts = True
+    persisted = True
+    for start in range(4):
+        for level in range(4):
+            board, system = new_system(start, state_dir)
+            before = system.step_counts[4]
+            ok = system.move_door_to_level(level)
+            moved = board.steppers[4].steps
+            exact = exact and ok and door_position(board) == table[level] and moved == abs(table[level] - table[start])
+            counts = counts and system.step_counts[4] - before == moved
+            stored = system.state_file.state
+            persisted = persisted and system.current_door_level == level and (
+                start == level or stored.door_level == level)
+    check(results, "도착 위치 = 표 위치, 이동 스텝 = 두 레벨 차이", exact)
+    check(results, "누적 스텝(step_counts[4]) = 이동 스텝", counts)
+    check(results, "위치 상태 파일에 도어 레벨 기록", persisted)
+
+    board, system = new_system(3)
+    ok = system.open_door_to_level(1)
+    check(results, "open_door_to_level은 기존처럼 낮은 레벨로 움직이지 않음",
+          ok and system.current_door_level == 3 and board.steppers[4].steps == 0)
+    check(results, "잘못된 레벨은 실패", not system.move_door_to_level(4) and not system.move_door_to_level(-1))
+
+
+# ----- 3. 합치기 -----
+
+def scenario_coalesce(results):
+    print("도어 명령 합치기 (닫기 미룸 + 열기)")
+    table = DOOR_LEVEL_STEPS
+    rows = []
+    for start, level in ((3, 1), (3, 3), (2, 3), (1, 2)):
+        board, system = new_system(start)
+        t0 = clock.now_us
+        assert system.close_door() and system.open_door_to_level(level)
+        old = (board.steppers[4].steps, clock.now_us - t0)
+        board, system = new_system(start)
+        t0 = clock.now_us
+        assert system.close_door(defer=True) and system.open_door_to_level(level)
+        new = (board.steppers[4].steps, clock.now_us - t0)
+        rows.append((start, level, old, new, door_position(board)))
+    print(f"  {'닫기 → 열기':<12}{'기존 스텝':>10}{'기존 ms':>10}{'합친 스텝':>10}{'합친 ms':>10}")
+    for start, level, old, new, _ in rows:
+        print(f"  {str(start) + ' → 0 → ' + str(level):<12}{old[0]:>10}{old[1] / 1000:>10.1f}"
+              f"{new[0]:>10}{new[1] / 1000:>10.1f}")
+    check(results, "닫기 + 열기가 현재 레벨 → 목표 레벨 1번 이동으로 합쳐짐",
+          all(new[0] == abs(table[level] - table[start]) and position == table[level]
+              for start, level, _, new, position in rows))
+
+    board, system = new_system(3)
+    ok = system.run_async(system.close_door_async(defer=True))
+    moved_before = board.steppers[4].steps
+    ok = ok and system.run_async(system.move_door_to_level_async(2))
+    check(results, "async: 미뤄 둔 닫기 + 이동도 1번 이동",
+          ok and moved_before == 0 and board.steppers[4].steps == table[3] - table[2] and system.door.pending is None)
+
+    board, system = new_system(2)
+    system.close_door(defer=True)
+    ok = system.flush_door() and system.flush_door()
+    check(results, "flush_door: 미뤄 둔 닫기 실행 (두 번째는 할 일 없음)",
+          ok and door_position(board) == 0 and board.steppers[4].steps == table[2])
+
+
+# ----- 4. 하루 복용 -----
+
+def run_days(coalesce):
+    """첫 배출 전 도어 초기화 + DAYS일 x DAY_LEVELS 복용 → [(레벨, 도어 ms)], 최종 위치, 도어 스텝"""
+    board, system = new_system(3)   # 전날 저녁 3단에서 시작 (재부팅 후 첫 배출)
+    rows = []
+    first = True
+    for _ in range(DAYS):
+        for level in DAY_LEVELS:
+            assert system.advance_disks([level], 1, drop_ms=0)
+            t0 = clock.now_us
+            if coalesce:
+                if first:
+                    system.close_door(defer=True)
+                assert system.move_door_to_level(level)
+            else:
+                # 기존 방식: 첫 배출 전 닫기, 낮은 레벨로는 닫은 뒤 다시 열기
+                if first or level < system.current_door_level:
+                    assert system.close_door()
+                assert system.open_door_to_level(level)
+            rows.append((level, clock.now_us - t0))
+            first = False
+    return rows, door_position(board), board.steppers[4].steps
+
+
+def scenario_day(results):
+    print(f"하루 복용 {len(DAY_LEVELS)}회 x {DAYS}일 도어 이동 (전날 3단에서 시작, 풀스텝)")
+    old_rows, old_position, old_steps = run_days(False)
+    new_rows, new_position, new_steps = run_days(True)
+    print(f"  {'일':<4}{'레벨':>6}{'기존 ms':>10}{'새 방식 ms':>12}")
+    for k, ((level, old_us), (_, new_us)) in enumerate(zip(old_rows, new_rows)):
+        print(f"  {k // len(DAY_LEVELS) + 1:<4}{level:>6}{old_us / 1000:>10.1f}{new_us / 1000:>12.1f}")
+    old_total = sum(us for _, us in old_rows)
+    new_total = sum(us for _, us in new_rows)
+    print(f"  합계: {old_total / 1000:.1f} → {new_total / 1000:.1f} ms ({(1 - new_total / old_total) * 100:.1f}% 단축), "
+          f"도어 스텝 {old_steps} → {new_steps}")
+    check(results, "같은 레벨 위치에서 끝남", old_position == new_position == DOOR_LEVEL_STEPS[DAY_LEVELS[-1]])
+    check(results, "매일 아침(3단 → 1단) 도어 이동 단축",
+          all(new_rows[k][1] < old_rows[k][1] for k in range(0, len(old_rows), len(DAY_LEVELS))))
+    check(results, "여러 날 도어 이동 시간 25% 이상 단축", new_total * 4 <= old_total * 3,
+          f"{old_total / 1000:.0f} → {new_total / 1000:.0f} ms")
+
+
+def main():
+    results = []
+    print("도어 레벨 위치 표 / 직접 이동 / 명령 합치기 시뮬레이션")
+    print("=" * 72)
+    state_dir = tempfile.mkdtemp(prefix="door_levels_")
+    try:
+        scenario_table(results, state_dir)
+        scenario_direct(results, state_dir)
+    finally:
+        motion_state.reset_state_files()
+        shutil.rmtree(state_dir, ignore_errors=True)
+    scenario_coalesce(results)
+    scenario_day(results)
+    ok = all(results)
+    print("-" * 72)
+    print("도어는 보정된 레벨 위치 사이를 바로, 연속 명령은 1번에 이동" if ok else "도어 레벨 이동 검사 실패")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+플래시 쓰기량 / 수명 추정 시뮬레이션 (호스트 PC용, CPython)
+하루 3회 복용 부하(복용마다 수량 감소 + 배출 기록, 화면 백업, 5일마다 충전)를
+DataManager로 실행하고 io_stats 통계로 하루 쓰기량과 플래시 수명을 추정
+
+실행: python tests/sim_flash_wear.py [시간당 쓰기 예산 bytes]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+
+import io_stats  # noqa: E402
+from data_manager import DataManager  # noqa: E402
+
+DOSES_PER_DAY = 3
+DISKS = [1, 2, 3]
+SCREEN_BACKUPS_PER_DOSE = 4  # 복용 전후 화면 전환 시 main 화면 백업 횟수
+PARTITION_BYTES = 2 * 1024 * 1024  # ESP32-C6 4MB 펌웨어 기준 /data(vfs) 파티션 크기 가정
+SAMPLE_MEDICATION_FILE = os.path.join(SRC_DIR, "data", "medication.json")
+SAMPLE_GLOBAL_FILE = os.path.join(SRC_DIR, "data", "global_data.json")
+
+
+def simulate_day(data_manager, refill):
+    """하루 부하 실행 (MainScreen의 쓰기 지연 모드와 같은 호출 순서)"""
+    if refill:
+        for disk_num in DISKS:
+            data_manager.update_disk_count(disk_num, 15)
+        data_manager.flush()
+
+    for dose_index in range(DOSES_PER_DAY):
+        for i in range(SCREEN_BACKUPS_PER_DOSE):
+            data_manager.backup_screen_data("main", {"dose_index": dose_index, "step": i})
+        for disk_num in DISKS:
+            count = data_manager.get_disk_count(disk_num)
+            if count > 0:
+                data_manager.update_disk_count(disk_num, count - 1)
+        data_manager.log_dispense(dose_index, True)
+        data_manager.flush()
+        data_manager.poll_flush()
+
+
+def main():
+    budget = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    print("플래시 쓰기량 시뮬레이션 (하루 3회 복용)")
+    print("=" * 64)
+
+    data_dir = tempfile.mkdtemp(prefix="pillbox_wear_")
+    try:
+        shutil.copy(SAMPLE_MEDICATION_FILE, data_dir)
+        shutil.copy(SAMPLE_GLOBAL_FILE, data_dir)
+        stats_file = os.path.join(data_dir, "io_stats.bin")
+        io_stats.init_tracker(stats_file)
+
+        data_manager = DataManager(data_dir)
+        data_manager._get_current_time = lambda: time.localtime()[:8]
+        data_manager.enable_write_back()
+        data_manager.set_write_budget(budget)
+
+        # 첫날 파일 생성 쓰기를 제외하기 위해 하루 실행 후 통계 초기화
+        simulate_day(data_manager, refill=True)
+        os.remove(stats_file)
+        io_stats.init_tracker(stats_file).set_hourly_budget(budget)
+        simulate_day(data_manager, refill=True)
+        data_manager.flush()
+        stats = data_manager.get_io_stats()
+
+        print(f"{'파일':<20}{'쓰기':>8}{'바이트':>10}{'재작성':>8}{'블록':>8}")
+        for name, entry in sorted(stats["files"].items()):
+            print(f"{name:<20}{entry['writes']:>8}{entry['bytes']:>10}{entry['rewrites']:>8}{entry['blocks']:>8}")
+        today = stats["today"]
+        print("-" * 64)
+        print(f"{'합계 (충전일)':<20}{today['writes']:>8}{today['bytes']:>10}{today['rewrites']:>8}{today['blocks']:>8}")
+        print(f"시간당 예산: {budget if budget is not None else '없음'}, 미룬 화면 백업: {stats['deferred_today']}회")
+
+        partition_blocks = PARTITION_BYTES // io_stats.BLOCK_SIZE
+        years = io_stats.estimate_flash_lifetime_years(today["blocks"], partition_blocks)
+        print(f"블록 소거 추정 수명: 약 {years:.0f}년 "
+              f"(파티션 {partition_blocks}블록, 블록당 10만 회, 블록 추정은 쓰기 1회당 최소 1블록)")
+    finally:
+        shutil.rmtree(data_dir)
+
+
+if __name__ == "__main__":
+    main()
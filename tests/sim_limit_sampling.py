@@ -0,0 +1,120 @@
+"""
+칸 이동 리미트 스위치 샘플링 시뮬레이션 (호스트 PC용, CPython + tests/hostsim)
+
+칸마다 캠 위치(±6스텝)와 폭(20±4스텝)이 다른 가상 디스크 3개(hostsim.stepper.ToleranceCamSwitch)로
+같은 이동 순서를 세 가지 샘플링으로 실행하여 정지 위치와 74HC165D 스캔 수 비교
+    - 매 스텝 확인 (sample_every=1, 기준)
+    - LimitSampler (sample_every=None): 칸 가운데는 드물게, 캠 예상 위치 근처는 매 스텝
+    - 50스텝마다 확인 (기존 충전 화면 방식)
+이동 순서: 원점 보정 → 디스크 1~3 동시 1칸 x45 (3바퀴) → 3칸 동시 충전 x5
+스캔 수는 첫 바퀴(칸별 캠 간격 기록 중)와 이후를 나눠 집계
+
+실행: python tests/sim_limit_sampling.py [디스크 세트 수]
+"""
+
+import os
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(TESTS_DIR, "..", "src")
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, TESTS_DIR)
+
+import hostsim  # noqa: E402
+
+clock = hostsim.install()
+
+from hostsim import check  # noqa: E402
+from hostsim.board import PillboxBoard  # noqa: E402
+from hostsim.stepper import ToleranceCamSwitch  # noqa: E402
+from motor_control import StepperMotorController  # noqa: E402
+
+SINGLE_MOVES = 45
+LOADING_MOVES = 5
+MOVES = [1] * SINGLE_MOVES + [3] * LOADING_MOVES
+FIRST_LAP = 15  # 한 바퀴 칸 수
+MODES = (("매 스텝", 1), ("LimitSampler", None), ("50스텝마다", 50))
+
+
+def run_sequence(seed, sample_every):
+    """디스크 세트 seed로 이동 순서 실행 → (이동마다 정지 위치, 캠 앞 경계에서 정지한 수, 이동마다 스캔 수, 컨트롤러)"""
+    board = PillboxBoard(cam_class=ToleranceCamSwitch, cam_offsets={m: 37 * m + seed for m in (1, 2, 3)},
+                         cam_args={m: {"seed": seed * 10 + m} for m in (1, 2, 3)}, door=False)
+    steppers = board.steppers
+    cams = board.cams
+    controller = StepperMotorController(output="softspi")
+    controller.calibrate_multiple_motors([1, 2, 3])
+    controller.stop_all_motors()
+
+    stops = []
+    at_edge = 0
+    scans = []
+    for compartments in MOVES:
+        before = controller.bus.scans
+        result = controller.run_until_limits([1, 2, 3], direction=-1, compartments=compartments,
+                                             sample_every=sample_every, delay_us=500,
+                                             max_steps=(compartments + 1) * 273)
+        controller.stop_all_motors()
+        scans.append(controller.bus.scans - before)
+        positions = tuple(steppers[m].position for m in (1, 2, 3))
+        stops.append((result is not None, positions))
+        at_edge += sum(1 for m in (1, 2, 3) if cams[m].edge_at(steppers[m].position))
+    return stops, at_edge, scans, controller
+
+
+def main():
+    boards = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    moves = len(MOVES)
+    later = sum(MOVES[FIRST_LAP:])
+    results = []
+    print(f"칸 이동 리미트 스위치 샘플링 (디스크 세트 {boards}개 x 이동 {moves}회, 디스크 1~3 동시)")
+    print("=" * 78)
+    print(f"{'샘플링':<14}{'스캔/칸 첫 바퀴':>16}{'이후':>8}{'기준과 같은 정지':>18}{'캠 경계 정지':>14}{'실패':>6}")
+
+    reference = {}
+    totals = {}
+    learned = []
+    for label, sample_every in MODES:
+        first_scans = 0
+        later_scans = 0
+        same = 0
+        at_edge = 0
+        failed = 0
+        for seed in range(boards):
+            stops, edges, scans, controller = run_sequence(seed, sample_every)
+            if sample_every == 1:
+                reference[seed] = stops
+            first_scans += sum(scans[:FIRST_LAP])
+            later_scans += sum(scans[FIRST_LAP:])
+            same += sum(1 for a, b in zip(stops, reference[seed]) if a == b)
+            at_edge += edges
+            failed += sum(1 for ok, _ in stops if not ok)
+            if sample_every is None:
+                sampler = controller.limit_sampler
+                learned.append((sampler.expected[1:4], sampler.margins[1:4], sampler.early, sampler.late))
+        totals[label] = (first_scans, later_scans, same, failed)
+        print(f"{label:<14}{first_scans / (boards * FIRST_LAP):>16.1f}{later_scans / (boards * later):>8.1f}"
+              f"{same:>12}/{boards * moves:<5}{at_edge:>8}/{boards * moves * 3:<5}{failed:>6}")
+    print("-" * 78)
+
+    _, reference_later, _, _ = totals["매 스텝"]
+    first_scans, later_scans, same, failed = totals["LimitSampler"]
+    early = sum(e for _, _, e, _ in learned)
+    late = sum(lt for _, _, _, lt in learned)
+    print(f"  디스크 평균 캠 간격 예 {learned[0][0]}, 칸별 기록이 없을 때 매 스텝 확인 구간 ±{learned[0][1]}, "
+          f"구간 밖 감지 {early + late}회")
+    check(results, "LimitSampler: 매 스텝 확인과 같은 위치에서 정지 (캠 누락/초과 없음)",
+          same == boards * moves and failed == 0, f"{same}/{boards * moves}")
+    check(results, "LimitSampler: 칸별 캠 간격 기록 후 74HC165D 스캔 1/10 이하", later_scans * 10 <= reference_later,
+          f"{reference_later} → {later_scans} ({reference_later / later_scans:.1f}배)")
+    legacy_same = totals["50스텝마다"][2]
+    print(f"  참고: 50스텝마다 확인은 {boards * moves - legacy_same}회 이동에서 기준과 다른 위치 "
+          f"(캠 폭 16~24스텝보다 샘플 간격이 길어 캠을 건너뛰거나 늦게 감지)")
+    ok = all(results)
+    print("-" * 78)
+    print("캠 오차가 있어도 드문 샘플링으로 모든 캠 경계에서 정지" if ok else "리미트 스위치 샘플링 검사 실패")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""
+비블로킹 모션 엔진 응답성 시뮬레이션 (호스트 PC용, CPython + tests/hostsim)
+
+    1. 배출 시퀀스 (디스크 1, 2 각 1칸 + 도어 1단 열기 + 대기, MainScreen._dispense_from_selected_disks_no_alarm 순서)를
+       기존 블로킹 방식(idle_callback=None)과 엔진 방식으로 실행하여
+       화면 갱신 간격(최대/평균), 갱신 횟수, 전체 시간, 모터 최종 위치 비교
+    2. 메인 루프 방식: 이동/대기/호출 작업을 큐에 넣고 메인 루프가 update → 화면 → 버튼을 반복할 때
+       루프 주기, 모터 구동 비율, 완료 콜백 순서 확인
+    3. 나눠서 실행하는 도어 이동 (idle_callback 있음, 기기 기본 경로): 0→3단 이동의 스텝 간격이
+       화면 갱신 시간을 빼면 블로킹 실행과 같은지 (구간마다 정지부터 다시 가속하지 않고 속도 계획을 이어서 재생)
+
+화면 갱신(lv.timer_handler)은 RENDER_US만큼 시뮬레이션 시간을 쓰는 함수로 대체
+
+실행: python tests/sim_motion_engine.py
+"""
+
+import os
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(TESTS_DIR, "..", "src")
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, TESTS_DIR)
+
+import hostsim  # noqa: E402
+
+clock = hostsim.install()
+
+from hostsim.hc165 import ShiftRegister165  # noqa: E402
+from hostsim.hc595 import ShiftRegister595  # noqa: E402
+from hostsim.stepper import CamLimitSwitch, StepperModel  # noqa: E402
+from motor_control import PauseJob, PillBoxMotorSystem  # noqa: E402
+
+RENDER_US = 8000        # 화면 갱신 1회 비용 (ST7735 부분 갱신 가정)
+BUTTON_POLL_US = 300    # 버튼 읽기 1회 비용
+IDLE_SLEEP_MS = 10      # 대기 작업만 남았을 때 메인 루프 대기
+DISKS = (1, 2)
+DOOR_LEVEL = 1
+LIMIT_BITS = {1: 5, 2: 6, 3: 7}
+
+
+class Screen:
+    """화면 갱신 기록 (호출 시각 기록 후 RENDER_US만큼 시간 진행)"""
+
+    def __init__(self):
+        self.refresh_times = []
+
+    def refresh(self):
+        self.refresh_times.append(clock.now_us)
+        clock.advance_us(RENDER_US)
+
+    def gaps_ms(self, start_us, end_us):
+        """start~end 구간에서 화면 갱신 사이 간격 목록 (구간 시작/끝 포함)"""
+        times = [start_us] + [t for t in self.refresh_times if start_us <= t <= end_us] + [end_us]
+        return [(b - a) / 1000 for a, b in zip(times, times[1:])]
+
+
+def make_system():
+    hostsim.reset()
+    clock.reset()
+    outputs = ShiftRegister595()
+    inputs = ShiftRegister165()
+    steppers = {}
+    for motor_index in (1, 2, 3):
+        steppers[motor_index] = StepperModel(outputs, motor_index)
+        CamLimitSwitch(steppers[motor_index], inputs, LIMIT_BITS[motor_index])
+    steppers[4] = StepperModel(outputs, 4)
+    system = PillBoxMotorSystem()
+    return system, steppers
+
+
+def dispense(system):
+    """MainScreen._dispense_from_selected_disks_no_alarm과 같은 순서 (수량/저장 처리 제외)"""
+    for i, disk_num in enumerate(DISKS):
+        assert system.rotate_disk(disk_num, 1)
+        system.wait_ms(100)
+        if i == 0:
+            assert system.open_door_to_level(DOOR_LEVEL)
+            system.wait_ms(100)
+        system.wait_ms(2000)
+        if i < len(DISKS) - 1:
+            system.wait_ms(1000)
+
+
+def run_dispense(blocking):
+    system, steppers = make_system()
+    screen = Screen()
+    system.idle_callback = None if blocking else screen.refresh
+    start = clock.now_us
+    dispense(system)
+    end = clock.now_us
+    if blocking:
+        # 기존 방식: 배출이 끝난 뒤에야 메인 루프가 화면 갱신
+        screen.refresh()
+    gaps = screen.gaps_ms(start, end)
+    positions = {m: steppers[m].position for m in steppers}
+    return end - start, gaps, positions
+
+
+def check_dispense():
+    print(f"{'방식':<10}{'전체 ms':>10}{'갱신 횟수':>10}{'최대 간격 ms':>14}{'평균 간격 ms':>14}")
+    results = {}
+    for name, blocking in (("블로킹", True), ("엔진", False)):
+        elapsed, gaps, positions = run_dispense(blocking)
+        results[name] = positions
+        print(f"{name:<10}{elapsed / 1000:>10.0f}{len(gaps) - 1:>10}{max(gaps):>14.1f}{sum(gaps) / len(gaps):>14.1f}")
+        if not blocking:
+            engine_max_gap = max(gaps)
+    same = results["블로킹"] == results["엔진"]
+    print(f"모터 최종 위치 {results['엔진']}: {'블로킹과 동일' if same else '불일치'}")
+    # 화면 갱신 간격 = 엔진 구간(20ms) + 화면 갱신 시간 + 8스텝 경계까지 남은 스텝
+    responsive = engine_max_gap <= 20 + RENDER_US / 1000 + 5
+    print(f"엔진 방식 최대 화면 갱신 간격 {engine_max_gap:.1f} ms: {'통과' if responsive else '실패'}")
+    return same and responsive
+
+
+def check_main_loop():
+    """작업을 큐에 넣고 메인 루프(update → 화면 → 버튼)로 진행, 완료 콜백 순서 확인"""
+    system, steppers = make_system()
+    engine = system.engine
+    screen = Screen()
+    order = []
+
+    def done(name):
+        return lambda job: order.append((name, clock.now_us // 1000))
+
+    engine.advance([1], on_done=done("디스크 1 1칸"))
+    engine.pause(100)
+    engine.move({4: (-1, 1593)}, on_done=done("도어 1단"))
+    engine.pause(2000, on_done=done("약 낙하 대기"))
+    engine.call(lambda: "수량 감소", on_done=done("수량 감소"))
+
+    loop_starts = []
+    motor_us = 0
+    while engine.busy():
+        loop_starts.append(clock.now_us)
+        before = clock.now_us
+        engine.update()
+        motor_us += clock.now_us - before
+        screen.refresh()
+        clock.advance_us(BUTTON_POLL_US)
+        if engine.queue and isinstance(engine.queue[0], PauseJob):
+            clock.sleep_ms(IDLE_SLEEP_MS)  # 대기 작업만 남으면 메인 루프 평소처럼 쉼
+    total = clock.now_us
+    periods = [(b - a) / 1000 for a, b in zip(loop_starts, loop_starts[1:])]
+
+    print(f"메인 루프 {len(loop_starts)}회, 최대 주기 {max(periods):.1f} ms, 평균 {sum(periods) / len(periods):.1f} ms, "
+          f"전체 {total / 1000:.0f} ms, 엔진 실행 {motor_us / 1000:.0f} ms")
+    for name, at_ms in order:
+        print(f"  {at_ms:>6} ms  완료: {name}")
+    names = [name for name, _ in order]
+    ok = names == ["디스크 1 1칸", "도어 1단", "약 낙하 대기", "수량 감소"]
+    ok = ok and steppers[1].position < 0 and steppers[4].position == -1593
+    # 루프 1회 = 엔진 구간(20ms, 이동이 끝나면 다음 대기 작업 때문에 IDLE_SLEEP_MS 추가) + 화면 + 버튼
+    ok = ok and max(periods) <= 20 + IDLE_SLEEP_MS + (RENDER_US + BUTTON_POLL_US) / 1000 + 5
+    print(f"완료 순서/위치/루프 주기: {'통과' if ok else '실패'}")
+    return ok
+
+
+def run_door(render_us):
+    """도어 0→3단 이동 → (스텝 간격 목록 us, 화면 갱신 시각 목록, 경과 us), render_us=None이면 블로킹"""
+    system, steppers = make_system()
+    refreshes = []
+
+    def refresh():
+        refreshes.append(clock.now_us)
+        clock.advance_us(render_us)
+
+    system.idle_callback = None if render_us is None else refresh
+    times = []
+    steppers[4].listeners.append(lambda position: times.append(clock.now_us))
+    start = clock.now_us
+    assert system.move_door_to_level(3)
+    elapsed = clock.now_us - start
+    intervals = [b - a for a, b in zip(times, times[1:])]
+    return intervals, times, refreshes, elapsed
+
+
+def check_door_sliced():
+    """나눠서 실행해도 블로킹과 같은 속도 계획으로 도어 이동 (화면 갱신 시간만 추가)"""
+    blocking, _, _, blocking_us = run_door(None)
+    print(f"{'화면 갱신':<12}{'경과 ms':>10}{'갱신 횟수':>10}{'이동 시간 ms':>14}{'블로킹 ms':>12}")
+    print(f"{'(블로킹)':<12}{blocking_us / 1000:>10.1f}{0:>10}{blocking_us / 1000:>14.1f}{blocking_us / 1000:>12.1f}")
+    ok = True
+    for render_us in (0, 15000):
+        intervals, times, refreshes, elapsed = run_door(render_us)
+        # 화면 갱신이 끼어든 스텝 간격에서 갱신 시간을 빼면 블로킹 실행의 스텝 간격과 같아야 함
+        moving = []
+        for k, interval in enumerate(intervals):
+            inside = sum(1 for t in refreshes if times[k] <= t < times[k + 1])
+            moving.append(interval - inside * render_us)
+        same = moving == blocking
+        moving_us = elapsed - len(refreshes) * render_us
+        ok = ok and same
+        print(f"{str(render_us // 1000) + ' ms':<12}{elapsed / 1000:>10.1f}{len(refreshes):>10}{moving_us / 1000:>14.1f}"
+              f"{blocking_us / 1000:>12.1f}  스텝 간격 {'블로킹과 동일' if same else '불일치'}")
+    return ok
+
+
+def main():
+    print("비블로킹 모션 엔진 응답성 시뮬레이션")
+    print("=" * 72)
+    ok = check_dispense()
+    print("-" * 72)
+    ok = check_main_loop() and ok
+    print("-" * 72)
+    ok = check_door_sliced() and ok
+    print("-" * 72)
+    print("모든 응답성 검사 통과" if ok else "응답성 검사 실패")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""
+가속/감속 속도 계획 타이밍 시뮬레이션 (호스트 PC용, CPython + tests/hostsim)
+
+    1. 속도 계획 검사: 출발 간격 = 출발 속도, 최소 간격 = 최고 속도, 가속도 한계, 가속/감속 대칭
+    2. 이동 시간 회귀 검사: 계획한 이동 시간이 해석적으로 계산한 시간과 같은지 (등가속 / S자)
+    3. 도어 이동 시뮬레이션: PillBoxMotorSystem 도어 레벨 이동을 시뮬레이션 시계로 실행하여
+       실제 경과 시간 = 계획 시간 + 프레임 전송 시간인지, 기존 고정 500us 대비 시간 비교
+       (블로킹 실행과, 기기 기본 경로인 idle_callback 화면 갱신(RENDER_US)을 끼워 나눠 실행하는 경우 모두)
+    4. 여러 모터 동시 도착 이동: 스텝 수가 다른 모터들이 같은 프레임에서 이동을 끝내는지 확인
+
+실행: python tests/sim_motion_timing.py
+"""
+
+import math
+import os
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(TESTS_DIR, "..", "src")
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, TESTS_DIR)
+
+import hostsim  # noqa: E402
+
+clock = hostsim.install()
+
+from hostsim.hc595 import ShiftRegister595  # noqa: E402
+from hostsim.stepper import StepperModel  # noqa: E402
+from motor_control import MotionPlanner, PillBoxMotorSystem, StepperMotorController  # noqa: E402
+
+DOOR_LEVEL_STEPS = {0: 0, 1: 1593, 2: 3187, 3: 4781}
+MOVE_LENGTHS = (10, 101, 374, 1593, 1594, 3187, 4781)
+DOOR_LIMITS = dict(start_speed=2000, max_speed=2500, accel=5000)
+RENDER_US = 15000  # 나눠 실행할 때 구간 사이 화면 갱신 1회 비용 (lv.timer_handler)
+
+
+def analytic_duration_us(shape, steps, start_speed, max_speed, accel):
+    """연속 모델로 계산한 이동 시간 (us) - 가속 구간은 최고 속도에 닿는 정수 스텝까지"""
+    v0, v1, a = start_speed, max_speed, accel
+    if shape == "trapezoid":
+        ramp_steps = int((v1 * v1 - v0 * v0) / (2 * a))
+        if steps >= 2 * ramp_steps:
+            ramp_time = (math.sqrt(v0 * v0 + 2 * a * ramp_steps) - v0) / a
+            return (2 * ramp_time + (steps - 2 * ramp_steps) / v1) * 1e6
+        up = steps - steps // 2
+        down = steps // 2
+        return ((math.sqrt(v0 * v0 + 2 * a * up) - v0) / a + (math.sqrt(v0 * v0 + 2 * a * down) - v0) / a) * 1e6
+    # S자: 가속 시간 T = 1.5dv/a, 가속 거리 (v0 + dv/2)T (긴 이동만 비교)
+    period = 1.5 * (v1 - v0) / a
+    ramp_steps = int((v0 + (v1 - v0) / 2) * period)
+    if steps < 2 * ramp_steps:
+        return None
+    # 정수 스텝까지의 가속 시간: 가속 끝 직전 구간은 거의 최고 속도이므로 남은 거리를 v1로 보정
+    ramp_time = period - ((v0 + (v1 - v0) / 2) * period - ramp_steps) / v1
+    return (2 * ramp_time + (steps - 2 * ramp_steps) / v1) * 1e6
+
+
+def check_profiles():
+    """속도 계획 검사 + 해석적 이동 시간과 비교"""
+    ok = True
+    print(f"{'곡선':<10}{'가속 스텝':>10}{'출발 us':>10}{'최소 us':>10}{'최대 가속도':>14}{'대칭':>6}")
+    for shape in MotionPlanner.SHAPES:
+        planner = MotionPlanner(shape=shape, **DOOR_LIMITS)
+        delays = planner.plan(4781).delays()
+        ramp = planner.ramp()
+        # 스텝 간격 → 속도, 20스텝 구간 평균 속도 변화 / 시간 = 가속도 (정수 us 반올림 영향 평균)
+        peak_accel = 0
+        for k in range(0, len(ramp) - 40, 20):
+            v_now = 20e6 / sum(ramp[k:k + 20])
+            v_next = 20e6 / sum(ramp[k + 20:k + 40])
+            peak_accel = max(peak_accel, (v_next - v_now) / (sum(ramp[k + 10:k + 30]) / 1e6))
+        symmetric = list(delays) == list(reversed(delays))
+        first_ok = abs(delays[0] - 1e6 / DOOR_LIMITS["start_speed"]) <= 1
+        min_ok = min(delays) >= int(1e6 / DOOR_LIMITS["max_speed"])
+        accel_ok = peak_accel <= DOOR_LIMITS["accel"] * 1.05
+        ok = ok and symmetric and first_ok and min_ok and accel_ok
+        print(f"{shape:<10}{len(ramp):>10}{delays[0]:>10}{min(delays):>10}{peak_accel:>14.0f}"
+              f"{'O' if symmetric else 'X':>6}")
+
+    print()
+    print(f"{'곡선':<10}{'스텝':>6}{'계획 ms':>10}{'해석 ms':>10}{'오차 %':>8}")
+    for shape in MotionPlanner.SHAPES:
+        planner = MotionPlanner(shape=shape, **DOOR_LIMITS)
+        for steps in MOVE_LENGTHS:
+            planned = planner.duration_us(steps)
+            assert planned == sum(planner.plan(steps).delays())
+            expected = analytic_duration_us(shape, steps, **DOOR_LIMITS)
+            if expected is None:
+                continue
+            error = (planned - expected) / expected * 100
+            ok = ok and abs(error) < 0.5
+            print(f"{shape:<10}{steps:>6}{planned / 1000:>10.1f}{expected / 1000:>10.1f}{error:>8.2f}")
+    return ok
+
+
+def frame_cost_us(system):
+    """프레임 1개 전송에 드는 시뮬레이션 시간 (비트뱅 sleep_us 합계)"""
+    start = clock.now_us
+    system.motor_controller.update_motor_output()
+    return clock.now_us - start
+
+
+def run_door(shape, render_us=None):
+    """도어 0→1→2→3→닫힘 순서 실행, 이동별 (레벨, 스텝 수, 모델 이동 스텝, 경과 us, 계획 us, 화면 갱신 us) 목록
+
+    render_us=None이면 엔진 구간으로 나누지 않고 한 번에 실행, 아니면 구간 사이마다 render_us 걸리는 화면 갱신
+    """
+    hostsim.reset()
+    outputs = ShiftRegister595()
+    door = StepperModel(outputs, 4)
+    system = PillBoxMotorSystem()
+    rendered = [0]
+
+    def refresh():
+        rendered[0] += render_us
+        clock.advance_us(render_us)
+
+    system.idle_callback = None if render_us is None else refresh
+    system.door_step_mode = "half"  # 하프스텝 계획(motion_planners) 검사, 스텝 방식 비교는 sim_step_modes.py
+    controller = system.motor_controller
+    if shape is None:
+        # 기존 동작 (고정 500us): 출발 속도 = 최고 속도
+        controller.set_motion_limits(4, max_speed=2000)
+    else:
+        controller.set_motion_limits(4, shape=shape, **DOOR_LIMITS)
+    planner = controller.motion_planners[4]
+    per_frame = frame_cost_us(system)
+
+    results = []
+    for level in (1, 2, 3, 0):
+        steps = abs(DOOR_LEVEL_STEPS[level] - DOOR_LEVEL_STEPS[system.current_door_level])
+        before_position = door.position
+        rendered[0] = 0
+        start = clock.now_us
+        if level == 0:
+            assert system.close_door()
+        else:
+            assert system.open_door_to_level(level)
+        elapsed = clock.now_us - start
+        moved = abs(door.position - before_position)
+        # 이동 전후 stop_all_motors 프레임 2개 포함
+        planned = planner.duration_us(steps) + (steps + 2) * per_frame
+        results.append((level, steps, moved, elapsed, planned, rendered[0]))
+    return results
+
+
+def check_door():
+    """도어 이동 시뮬레이션: 경과 시간 = 계획 + 프레임 전송 (나눠 실행하면 + 화면 갱신), 기존 고정 속도 대비"""
+    ok = True
+    baseline = {level: elapsed for level, _, _, elapsed, _, _ in run_door(None)}
+    sliced_baseline = {level: elapsed for level, _, _, elapsed, _, _ in run_door(None, RENDER_US)}
+    print(f"{'곡선':<10}{'레벨':>6}{'스텝':>6}{'이동':>6}{'경과 ms':>10}{'계획 ms':>10}{'기존 ms':>10}{'단축 %':>8}")
+    for shape in MotionPlanner.SHAPES:
+        for level, steps, moved, elapsed, planned, _ in run_door(shape):
+            ok = ok and moved == steps and elapsed == planned
+            saved = (1 - elapsed / baseline[level]) * 100
+            print(f"{shape:<10}{level:>6}{steps:>6}{moved:>6}{elapsed / 1000:>10.1f}{planned / 1000:>10.1f}"
+                  f"{baseline[level] / 1000:>10.1f}{saved:>8.1f}")
+
+    # 기기 기본 경로: idle_callback(화면 갱신)이 있으면 엔진 구간(20ms)으로 나눠 실행
+    print(f"나눠 실행 (구간마다 화면 갱신 {RENDER_US / 1000:.0f} ms, 경과 = 이동 + 화면 갱신)")
+    print(f"{'곡선':<10}{'레벨':>6}{'스텝':>6}{'이동 ms':>10}{'갱신 ms':>10}{'경과 ms':>10}{'기존 ms':>10}{'단축 %':>8}")
+    for shape in MotionPlanner.SHAPES:
+        for level, steps, moved, elapsed, planned, rendered in run_door(shape, RENDER_US):
+            # 속도 계획을 구간 사이에 이어서 재생하므로 이동 시간은 블로킹 실행과 같음
+            ok = ok and moved == steps and elapsed - rendered == planned
+            saved = (1 - elapsed / sliced_baseline[level]) * 100
+            print(f"{shape:<10}{level:>6}{steps:>6}{(elapsed - rendered) / 1000:>10.1f}{rendered / 1000:>10.1f}"
+                  f"{elapsed / 1000:>10.1f}{sliced_baseline[level] / 1000:>10.1f}{saved:>8.1f}")
+    return ok
+
+
+def check_coordinated():
+    """모터 1~3을 1/2/3칸씩 함께 이동: 모든 모터가 마지막 프레임에 도착하고 느린 모터 한계를 지키는지"""
+    hostsim.reset()
+    outputs = ShiftRegister595()
+    steppers = {m: StepperModel(outputs, m) for m in (1, 2, 3)}
+    last_change = {}
+    for m, stepper in steppers.items():
+        stepper.listeners.append(lambda position, m=m: last_change.__setitem__(m, len(outputs.latches)))
+    controller = StepperMotorController(output="softspi")
+    for m in (1, 2, 3):
+        controller.set_motion_limits(m, max_speed=2400, accel=6000)
+    moves = {1: (-1, 273), 2: (-1, 546), 3: (-1, 819)}
+    start = clock.now_us
+    controller.update_motor_output()
+    per_frame = clock.now_us - start
+    start = clock.now_us
+    played = controller.move_motors(moves)
+    elapsed = clock.now_us - start
+
+    planner = controller.planner_for(moves)
+    planned = planner.duration_us(819) + played * per_frame
+    positions = {m: steppers[m].position for m in steppers}
+    same_finish = len(set(last_change.values())) == 1
+    ok = played == 819 and positions == {1: -273, 2: -546, 3: -819} and same_finish and elapsed == planned
+    # 가장 느린 모터(1칸) 기준 한계: 리드 모터 최고 속도 = 2400 x 819/819, 모터 1 실제 최고 속도 = 리드 x 273/819
+    ok = ok and planner.max_speed <= 2400 and planner.max_speed * 273 / 819 <= 2400
+    print(f"이동 스텝 {played}, 모터 위치 {positions}, 마지막 이동 프레임 {sorted(set(last_change.values()))}, "
+          f"경과 {elapsed / 1000:.1f} ms (계획 + 프레임 전송 {planned / 1000:.1f} ms)")
+    print(f"모터 상태 motor_steps={controller.motor_steps[1:4]}")
+    return ok
+
+
+def main():
+    print("가속/감속 속도 계획 타이밍 시뮬레이션")
+    print("=" * 78)
+    ok = check_profiles()
+    print("-" * 78)
+    ok = check_door() and ok
+    print("-" * 78)
+    ok = check_coordinated() and ok
+    print("-" * 78)
+    print("모든 타이밍 검사 통과" if ok else "타이밍 검사 실패")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
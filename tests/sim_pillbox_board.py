@@ -0,0 +1,118 @@
+"""
+필박스 보드 시뮬레이션 (호스트 PC용, CPython + tests/hostsim)
+
+기기용 StepperMotorController / PillBoxMotorSystem / ButtonInterface를 수정 없이 가상 보드(hostsim.board)에서 실행하고
+시나리오마다 스텝 수, 래치한 프레임 수, 시프트한 비트 수, 입력 스캔 수, 시뮬레이션 경과 시간 보고
+    1. 컨트롤러 직접 구동: 모터 4 연속 200스텝 (비트뱅 / SoftSPI)
+    2. 원점 보정 + 복용 1회: 디스크별 캠 위치가 달라도 각자 리미트 스위치에서 정지, 도어 1단 열고 닫기
+    3. 타이머 구동: machine.Timer(25ms) → micropython.schedule → MotionEngine.update로 디스크를 돌리는 동안
+       메인 루프가 5ms마다 버튼을 스캔하고, 이동 중 누른 버튼 A가 한 번 처리되는지와 응답 지연 확인
+
+실행: python tests/sim_pillbox_board.py
+"""
+
+import os
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(TESTS_DIR, "..", "src")
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, TESTS_DIR)
+
+import hostsim  # noqa: E402
+
+clock = hostsim.install()
+
+from hostsim import check  # noqa: E402
+from hostsim.board import PillboxBoard  # noqa: E402
+from button_interface import ButtonInterface  # noqa: E402
+from motor_control import PillBoxMotorSystem, StepperMotorController  # noqa: E402
+
+CAM_OFFSETS = {1: 0, 2: 90, 3: 181}
+DOOR_LEVEL_1 = 1593
+
+
+def scenario_controller(results):
+    print("1. 컨트롤러 직접 구동 (모터 4 연속 200스텝)")
+    for output in ("bitbang", "softspi"):
+        board = PillboxBoard()
+        controller = StepperMotorController(output=output)
+        board.mark()
+        controller.step_motor_continuous(4, 1, 200)
+        controller.stop_all_motors()
+        r = board.print_report(output)
+        check(results, f"{output}: 200스텝, 스텝당 1프레임", r["steps"][4] == 200 and r["positions"][4] == 200 and
+              r["frames"] == 201 and r["bits"] == 16 * 201 and not r["energized"])
+
+
+def scenario_dose(results):
+    print("2. 원점 보정 + 복용 1회 (디스크 1~3 동시 1칸, 도어 1단 열고 닫기)")
+    board = PillboxBoard(cam_offsets=CAM_OFFSETS)
+    system = PillBoxMotorSystem(state_path=None)
+    system.idle_callback = None
+
+    board.mark()
+    ok = system.calibrate_all_disks_simultaneous()
+    r = board.print_report("원점 보정")
+    expected = {m: (273 - CAM_OFFSETS[m]) % 273 for m in (1, 2, 3)}
+    check(results, "디스크별 캠까지 이동 후 정지", ok and all(r["steps"][m] == expected[m] for m in (1, 2, 3)),
+          str({m: r["steps"][m] for m in (1, 2, 3)}))
+
+    board.mark()
+    ok = (system.advance_disks([1, 2, 3], 1) and system.open_door_to_level(1) and system.close_door())
+    r = board.print_report("복용 1회")
+    check(results, "디스크마다 정확히 1칸 (273스텝)", ok and all(r["steps"][m] == 273 for m in (1, 2, 3)))
+    check(results, "도어 1단 왕복 후 원위치", r["steps"][4] == 2 * DOOR_LEVEL_1 and r["positions"][4] == 0)
+    check(results, "동작 후 모든 코일 OFF", not r["energized"])
+
+
+def scenario_timer_engine(results):
+    print("3. 타이머 구동 모션 엔진 + 버튼 스캔")
+    board = PillboxBoard(cam_offsets=CAM_OFFSETS)
+    system = PillBoxMotorSystem(state_path=None)
+    buttons = ButtonInterface()
+    pressed = []
+    buttons.set_callback('A', lambda: pressed.append(clock.now_us))
+    engine = system.engine
+
+    clock.sleep_ms(100)  # 디바운스 기준 시각(0ms) 이후
+    board.mark()
+    press_ms = clock.now_us // 1000 + 150
+    board.buttons.tap('A', press_ms, hold_ms=60)
+    job = engine.advance([1, 2, 3], 1)
+    engine.start_timer(period_ms=25)
+    polls = 0
+    while not job.done and polls < 10000:
+        buttons.update()
+        polls += 1
+        clock.sleep_ms(5)
+    engine.stop_timer()
+    system.motor_controller.stop_all_motors()
+    r = board.print_report("타이머 구동")
+
+    check(results, "타이머 예약 update만으로 이동 완료", job.done and job.error is None and r["scheduled"] > 0,
+          f"예약 {r['scheduled']}회")
+    check(results, "디스크별 캠에서 정지", all(r["steps"][m] == (273 - CAM_OFFSETS[m]) % 273 or
+                                          r["steps"][m] == 273 for m in (1, 2, 3)),
+          str({m: r["steps"][m] for m in (1, 2, 3)}))
+    latency_ms = (pressed[0] - press_ms * 1000) / 1000 if pressed else None
+    # 눌림은 다음 버튼 스캔에서 처리: 스캔 주기(5ms) + 그 사이에 끼어든 엔진 구간(slice 20ms) 이내
+    check(results, "이동 중 누른 버튼 A 1회 처리", len(pressed) == 1 and latency_ms <= 5 + engine.slice_us / 1000,
+          f"응답 {latency_ms} ms")
+
+
+def main():
+    results = []
+    print("필박스 가상 보드 시뮬레이션")
+    print("=" * 78)
+    scenario_controller(results)
+    scenario_dose(results)
+    scenario_timer_engine(results)
+    ok = all(results)
+    print("-" * 78)
+    print("기기용 모터/버튼 코드가 가상 보드에서 수정 없이 동작" if ok else "가상 보드 시뮬레이션 검사 실패")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+"""
+충전 기록(refill_history) 압축 시험 (호스트 PC용, CPython)
+
+    1. compact_step: 오래된 원본 기록이 날짜/디스크별 요약으로 합쳐지고 최근 RAW_KEEP개는 원본 그대로,
+       요약이 SUMMARY_KEEP개를 넘으면 오래된 요약은 디스크별 누적(refill_totals)으로, 디스크별 전체 충전 횟수 유지
+    2. query: 원본 기록(최신 순) 다음에 요약 항목, 디스크 필터와 개수 제한
+    3. DataManager: 충전마다 원본 기록 추가, 유휴 압축(compact_refill_history, MainScreen.update에서 호출)이
+       밀려도 원본은 RAW_KEEP + COMPACT_SLACK개를 넘지 않음, 압축 결과 저장, 압축할 기록이 없으면 파일 접근 없음
+
+실행: python tests/sim_refill_history.py
+"""
+
+import builtins
+import datetime
+import os
+import shutil
+import sys
+import tempfile
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(TESTS_DIR, "..", "src")
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, TESTS_DIR)
+
+import refill_history  # noqa: E402
+from data_manager import DataManager  # noqa: E402
+from hostsim import check  # noqa: E402
+from refill_history import COMPACT_SLACK, RAW_KEEP, SUMMARY_KEEP  # noqa: E402
+
+START = datetime.datetime(2026, 3, 1, 7, 30, 0)
+
+
+def make_records(count, hours=7):
+    """hours 시간 간격 충전 기록 count개 (디스크 1→2→3 순환, 수량 10~15)"""
+    records = []
+    for k in range(count):
+        t = START + datetime.timedelta(hours=hours * k)
+        records.append({"disk": k % 3 + 1, "timestamp": t.strftime("%Y-%m-%dT%H:%M:%S"), "count": 10 + k % 6})
+    return records
+
+
+def expected_summary(records):
+    """records를 날짜/디스크별로 직접 집계 {(날짜, 디스크): 요약}"""
+    summary = {}
+    for record in records:
+        day, clock = record["timestamp"][:10], record["timestamp"][11:19]
+        entry = summary.setdefault((day, record["disk"]), {
+            "refills": 0, "first": clock, "last": clock, "last_count": record["count"], "max_count": 0})
+        entry["refills"] += 1
+        entry["first"] = min(entry["first"], clock)
+        if clock >= entry["last"]:
+            entry["last"] = clock
+            entry["last_count"] = record["count"]
+        entry["max_count"] = max(entry["max_count"], record["count"])
+    return summary
+
+
+def compact_all(document, max_events=8):
+    """needs_compaction이 False가 될 때까지 compact_step 반복 → 반복 횟수"""
+    steps = 0
+    while refill_history.needs_compaction(document):
+        moved = refill_history.compact_step(document, max_events=max_events)
+        if not moved or moved > 2 * max_events:
+            return -1
+        steps += 1
+    return steps
+
+
+def refill_counts(document):
+    return {disk: refill_history.refill_count(document, disk) for disk in (1, 2, 3)}
+
+
+# ----- 1. compact_step -----
+
+def scenario_compact(results):
+    print(f"compact_step (원본 {RAW_KEEP}개 유지, 요약 {SUMMARY_KEEP}개 유지)")
+    records = make_records(60)
+    document = {"refill_history": [dict(r) for r in records]}
+    counts = refill_counts(document)
+    steps = compact_all(document)
+    history = document["refill_history"]
+    check(results, f"원본은 최근 {RAW_KEEP}개만 그대로", history == records[-RAW_KEEP:] and steps > 0,
+          f"{len(history)}개, 압축 {steps}회")
+
+    expected = expected_summary(records[:-RAW_KEEP])
+    summary = {(e["date"], e["disk"]): {k: e[k] for k in ("refills", "first", "last", "last_count", "max_count")}
+               for e in document["refill_summary"]}
+    check(results, "오래된 원본은 날짜/디스크별 요약으로 합쳐짐 (횟수, 처음/마지막 시각, 마지막/최대 수량)",
+          summary == expected and len(summary) == len(document["refill_summary"]),
+          f"요약 {len(summary)}개")
+    check(results, "요약 순서는 날짜순", [e["date"] for e in document["refill_summary"]] ==
+          sorted(e["date"] for e in document["refill_summary"]))
+    check(results, "디스크별 전체 충전 횟수 유지", refill_counts(document) == counts, str(counts))
+
+    # 같은 날짜/디스크 요약에 더 이른 시각 기록이 늦게 들어온 경우
+    late = {"refill_history": [{"disk": 1, "timestamp": "2026-03-01T09:00:00", "count": 12},
+                               {"disk": 1, "timestamp": "2026-03-01T06:15:00", "count": 14}]}
+    refill_history.compact_step(late, raw_keep=0)
+    entry = late["refill_summary"]
+    check(results, "늦게 들어온 이른 기록: 처음 시각만 앞당기고 마지막 기록은 유지",
+          len(entry) == 1 and entry[0]["first"] == "06:15:00" and entry[0]["last"] == "09:00:00" and
+          entry[0]["last_count"] == 12 and entry[0]["max_count"] == 14 and entry[0]["refills"] == 2, str(entry))
+
+    # 요약이 SUMMARY_KEEP개를 넘으면 오래된 요약은 디스크별 누적으로
+    records = make_records(3 * (SUMMARY_KEEP + 40) + RAW_KEEP, hours=24)
+    document = {"refill_history": [dict(r) for r in records]}
+    counts = refill_counts(document)
+    steps = compact_all(document)
+    totals = document.get("refill_totals", {})
+    check(results, f"요약은 최근 {SUMMARY_KEEP}개만, 밀려난 요약은 refill_totals로",
+          steps > 0 and len(document["refill_summary"]) == SUMMARY_KEEP and len(document["refill_history"]) == RAW_KEEP
+          and sum(totals.values()) == len(records) - RAW_KEEP - SUMMARY_KEEP, str(totals))
+    check(results, "누적 후에도 디스크별 전체 충전 횟수 유지", refill_counts(document) == counts, str(counts))
+    check(results, "압축할 기록이 없으면 변경 없음", refill_history.compact_step(document) == 0)
+
+
+# ----- 2. query -----
+
+def scenario_query(results):
+    print("query (원본 + 요약)")
+    records = make_records(30)
+    document = {"refill_history": [dict(r) for r in records]}
+    compact_all(document)
+
+    result = refill_history.query(document, limit=25)
+    raw = result[:RAW_KEEP]
+    check(results, "원본 기록을 최신 순으로 먼저",
+          raw == list(reversed(records[-RAW_KEEP:])) and not any(r.get("summary") for r in raw))
+    summaries = result[RAW_KEEP:]
+    newest = list(reversed(document["refill_summary"]))[:len(summaries)]
+    check(results, "부족한 개수는 최근 요약 항목으로 (그날 충전 횟수와 summary 표시)",
+          len(result) == 25 and all(r["summary"] and r["refills"] == e["refills"] and
+                                    r["timestamp"] == f"{e['date']}T{e['last']}" and r["count"] == e["last_count"]
+                                    for r, e in zip(summaries, newest)))
+    result = refill_history.query(document, disk_num=2, limit=50)
+    timestamps = [r["timestamp"] for r in result]
+    check(results, "디스크 필터: 그 디스크 기록만, 최신 순",
+          all(r["disk"] == 2 for r in result) and timestamps == sorted(timestamps, reverse=True) and
+          sum(r.get("refills", 1) for r in result) == refill_history.refill_count(document, 2))
+    check(results, "개수 제한", len(refill_history.query(document, limit=5)) == 5)
+
+
+# ----- 3. DataManager -----
+
+class FakeClock:
+    """DataManager._get_current_time 대체 (호출마다 hours 시간씩 진행)"""
+
+    def __init__(self, hours=7):
+        self.now = START
+        self.step = datetime.timedelta(hours=hours)
+
+    def __call__(self):
+        self.now += self.step
+        return self.now.timetuple()[:8]
+
+
+class OpenCounter:
+    """builtins.open 호출 횟수 집계"""
+
+    def __init__(self):
+        self.opens = 0
+        self._original_open = builtins.open
+
+    def __enter__(self):
+        counter = self
+        original_open = self._original_open
+
+        def counting_open(*args, **kwargs):
+            counter.opens += 1
+            return original_open(*args, **kwargs)
+
+        builtins.open = counting_open
+        return self
+
+    def __exit__(self, *args):
+        builtins.open = self._original_open
+
+
+def new_manager(data_dir):
+    dm = DataManager(data_dir)
+    dm._get_current_time = FakeClock()
+    return dm
+
+
+def refill(dm, disk_num, refills):
+    """배출로 비운 뒤 15개 충전 (충전 기록 1개), refills에 디스크별 충전 횟수 집계"""
+    refills[disk_num] += 1
+    return dm.update_disk_count(disk_num, 0) and dm.update_disk_count(disk_num, 15)
+
+
+def scenario_data_manager(results, data_dir):
+    print("DataManager 충전 기록 / 유휴 압축")
+    dm = new_manager(data_dir)
+    refills = {1: 0, 2: 0, 3: 0}
+    ok = all(refill(dm, k % 3 + 1, refills) for k in range(RAW_KEEP + 5))
+    history = dm.load_medication_data()["refill_history"]
+    check(results, f"충전 {RAW_KEEP + 5}회: 원본 기록 추가, 한도({RAW_KEEP + COMPACT_SLACK}개) 안이면 즉시 압축 안 함",
+          ok and len(history) == RAW_KEEP + 5)
+
+    moved = []
+    while True:
+        n = dm.compact_refill_history()
+        if not n:
+            break
+        moved.append(n)
+    document = new_manager(data_dir).load_medication_data()
+    check(results, f"유휴 압축(MainScreen.update 루프): 원본 {RAW_KEEP}개로 줄고 결과가 파일에 저장",
+          moved == [5] and len(document["refill_history"]) == RAW_KEEP and
+          sum(e["refills"] for e in document["refill_summary"]) == 5, f"압축 {moved}")
+    with OpenCounter() as counter:
+        n = dm.compact_refill_history()
+    check(results, "압축할 기록이 없으면 파일 접근 없이 0", n == 0 and counter.opens == 0, f"open {counter.opens}회")
+
+    longest = 0
+    for k in range(3 * COMPACT_SLACK):
+        refill(dm, k % 3 + 1, refills)
+        longest = max(longest, len(dm.load_medication_data()["refill_history"]))
+    check(results, f"유휴 압축 없이 충전이 이어져도 원본은 {RAW_KEEP + COMPACT_SLACK}개 이하",
+          longest <= RAW_KEEP + COMPACT_SLACK, f"최대 {longest}개")
+    counts = refill_counts(new_manager(data_dir).load_medication_data())
+    check(results, "디스크별 전체 충전 횟수 = 충전 횟수", counts == refills, str(counts))
+
+
+def main():
+    results = []
+    print("충전 기록 압축 시험")
+    print("=" * 72)
+    scenario_compact(results)
+    scenario_query(results)
+    data_dir = tempfile.mkdtemp(prefix="pillbox_refill_")
+    try:
+        scenario_data_manager(results, data_dir)
+    finally:
+        shutil.rmtree(data_dir)
+    ok = all(results)
+    print("-" * 72)
+    print("충전 기록은 정해진 크기 안에서 횟수를 잃지 않고 압축" if ok else "충전 기록 압축 검사 실패")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
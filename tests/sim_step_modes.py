@@ -0,0 +1,251 @@
+"""
+스텝 방식(하프스텝 / 풀스텝 / 웨이브) 시뮬레이션 (호스트 PC용, CPython + tests/hostsim)
+
+    1. 위치 일관성: 방식을 섞은 이동(홀수/짝수 스텝, 여러 모터 동시 도착, 엔진 구간으로 나눠 실행)을
+       반복한 뒤 모델 위치 = 명령한 하프스텝 합, motor_steps = 회전자 시퀀스 위치, 누적 스텝 일치
+    2. 도어 이동: 레벨 이동마다 방식별 이동 시간, 코일 평균 통전 수 비교 (도착 위치는 같아야 함),
+       기기 기본 경로(idle_callback 화면 갱신, 엔진 구간으로 나눠 실행)의 하프스텝/풀스텝 시간 비교
+    3. 배출 시나리오: main_screen 배출 순서(디스크 1칸 → 도어 열기, 마지막에 닫기)를
+       도어 방식별로 실행하여 모터 동작 시간 비교 (디스크 칸 이동은 항상 하프스텝)
+
+실행: python tests/sim_step_modes.py
+"""
+
+import os
+import random
+import sys
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(TESTS_DIR, "..", "src")
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, TESTS_DIR)
+
+import hostsim  # noqa: E402
+
+clock = hostsim.install()
+
+from hostsim import check  # noqa: E402
+from hostsim.board import PillboxBoard  # noqa: E402
+from hostsim.stepper import HALF_STEP_SEQUENCE  # noqa: E402
+from motor_control import STEP_MODES, MoveJob, PillBoxMotorSystem  # noqa: E402
+
+MODES = ("half", "full", "wave")
+DOOR_LEVEL_STEPS = {0: 0, 1: 1593, 2: 3187, 3: 4781}
+DOOR_MOVES = ((0, 1), (0, 2), (0, 3), (1, 2), (2, 3), (1, 0), (2, 0), (3, 0))
+# (이름, 배출 디스크, 도어 레벨) - 도어 레벨이 None이면 닫기 (모든 약 소진)
+DISPENSE_SEQUENCE = (
+    ("아침 디스크 1, 1단", [1], 1),
+    ("점심 디스크 1~2, 2단", [1, 2], 2),
+    ("저녁 디스크 1~3, 3단", [1, 2, 3], 3),
+    ("약 소진 후 닫기", [], None),
+)
+RENDER_US = 15000  # 나눠 실행할 때 구간 사이 화면 갱신 1회 비용 (lv.timer_handler)
+FULL_NIBBLES = set(HALF_STEP_SEQUENCE[1::2])
+WAVE_NIBBLES = set(HALF_STEP_SEQUENCE[0::2])
+
+
+def new_system(board, door_mode="full", idle=None):
+    system = PillBoxMotorSystem(state_path=None)
+    system.idle_callback = idle
+    system.door_step_mode = door_mode
+    return system
+
+
+def coil_stats(latches, motor_index):
+    """래치 프레임 목록에서 모터 니블 → (한 코일 프레임 수, 두 코일 프레임 수, 평균 통전 코일 수)"""
+    shift = (motor_index - 1) * 4
+    nibbles = [(word >> shift) & 0x0F for word in latches]
+    nibbles = [n for n in nibbles if n]
+    wave = sum(1 for n in nibbles if n in WAVE_NIBBLES)
+    full = sum(1 for n in nibbles if n in FULL_NIBBLES)
+    coils = sum(bin(n).count("1") for n in nibbles) / len(nibbles) if nibbles else 0
+    return wave, full, coils
+
+
+# ----- 1. 위치 일관성 -----
+
+def scenario_consistency(results, seed=7, moves=60):
+    print(f"방식을 섞은 이동 {moves}회 (모터 1~2 동시 도착 + 도어, 엔진 20ms 구간으로 나눠 실행)")
+    board = PillboxBoard()
+    system = new_system(board)
+    system.idle_callback = lambda: None  # 엔진 구간마다 멈췄다가 이어서 실행
+    controller = system.motor_controller
+    rng = random.Random(seed)
+    expected = {m: 0 for m in (1, 2, 4)}
+    total = {m: 0 for m in (1, 2, 4)}
+    stray = 0
+    for _ in range(moves):
+        mode = rng.choice(MODES)
+        if rng.random() < 0.5:
+            move = {4: (rng.choice((-1, 1)), rng.randint(1, 900))}
+        else:
+            move = {m: (rng.choice((-1, 1)), rng.randint(1, 400)) for m in (1, 2)}
+        before = len(board.outputs.latches)
+        system.wait(MoveJob(move, mode=mode))
+        for m, (direction, steps) in move.items():
+            expected[m] += direction * steps
+            total[m] += steps
+            if mode != "half":
+                # 홀짝 맞춤/남은 하프스텝 외에는 모두 방식의 코일 조합
+                wave, full, _ = coil_stats(board.outputs.latches[before:], m)
+                stray += max(0, min(wave, full) - 2)
+        if rng.random() < 0.3:
+            controller.stop_all_motors()
+    positions = {m: board.steppers[m].position for m in expected}
+    phases_ok = all(controller.motor_steps[m] == board.steppers[m]._index for m in expected)
+    check(results, "모델 위치 = 명령한 하프스텝 합", positions == expected, f"{positions}")
+    check(results, "실제 스텝 수 = 이동 거리 (되돌아가거나 건너뛴 스텝 없음)",
+          all(board.steppers[m].steps == total[m] for m in expected))
+    check(results, "motor_steps(하프스텝 시퀀스 위치) = 회전자 위치", phases_ok,
+          f"{[controller.motor_steps[m] for m in expected]}")
+    check(results, "누적 스텝(위치 상태 저장용) = 이동 거리",
+          all(system.step_counts[m] == total[m] for m in expected))
+    check(results, "풀스텝/웨이브 이동은 맞춤 하프스텝 2개 외에 방식의 코일 조합만 출력", stray == 0)
+
+    # 지원하지 않는 방식 / 홀짝이 맞지 않는 직접 컴파일은 오류
+    errors = 0
+    for call in (lambda: controller.compile_motion({4: (1, 4)}, mode="micro"),
+                 lambda: controller.compile_motion({4: (1, 4)}, mode="full" if controller.motor_steps[4] % 2 == 0
+                                                   else "wave")):
+        try:
+            call()
+        except ValueError:
+            errors += 1
+    check(results, "잘못된 방식 / 시퀀스 홀짝 불일치는 ValueError", errors == 2)
+
+
+# ----- 2. 도어 이동 -----
+
+def run_door(mode, start, level, render_us=None):
+    """도어 start→level 이동 → (성공, 경과 us, 이동 스텝, 위치, 프레임 수, 평균 통전 코일 수, 화면 갱신 us)
+
+    render_us=None이면 블로킹 실행, 아니면 엔진 구간 사이마다 render_us 화면 갱신 (기기 기본 경로)
+    """
+    board = PillboxBoard()
+    rendered = [0]
+
+    def refresh():
+        rendered[0] += render_us
+        clock.advance_us(render_us)
+
+    system = new_system(board, mode, None if render_us is None else refresh)
+    system.current_door_level = start
+    board.steppers[4].position = -DOOR_LEVEL_STEPS[start]
+    board.mark()
+    before = len(board.outputs.latches)
+    start_us = clock.now_us
+    ok = system.close_door() if level == 0 else system.open_door_to_level(level)
+    elapsed = clock.now_us - start_us
+    _, _, coils = coil_stats(board.outputs.latches[before:], 4)
+    report = board.report()
+    return ok, elapsed, report["steps"][4], board.steppers[4].position, report["frames"], coils, rendered[0]
+
+
+def scenario_door(results):
+    print("도어 레벨 이동 (방식별 이동 시간 ms / 프레임 수 / 평균 통전 코일 수)")
+    print(f"  {'이동':<8}{'스텝':>6}" + "".join(f"{mode + ' ms':>11}{'프레임':>7}{'코일':>6}" for mode in MODES)
+          + f"{'풀스텝 단축':>11}")
+    faster = True
+    same = True
+    for start, level in DOOR_MOVES:
+        steps = abs(DOOR_LEVEL_STEPS[level] - DOOR_LEVEL_STEPS[start])
+        row = {}
+        for mode in MODES:
+            row[mode] = run_door(mode, start, level)
+        line = f"  {str(start) + '→' + str(level):<8}{steps:>6}"
+        for mode in MODES:
+            ok, elapsed, moved, position, frames, coils, _ = row[mode]
+            same = same and ok and moved == steps and position == -DOOR_LEVEL_STEPS[level]
+            line += f"{elapsed / 1000:>11.1f}{frames:>7}{coils:>6.2f}"
+        saved = 1 - row["full"][1] / row["half"][1]
+        faster = faster and saved > 0.1
+        print(line + f"{saved * 100:>10.1f}%")
+    check(results, "모든 방식이 같은 레벨 위치에 도착 (하프스텝 단위)", same)
+    check(results, "풀스텝 도어 이동이 하프스텝보다 10% 이상 빠름", faster)
+
+    print(f"나눠 실행 (기기 기본 경로, 구간마다 화면 갱신 {RENDER_US / 1000:.0f} ms, 경과 = 이동 + 화면 갱신)")
+    print(f"  {'이동':<8}{'스텝':>6}" + "".join(f"{mode + ' 이동':>11}{'경과 ms':>10}" for mode in ("half", "full"))
+          + f"{'풀스텝 단축':>11}")
+    faster = True
+    same = True
+    for start, level in DOOR_MOVES:
+        steps = abs(DOOR_LEVEL_STEPS[level] - DOOR_LEVEL_STEPS[start])
+        line = f"  {str(start) + '→' + str(level):<8}{steps:>6}"
+        elapsed = {}
+        for mode in ("half", "full"):
+            ok, sliced_us, moved, position, _, _, rendered = run_door(mode, start, level, RENDER_US)
+            blocking_us = run_door(mode, start, level)[1]
+            # 속도 계획을 구간 사이에 이어서 재생: 이동 시간은 블로킹 실행과 같음 (화면 갱신 시간만 추가)
+            same = same and ok and moved == steps and position == -DOOR_LEVEL_STEPS[level] and \
+                sliced_us - rendered == blocking_us
+            elapsed[mode] = sliced_us
+            line += f"{(sliced_us - rendered) / 1000:>11.1f}{sliced_us / 1000:>10.1f}"
+        saved = 1 - elapsed["full"] / elapsed["half"]
+        faster = faster and saved > 0.1
+        print(line + f"{saved * 100:>10.1f}%")
+    check(results, "나눠 실행해도 방식별 이동 시간 = 블로킹 실행 (최고 속도까지 가속)", same)
+    check(results, "나눠 실행해도 풀스텝 도어 이동이 하프스텝보다 10% 이상 빠름", faster)
+
+
+# ----- 3. 배출 시나리오 -----
+
+def run_dispense(mode):
+    """배출 순서 실행 → [(이름, 디스크 ms, 도어 ms)], 최종 모델 위치"""
+    board = PillboxBoard(cam_offsets={1: 0, 2: 0, 3: 0})
+    system = new_system(board, mode)
+    rows = []
+    for name, disks, level in DISPENSE_SEQUENCE:
+        start_us = clock.now_us
+        if disks:
+            assert system.advance_disks(disks, 1, drop_ms=0)
+        disk_us = clock.now_us - start_us
+        start_us = clock.now_us
+        if level is None:
+            assert system.close_door()
+        else:
+            assert system.open_door_to_level(level)
+        rows.append((name, disk_us, clock.now_us - start_us))
+    positions = {m: stepper.position for m, stepper in board.steppers.items()}
+    return rows, positions
+
+
+def scenario_dispense(results):
+    print("배출 시나리오 (디스크 하프스텝 고정, 도어 방식별 모터 동작 ms)")
+    runs = {mode: run_dispense(mode) for mode in MODES}
+    print(f"  {'시나리오':<22}{'디스크':>8}" + "".join(f"{'도어 ' + mode:>11}" for mode in MODES)
+          + f"{'합계 단축':>10}")
+    totals = {mode: 0 for mode in MODES}
+    for k, (name, disk_us, _) in enumerate(runs["half"][0]):
+        line = f"  {name:<22}{disk_us / 1000:>8.1f}"
+        for mode in MODES:
+            _, mode_disk_us, door_us = runs[mode][0][k]
+            totals[mode] += mode_disk_us + door_us
+            line += f"{door_us / 1000:>11.1f}"
+        half_total = disk_us + runs["half"][0][k][2]
+        full_total = runs["full"][0][k][1] + runs["full"][0][k][2]
+        print(line + f"{(1 - full_total / half_total) * 100:>9.1f}%")
+    print(f"  {'합계 (ms)':<30}" + "".join(f"{totals[mode] / 1000:>11.1f}" for mode in MODES))
+    positions = [runs[mode][1] for mode in MODES]
+    check(results, "방식과 관계없이 디스크/도어 최종 위치 같음", all(p == positions[0] for p in positions),
+          str(positions[0]))
+    disk_times = set(tuple(row[1] for row in runs[mode][0]) for mode in MODES)
+    check(results, "디스크 칸 이동 시간은 도어 방식과 무관 (하프스텝 유지)", len(disk_times) == 1)
+    check(results, "풀스텝 도어로 배출 순서 전체 시간 단축", totals["full"] < totals["half"],
+          f"{totals['half'] / 1000:.1f} → {totals['full'] / 1000:.1f} ms")
+
+
+def main():
+    results = []
+    print("스텝 방식 시뮬레이션: " + ", ".join(f"{mode} = {STEP_MODES[mode][0]}하프스텝/프레임" for mode in MODES))
+    print("=" * 96)
+    scenario_consistency(results)
+    scenario_door(results)
+    scenario_dispense(results)
+    ok = all(results)
+    print("-" * 96)
+    print("스텝 방식을 바꿔도 위치는 하프스텝 단위로 일치, 도어는 풀스텝으로 단축" if ok else "스텝 방식 검사 실패")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())